@@ -1,10 +1,15 @@
 -- ObservationClient.lua
 local util = require("util")
 local Sensor = require("Sensor")
+local StateDelta = require("StateDelta")
 
 
 local TAG = "[AISurvivorBridge] "
 local OUTPUT_FILE_NAME = "AISurvivorBridge/state.json"
+local BINARY_OUTPUT_FILE_NAME = "AISurvivorBridge/state.bin"
+-- Keyframes are mirrored here, so a reader that skipped one can still apply the deltas after it
+local KEY_OUTPUT_FILE_NAME = "AISurvivorBridge/state_key.json"
+local BINARY_KEY_OUTPUT_FILE_NAME = "AISurvivorBridge/state_key.bin"
 
 print(TAG.."ObservationClient.lua loading..")
 local ObservationClient = {}
@@ -15,6 +20,49 @@ local WRITE_INTERVAL_MS = 200
 local lastScanTime = 0
 local SCAN_INTERVAL_MS = 100
 
+-- State transport, negotiated via launch_config.json ("state_format": "json" | "msgpack")
+-- Delta frames, negotiated the same way ("state_delta": "on" | "off")
+local stateFormat = "json"
+local stateDelta = false
+local lastFormatCheckTime = 0
+local FORMAT_CHECK_INTERVAL_MS = 5000
+
+local function refreshStateFormat(now)
+    lastFormatCheckTime = now
+    local requested = util.readLaunchOption("state_format") or "json"
+    if requested ~= stateFormat then
+        print(TAG.."State format: "..requested)
+        stateFormat = requested
+    end
+
+    local delta = util.readLaunchOption("state_delta") == "on"
+    if delta ~= stateDelta then
+        print(TAG.."Delta frames: "..(delta and "on" or "off"))
+        stateDelta = delta
+        StateDelta.reset()
+    end
+end
+
+local function publishState(state)
+    local kind = nil
+    if stateDelta then kind = StateDelta.begin(state) end
+
+    local binary = stateFormat == "msgpack" and util.writeStateBinary(BINARY_OUTPUT_FILE_NAME, state)
+    if not binary then
+        -- JSON is the fallback (and the default)
+        util.writeState(OUTPUT_FILE_NAME, state)
+    end
+
+    if kind == "key" then
+        if binary then
+            util.writeStateBinary(BINARY_KEY_OUTPUT_FILE_NAME, state, true)
+        else
+            util.writeState(KEY_OUTPUT_FILE_NAME, state, true)
+        end
+    end
+    if kind then StateDelta.finish(state) end
+end
+
 -- Global state object for this module
 local state = nil
 
@@ -60,7 +108,8 @@ end
 function ObservationClient.OnGameStart()
     print(TAG.."Initializing ObservationClient State...")
     state = util.initState()
-    util.writeState(OUTPUT_FILE_NAME, state)
+    refreshStateFormat(getTimestampMs())
+    publishState(state)
 end
 
 function ObservationClient.OnPlayerUpdateObserve(player)
@@ -392,7 +441,10 @@ function ObservationClient.OnPlayerUpdateObserve(player)
         }
 
         -- Write to disk
-        util.writeState(OUTPUT_FILE_NAME, state)
+        if (now - lastFormatCheckTime) > FORMAT_CHECK_INTERVAL_MS then
+            refreshStateFormat(now)
+        end
+        publishState(state)
     end
 end
 
@@ -0,0 +1,175 @@
+-- StateDelta.lua
+--
+-- Keyframe + delta frames for the state channel (read by bot_runtime/ingest/delta.py).
+--
+-- Every frame gets a header: state.frame = { kind = "key"|"delta", session = S, key = K }.
+-- A keyframe is the full state. A delta frame drops the keyed vision lists (KEYED_LISTS)
+-- and sends vision.delta[list] = { set = { [key] = entry }, del = { key, ... } } instead.
+-- Deltas are cumulative against keyframe K, so the reader only ever needs the latest
+-- delta and its keyframe, however many frames it skipped.
+--
+-- Usage: local kind = StateDelta.begin(state) -> write -> StateDelta.finish(state)
+
+local StateDelta = {}
+
+StateDelta.KEYFRAME_INTERVAL = 25   -- frames (5s at 200ms)
+StateDelta.MAX_CHANGE_RATIO = 0.5   -- bigger deltas are sent as a keyframe instead
+
+local floor = math.floor
+local format = string.format
+local concat = table.concat
+
+-- Entry keys (must match delta.py)
+local function tileKey(t)
+    return format("%d,%d,%d", floor(t.x or 0), floor(t.y or 0), floor(t.z or 0))
+end
+
+local function containerKey(c)
+    if c.id ~= nil then
+        return tostring(c.id) .. "@" .. format("%d", floor(c.z or 0))
+    end
+    local parent = (c.meta and c.meta.parent_id) or ""
+    return tostring(parent) .. "|" .. tostring(c.object_type or "") .. "|" ..
+        format("%d,%d,%d", floor(c.x or 0), floor(c.y or 0), floor(c.z or 0))
+end
+
+local function itemKey(i)
+    return tostring(i.id)
+end
+
+-- Change detection: tiles are hot, so they get a flat signature
+local function tileSignature(t)
+    return (t.w and "1" or "0") .. (t.v and "1" or "0") .. (t.room or "") .. "|" .. (t.layer or "")
+end
+
+local function signature(v)
+    if type(v) ~= "table" then return tostring(v) end
+    local parts = {}
+    if rawget(v, 1) ~= nil then
+        for i = 1, #v do parts[#parts + 1] = signature(v[i]) end
+        return "[" .. concat(parts, ",") .. "]"
+    end
+    local keys = {}
+    for k in pairs(v) do keys[#keys + 1] = k end
+    table.sort(keys, function(a, b) return tostring(a) < tostring(b) end)
+    for _, k in ipairs(keys) do
+        parts[#parts + 1] = tostring(k) .. "=" .. signature(v[k])
+    end
+    return "{" .. concat(parts, ",") .. "}"
+end
+
+local KEYED_LISTS = {
+    { name = "tiles", key = tileKey, sig = tileSignature },
+    { name = "nearby_containers", key = containerKey, sig = signature },
+    { name = "world_items", key = itemKey, sig = signature },
+}
+
+local session = getTimestampMs and getTimestampMs() or os.time()
+local keyNumber = 0
+local sinceKey = 0
+local base = nil      -- list name -> { key -> signature } at the last keyframe
+local stash = nil     -- lists removed from vision while a delta frame is written
+
+-- Keys entries in order; repeated keys get a "#n" suffix
+local function indexEntries(entries, spec)
+    local out = {}
+    if not entries then return out end
+    for _, e in ipairs(entries) do
+        local k = spec.key(e)
+        if out[k] then
+            local n = 2
+            while out[k .. "#" .. n] do n = n + 1 end
+            k = k .. "#" .. n
+        end
+        out[k] = e
+    end
+    return out
+end
+
+local function signatures(current)
+    local sigs = {}
+    for _, spec in ipairs(KEYED_LISTS) do
+        local s = {}
+        for k, e in pairs(current[spec.name]) do s[k] = spec.sig(e) end
+        sigs[spec.name] = s
+    end
+    return sigs
+end
+
+-- Forces the next frame to be a keyframe (e.g. after the reader restarted)
+function StateDelta.reset()
+    base = nil
+end
+
+-- Prepares `state` for writing. Returns "key" or "delta".
+function StateDelta.begin(state)
+    local vision = state.player and state.player.vision
+    local current = {}
+    local total = 0
+    for _, spec in ipairs(KEYED_LISTS) do
+        current[spec.name] = indexEntries(vision and vision[spec.name], spec)
+        if vision and vision[spec.name] then total = total + #vision[spec.name] end
+    end
+
+    if base and sinceKey < StateDelta.KEYFRAME_INTERVAL then
+        local delta = {}
+        local count = 0
+        for _, spec in ipairs(KEYED_LISTS) do
+            local old = base[spec.name]
+            local set, del = {}, {}
+            local nSet, nDel = 0, 0
+            for k, e in pairs(current[spec.name]) do
+                if old[k] ~= spec.sig(e) then
+                    set[k] = e
+                    nSet = nSet + 1
+                end
+            end
+            for k in pairs(old) do
+                if current[spec.name][k] == nil then
+                    nDel = nDel + 1
+                    del[nDel] = k
+                end
+            end
+            if nSet > 0 or nDel > 0 then
+                local change = {}
+                if nSet > 0 then change.set = set end
+                if nDel > 0 then change.del = del end
+                delta[spec.name] = change
+                count = count + nSet + nDel
+            end
+        end
+
+        if count <= StateDelta.MAX_CHANGE_RATIO * math.max(total, 1) then
+            sinceKey = sinceKey + 1
+            state.frame = { kind = "delta", session = session, key = keyNumber }
+            if vision then
+                stash = {}
+                for _, spec in ipairs(KEYED_LISTS) do
+                    stash[spec.name] = vision[spec.name]
+                    vision[spec.name] = nil
+                end
+                if next(delta) then vision.delta = delta end
+            end
+            return "delta"
+        end
+    end
+
+    keyNumber = keyNumber + 1
+    sinceKey = 0
+    base = signatures(current)
+    state.frame = { kind = "key", session = session, key = keyNumber }
+    return "key"
+end
+
+-- Restores the lists removed by begin() (the same vision may be published again)
+function StateDelta.finish(state)
+    state.frame = nil
+    local vision = state.player and state.player.vision
+    if vision and stash then
+        for name, list in pairs(stash) do vision[name] = list end
+        vision.delta = nil
+    end
+    stash = nil
+end
+
+return StateDelta
@@ -0,0 +1,161 @@
+-- msgpack.lua
+--
+-- Minimal msgpack encoder for the binary state channel (see util.writeStateBinary).
+-- Output is a Lua string with one byte per character (0-255), written with
+-- DataOutputStream:writeBytes. Tables follow json.lua: a table with [1] set is an
+-- array, anything else (including {}) is a map.
+
+local msgpack = {}
+
+local char = string.char
+local floor = math.floor
+local concat = table.concat
+
+local LOG2 = math.log(2)
+
+local function u16(n)
+    return char(floor(n / 256), n % 256)
+end
+
+local function u32(n)
+    return char(floor(n / 16777216) % 256, floor(n / 65536) % 256, floor(n / 256) % 256, n % 256)
+end
+
+-- IEEE 754 double, big endian
+local function float64(n)
+    local sign = 0
+    if n < 0 or (n == 0 and 1 / n < 0) then
+        sign = 128
+        n = -n
+    end
+
+    if n ~= n then
+        return char(0xcb, 0x7f, 0xf8, 0, 0, 0, 0, 0, 0)
+    elseif n == math.huge then
+        return char(0xcb, sign + 0x7f, 0xf0, 0, 0, 0, 0, 0, 0)
+    elseif n == 0 then
+        return char(0xcb, sign, 0, 0, 0, 0, 0, 0, 0)
+    end
+
+    local e = floor(math.log(n) / LOG2)
+    local m = n / 2 ^ e
+    -- log() rounding
+    if m >= 2 then m = m / 2; e = e + 1 elseif m < 1 then m = m * 2; e = e - 1 end
+
+    if e < -1022 then
+        -- Subnormal
+        m = n / 2 ^ -1022
+        e = -1023
+    else
+        m = m - 1
+    end
+
+    local biased = e + 1023
+    local mant = m * 2 ^ 52
+    local hi = floor(mant / 4294967296)
+    local lo = mant - hi * 4294967296
+
+    return char(0xcb,
+        sign + floor(biased / 16),
+        (biased % 16) * 16 + floor(hi / 65536),
+        floor(hi / 256) % 256,
+        hi % 256) .. u32(lo)
+end
+
+local function encodeNumber(n, out)
+    if n == floor(n) and n >= -2147483648 and n <= 4294967295 then
+        if n >= 0 then
+            if n < 128 then out[#out + 1] = char(n)
+            elseif n < 256 then out[#out + 1] = char(0xcc, n)
+            elseif n < 65536 then out[#out + 1] = char(0xcd) .. u16(n)
+            else out[#out + 1] = char(0xce) .. u32(n) end
+        else
+            if n >= -32 then out[#out + 1] = char(256 + n)
+            elseif n >= -128 then out[#out + 1] = char(0xd0, 256 + n)
+            elseif n >= -32768 then out[#out + 1] = char(0xd1) .. u16(65536 + n)
+            else out[#out + 1] = char(0xd2) .. u32(4294967296 + n) end
+        end
+    else
+        out[#out + 1] = float64(n)
+    end
+end
+
+-- Kahlua strings are Java strings: characters above 127 need UTF-8 encoding
+local function utf8(s)
+    local parts = {}
+    local i, len = 1, #s
+    while i <= len do
+        local c = string.byte(s, i)
+        if c < 128 then
+            parts[#parts + 1] = char(c)
+        elseif c < 2048 then
+            parts[#parts + 1] = char(192 + floor(c / 64), 128 + c % 64)
+        elseif c >= 0xD800 and c <= 0xDBFF and i < len then
+            -- Surrogate pair
+            local c2 = string.byte(s, i + 1)
+            local cp = 0x10000 + (c - 0xD800) * 1024 + (c2 - 0xDC00)
+            parts[#parts + 1] = char(240 + floor(cp / 262144), 128 + floor(cp / 4096) % 64,
+                                     128 + floor(cp / 64) % 64, 128 + cp % 64)
+            i = i + 1
+        else
+            parts[#parts + 1] = char(224 + floor(c / 4096), 128 + floor(c / 64) % 64, 128 + c % 64)
+        end
+        i = i + 1
+    end
+    return concat(parts)
+end
+
+local function encodeString(s, out)
+    if string.find(s, "[^\1-\127]") then
+        s = utf8(s)
+    end
+    local n = #s
+    if n < 32 then out[#out + 1] = char(0xa0 + n)
+    elseif n < 256 then out[#out + 1] = char(0xd9, n)
+    elseif n < 65536 then out[#out + 1] = char(0xda) .. u16(n)
+    else out[#out + 1] = char(0xdb) .. u32(n) end
+    out[#out + 1] = s
+end
+
+local encode
+
+local function encodeTable(t, out)
+    if rawget(t, 1) ~= nil then
+        local n = #t
+        if n < 16 then out[#out + 1] = char(0x90 + n)
+        elseif n < 65536 then out[#out + 1] = char(0xdc) .. u16(n)
+        else out[#out + 1] = char(0xdd) .. u32(n) end
+        for i = 1, n do
+            encode(t[i], out)
+        end
+    else
+        local n = 0
+        for _ in pairs(t) do n = n + 1 end
+        if n < 16 then out[#out + 1] = char(0x80 + n)
+        elseif n < 65536 then out[#out + 1] = char(0xde) .. u16(n)
+        else out[#out + 1] = char(0xdf) .. u32(n) end
+        for k, v in pairs(t) do
+            encodeString(tostring(k), out)
+            encode(v, out)
+        end
+    end
+end
+
+encode = function(v, out)
+    local t = type(v)
+    if t == "table" then encodeTable(v, out)
+    elseif t == "string" then encodeString(v, out)
+    elseif t == "number" then encodeNumber(v, out)
+    elseif t == "boolean" then out[#out + 1] = v and char(0xc3) or char(0xc2)
+    else out[#out + 1] = char(0xc0) end
+end
+
+function msgpack.encode(val)
+    local out = {}
+    encode(val, out)
+    return concat(out)
+end
+
+msgpack.u32 = u32
+
+return msgpack
@@ -1,5 +1,6 @@
 -- util.lua
 local json = require("json")
+local msgpack = require("msgpack")
 
 local util = {}
 
@@ -38,8 +39,15 @@ function util.decode(jsonText)
 end
 
 -- write
-local writeState = function(fileName, state)
+-- Frame trailer: "\n#PZB <seq> <length>\n" after the JSON body.
+-- Lets the reader detect a partially written file without parsing the JSON.
+util.STATE_TRAILER = true
+local stateSeq = 0
+
+-- `mirror`: copy of the current frame to a side file (keeps the current seq)
+local writeState = function(fileName, state, mirror)
     local jsonText = encode(state)
+    if not jsonText then return end
     local writer, _ = getFileWriter(fileName, true, false)
     if not writer then
         print(TAG.."writer not")
@@ -47,8 +55,62 @@ local writeState = function(fileName, state)
     end
 
     writer:write(jsonText)
+    if util.STATE_TRAILER then
+        if not mirror then stateSeq = stateSeq + 1 end
+        writer:write("\n#PZB " .. tostring(stateSeq) .. " " .. tostring(#jsonText) .. "\n")
+    end
     writer:close()
 end
+
+-- write (binary transport)
+-- Frame: "PZMP" | seq (uint32 BE) | length (uint32 BE) | msgpack body
+-- The length-prefixed header lets the reader detect a partially written file.
+-- Returns false if binary file output is unavailable, so the caller can fall back to JSON.
+local writeStateBinary = function(fileName, state, mirror)
+    if not getFileOutput or not endFileOutput then return false end
+
+    local ok, body = pcall(msgpack.encode, state)
+    if not ok then
+        print(TAG.."msgpack encode failed: "..tostring(body))
+        return false
+    end
+
+    if not mirror then stateSeq = stateSeq + 1 end
+    local frame = "PZMP" .. msgpack.u32(stateSeq % 4294967296) .. msgpack.u32(#body) .. body
+
+    local okWrite, err = pcall(function()
+        local out = getFileOutput(fileName)
+        -- writeBytes writes the low byte of each character: one call per frame
+        out:writeBytes(frame)
+        endFileOutput(fileName)
+    end)
+    if not okWrite then
+        print(TAG.."binary state write failed: "..tostring(err))
+        return false
+    end
+    return true
+end
+
+function util.writeStateBinary(fileName, state, mirror)
+    return ( writeStateBinary(fileName, state, mirror) )
+end
+
+-- Reads a top-level string option from launch_config.json (written by the Python side)
+function util.readLaunchOption(key)
+    local reader = getFileReader("AISurvivorBridge/launch_config.json", true)
+    if not reader then return nil end
+
+    local value = nil
+    local line = reader:readLine()
+    while line do
+        local found = string.match(line, '"' .. key .. '"%s*:%s*"([^"]*)"')
+        if found then value = found end
+        line = reader:readLine()
+    end
+    reader:close()
+    return value
+end
+
 -- Helper to dump Java/Lua object keys
 function util.inspectObject(obj, filter)
     if not obj then return end
@@ -81,8 +143,8 @@ function util.inspectObject(obj, filter)
     print("[INSPECT] Done.")
 end
 
-function util.writeState(fileName, state)
-    return ( writeState(fileName, state) )
+function util.writeState(fileName, state, mirror)
+    return ( writeState(fileName, state, mirror) )
 end
 
 -- read
@@ -33,10 +33,12 @@ local function attemptLoad()
     
     -- Read Launch Config
     local launchMode = "continue"
+    local configLines = {}
     local reader = getFileReader("AISurvivorBridge/launch_config.json", true)
     if reader then
         local line = reader:readLine()
         while line do
+            table.insert(configLines, line)
             if string.find(line, "new_game") then 
                 launchMode = "new_game"
             elseif string.find(line, "done") then 
@@ -59,10 +61,15 @@ local function attemptLoad()
     end
 
     -- CONSUME CONFIG (Mark as done)
-    -- We overwrite the config to ensure next time we see "done"
+    -- Only the mode is replaced: other keys (log_level, state_format) are kept for the session
+    local configText = table.concat(configLines, "\n")
+    local newText, replaced = string.gsub(configText, '"mode"%s*:%s*"[^"]*"', '"mode": "done"', 1)
+    if replaced == 0 then
+        newText = "{\"mode\": \"done\"}"
+    end
     local writer = getFileWriter("AISurvivorBridge/launch_config.json", true, false)
     if writer then
-        writer:write("{\"mode\": \"done\"}")
+        writer:write(newText)
         writer:close()
     else
         log("Error: Could not update launch_config.json directly.")
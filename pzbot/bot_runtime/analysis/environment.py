@@ -9,7 +9,7 @@ class EnvironmentAnalyzer(BaseAnalyzer):
     
     Active Inputs:
         - memory.current_state.environment (Time, Rain, Fog)
-        - memory.player.vision.tiles (For Room/Shelter check)
+        - memory.player.vision.tile_block (For Room/Shelter check)
         
     Desired Inputs:
         - Light Level (Lux)
@@ -44,15 +44,7 @@ class EnvironmentAnalyzer(BaseAnalyzer):
             py = int(memory.player.position.y)
             pz = int(memory.player.position.z)
             
-            # Simple linear search over vision tiles (usually small set ~700)
-            # Optimization: Could use GridSystem if indexed
-            found_room = False
-            for tile in memory.player.vision.tiles:
-                if tile.x == px and tile.y == py and tile.z == pz:
-                    if tile.room:
-                        found_room = True
-                    break
-            
-            state.is_sheltered = found_room
+            # O(1) lookup in the frame's tile index
+            state.is_sheltered = memory.player.vision.tile_block.room_at(px, py, pz) is not None
             
         return state
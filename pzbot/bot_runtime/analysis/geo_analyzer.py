@@ -17,24 +17,16 @@ class GeoAnalyzer:
         Finds the nearest building centroid that is not in the exclude set.
         Returns a dict with {x, y, id} or None.
         
-        NOTE: Since we don't have a global map of buildings yet, 
-        we rely on 'Simulation Evidence' or 'Memory'.
-        For the prototype, this might return a mock or rely on seeing "Walls" in vision.
-        
-        Real implementation would parse `map_zones` or `chunk_data` if available.
-        For now, we return None if we can't see anything, or a heuristic.
+        Buildings come from the world model's `RoomIndex`: rooms (room-labelled tiles)
+        joined by adjacency. Only buildings we have seen some room tiles of are known.
         """
-        # Placeholder: If the sensor doesn't provide building lists, 
-        # we can't easily "Find nearest building" from scratch without map data.
-        # However, we can scan `vision.tiles` for `layer="Wall"`.
-        
-        # Simple Heuristic: Return center of 'Wall' clusters?
-        # Too expensive for python?
-        
-        # PROTOTYPE HACK:
-        # We assume the user creates a 'KnownLocations' list or we rely on vision.
-        # If we see a wall, that's a building.
-        return None
+        if not state.rooms or not state.player:
+            return None
+        pos = state.player.position
+        building = state.rooms.nearest_building(pos.x, pos.y, exclude=exclude_set or ())
+        if building is None:
+            return None
+        return {"x": int(round(building.x)), "y": int(round(building.y)), "id": building.id}
 
     @staticmethod
     def get_building_entry(state: BrainState, building_center: Tuple[int, int]) -> Optional[Tuple[int, int]]:
@@ -1,3 +1,4 @@
+import math
 import yaml
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -14,6 +15,7 @@ class LootAnalyzer(BaseAnalyzer):
     
     Active Inputs:
         - memory.containers
+        - memory.reach (path distances from the player)
         - NeedState (Context)
     
     Outputs:
@@ -100,6 +102,7 @@ class LootAnalyzer(BaseAnalyzer):
                         "type": item.get('type', 'Unknown'),
                         "x": item.get('x', c_data.x),
                         "y": item.get('y', c_data.y),
+                        "z": item.get('z', c_data.z),
                         "value": val,
                         "tags": tags,
                         "container_id": cid
@@ -112,13 +115,18 @@ class LootAnalyzer(BaseAnalyzer):
                      "id": cid,
                      "x": c_data.x,
                      "y": c_data.y,
+                     "z": c_data.z,
                      "value": c_value,
                      "item_count": len(items)
                  })
 
-        # 3. Sort Targets
-        targets.sort(key=lambda t: t['value'], reverse=True)
-        containers_of_interest.sort(key=lambda c: c['value'], reverse=True)
+        # 3. Sort Targets: reachable first (path distance, one Dijkstra for all), then by value
+        pos = memory.player.position
+        reach = memory.reach.field(pos.x, pos.y, int(pos.z))
+        for group in (targets, containers_of_interest):
+            for t, d in zip(group, reach.distances([(t['x'], t['y'], t['z']) for t in group])):
+                t['dist'] = d
+            group.sort(key=lambda t: (t['dist'] == math.inf, -t['value'], t['dist']))
         
         state.zone_value = total_value
         state.high_value_targets = targets
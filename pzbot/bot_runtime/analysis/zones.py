@@ -1,7 +1,6 @@
 import yaml
 import logging
 from typing import Dict, List, Optional
-from collections import Counter
 
 from bot_runtime import config as bot_config
 from bot_runtime.analysis.base import BaseAnalyzer
@@ -57,26 +56,18 @@ class ZoneAnalyzer(BaseAnalyzer):
         if not player:
             return ZoneState(current_zone="Unknown", tags=[])
 
-        px, py = int(player.position.x), int(player.position.y)
+        px, py, pz = int(player.position.x), int(player.position.y), int(player.position.z)
         
         # Check current tile
         # Note: We rely on the GridSystem having updated the tiles with room data.
         current_room = "Outdoors"
         
-        # We can scan a small radius to handle "Standing in a doorway" edge cases
-        room_names = []
-        
-        # Check 3x3
-        for dh in [-1, 0, 1]:
-            for dw in [-1, 0, 1]:
-                 tile = memory.get_tile(px + dw, py + dh)
-                 if tile and tile.room:
-                     room_names.append(tile.room)
-
-        if room_names:
+        # We scan a small radius to handle "Standing in a doorway" edge cases:
+        # the 3x3 around the player, read from the grid in one query
+        counts = memory.grid.query_box(px - 1, py - 1, px + 1, py + 1, pz).room_counts()
+        if counts:
             # Pick most common room name (ignoring 'hall' maybe? No, hall is valid)
-            counts = Counter(room_names)
-            current_room = counts.most_common(1)[0][0]
+            current_room = counts[0][0]
         
         # 2. Map Room Name to Semantic Tags
         tags = self._resolve_tags(current_room)
@@ -79,6 +79,11 @@ class Brain:
         self.state.situation = situation
         self.state.vision = self.memory.vision
         self.state.player = self.memory.player
+        self.state.rooms = self.memory.rooms
+        self.state.flow = self.memory.flow
+        self.state.routes = self.memory.routes
+        pos = self.memory.player.position if self.memory.player else None
+        self.state.reach = self.memory.reach.field(pos.x, pos.y, int(pos.z)) if pos else None
         
         # Update Thought Stream
         if new_thoughts:
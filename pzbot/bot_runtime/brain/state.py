@@ -1,7 +1,11 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict, replace
 from typing import List, Dict, Optional, Set
 import time
 from bot_runtime.ingest.state import Vision, Player
+from bot_runtime.world.processors.room_index import RoomIndex
+from bot_runtime.world.flow_field import FlowFieldService
+from bot_runtime.world.reach import ReachField
+from bot_runtime.world.replan import ReplanService
 
 @dataclass
 class CharacterPersonality:
@@ -126,6 +130,10 @@ class BrainState:
     memory: MemoryState = field(default_factory=MemoryState)
     vision: Optional[Vision] = None # Raw sensory input (Context)
     player: Optional[Player] = None # Physical self (Body, Inventory, Flags)
+    rooms: Optional[RoomIndex] = None # Rooms & buildings seen so far (Context)
+    flow: Optional[FlowFieldService] = None # Flee fields over the local grid (Context)
+    reach: Optional[ReachField] = None # Path distances from the player, this tick (Context)
+    routes: Optional[ReplanService] = None # Incremental path to the current nav target (Context)
     
     thoughts: List[Thought] = field(default_factory=list)
     active_thought: Optional[Thought] = None # The thought generated THIS tick, if any.
@@ -134,3 +142,18 @@ class BrainState:
     active_plan_name: str = "None" # The name of the currently running FSM Plan (e.g. Loot(Gun))
     plan_status: str = "Idle" # Status of the plan (RUNNING, PENDING, etc)
     proposed_actions: List[Dict] = field(default_factory=list) # Actions the strategy WANTS to execute
+
+    # Live world objects handed to the strategies; they stay out of the snapshot
+    SNAPSHOT_SKIP = ("vision", "player", "rooms", "flow", "reach", "routes")
+
+    def snapshot(self) -> Dict:
+        """
+        The state as plain JSON data for grid_snapshot.json. The (Context) fields are left
+        out, except the room index, which goes in as its counts.
+        """
+        data = asdict(replace(self, **{name: None for name in self.SNAPSHOT_SKIP}))
+        for name in self.SNAPSHOT_SKIP:
+            del data[name]
+        data["memory"] = {k: list(v) if isinstance(v, set) else v for k, v in data["memory"].items()}
+        data["rooms"] = self.rooms.get_stats() if self.rooms else None
+        return data
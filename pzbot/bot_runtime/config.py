@@ -23,6 +23,40 @@ class BotConfig(BaseModel):
     STATE_FILE_PATH: str = "../Lua/AISurvivorBridge/state.json"
     LOG_FILE_PATH: str = "logs/runtime.log"
 
+    # Ingest
+    INGEST_BACKEND: str = "auto" # auto | events | poll
+    INGEST_DECODER: str = "fast" # fast | validated
+    INGEST_TORN_RETRIES: int = 5 # Same-frame re-reads of a partially written state file
+    STATE_FORMAT: str = "json" # json | msgpack (requested from the mod via launch_config.json)
+    STATE_DELTA: bool = True # Keyframe + delta frames from the mod (requested via launch_config.json)
+    STATE_RING: bool = True # Publish frames to shared memory for the tools (recorder, debug server, monitor)
+    STATE_RING_NAME: str = "pzbot_state"
+    STATE_RING_SLOTS: int = 8
+    STATE_RING_SLOT_BYTES: int = 1048576 # Largest frame body that fits
+
+    # Grid chunk cache (LRU; 0 = no limit)
+    GRID_CACHE_MAX_CHUNKS: int = 20000
+    GRID_CACHE_MAX_MB: int = 256 # Tile planes only
+    GRID_CACHE_TTL_MS: int = 300000 # Chunks not seen for this long are unloaded
+    GRID_WRITE_BEHIND: bool = True # Write dirty chunks on a background thread
+    GRID_WRITE_QUEUE: int = 1024 # Max chunks waiting for the writer
+    GRID_PREFETCH_TILES: int = 40 # Read saved chunks this far ahead of the moving player (0 = off)
+    GRID_TILE_LOG: int = 512 # Updates whose walkability diffs are kept for incremental replanning
+
+    # Hierarchical pathfinding over grid chunks
+    NAV_MAX_NODES: int = 20000 # Abstract nodes a search may expand before giving up
+    NAV_REFINE_TILES: int = 32 # Path tiles refined to single steps; the rest stays as chunk waypoints
+    NAV_HEURISTIC_WEIGHT: float = 1.1 # > 1 trades a few % of path length for far fewer expansions
+    NAV_PATH_CACHE: int = 256 # Paths kept by (start chunk, goal), dropped when their chunks' walkability changes
+    NAV_REPLAN_MARGIN: int = 16 # Incremental replanning searches the start-goal box grown by this many tiles
+
+    # Fleeing
+    FLEE_RADIUS: int = 30 # Flee field covers this many tiles around the player
+    FLEE_STEPS: int = 12 # Tiles climbed on the flee field per MoveTo
+
+    # Loot & room ranking by path distance
+    REACH_RADIUS: int = 40 # Targets farther than this many tiles from the player rank as unreachable
+
     class Config:
         env_prefix = "PZBOT_"
 
@@ -67,6 +101,17 @@ LOG_FILE_PATH = resolve_path(settings.LOG_FILE_PATH)
 STATE_FILE_PATH = resolve_path(settings.STATE_FILE_PATH)
 INPUT_FILE_PATH = resolve_path(settings.INPUT_FILE_PATH)
 POLLING_INTERVAL = 0.1
+INGEST_BACKEND = settings.INGEST_BACKEND
+INGEST_DECODER = settings.INGEST_DECODER
+INGEST_TORN_RETRIES = settings.INGEST_TORN_RETRIES
+STATE_FORMAT = settings.STATE_FORMAT
+STATE_DELTA = settings.STATE_DELTA
+STATE_RING = settings.STATE_RING
+STATE_RING_NAME = settings.STATE_RING_NAME
+STATE_RING_SLOTS = settings.STATE_RING_SLOTS
+STATE_RING_SLOT_BYTES = settings.STATE_RING_SLOT_BYTES
+STATE_BINARY_PATH = STATE_FILE_PATH.with_suffix(".bin")
+LAUNCH_CONFIG_PATH = STATE_FILE_PATH.parent / "launch_config.json"
 
 # Aliases from settings
 LOG_LEVEL = settings.LOG_LEVEL
@@ -0,0 +1,222 @@
+"""
+Binary state transport: msgpack body behind a fixed, length-prefixed header.
+
+    "PZMP" | seq (uint32 BE) | length (uint32 BE) | msgpack body
+
+Written by `msgpack.lua` / `util.writeStateBinary` in the mod. The header lets the
+reader detect a partially written file without decoding the body.
+"""
+import struct
+from typing import Any, Tuple
+
+# Optional: C-accelerated decoder
+try:
+    import msgpack as _msgpack
+except ImportError:
+    _msgpack = None
+
+MAGIC = b"PZMP"
+HEADER = struct.Struct(">4sII")
+HEADER_SIZE = HEADER.size
+
+def has_native_decoder() -> bool:
+    return _msgpack is not None
+
+def is_binary_frame(raw: bytes) -> bool:
+    return raw[:4] == MAGIC
+
+def is_msgpack_body(body: bytes) -> bool:
+    """A state body is a map: fixmap (0x80-0x8f), map16 (0xde) or map32 (0xdf)."""
+    if not body:
+        return False
+    b = body[0]
+    return 0x80 <= b <= 0x8f or b in (0xde, 0xdf)
+
+def read_header(raw: bytes) -> Tuple[int, int]:
+    """Returns (seq, body_length). Caller checks `is_binary_frame` first."""
+    _, seq, length = HEADER.unpack_from(raw)
+    return seq, length
+
+def encode_frame(obj: Any, seq: int) -> bytes:
+    """Builds a complete binary frame (used by the stand-in writer and tests)."""
+    body = packb(obj)
+    return HEADER.pack(MAGIC, seq & 0xFFFFFFFF, len(body)) + body
+
+# --- Decoding ---
+
+def unpackb(body: bytes) -> Any:
+    if _msgpack is not None:
+        return _msgpack.unpackb(body, raw=False, strict_map_key=False)
+    obj, end = _decode(body, 0)
+    if end != len(body):
+        raise ValueError(f"Trailing data in msgpack body ({len(body) - end} bytes)")
+    return obj
+
+_U8 = struct.Struct(">B")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+_I8 = struct.Struct(">b")
+_I16 = struct.Struct(">h")
+_I32 = struct.Struct(">i")
+_I64 = struct.Struct(">q")
+_F32 = struct.Struct(">f")
+_F64 = struct.Struct(">d")
+
+def _decode(data: bytes, pos: int) -> Tuple[Any, int]:
+    """Pure-Python fallback decoder for the msgpack subset the mod writes (plus the rest of the spec)."""
+    b = data[pos]
+    pos += 1
+    if b <= 0x7f:
+        return b, pos
+    if b >= 0xe0:
+        return b - 0x100, pos
+    if 0xa0 <= b <= 0xbf:
+        n = b & 0x1f
+        return data[pos:pos + n].decode('utf-8'), pos + n
+    if 0x80 <= b <= 0x8f:
+        return _decode_map(data, pos, b & 0x0f)
+    if 0x90 <= b <= 0x9f:
+        return _decode_array(data, pos, b & 0x0f)
+    if b == 0xc0:
+        return None, pos
+    if b == 0xc2:
+        return False, pos
+    if b == 0xc3:
+        return True, pos
+    if b == 0xcb:
+        return _F64.unpack_from(data, pos)[0], pos + 8
+    if b == 0xca:
+        return _F32.unpack_from(data, pos)[0], pos + 4
+    if b == 0xcc:
+        return data[pos], pos + 1
+    if b == 0xcd:
+        return _U16.unpack_from(data, pos)[0], pos + 2
+    if b == 0xce:
+        return _U32.unpack_from(data, pos)[0], pos + 4
+    if b == 0xcf:
+        return _U64.unpack_from(data, pos)[0], pos + 8
+    if b == 0xd0:
+        return _I8.unpack_from(data, pos)[0], pos + 1
+    if b == 0xd1:
+        return _I16.unpack_from(data, pos)[0], pos + 2
+    if b == 0xd2:
+        return _I32.unpack_from(data, pos)[0], pos + 4
+    if b == 0xd3:
+        return _I64.unpack_from(data, pos)[0], pos + 8
+    if b in (0xd9, 0xda, 0xdb):
+        size = {0xd9: _U8, 0xda: _U16, 0xdb: _U32}[b]
+        n = size.unpack_from(data, pos)[0]
+        pos += size.size
+        return data[pos:pos + n].decode('utf-8'), pos + n
+    if b in (0xc4, 0xc5, 0xc6):
+        size = {0xc4: _U8, 0xc5: _U16, 0xc6: _U32}[b]
+        n = size.unpack_from(data, pos)[0]
+        pos += size.size
+        return bytes(data[pos:pos + n]), pos + n
+    if b == 0xdc:
+        return _decode_array(data, pos + 2, _U16.unpack_from(data, pos)[0])
+    if b == 0xdd:
+        return _decode_array(data, pos + 4, _U32.unpack_from(data, pos)[0])
+    if b == 0xde:
+        return _decode_map(data, pos + 2, _U16.unpack_from(data, pos)[0])
+    if b == 0xdf:
+        return _decode_map(data, pos + 4, _U32.unpack_from(data, pos)[0])
+    raise ValueError(f"Unsupported msgpack type byte 0x{b:02x} at {pos - 1}")
+
+def _decode_array(data: bytes, pos: int, n: int):
+    out = []
+    for _ in range(n):
+        v, pos = _decode(data, pos)
+        out.append(v)
+    return out, pos
+
+def _decode_map(data: bytes, pos: int, n: int):
+    out = {}
+    for _ in range(n):
+        k, pos = _decode(data, pos)
+        v, pos = _decode(data, pos)
+        out[k] = v
+    return out, pos
+
+# --- Encoding (mirrors msgpack.lua) ---
+
+def packb(obj: Any) -> bytes:
+    if _msgpack is not None:
+        return _msgpack.packb(obj, use_bin_type=True)
+    parts = []
+    _encode(obj, parts.append)
+    return b"".join(parts)
+
+def _encode(obj: Any, out):
+    if obj is None:
+        out(b"\xc0")
+    elif obj is True:
+        out(b"\xc3")
+    elif obj is False:
+        out(b"\xc2")
+    elif isinstance(obj, int):
+        if 0 <= obj <= 0x7f:
+            out(_U8.pack(obj))
+        elif -32 <= obj < 0:
+            out(_I8.pack(obj))
+        elif 0 <= obj <= 0xff:
+            out(b"\xcc" + _U8.pack(obj))
+        elif 0 <= obj <= 0xffff:
+            out(b"\xcd" + _U16.pack(obj))
+        elif 0 <= obj <= 0xffffffff:
+            out(b"\xce" + _U32.pack(obj))
+        elif -0x80 <= obj < 0:
+            out(b"\xd0" + _I8.pack(obj))
+        elif -0x8000 <= obj < 0:
+            out(b"\xd1" + _I16.pack(obj))
+        elif -0x80000000 <= obj < 0:
+            out(b"\xd2" + _I32.pack(obj))
+        else:
+            out(b"\xd3" + _I64.pack(obj))
+    elif isinstance(obj, float):
+        out(b"\xcb" + _F64.pack(obj))
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        n = len(data)
+        if n <= 31:
+            out(_U8.pack(0xa0 | n))
+        elif n <= 0xff:
+            out(b"\xd9" + _U8.pack(n))
+        elif n <= 0xffff:
+            out(b"\xda" + _U16.pack(n))
+        else:
+            out(b"\xdb" + _U32.pack(n))
+        out(data)
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n <= 15:
+            out(_U8.pack(0x90 | n))
+        elif n <= 0xffff:
+            out(b"\xdc" + _U16.pack(n))
+        else:
+            out(b"\xdd" + _U32.pack(n))
+        for v in obj:
+            _encode(v, out)
+    elif isinstance(obj, dict):
+        n = len(obj)
+        if n <= 15:
+            out(_U8.pack(0x80 | n))
+        elif n <= 0xffff:
+            out(b"\xde" + _U16.pack(n))
+        else:
+            out(b"\xdf" + _U32.pack(n))
+        for k, v in obj.items():
+            _encode(k, out)
+            _encode(v, out)
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        if n <= 0xff:
+            out(b"\xc4" + _U8.pack(n))
+        elif n <= 0xffff:
+            out(b"\xc5" + _U16.pack(n))
+        else:
+            out(b"\xc6" + _U32.pack(n))
+        out(bytes(obj))
+    else:
+        raise TypeError(f"Cannot msgpack-encode {type(obj).__name__}")
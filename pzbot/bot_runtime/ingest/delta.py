@@ -0,0 +1,262 @@
+"""
+Delta state frames: keyframes plus cumulative deltas, written by `StateDelta.lua`.
+
+Every frame from a delta-enabled mod carries a header:
+
+    "frame": {"kind": "key" | "delta", "session": <mod session id>, "key": <keyframe number>}
+
+A keyframe is a normal full frame. A delta frame omits the keyed vision lists
+(`KEYED_LISTS`) and instead carries, in `player.vision.delta`, for each list that changed:
+
+    {"set": {<key>: <entry>, ...}, "del": [<key>, ...]}
+
+Deltas are cumulative against their keyframe, so one delta plus its keyframe rebuilds the
+full frame no matter how many frames the reader skipped in between. Keyframes are also
+mirrored to a side file (`keyframe_path()`), so a reader that never saw one can still fetch it.
+
+Frames without a header (older mods, delta mode off) pass through unchanged.
+"""
+import math
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bot_runtime.ingest.frame import FrameReader, TornReadError
+
+logger = logging.getLogger(__name__)
+
+KIND_KEY = "key"
+KIND_DELTA = "delta"
+
+class MissingKeyframeError(ValueError):
+    """A delta frame arrived whose keyframe was never seen and could not be loaded."""
+
+# --- Entry keys (must match StateDelta.lua) ---
+
+def _int(v: Any) -> int:
+    return int(math.floor(v or 0))
+
+def tile_key(t: dict) -> str:
+    return f"{_int(t.get('x'))},{_int(t.get('y'))},{_int(t.get('z'))}"
+
+def container_key(c: dict) -> str:
+    if c.get('id') is not None:
+        return f"{c['id']}@{_int(c.get('z'))}"
+    meta = c.get('meta') or {}
+    parent = meta.get('parent_id', '') if isinstance(meta, dict) else ''
+    return f"{parent}|{c.get('object_type', '')}|{_int(c.get('x'))},{_int(c.get('y'))},{_int(c.get('z'))}"
+
+def item_key(i: dict) -> str:
+    return str(i.get('id'))
+
+KEYED_LISTS: Dict[str, Callable[[dict], str]] = {
+    "tiles": tile_key,
+    "nearby_containers": container_key,
+    "world_items": item_key,
+}
+
+def _as_list(v: Any) -> list:
+    # Lua encodes an empty table as {}
+    if isinstance(v, dict):
+        return list(v.values())
+    return v or []
+
+def index_entries(entries: Sequence[dict], key_fn: Callable[[dict], str]) -> Dict[str, dict]:
+    """Keys entries in order. Repeated keys get a '#n' suffix, as on the Lua side."""
+    out: Dict[str, dict] = {}
+    for e in entries:
+        k = key_fn(e)
+        if k in out:
+            n = 2
+            while f"{k}#{n}" in out:
+                n += 1
+            k = f"{k}#{n}"
+        out[k] = e
+    return out
+
+def keyframe_path(state_path: Path) -> Path:
+    """Side file the mod mirrors keyframes to: state.json -> state_key.json."""
+    state_path = Path(state_path)
+    return state_path.with_name(f"{state_path.stem}_key{state_path.suffix}")
+
+def _vision(data: dict) -> Optional[dict]:
+    player = data.get("player")
+    if isinstance(player, dict):
+        vision = player.get("vision")
+        if isinstance(vision, dict):
+            return vision
+    return None
+
+class DeltaAssembler:
+    """
+    Rebuilds full frames from keyframes and delta frames.
+
+    Holds the current keyframe's keyed lists. Entries that did not change since the
+    previously rebuilt frame are handed out as the *same* dict objects, so consumers
+    can skip them with an identity check.
+
+    `keyframe_paths` are the side files to try when a delta refers to an unknown keyframe.
+    Not thread-safe: use one assembler per parser thread.
+    """
+    def __init__(self, keyframe_paths: Sequence[Path] = ()):
+        self._readers = [FrameReader(p, retries=3) for p in keyframe_paths]
+        self._ident: Optional[Tuple[Any, Any]] = None
+        self._base: Dict[str, Dict[str, dict]] = {}
+        self._last: Dict[str, Dict[str, dict]] = {}
+
+        self.keyframes = 0
+        self.deltas = 0
+        self.keyframe_loads = 0
+        self.missing_keyframes = 0
+
+    def apply(self, data: dict) -> dict:
+        """Returns the full frame for `data` (modified in place). Raises MissingKeyframeError."""
+        header = data.pop("frame", None)
+        if not isinstance(header, dict):
+            return data
+
+        ident = (header.get("session"), header.get("key"))
+        vision = _vision(data)
+
+        if header.get("kind") == KIND_KEY:
+            self.keyframes += 1
+            self._set_keyframe(ident, vision)
+            return data
+
+        if ident != self._ident:
+            self._load_keyframe(ident)
+        self.deltas += 1
+        if vision is None:
+            return data
+
+        changes = vision.pop("delta", None) or {}
+        for name in KEYED_LISTS:
+            vision[name] = self._rebuild(name, changes.get(name))
+        return data
+
+    def _set_keyframe(self, ident: Tuple[Any, Any], vision: Optional[dict]):
+        self._ident = ident
+        self._base = {}
+        for name, key_fn in KEYED_LISTS.items():
+            entries = _as_list(vision.get(name)) if vision is not None else []
+            base = index_entries(entries, key_fn)
+            # Keep the previous frame's objects for unchanged entries
+            last = self._last.get(name, {})
+            for k, e in base.items():
+                prev = last.get(k)
+                if prev is not None and prev is not e and prev == e:
+                    base[k] = prev
+            self._base[name] = base
+            self._last[name] = base
+            if vision is not None:
+                vision[name] = list(base.values())
+
+    def _rebuild(self, name: str, change: Optional[dict]) -> List[dict]:
+        base = self._base.get(name, {})
+        if not change:
+            self._last[name] = base
+            return list(base.values())
+
+        merged = dict(base)
+        for k in _as_list(change.get("del")):
+            merged.pop(k, None)
+
+        last = self._last.get(name, {})
+        upserts = change.get("set") or {}
+        if isinstance(upserts, list):
+            upserts = index_entries(upserts, KEYED_LISTS[name])
+        for k, e in upserts.items():
+            prev = last.get(k)
+            merged[k] = prev if prev is not None and prev == e else e
+
+        self._last[name] = merged
+        return list(merged.values())
+
+    def _load_keyframe(self, ident: Tuple[Any, Any]):
+        """Loads keyframe `ident` from the side files, newest first."""
+        readers = sorted((r for r in self._readers if r.path.exists()),
+                         key=lambda r: r.path.stat().st_mtime_ns, reverse=True)
+        for reader in readers:
+            try:
+                data = reader.load()
+            except (OSError, TornReadError, ValueError) as e:
+                logger.debug(f"Could not read keyframe file {reader.path}: {e}")
+                continue
+            header = data.get("frame") if isinstance(data, dict) else None
+            if isinstance(header, dict) and (header.get("session"), header.get("key")) == ident:
+                self.keyframe_loads += 1
+                self._set_keyframe(ident, _vision(data))
+                return
+
+        self.missing_keyframes += 1
+        raise MissingKeyframeError(f"Delta frame for unknown keyframe {ident}")
+
+    def get_stats(self) -> dict:
+        return {
+            "keyframes": self.keyframes,
+            "deltas": self.deltas,
+            "keyframe_loads": self.keyframe_loads,
+            "missing_keyframes": self.missing_keyframes,
+        }
+
+class DeltaEncoder:
+    """
+    Python mirror of `StateDelta.lua`: turns full frames into keyframes and deltas.
+    Used by the stand-in writer (`tools/bench_transport.py`) and the tests.
+    """
+    def __init__(self, session: int = 1, keyframe_interval: int = 25, max_change_ratio: float = 0.5):
+        self.session = session
+        self.keyframe_interval = keyframe_interval
+        self.max_change_ratio = max_change_ratio
+        self.key = 0
+        self._since_key = 0
+        self._base: Optional[Dict[str, Dict[str, dict]]] = None
+
+    def encode(self, data: dict, force_key: bool = False) -> Tuple[dict, str]:
+        """Returns (frame, kind). `data` is not modified."""
+        vision = _vision(data)
+        current = {name: index_entries(_as_list(vision.get(name)) if vision else [], fn)
+                   for name, fn in KEYED_LISTS.items()}
+
+        if not force_key and self._base is not None and self._since_key < self.keyframe_interval:
+            changes, count = self._diff(current)
+            total = sum(len(v) for v in current.values())
+            if count <= self.max_change_ratio * max(total, 1):
+                self._since_key += 1
+                frame = dict(data)
+                frame["frame"] = {"kind": KIND_DELTA, "session": self.session, "key": self.key}
+                if vision is not None:
+                    v = {k: val for k, val in vision.items() if k not in KEYED_LISTS}
+                    if changes:
+                        v["delta"] = changes
+                    frame["player"] = dict(data["player"], vision=v)
+                return frame, KIND_DELTA
+
+        self.key += 1
+        self._since_key = 0
+        self._base = current
+        frame = dict(data)
+        frame["frame"] = {"kind": KIND_KEY, "session": self.session, "key": self.key}
+        return frame, KIND_KEY
+
+    def _diff(self, current: Dict[str, Dict[str, dict]]) -> Tuple[dict, int]:
+        changes = {}
+        count = 0
+        for name, entries in current.items():
+            base = self._base.get(name, {})
+            upserts = {k: e for k, e in entries.items() if base.get(k) != e}
+            removed = [k for k in base if k not in entries]
+            if upserts or removed:
+                change = {}
+                if upserts:
+                    change["set"] = upserts
+                if removed:
+                    change["del"] = removed
+                changes[name] = change
+                count += len(upserts) + len(removed)
+        return changes, count
+
+def load_full_state(path: Path, retries: int = 5, retry_delay: float = 0.005) -> dict:
+    """One-shot read of a state file, rebuilding a delta frame from its keyframe side file (for tools)."""
+    data = FrameReader(path, retries=retries, retry_delay=retry_delay).load()
+    return DeltaAssembler([keyframe_path(path)]).apply(data)
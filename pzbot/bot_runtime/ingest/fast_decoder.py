@@ -0,0 +1,224 @@
+import logging
+import typing
+from typing import Any, Callable, Dict, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from bot_runtime.ingest.lazy import LazyList
+from bot_runtime.ingest.state import GameState
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class TrustedStruct:
+    """
+    Lightweight, validation-free stand-in for a state model.
+    Exposes the same attributes (and properties) as the Pydantic model it mirrors,
+    plus `model_dump()` / `dict()` for consumers that flatten to dicts.
+    """
+    __slots__ = ('_extra',)
+    _model: Type[BaseModel] = None
+    _fields: Tuple[str, ...] = ()
+
+    def __getattr__(self, name):
+        # Only reached for names that are not slots: extra fields (extra='allow')
+        try:
+            extra = object.__getattribute__(self, '_extra')
+        except AttributeError:
+            extra = None
+        if extra and name in extra:
+            return extra[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def model_dump(self) -> Dict[str, Any]:
+        out = {name: _dump_value(getattr(self, name)) for name in self._fields}
+        if self._extra:
+            out.update(_dump_value(self._extra))
+        return out
+
+    def dict(self) -> Dict[str, Any]:
+        return self.model_dump()
+
+    def __repr__(self):
+        args = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({args})"
+
+def _dump_value(v):
+    if isinstance(v, TrustedStruct):
+        return v.model_dump()
+    if isinstance(v, BaseModel):
+        return v.model_dump()
+    if isinstance(v, (list, LazyList)):
+        return [_dump_value(i) for i in v]
+    if isinstance(v, dict):
+        return {k: _dump_value(i) for k, i in v.items()}
+    return v
+
+def _is_model(tp) -> bool:
+    return isinstance(tp, type) and issubclass(tp, BaseModel)
+
+def _unwrap_optional(tp):
+    """Returns (inner_type, is_optional)."""
+    if get_origin(tp) is Union:
+        args = [a for a in get_args(tp) if a is not type(None)]
+        if len(args) == 1 and len(get_args(tp)) == 2:
+            return args[0], True
+    return tp, False
+
+class FastDecoder:
+    """
+    Compiled decoder for trusted frames.
+
+    Compiles each model reachable from `root` into a slotted struct class and a
+    generated decode function. Lua quirk handling (the `mode='before'` field
+    validators) is reused as-is; type validation is skipped. Missing required
+    fields raise, so the caller can fall back to full validation.
+    """
+    def __init__(self, root: Type[BaseModel] = GameState):
+        self.root = root
+        self._decoders: Dict[Type[BaseModel], Callable[[dict], Any]] = {}
+        self._structs: Dict[Type[BaseModel], type] = {}
+        self._decode_root = self._compile(root)
+
+    def decode(self, data: dict):
+        return self._decode_root(data)
+
+    def struct_for(self, model_cls: Type[BaseModel]) -> type:
+        return self._structs[model_cls]
+
+    # --- Compilation ---
+
+    def _compile(self, model_cls: Type[BaseModel]) -> Callable[[dict], Any]:
+        if model_cls in self._decoders:
+            return self._decoders[model_cls]
+
+        decorators = model_cls.__pydantic_decorators__
+        if any(d.info.mode != 'before' for d in decorators.field_validators.values()) or decorators.model_validators:
+            # Can't reproduce these without Pydantic. Keep this subtree validated.
+            logger.debug(f"FastDecoder: {model_cls.__name__} has non-trivial validators, using model_validate")
+            decoder = model_cls.model_validate
+            self._decoders[model_cls] = decoder
+            return decoder
+
+        hints = typing.get_type_hints(model_cls)
+        field_names = tuple(model_cls.model_fields.keys())
+        struct_cls = self._make_struct(model_cls, field_names)
+
+        ns: Dict[str, Any] = {"_new": object.__new__, "S": struct_cls, "_MISSING": _MISSING}
+        lines = ["def decode(d):", "    o = _new(S)"]
+
+        for name, field in model_cls.model_fields.items():
+            key = field.alias or name
+            tp, optional = _unwrap_optional(hints.get(name, field.annotation))
+
+            # 1. Before-validators (Lua {} -> [] normalization etc)
+            validators = []
+            for i, dec in enumerate(decorators.field_validators.values()):
+                if name in dec.info.fields:
+                    fn = getattr(model_cls, dec.cls_var_name)
+                    vname = f"_val_{name}_{i}"
+                    if dec.info.mode == 'before' and _takes_info(fn):
+                        ns[vname] = (lambda f: lambda v: f(v, None))(fn)
+                    else:
+                        ns[vname] = fn
+                    validators.append(vname)
+
+            # 2. Conversion expression for a present value `v`
+            conv = "v"
+            if _is_model(tp):
+                ns[f"_dec_{name}"] = self._compile(tp)
+                conv = f"_dec_{name}(v)"
+            elif get_origin(tp) is LazyList and get_args(tp) and _is_model(get_args(tp)[0]):
+                # Keep raw, decode items on first read
+                ns["_LazyList"] = LazyList
+                ns[f"_dec_{name}"] = _with_fallback(self._compile(get_args(tp)[0]), get_args(tp)[0])
+                conv = f"_LazyList(v, _dec_{name})"
+            elif get_origin(tp) in (list, typing.List) and get_args(tp) and _is_model(get_args(tp)[0]):
+                ns[f"_dec_{name}"] = self._compile(get_args(tp)[0])
+                conv = f"[_dec_{name}(e) for e in v]"
+            if optional and conv != "v":
+                conv = f"None if v is None else {conv}"
+
+            # 3. Default for a missing value
+            if field.is_required():
+                lines.append(f"    v = d[{key!r}]")
+                default_expr = None
+            elif field.default_factory is not None:
+                factory = field.default_factory
+                if _is_model(factory):
+                    sub = self._compile(factory)
+                    factory = (lambda s: lambda: s({}))(sub)
+                ns[f"_fac_{name}"] = factory
+                default_expr = f"_fac_{name}()"
+            else:
+                ns[f"_def_{name}"] = field.default
+                default_expr = f"_def_{name}"
+
+            if default_expr is not None:
+                if not validators and conv == "v":
+                    if default_expr.startswith("_def_"):
+                        lines.append(f"    o.{name} = d.get({key!r}, {default_expr})")
+                    else:
+                        lines.append(f"    v = d.get({key!r}, _MISSING)")
+                        lines.append(f"    o.{name} = {default_expr} if v is _MISSING else v")
+                    continue
+                lines.append(f"    v = d.get({key!r}, _MISSING)")
+                lines.append(f"    if v is _MISSING:")
+                lines.append(f"        o.{name} = {default_expr}")
+                lines.append(f"    else:")
+                indent = "        "
+            else:
+                indent = "    "
+
+            for vname in validators:
+                lines.append(f"{indent}v = {vname}(v)")
+            lines.append(f"{indent}o.{name} = {conv}")
+
+        if model_cls.model_config.get('extra') == 'allow':
+            ns["_known"] = frozenset((f.alias or n) for n, f in model_cls.model_fields.items()) | set(field_names)
+            lines.append("    o._extra = {k: x for k, x in d.items() if k not in _known} or None")
+        else:
+            lines.append("    o._extra = None")
+        lines.append("    return o")
+
+        exec("\n".join(lines), ns)
+        decoder = ns["decode"]
+        self._decoders[model_cls] = decoder
+        return decoder
+
+    def _make_struct(self, model_cls: Type[BaseModel], field_names: Tuple[str, ...]) -> type:
+        attrs: Dict[str, Any] = {
+            "__slots__": field_names,
+            "__module__": __name__,
+            "__qualname__": model_cls.__name__,
+            "_model": model_cls,
+            "_fields": field_names,
+        }
+        # Carry over computed properties (e.g. PlayerBody.stamina)
+        for klass in reversed(model_cls.__mro__):
+            if klass in (BaseModel, object) or not issubclass(klass, BaseModel):
+                continue
+            for attr, value in vars(klass).items():
+                if isinstance(value, property):
+                    attrs[attr] = value
+
+        struct_cls = type(model_cls.__name__, (TrustedStruct,), attrs)
+        self._structs[model_cls] = struct_cls
+        return struct_cls
+
+def _with_fallback(decode: Callable[[dict], Any], model_cls: Type[BaseModel]) -> Callable[[dict], Any]:
+    """Lazy lists are decoded after parse_dict returned, so they fall back to validation on their own."""
+    def decode_list(raw):
+        try:
+            return [decode(d) for d in raw]
+        except Exception:
+            return [model_cls.model_validate(d) for d in raw]
+    return decode_list
+
+def _takes_info(fn) -> bool:
+    import inspect
+    try:
+        return len(inspect.signature(fn).parameters) >= 2
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,134 @@
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Optional, Tuple
+
+from bot_runtime.ingest import binary
+
+logger = logging.getLogger(__name__)
+
+# Written by util.writeState after the JSON body: "\n#PZB <seq> <length>\n"
+TRAILER_PREFIX = b"\n#PZB "
+
+class TornReadError(ValueError):
+    """The state file was read while Lua was still writing it."""
+
+def _body_length_matches(body: bytes, length: int) -> bool:
+    if len(body) == length:
+        return True
+    # Kahlua strings are Java strings: `#jsonText` counts UTF-16 code units, not bytes
+    # (characters outside the BMP, like emoji in names, count twice).
+    try:
+        return len(body.decode('utf-8').encode('utf-16-le')) // 2 == length
+    except UnicodeDecodeError:
+        return False # Cut in the middle of a multi-byte character
+
+def split_frame(raw: bytes, require_trailer: bool = False) -> Tuple[bytes, Optional[int]]:
+    """
+    Splits a raw state file into (body, seq) without decoding the body.
+    Raises TornReadError if the frame is incomplete.
+
+    Binary frames (see `binary.py`) carry their length in the header.
+    JSON files without a trailer (older mods) are accepted if they end like a JSON object,
+    unless `require_trailer` is set.
+    """
+    if binary.is_binary_frame(raw):
+        if len(raw) < binary.HEADER_SIZE:
+            raise TornReadError("partial header")
+        seq, length = binary.read_header(raw)
+        body = raw[binary.HEADER_SIZE:]
+        if len(body) != length:
+            raise TornReadError(f"length mismatch (read {len(body)}, expected {length})")
+        return body, seq
+
+    idx = raw.rfind(TRAILER_PREFIX)
+    if idx < 0:
+        if require_trailer:
+            raise TornReadError("missing trailer")
+        if not raw.rstrip().endswith(b"}"):
+            raise TornReadError("truncated JSON")
+        return raw, None
+
+    line = raw[idx + len(TRAILER_PREFIX):]
+    if not line.endswith(b"\n"):
+        raise TornReadError("partial trailer")
+    parts = line.split()
+    try:
+        seq, length = int(parts[0]), int(parts[1])
+    except (IndexError, ValueError):
+        raise TornReadError(f"malformed trailer {line!r}")
+
+    body = raw[:idx]
+    if not _body_length_matches(body, length):
+        raise TornReadError(f"length mismatch (read {len(body)}, expected {length})")
+    return body, seq
+
+def decode_body(body: bytes) -> dict:
+    """Decodes a frame body (msgpack or JSON, told apart by the first byte)."""
+    if binary.is_msgpack_body(body):
+        return binary.unpackb(body)
+    return json.loads(body)
+
+class FrameReader:
+    """
+    Reads complete frames from the state file.
+
+    A torn read is retried up to `retries` times, `retry_delay` seconds apart, so a frame
+    caught mid-write is still delivered in the same frame. Once a trailer has been seen,
+    it is required from then on (a missing trailer means the writer is not done yet).
+    """
+    def __init__(self, path: Path, retries: int = 5, retry_delay: float = 0.005):
+        self.path = Path(path)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._trailer_seen = False
+
+        self.last_seq: Optional[int] = None
+        self.reads = 0
+        self.torn_reads = 0     # Reads that caught a partial file (including recovered ones)
+        self.failed_reads = 0   # Frames given up on after all retries
+        self.skipped_seqs = 0   # Writer frames never seen (gaps in seq)
+
+    def read(self) -> Tuple[bytes, Optional[int]]:
+        """Returns (json_body, seq). Raises TornReadError if the file stays incomplete."""
+        for attempt in range(self.retries + 1):
+            raw = self.path.read_bytes()
+            try:
+                body, seq = split_frame(raw, require_trailer=self._trailer_seen)
+            except TornReadError as e:
+                self.torn_reads += 1
+                if attempt == self.retries:
+                    self.failed_reads += 1
+                    # Writer may have been swapped for one without trailers (mod reload)
+                    self._trailer_seen = False
+                    raise
+                logger.debug(f"Torn read ({e}), retry {attempt + 1}/{self.retries}")
+                time.sleep(self.retry_delay)
+                continue
+
+            if seq is not None:
+                self._trailer_seen = True
+                if self.last_seq is not None and seq > self.last_seq + 1:
+                    self.skipped_seqs += seq - self.last_seq - 1
+                self.last_seq = seq
+            self.reads += 1
+            return body, seq
+
+    def load(self) -> dict:
+        """Reads and decodes a complete frame."""
+        body, _ = self.read()
+        return decode_body(body)
+
+    def get_stats(self) -> dict:
+        return {
+            "reads": self.reads,
+            "torn_reads": self.torn_reads,
+            "failed_reads": self.failed_reads,
+            "skipped_seqs": self.skipped_seqs,
+            "last_seq": self.last_seq,
+        }
+
+def load_state_file(path: Path, retries: int = 5, retry_delay: float = 0.005) -> dict:
+    """One-shot read of a complete state frame (for tools)."""
+    return FrameReader(path, retries=retries, retry_delay=retry_delay).load()
@@ -0,0 +1,101 @@
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar, get_args
+
+from pydantic import TypeAdapter
+from pydantic_core import core_schema
+
+T = TypeVar('T')
+
+def _dump_item(item):
+    if hasattr(item, 'model_dump'):
+        return item.model_dump()
+    return item
+
+class LazyList(Sequence, Generic[T]):
+    """
+    List field that keeps the raw JSON-derived items and decodes them on first read.
+
+    Usage in a model: `tiles: LazyList[Tile] = Field(default_factory=list)`.
+    `decode` turns the raw list into the decoded list.
+    `len()` / truthiness never decode. Iteration or indexing decodes every item once;
+    the result is cached on the instance, i.e. for the lifetime of the frame.
+    `raw` gives the undecoded dicts for consumers that only need plain data.
+    `derived()` caches per-frame views built from the raw data (e.g. `TileBlock`, used by GridSystem).
+    """
+    __slots__ = ('_raw', '_decode', '_items', '_derived')
+
+    def __init__(self, raw: List[Any], decode: Callable[[List[Any]], List[T]]):
+        self._raw = raw
+        self._decode = decode
+        self._items: Optional[List[T]] = None
+        self._derived: Optional[Dict[str, Any]] = None
+
+    @property
+    def raw(self) -> List[Any]:
+        return self._raw
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._items is not None
+
+    def materialize(self) -> List[T]:
+        items = self._items
+        if items is None:
+            items = self._items = self._decode(self._raw)
+        return items
+
+    def derived(self, key: str, build: Callable[['LazyList'], Any]) -> Any:
+        """Returns `build(self)`, computed once per list (i.e. once per frame)."""
+        if self._derived is None:
+            self._derived = {}
+        value = self._derived.get(key)
+        if value is None:
+            value = self._derived[key] = build(self)
+        return value
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __bool__(self):
+        return bool(self._raw)
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def __getitem__(self, index):
+        return self.materialize()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, LazyList):
+            return self.materialize() == other.materialize()
+        if isinstance(other, list):
+            return self.materialize() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        if self._items is None:
+            return f"LazyList(<{len(self._raw)} undecoded>)"
+        return f"LazyList({self._items!r})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        args = get_args(source)
+        item_type = args[0] if args else Any
+        # One call for the whole list: much cheaper than validating item by item
+        decode = TypeAdapter(List[item_type]).validate_python
+
+        def wrap(v):
+            if isinstance(v, LazyList):
+                return v
+            if not isinstance(v, list):
+                raise ValueError(f"Expected a list, got {type(v).__name__}")
+            return cls(v, decode)
+
+        return core_schema.no_info_plain_validator_function(
+            wrap,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda v: [_dump_item(i) for i in v]
+            ),
+        )
@@ -1,20 +1,43 @@
 import json
 import logging
 from pathlib import Path
+from typing import Sequence
 from bot_runtime.ingest.state import GameState
+from bot_runtime.ingest.frame import split_frame, decode_body
+from bot_runtime.ingest.delta import DeltaAssembler
 
 logger = logging.getLogger(__name__)
 
+DECODER_VALIDATED = "validated"
+DECODER_FAST = "fast"
+
 class StateParser:
-    def __init__(self):
-        pass
+    """
+    Decodes state frames into `GameState`.
+
+    Decoders (the bot uses `config.INGEST_DECODER`, "fast" by default):
+        - "validated": Full Pydantic validation of every sub-model (this class's default).
+        - "fast": Compiled, validation-free struct tree for trusted frames (see `fast_decoder.py`).
+          Falls back to full validation if a frame does not match the schema.
+
+    Delta frames (see `delta.py`) are rebuilt into full frames before decoding.
+    `keyframe_paths` are the keyframe side files to fall back on when a keyframe was missed.
+    """
+    def __init__(self, decoder: str = DECODER_VALIDATED, keyframe_paths: Sequence[Path] = ()):
+        self.decoder = decoder
+        self.deltas = DeltaAssembler(keyframe_paths)
+        self._fast = None
+        self.fast_fallbacks = 0
+
+        if decoder == DECODER_FAST:
+            from bot_runtime.ingest.fast_decoder import FastDecoder
+            self._fast = FastDecoder(GameState)
 
     def parse_file(self, file_path: Path) -> GameState:
-        """Parses the game state from a JSON file."""
+        """Parses the game state from a state file (JSON with or without trailer, or binary frame)."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return self.parse_dict(data)
+            body, _ = split_frame(Path(file_path).read_bytes())
+            return self.parse_bytes(body)
         except json.JSONDecodeError as e:
             logger.error(f"Failed to decode JSON from {file_path}: {e}")
             raise
@@ -22,6 +45,18 @@ class StateParser:
             logger.error(f"Failed to parse state file {file_path}: {e}")
             raise
 
+    def parse_bytes(self, raw: bytes) -> GameState:
+        """Parses the game state from a frame body (JSON or msgpack, trailer/header already stripped)."""
+        return self.parse_dict(decode_body(raw))
+
     def parse_dict(self, data: dict) -> GameState:
         """Parses the game state from a dictionary."""
+        data = self.deltas.apply(data)
+        if self._fast is not None:
+            try:
+                return self._fast.decode(data)
+            except Exception as e:
+                # Schema mismatch (e.g. missing required field). Let Pydantic report it properly.
+                self.fast_fallbacks += 1
+                logger.debug(f"Fast decode failed ({type(e).__name__}: {e}). Falling back to validation.")
         return GameState(**data)
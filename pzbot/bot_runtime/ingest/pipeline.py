@@ -0,0 +1,182 @@
+import time
+import logging
+from pathlib import Path
+from typing import Any, Callable, Optional
+from threading import Thread, Event, Condition
+from bot_runtime.ingest.state import GameState
+from bot_runtime.ingest.parser import StateParser, DECODER_VALIDATED
+from bot_runtime.ingest.watcher import StateWatcher, FrameLatencyStats, BACKEND_AUTO
+from bot_runtime.ingest.delta import MissingKeyframeError, keyframe_path
+from bot_runtime.ingest.shm_ring import StateRing
+
+logger = logging.getLogger(__name__)
+
+_EMPTY = object()
+
+class LatestFrameMailbox:
+    """
+    Single-slot, latest-wins handoff between two threads.
+    `put` never blocks: an item that was not taken yet is replaced and counted as dropped.
+    """
+    def __init__(self, name: str = "mailbox"):
+        self.name = name
+        self._cond = Condition()
+        self._item = _EMPTY
+        self._closed = False
+        self.posted = 0
+        self.taken = 0
+        self.dropped = 0
+
+    def put(self, item: Any):
+        with self._cond:
+            if self._item is not _EMPTY:
+                self.dropped += 1
+            self._item = item
+            self.posted += 1
+            self._cond.notify()
+
+    def take(self, timeout: Optional[float] = None) -> Any:
+        """Returns the newest item, or None on timeout/close."""
+        with self._cond:
+            if self._item is _EMPTY and not self._closed:
+                self._cond.wait(timeout)
+            if self._item is _EMPTY:
+                return None
+            item = self._item
+            self._item = _EMPTY
+            self.taken += 1
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        with self._cond:
+            self._closed = False
+            self._item = _EMPTY
+
+    def as_dict(self):
+        return {"posted": self.posted, "taken": self.taken, "dropped": self.dropped}
+
+class IngestPipeline:
+    """
+    Staged ingest: reader -> parser -> controller.
+
+        - Reader:     `StateWatcher` in raw mode; reads bytes as soon as a frame lands.
+        - Parser:     Worker thread decoding the newest raw frame into a `GameState`.
+        - Dispatcher: Drains the newest parsed frame and calls `on_frame` (the controller tick).
+
+    Each handoff is a `LatestFrameMailbox`, so a long tick never backs up the reader
+    and the controller always acts on the freshest state. Superseded frames are dropped and counted.
+
+    If `ring` is given, every frame read is also published to it (see `shm_ring.py`) for the tools.
+    """
+    def __init__(self, state_file_path: Path, on_frame: Callable[[GameState], None], polling_interval: float = 0.05,
+                 backend: str = BACKEND_AUTO, decoder: str = DECODER_VALIDATED, torn_retries: int = 5,
+                 binary_path: Optional[Path] = None, ring: Optional[StateRing] = None):
+        self.on_frame = on_frame
+        self.ring = ring
+        self._raw_box = LatestFrameMailbox("raw")
+        self._frame_box = LatestFrameMailbox("parsed")
+        self._parser = StateParser(decoder=decoder, keyframe_paths=[keyframe_path(p) for p in (binary_path, state_file_path) if p])
+        self.watcher = StateWatcher(
+            state_file_path,
+            polling_interval=polling_interval,
+            backend=backend,
+            on_raw=self._on_raw,
+            torn_retries=torn_retries,
+            binary_path=binary_path
+        )
+
+        self._stop_event = Event()
+        self._parse_thread: Optional[Thread] = None
+        self._dispatch_thread: Optional[Thread] = None
+
+        self.parse_errors = 0
+        self.tick_errors = 0
+        self.latency = FrameLatencyStats() # write -> on_frame
+        self.latency_report_interval = 100 # ticks
+
+    def start(self):
+        if self._dispatch_thread is not None and self._dispatch_thread.is_alive():
+            logger.warning("Ingest pipeline already running.")
+            return
+
+        self._stop_event.clear()
+        self._raw_box.reopen()
+        self._frame_box.reopen()
+        self._parse_thread = Thread(target=self._parse_loop, name="ingest-parser", daemon=True)
+        self._dispatch_thread = Thread(target=self._dispatch_loop, name="ingest-dispatch", daemon=True)
+        self._parse_thread.start()
+        self._dispatch_thread.start()
+        self.watcher.start()
+
+    def stop(self):
+        self.watcher.stop()
+        self._stop_event.set()
+        self._raw_box.close()
+        self._frame_box.close()
+        for t in (self._parse_thread, self._dispatch_thread):
+            if t:
+                t.join(timeout=1.0)
+        self._parse_thread = None
+        self._dispatch_thread = None
+        logger.info("Stopped ingest pipeline.")
+
+    def _on_raw(self, raw: bytes, written_at: float):
+        if self.ring is not None:
+            self.ring.publish(raw, written_at)
+        self._raw_box.put((raw, written_at))
+
+    def _parse_loop(self):
+        while not self._stop_event.is_set():
+            item = self._raw_box.take(timeout=0.5)
+            if item is None:
+                continue
+            raw, written_at = item
+            try:
+                game_state = self._parser.parse_bytes(raw)
+            except MissingKeyframeError as e:
+                # Resolves itself at the next keyframe
+                logger.debug(f"Dropped delta frame: {e}")
+                continue
+            except Exception as e:
+                self.parse_errors += 1
+                logger.warning(f"Error parsing state update: {e}")
+                continue
+            self._frame_box.put((game_state, written_at))
+
+    def _dispatch_loop(self):
+        while not self._stop_event.is_set():
+            item = self._frame_box.take(timeout=0.5)
+            if item is None:
+                continue
+            game_state, written_at = item
+            self.latency.record(max(0.0, (time.time() - written_at) * 1000.0))
+            try:
+                self.on_frame(game_state)
+            except Exception as e:
+                self.tick_errors += 1
+                logger.error(f"Error in tick: {e}", exc_info=True)
+
+            if self.latency.frames % self.latency_report_interval == 0:
+                s = self.get_stats()
+                logger.info(f"[INGEST] ticks={s['ticks']} latency avg={s['latency']['avg_ms']}ms max={s['latency']['max_ms']}ms "
+                            f"dropped raw={s['raw']['dropped']} parsed={s['parsed']['dropped']}")
+                self.latency.reset_window()
+
+    def get_stats(self) -> dict:
+        return {
+            "ticks": self.latency.frames,
+            "latency": self.latency.as_dict(),
+            "reader": self.watcher.get_stats(),
+            "raw": self._raw_box.as_dict(),
+            "parsed": self._frame_box.as_dict(),
+            "dropped": self._raw_box.dropped + self._frame_box.dropped,
+            "parse_errors": self.parse_errors,
+            "deltas": self._parser.deltas.get_stats(),
+            "ring": self.ring.get_stats() if self.ring is not None else None,
+            "tick_errors": self.tick_errors,
+        }
@@ -0,0 +1,302 @@
+"""
+Shared-memory ring of state frames, published by the bot's ingest pipeline.
+
+The runtime is the only process that reads `state.json`. Tools (recorder, debug server,
+monitor) attach to the ring instead of polling the file themselves: no extra file I/O,
+no file-lock contention with the game on Windows.
+
+Layout (little endian):
+
+    header  "PZRG" | version u32 | slots u32 | slot_bytes u32 | session u64 | head u64
+    slot i  lock u64 | seq u64 | written_at f64 | length u32 | pad | body[slot_bytes]
+
+Frame `seq` lives in slot `seq % slots`. Each slot is a seqlock: the writer sets `lock`
+to 2*seq-1 (odd) before writing and to 2*seq (even) after; a reader copies the body and
+accepts it only if `lock` was 2*seq before and after the copy. There is one writer and
+no locking, so readers never slow the writer down and a slow reader just skips frames.
+
+Bodies are stored as read from the state file (JSON or msgpack, trailer stripped).
+Delta frames (see `delta.py`) are rebuilt by the reader; `RingFeed` does both for tools.
+"""
+import os
+import time
+import struct
+import logging
+from pathlib import Path
+from multiprocessing import shared_memory
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from bot_runtime.ingest.frame import decode_body
+from bot_runtime.ingest.delta import DeltaAssembler, MissingKeyframeError
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PZRG"
+CLOSED = b"PZRX" # Written by the writer on close: readers should re-attach
+VERSION = 1
+HEADER = struct.Struct("<4sIIIQQ")
+HEADER_BYTES = 64
+HEAD_OFFSET = struct.calcsize("<4sIIIQ")
+SLOT_HEADER = struct.Struct("<QQdI4x")
+_U64 = struct.Struct("<Q")
+
+DEFAULT_NAME = "pzbot_state"
+
+class RingFrame(NamedTuple):
+    seq: int
+    written_at: float
+    body: bytes
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Opens an existing segment without handing its lifetime to this process."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False) # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name != 'nt':
+            # Older versions register attached segments with the resource tracker,
+            # which would unlink the writer's ring when this process exits.
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        return shm
+
+class StateRing:
+    """Writer side. One per ring (the ingest pipeline)."""
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, slot_bytes: int, owner: bool):
+        self._shm = shm
+        self._buf = shm.buf
+        self.name = shm.name
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._owner = owner
+        self.seq = 0
+        self.published = 0
+        self.oversized = 0
+
+        HEADER.pack_into(self._buf, 0, MAGIC, VERSION, slots, slot_bytes, time.time_ns(), 0)
+
+    @classmethod
+    def create(cls, name: str = DEFAULT_NAME, slots: int = 8, slot_bytes: int = 1 << 20) -> 'StateRing':
+        size = HEADER_BYTES + slots * (SLOT_HEADER.size + slot_bytes)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a runtime that did not shut down cleanly, or still held open by a
+            # reader (Windows keeps it alive while any handle is open). Reuse it if it fits.
+            shm = _attach(name)
+            if shm.size < size:
+                shm.buf[:4] = CLOSED
+                shm.close()
+                shm.unlink()
+                shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        logger.info(f"State ring '{name}' created ({slots} x {slot_bytes // 1024}KB)")
+        return cls(shm, slots, slot_bytes, owner=True)
+
+    def _slot_offset(self, seq: int) -> int:
+        return HEADER_BYTES + (seq % self.slots) * (SLOT_HEADER.size + self.slot_bytes)
+
+    def publish(self, body: bytes, written_at: float) -> int:
+        """Publishes one frame body. Returns its seq, or 0 if it does not fit in a slot."""
+        n = len(body)
+        if n > self.slot_bytes:
+            self.oversized += 1
+            if self.oversized == 1:
+                logger.warning(f"State frame ({n} bytes) larger than ring slot ({self.slot_bytes} bytes). Not published.")
+            return 0
+
+        buf = self._buf
+        seq = self.seq + 1
+        off = self._slot_offset(seq)
+        _U64.pack_into(buf, off, 2 * seq - 1)
+        start = off + SLOT_HEADER.size
+        buf[start:start + n] = body
+        SLOT_HEADER.pack_into(buf, off, 2 * seq - 1, seq, written_at, n)
+        _U64.pack_into(buf, off, 2 * seq)
+        _U64.pack_into(buf, HEAD_OFFSET, seq)
+
+        self.seq = seq
+        self.published += 1
+        return seq
+
+    def close(self):
+        if self._buf is None:
+            return
+        self._buf[:4] = CLOSED
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def get_stats(self) -> dict:
+        return {"name": self.name, "seq": self.seq, "published": self.published, "oversized": self.oversized}
+
+class StateRingReader:
+    """
+    Reader side. Any number of processes can attach.
+
+    `latest()` returns the newest frame; `read_since()` returns every frame still in the
+    ring after a given seq (for readers that want all frames, e.g. the recorder).
+    """
+    def __init__(self, name: str = DEFAULT_NAME):
+        self._shm = _attach(name)
+        self._buf = self._shm.buf
+        magic, version, self.slots, self.slot_bytes, self.session, _ = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self._shm.close()
+            raise ValueError(f"Shared memory '{name}' is not a state ring (v{VERSION})")
+        self.name = name
+        self.last_seq = 0
+        self.reads = 0
+        self.skipped = 0
+        self.torn = 0
+
+    @classmethod
+    def open(cls, name: str = DEFAULT_NAME) -> Optional['StateRingReader']:
+        """Attaches to the ring, or returns None if no runtime is publishing one."""
+        try:
+            return cls(name)
+        except (FileNotFoundError, ValueError) as e:
+            logger.debug(f"No state ring '{name}': {e}")
+            return None
+
+    @property
+    def head(self) -> int:
+        return _U64.unpack_from(self._buf, HEAD_OFFSET)[0]
+
+    @property
+    def closed(self) -> bool:
+        """The writer closed this ring. Re-`open()` to follow a restarted runtime."""
+        return bytes(self._buf[:4]) == CLOSED
+
+    def _check_session(self):
+        # A restarted runtime may reuse the segment: its seqs start over
+        _, _, slots, slot_bytes, session, _ = HEADER.unpack_from(self._buf, 0)
+        if session != self.session:
+            self.slots, self.slot_bytes, self.session = slots, slot_bytes, session
+            self.last_seq = 0
+
+    def _read_slot(self, seq: int) -> Optional[RingFrame]:
+        buf = self._buf
+        off = HEADER_BYTES + (seq % self.slots) * (SLOT_HEADER.size + self.slot_bytes)
+        lock, slot_seq, written_at, n = SLOT_HEADER.unpack_from(buf, off)
+        if lock != 2 * seq or slot_seq != seq:
+            return None
+        start = off + SLOT_HEADER.size
+        body = bytes(buf[start:start + n])
+        if _U64.unpack_from(buf, off)[0] != lock:
+            self.torn += 1
+            return None # Overwritten while copying
+        return RingFrame(seq, written_at, body)
+
+    def latest(self) -> Optional[RingFrame]:
+        """The newest frame, or None if nothing new was published since the last read."""
+        self._check_session()
+        for _ in range(3):
+            head = self.head
+            if head == 0 or head == self.last_seq:
+                return None
+            frame = self._read_slot(head)
+            if frame is not None:
+                if self.last_seq and head > self.last_seq + 1:
+                    self.skipped += head - self.last_seq - 1
+                self.last_seq = head
+                self.reads += 1
+                return frame
+        return None
+
+    def read_since(self, seq: Optional[int] = None) -> List[RingFrame]:
+        """All frames after `seq` (default: the last one read) that are still in the ring, oldest first."""
+        self._check_session()
+        last = self.last_seq if seq is None else seq
+        head = self.head
+        start = max(last + 1, head - self.slots + 1, 1)
+        if last:
+            self.skipped += start - last - 1
+
+        frames = []
+        for s in range(start, head + 1):
+            frame = self._read_slot(s)
+            if frame is None:
+                self.skipped += 1
+                continue
+            frames.append(frame)
+        self.last_seq = max(last, head)
+        self.reads += len(frames)
+        return frames
+
+    def close(self):
+        if self._buf is not None:
+            self._buf = None
+            self._shm.close()
+
+    def get_stats(self) -> dict:
+        return {"name": self.name, "last_seq": self.last_seq, "reads": self.reads,
+                "skipped": self.skipped, "torn": self.torn}
+
+class RingFeed:
+    """
+    Decoded full frames from the ring, for tools.
+
+    Attaches lazily and re-attaches after a runtime restart. Delta frames are rebuilt,
+    with the keyframe side files (`keyframe_paths`) as fallback for a skipped keyframe.
+    """
+    def __init__(self, name: str = DEFAULT_NAME, keyframe_paths: Sequence[Path] = ()):
+        self.name = name
+        self._keyframe_paths = keyframe_paths
+        self._reader: Optional[StateRingReader] = None
+        self._deltas = DeltaAssembler(keyframe_paths)
+        self.last: Optional[dict] = None # Newest decoded frame
+
+    def connect(self) -> bool:
+        """True if a runtime is publishing frames."""
+        if self._reader is not None and self._reader.closed:
+            self._reader.close()
+            self._reader = None
+        if self._reader is None:
+            self._reader = StateRingReader.open(self.name)
+            if self._reader is not None:
+                self._deltas = DeltaAssembler(self._keyframe_paths)
+        return self._reader is not None
+
+    def _decode(self, frame: RingFrame) -> Optional[dict]:
+        try:
+            data = self._deltas.apply(decode_body(frame.body))
+        except MissingKeyframeError:
+            return None
+        self.last = data
+        return data
+
+    def latest(self) -> Optional[dict]:
+        """The newest frame, or None if nothing new arrived (see `last`)."""
+        if not self.connect():
+            return None
+        frame = self._reader.latest()
+        return self._decode(frame) if frame is not None else None
+
+    def read_all(self) -> List[Tuple[RingFrame, dict]]:
+        """Every frame published since the previous call that is still in the ring, oldest first."""
+        if not self.connect():
+            return []
+        out = []
+        for frame in self._reader.read_since():
+            data = self._decode(frame)
+            if data is not None:
+                out.append((frame, data))
+        return out
+
+    def get_stats(self) -> dict:
+        stats = self._reader.get_stats() if self._reader is not None else {"name": self.name}
+        stats["connected"] = self._reader is not None
+        stats["deltas"] = self._deltas.get_stats()
+        return stats
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
@@ -3,6 +3,9 @@ from typing import Dict, List, Any, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+from bot_runtime.ingest.lazy import LazyList
+from bot_runtime.ingest.tiles import TileBlock, tile_block
+
 logger = logging.getLogger(__name__)
 
 class LogExtraFieldsBase(BaseModel):
@@ -181,7 +184,7 @@ class Container(LogExtraFieldsBase):
     x: int
     y: int
     z: int
-    items: List[ContainerItem] = Field(default_factory=list)
+    items: LazyList[ContainerItem] = Field(default_factory=list) # Decoded on first read
     meta: Dict[str, Any] = Field(default_factory=dict)
 
     @field_validator('items', mode='before')
@@ -242,11 +245,12 @@ class Sound(LogExtraFieldsBase):
 class Vision(LogExtraFieldsBase):
     scan_radius: int = 0
     timestamp: int = 0
-    tiles: List[Tile] = Field(default_factory=list)
+    # Heavy lists stay raw until first read (see lazy.py)
+    tiles: LazyList[Tile] = Field(default_factory=list)
     objects: List[WorldObject] = Field(default_factory=list)
     vehicles: List[Vehicle] = Field(default_factory=list)
-    world_items: List[WorldItem] = Field(default_factory=list)
-    nearby_containers: List[Container] = Field(default_factory=list)
+    world_items: LazyList[WorldItem] = Field(default_factory=list)
+    nearby_containers: LazyList[Container] = Field(default_factory=list)
     neighbors: Dict[str, Any] = Field(default_factory=dict)
     
     # New Sensory Channels
@@ -255,6 +259,11 @@ class Vision(LogExtraFieldsBase):
     
     debug_z: Optional[Dict[str, Any]] = None
 
+    @property
+    def tile_block(self) -> TileBlock:
+        """Columnar view of `tiles` with an (x,y,z) index, built once per frame."""
+        return tile_block(self.tiles)
+
     @field_validator('tiles', 'objects', 'world_items', 'nearby_containers', 'vehicles', 'signals', 'sounds', mode='before')
     @classmethod
     def validate_lists(cls, v, info):
@@ -0,0 +1,166 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bot_runtime.ingest.lazy import LazyList
+
+NO_ID = -1
+
+class StringTable:
+    """
+    Interns room/layer names to small ints.
+    Process-wide, so ids are stable across frames and can be stored (e.g. in the grid).
+    """
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, name: Optional[str]) -> int:
+        if name is None:
+            return NO_ID
+        i = self._ids.get(name)
+        if i is None:
+            with self._lock:
+                i = self._ids.get(name)
+                if i is None:
+                    i = len(self.names)
+                    self.names.append(name)
+                    self._ids[name] = i
+        return i
+
+    def lookup(self, name: Optional[str]) -> int:
+        """Id of `name`, or NO_ID if it was never seen (never interns)."""
+        if name is None:
+            return NO_ID
+        return self._ids.get(name, NO_ID)
+
+    def name(self, i: int) -> Optional[str]:
+        return self.names[i] if i >= 0 else None
+
+ROOMS = StringTable()
+LAYERS = StringTable()
+
+class TileBlock:
+    """
+    Columnar view of one frame's `Vision.tiles`.
+
+    Columns (one row per tile):
+        x, y, z            int32
+        walkable, visible  bool
+        room_id, layer_id  int32, interned via ROOMS / LAYERS (NO_ID = none)
+
+    The (x, y, z) -> row index is built on first lookup and kept for the frame.
+    """
+    __slots__ = ('x', 'y', 'z', 'walkable', 'visible', 'room_id', 'layer_id', '_index')
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, z: np.ndarray, walkable: np.ndarray, visible: np.ndarray,
+                 room_id: np.ndarray, layer_id: np.ndarray):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.walkable = walkable
+        self.visible = visible
+        self.room_id = room_id
+        self.layer_id = layer_id
+        self._index: Optional[Dict[Tuple[int, int, int], int]] = None
+
+    @classmethod
+    def from_rows(cls, tiles: Sequence[Any]) -> 'TileBlock':
+        """Builds the block from raw tile dicts (as sent by Lua) or decoded `Tile` objects."""
+        if tiles and not isinstance(tiles[0], dict):
+            tiles = [{'x': t.x, 'y': t.y, 'z': t.z, 'w': t.w, 'v': t.v, 'room': t.room, 'layer': t.layer} for t in tiles]
+
+        room = ROOMS.intern
+        layer = LAYERS.intern
+        return cls(
+            np.array([t['x'] for t in tiles], dtype=np.int32),
+            np.array([t['y'] for t in tiles], dtype=np.int32),
+            np.array([t['z'] for t in tiles], dtype=np.int32),
+            np.array([bool(t['w']) for t in tiles], dtype=bool),
+            np.array([bool(t.get('v', False)) for t in tiles], dtype=bool),
+            np.array([room(t.get('room')) for t in tiles], dtype=np.int32),
+            np.array([layer(t.get('layer')) for t in tiles], dtype=np.int32),
+        )
+
+    def __len__(self):
+        return len(self.x)
+
+    # --- Point lookups (O(1)) ---
+
+    @property
+    def index(self) -> Dict[Tuple[int, int, int], int]:
+        if self._index is None:
+            keys = zip(self.x.tolist(), self.y.tolist(), self.z.tolist())
+            self._index = {k: i for i, k in enumerate(keys)}
+        return self._index
+
+    def row(self, x: int, y: int, z: int) -> int:
+        """Row of the tile at (x, y, z), or -1 if it is not in this frame."""
+        return self.index.get((int(x), int(y), int(z)), -1)
+
+    def room_at(self, x: int, y: int, z: int) -> Optional[str]:
+        i = self.row(x, y, z)
+        return ROOMS.name(int(self.room_id[i])) if i >= 0 else None
+
+    def is_walkable(self, x: int, y: int, z: int) -> bool:
+        """False for tiles that are not walkable or not in this frame."""
+        i = self.row(x, y, z)
+        return i >= 0 and bool(self.walkable[i])
+
+    def room(self, row: int) -> Optional[str]:
+        return ROOMS.name(int(self.room_id[row]))
+
+    def layer(self, row: int) -> Optional[str]:
+        return LAYERS.name(int(self.layer_id[row]))
+
+    # --- Vectorized filters ---
+
+    def has_rooms(self) -> bool:
+        return bool((self.room_id != NO_ID).any())
+
+    def near(self, x: int, y: int, radius: int, z: Optional[int] = None) -> np.ndarray:
+        """Boolean mask of tiles within `radius` (Chebyshev) of (x, y)."""
+        mask = (np.abs(self.x - int(x)) <= radius) & (np.abs(self.y - int(y)) <= radius)
+        if z is not None:
+            mask &= self.z == int(z)
+        return mask
+
+    def in_rooms(self, names: Iterable[str]) -> np.ndarray:
+        """Boolean mask of tiles whose room is one of `names`."""
+        ids = [i for i in (ROOMS.lookup(n) for n in names) if i != NO_ID]
+        if not ids:
+            return np.zeros(len(self), dtype=bool)
+        return np.isin(self.room_id, ids)
+
+    def at(self, coords: Iterable[Tuple[int, int]], z: Optional[int] = None) -> np.ndarray:
+        """Boolean mask of tiles at any of the (x, y) `coords`."""
+        mask = np.zeros(len(self), dtype=bool)
+        for cx, cy in coords:
+            hit = (self.x == int(cx)) & (self.y == int(cy))
+            if z is not None:
+                hit &= self.z == int(z)
+            mask |= hit
+        return mask
+
+    def closest(self, mask: np.ndarray, x: float, y: float) -> int:
+        """Row of the masked tile closest to (x, y), or -1 if the mask is empty."""
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return -1
+        d2 = (self.x[rows] - x) ** 2 + (self.y[rows] - y) ** 2
+        return int(rows[np.argmin(d2)])
+
+def _build(tiles: LazyList) -> TileBlock:
+    try:
+        return TileBlock.from_rows(tiles.raw)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        # Malformed raw tiles: decoding reports the proper validation error
+        return TileBlock.from_rows(tiles.materialize())
+
+def tile_block(tiles: Sequence[Any]) -> TileBlock:
+    """Returns the frame's `TileBlock`, built once per tiles list."""
+    if isinstance(tiles, LazyList):
+        return tiles.derived('tile_block', _build)
+    return TileBlock.from_rows(tiles or [])
@@ -2,68 +2,314 @@ import time
 import os
 import logging
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from threading import Thread, Event
 from bot_runtime.ingest.state import GameState
-from bot_runtime.ingest.parser import StateParser
+from bot_runtime.ingest.parser import StateParser, DECODER_VALIDATED
+from bot_runtime.ingest.frame import FrameReader, TornReadError
+from bot_runtime.ingest.delta import MissingKeyframeError, keyframe_path
+
+# Optional: event-driven backend (inotify on Linux, ReadDirectoryChangesW on Windows)
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler, FileClosedEvent
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+    FileClosedEvent = None
 
 logger = logging.getLogger(__name__)
 
+BACKEND_AUTO = "auto"
+BACKEND_EVENTS = "events"
+BACKEND_POLL = "poll"
+
+class FrameLatencyStats:
+    """
+    Tracks how long each frame waited between the Lua write (file mtime)
+    and the moment it was handed to `on_update`.
+    """
+    def __init__(self):
+        self.frames = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+
+    def record(self, latency_ms: float):
+        self.frames += 1
+        self.last_ms = latency_ms
+        self.total_ms += latency_ms
+        if latency_ms > self.max_ms:
+            self.max_ms = latency_ms
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.frames if self.frames else 0.0
+
+    def reset_window(self):
+        """Resets max so periodic reports show the worst case of the last window."""
+        self.max_ms = 0.0
+
+    def as_dict(self):
+        return {
+            "frames": self.frames,
+            "last_ms": round(self.last_ms, 2),
+            "avg_ms": round(self.avg_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+class _StateFileEventHandler(FileSystemEventHandler):
+    """Wakes the watcher loop when a state file is written."""
+    def __init__(self, state_file_paths: List[Path], wake_event: Event):
+        super().__init__()
+        self._targets = {os.path.normcase(os.path.abspath(p)) for p in state_file_paths}
+        self._wake = wake_event
+        self.close_write_seen = False
+
+    def _matches(self, path) -> bool:
+        if not path:
+            return False
+        if isinstance(path, bytes):
+            path = os.fsdecode(path)
+        return os.path.normcase(os.path.abspath(path)) in self._targets
+
+    def on_closed(self, event):
+        # IN_CLOSE_WRITE: the writer has finished and closed the file.
+        if self._matches(event.src_path):
+            self.close_write_seen = True
+            self._wake.set()
+
+    def on_modified(self, event):
+        # Backends without close events (Windows) only report modifications.
+        if self._matches(event.src_path):
+            self._wake.set()
+
+    def on_moved(self, event):
+        # Atomic writers (tmp + rename)
+        if self._matches(getattr(event, 'dest_path', None)):
+            self.close_write_seen = True
+            self._wake.set()
+
+    def on_created(self, event):
+        if self._matches(event.src_path):
+            self._wake.set()
+
 class StateWatcher:
-    def __init__(self, state_file_path: Path, on_update: Callable[[GameState], None], polling_interval: float = 0.05):
+    """
+    Watches the Lua state file and feeds parsed `GameState`s to `on_update`.
+
+    Backends:
+        - "events": Wakes on the close-after-write event (watchdog/inotify).
+        - "poll":   Stats the file every `polling_interval` seconds.
+        - "auto":   Uses events when available, polling otherwise.
+    The event backend still polls at `polling_interval` as a safety net for missed events.
+
+    If `on_raw` is given, the watcher only reads: each new frame is handed over as
+    `(raw_bytes, written_at)` without parsing (see `IngestPipeline`).
+
+    Frames caught mid-write are retried within the same frame (see `FrameReader`).
+
+    If `binary_path` is given (binary transport, see `binary.py`), both files are watched
+    and the most recently written one is read, so the mod can fall back to JSON at any time.
+    """
+    def __init__(self, state_file_path: Path, on_update: Optional[Callable[[GameState], None]] = None, polling_interval: float = 0.05, backend: str = BACKEND_AUTO, decoder: str = DECODER_VALIDATED,
+                 on_raw: Optional[Callable[[bytes, float], None]] = None, torn_retries: int = 5, binary_path: Optional[Path] = None):
         self.state_file_path = state_file_path
+        self.binary_path = binary_path
+        self._paths: List[Path] = [p for p in (binary_path, state_file_path) if p is not None]
         self.on_update = on_update
+        self.on_raw = on_raw
         self.polling_interval = polling_interval
+        self.backend = backend
         self._stop_event = Event()
+        self._wake_event = Event()
         self._thread: Optional[Thread] = None
-        self._parser = StateParser()
-        self._last_mtime = 0.0
+        self._parser = StateParser(decoder=decoder, keyframe_paths=[keyframe_path(p) for p in self._paths]) if on_raw is None else None
+        self._readers: Dict[Path, FrameReader] = {p: FrameReader(p, retries=torn_retries) for p in self._paths}
+        self._reader = self._readers[state_file_path]
+        self.active_path = state_file_path
+        self._last_signature: Optional[Tuple[Path, int, int]] = None
+        self._last_body: Optional[bytes] = None
         self._last_missing_log = 0.0
 
+        self._observer = None
+        self._event_handler: Optional[_StateFileEventHandler] = None
+        self.active_backend = BACKEND_POLL
+
+        self.latency = FrameLatencyStats()
+        self.latency_report_interval = 100 # frames
+
     def start(self):
         """Starts the watcher in a background thread."""
         if self._thread is not None and self._thread.is_alive():
             logger.warning("Watcher already running.")
             return
-        
+
         self._stop_event.clear()
+        if self.backend != BACKEND_POLL:
+            self._start_observer()
+
         self._thread = Thread(target=self._watch_loop, daemon=True)
         self._thread.start()
-        logger.info(f"Started watching {self.state_file_path}")
+        logger.info(f"Started watching {self.state_file_path} (backend: {self.active_backend})")
 
     def stop(self):
         """Stops the watcher thread."""
         if self._thread:
             self._stop_event.set()
+            self._wake_event.set()
             self._thread.join(timeout=1.0)
             self._thread = None
             logger.info("Stopped watching state file.")
+        self._stop_observer()
+
+    def _start_observer(self) -> bool:
+        if Observer is None:
+            if self.backend == BACKEND_EVENTS:
+                logger.warning("watchdog not installed. Falling back to mtime polling.")
+            return False
+
+        watch_dir = Path(self.state_file_path).parent
+        if not watch_dir.exists():
+            # Game hasn't created the bridge dir yet. Retried from the loop.
+            return False
+
+        try:
+            self._event_handler = _StateFileEventHandler(self._paths, self._wake_event)
+            self._observer = Observer()
+            self._observer.schedule(self._event_handler, str(watch_dir), recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+            self.active_backend = BACKEND_EVENTS
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to start event observer ({e}). Falling back to mtime polling.")
+            self._observer = None
+            self._event_handler = None
+            self.active_backend = BACKEND_POLL
+            return False
+
+    def _stop_observer(self):
+        if self._observer:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=1.0)
+            except Exception as e:
+                logger.debug(f"Error stopping observer: {e}")
+            self._observer = None
+            self._event_handler = None
+            self.active_backend = BACKEND_POLL
 
     def _watch_loop(self):
         while not self._stop_event.is_set():
+            # Block until the file is written (events) or the poll interval elapses
+            woke = self._wake_event.wait(self.polling_interval)
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+
             try:
-                if self.state_file_path.exists():
-                    stat = self.state_file_path.stat()
-                    mtime = stat.st_mtime
-                    
-                    if mtime > self._last_mtime:
-                        self._last_mtime = mtime
-                        # Small delay to ensure write completion if needed, though atomic writes are preferred
-                        # But for now assuming file is ready when mtime updates or we catch JSON error and retry next time
-                        try:
-                            game_state = self._parser.parse_file(self.state_file_path)
-                            self.on_update(game_state)
-                            # logger.debug(f"State updated. Tick: {game_state.tick}")
-                        except Exception as e:
-                            logger.warning(f"Error parsing state update: {e}")
-                else:
-                    # Log warning if file is missing, throttled to once every 10s
-                    now = time.time()
-                    if now - self._last_missing_log > 10:
-                        logger.warning(f"State file not found at {self.state_file_path}. Waiting for game...")
-                        self._last_missing_log = now
+                if self.backend != BACKEND_POLL and self._observer is None:
+                    self._start_observer()
 
+                forced = False
+                if woke and self._event_handler and self._event_handler.close_write_seen:
+                    # A close-after-write always carries a new frame, even if the
+                    # mtime did not advance (two writes in the same mtime granule).
+                    self._event_handler.close_write_seen = False
+                    forced = True
+
+                self._check_file(forced)
             except Exception as e:
                 logger.error(f"Error in watcher loop: {e}")
 
-            time.sleep(self.polling_interval)
+    def _latest_file(self) -> Tuple[Path, os.stat_result]:
+        """The most recently written state file. Raises FileNotFoundError if there is none."""
+        best = None
+        for path in self._paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if best is None or stat.st_mtime_ns > best[1].st_mtime_ns:
+                best = (path, stat)
+        if best is None:
+            raise FileNotFoundError(self.state_file_path)
+        return best
+
+    def _check_file(self, forced: bool = False):
+        try:
+            path, stat = self._latest_file()
+        except FileNotFoundError:
+            # Log warning if file is missing, throttled to once every 10s
+            now = time.time()
+            if now - self._last_missing_log > 10:
+                logger.warning(f"State file not found at {self.state_file_path}. Waiting for game...")
+                self._last_missing_log = now
+            return
+
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+        if signature == self._last_signature and not forced:
+            return
+
+        if path != self.active_path:
+            logger.info(f"State transport: now reading {path.name}")
+            self.active_path = path
+            self._reader = self._readers[path]
+
+        last_seq = self._reader.last_seq
+        try:
+            body, seq = self._reader.read()
+            # The file may have grown while we retried: remember what we actually read
+            stat = path.stat()
+        except TornReadError as e:
+            logger.warning(f"Torn read of state file after {self._reader.retries} retries ({e}). Will re-check.")
+            self._last_signature = None
+            return
+        except OSError as e:
+            logger.warning(f"Error reading state file: {e}")
+            return
+        self._last_signature = (path, stat.st_mtime_ns, stat.st_size)
+
+        # Same frame read twice (e.g. modify + close events for one write)
+        if seq is not None:
+            if seq == last_seq:
+                return
+        elif body == self._last_body:
+            return
+        self._last_body = body
+
+        if self.on_raw is not None:
+            self._record_latency(stat.st_mtime)
+            self.on_raw(body, stat.st_mtime)
+            return
+
+        try:
+            game_state = self._parser.parse_bytes(body)
+        except MissingKeyframeError as e:
+            logger.debug(f"Dropped delta frame: {e}")
+            return
+        except Exception as e:
+            logger.warning(f"Error parsing state update: {e}")
+            return
+
+        self._record_latency(stat.st_mtime)
+        self.on_update(game_state)
+        # logger.debug(f"State updated. Tick: {game_state.tick}")
+
+    def _record_latency(self, written_at: float):
+        latency_ms = max(0.0, (time.time() - written_at) * 1000.0)
+        self.latency.record(latency_ms)
+        logger.debug(f"Frame latency: {latency_ms:.1f}ms (write -> on_update)")
+
+        if self.latency.frames % self.latency_report_interval == 0:
+            s = self.latency.as_dict()
+            logger.info(f"[INGEST] backend={self.active_backend} frames={s['frames']} latency avg={s['avg_ms']}ms max={s['max_ms']}ms")
+            self.latency.reset_window()
+
+    def get_stats(self) -> dict:
+        stats = self.latency.as_dict()
+        stats["backend"] = self.active_backend
+        stats["transport"] = "binary" if self.active_path == self.binary_path else "json"
+        stats.update(self._reader.get_stats())
+        return stats
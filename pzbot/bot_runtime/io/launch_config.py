@@ -0,0 +1,32 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+def set_launch_option(config_path: Path, key: str, value: Any) -> bool:
+    """
+    Sets one key in the mod's launch_config.json, preserving the other keys
+    (mode, log_level, ...). Returns False if the file could not be written.
+    """
+    data = {}
+    if config_path.exists():
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                data = json.load(f) or {}
+        except Exception as e:
+            logger.warning(f"Could not read {config_path}: {e}. Rewriting it.")
+
+    if data.get(key) == value:
+        return True
+    data[key] = value
+
+    try:
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not update {config_path}: {e}")
+        return False
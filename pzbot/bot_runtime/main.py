@@ -8,11 +8,15 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from bot_runtime import config
 from bot_runtime.logging_setup import setup_logging
-from bot_runtime.ingest.watcher import StateWatcher
+from bot_runtime.ingest.pipeline import IngestPipeline
+from bot_runtime.ingest import binary
+from bot_runtime.ingest.delta import keyframe_path
+from bot_runtime.ingest.shm_ring import StateRing
 from bot_runtime.world.model import WorldModel
 from bot_runtime.control.action_queue import ActionQueue
 from bot_runtime.control.controller import BotController
 from bot_runtime.io.input_writer import InputWriter
+from bot_runtime.io.launch_config import set_launch_option
 
 logger = logging.getLogger(__name__)
 
@@ -28,30 +32,54 @@ def main():
     input_writer.write_actions([], clear_queue=True, packet_id="init_clear")
     controller = BotController(world_model, action_queue, input_writer)
 
-    # Initialize Watcher
-    watcher = StateWatcher(
+    # Negotiate the state transport (read by ObservationClient.lua). JSON stays the fallback.
+    set_launch_option(config.LAUNCH_CONFIG_PATH, "state_format", config.STATE_FORMAT)
+    set_launch_option(config.LAUNCH_CONFIG_PATH, "state_delta", "on" if config.STATE_DELTA else "off")
+    binary_path = config.STATE_BINARY_PATH if config.STATE_FORMAT == "msgpack" else None
+    if binary_path and not binary.has_native_decoder():
+        logger.warning("STATE_FORMAT is msgpack but the msgpack package is not installed. Pure-Python decoding is slower than JSON.")
+
+    # Shared-memory frame ring: the tools read frames from here instead of re-reading the state file
+    ring = None
+    if config.STATE_RING:
+        try:
+            ring = StateRing.create(config.STATE_RING_NAME, slots=config.STATE_RING_SLOTS, slot_bytes=config.STATE_RING_SLOT_BYTES)
+        except Exception as e:
+            logger.warning(f"Could not create state ring '{config.STATE_RING_NAME}' ({e}). Tools will read the state file.")
+
+    # Initialize Ingest (reader -> parser -> controller, latest frame wins)
+    ingest = IngestPipeline(
         state_file_path=config.STATE_FILE_PATH,
-        on_update=controller.on_tick,
-        polling_interval=config.POLLING_INTERVAL
+        on_frame=controller.on_tick,
+        polling_interval=config.POLLING_INTERVAL,
+        backend=config.INGEST_BACKEND,
+        decoder=config.INGEST_DECODER,
+        torn_retries=config.INGEST_TORN_RETRIES,
+        binary_path=binary_path,
+        ring=ring
     )
 
     # Snapshot settings
     last_snapshot_time = 0.0
     SNAPSHOT_INTERVAL = 0.5 # seconds
     snapshot_path = config.BASE_DIR / "tools" / "grid_snapshot.json"
+    stream_path = config.BASE_DIR / "tools" / "grid_stream.jsonl" # Tiles, changed chunks only
 
     # Cleanup previous runtime data
     # Logic: If state.json is 'fresh' (modified < 5s ago), assume game is running and don't delete it.
     # This allows 'Hot Attach' of the bot.
-    if snapshot_path.exists():
-        try:
-            snapshot_path.unlink()
-            logger.info(f"Cleaned up previous data at {snapshot_path}")
-        except Exception as e:
-            logger.warning(f"Failed to clean up {snapshot_path}: {e}")
+    for stale_path in (snapshot_path, stream_path):
+        if stale_path.exists():
+            try:
+                stale_path.unlink()
+                logger.info(f"Cleaned up previous data at {stale_path}")
+            except Exception as e:
+                logger.warning(f"Failed to clean up {stale_path}: {e}")
 
-    state_path = config.STATE_FILE_PATH
-    if state_path.exists():
+    state_paths = (config.STATE_FILE_PATH, config.STATE_BINARY_PATH)
+    for state_path in state_paths + tuple(keyframe_path(p) for p in state_paths):
+        if not state_path.exists():
+            continue
         try:
             mtime = state_path.stat().st_mtime
             age = time.time() - mtime
@@ -64,7 +92,7 @@ def main():
             logger.warning(f"Failed to check/cleanup {state_path}: {e}")
 
     try:
-        watcher.start()
+        ingest.start()
         
         # Keep main thread alive
         while True:
@@ -96,21 +124,8 @@ def main():
                 signals = world_model.memory.get_signals()
                 sounds = world_model.memory.get_sounds()
                 
-                # Brain State
-                import dataclasses
-                brain_data = dataclasses.asdict(controller.brain.state)
-                # Exclude 'vision' as it contains non-serializable Pydantic objects and is too large
-                if 'vision' in brain_data:
-                    del brain_data['vision']
-                if 'player' in brain_data:
-                    del brain_data['player']
-
-                # Convert Memory Sets to Lists for JSON
-                if 'memory' in brain_data:
-                    mem = brain_data['memory']
-                    for k, v in mem.items():
-                        if isinstance(v, set):
-                            mem[k] = list(v)
+                # Brain State (without the live vision, player and world services)
+                brain_data = controller.brain.state.snapshot()
                 
                 grid_data = {
                     "entities": known_entities,
@@ -122,17 +137,21 @@ def main():
                     "brain": brain_data
                 }
                 
-                world_model.grid.save_snapshot(str(snapshot_path), grid_data)
+                world_model.grid.save_snapshot(str(snapshot_path), grid_data, str(stream_path))
                 last_snapshot_time = time.time()
 
     except KeyboardInterrupt:
         logger.info("Shutting down...")
-        world_model.grid.save_snapshot(str(snapshot_path))
-        watcher.stop()
+        world_model.grid.save_snapshot(str(snapshot_path), stream_path=str(stream_path))
+        ingest.stop()
     except Exception as e:
         logger.error(f"Fatal error: {e}")
-        watcher.stop()
+        ingest.stop()
         sys.exit(1)
+    finally:
+        world_model.grid.close()
+        if ring:
+            ring.close()
 
 if __name__ == "__main__":
     main()
@@ -120,14 +120,10 @@ class LootPlan(Plan):
                  best_dist = 9999
                  found_adj = False
                  
-                 # Create a quick lookup for walkability
-                 # This is O(N) where N is visible tiles (~800). Acceptable.
-                 walkable_map = set()
-                 if state.vision.tiles:
-                     for t in state.vision.tiles:
-                         if t.w: # w = walkable
-                             walkable_map.add((t.x, t.y))
-                         
+                 # O(1) walkability lookups in the frame's tile index
+                 tiles = state.vision.tile_block
+                 pz = int(player_pos.z)
+
                  # Check 8 neighbors
                  candidates = [
                      (0, 1), (0, -1), (1, 0), (-1, 0),
@@ -136,7 +132,7 @@ class LootPlan(Plan):
                  
                  for dx, dy in candidates:
                      nx, ny = target_pos.x + dx, target_pos.y + dy
-                     if (nx, ny) in walkable_map:
+                     if tiles.is_walkable(nx, ny, pz):
                          d = math.dist((player_pos.x, player_pos.y), (nx, ny))
                          if d < best_dist:
                              best_dist = d
@@ -2,7 +2,10 @@ from typing import List, Optional, Set
 import math
 import logging
 
+import numpy as np
+
 from bot_runtime.brain.state import BrainState
+from bot_runtime.ingest.tiles import NO_ID
 from bot_runtime.control.action_queue import Action, ActionType
 from bot_runtime.planning.base import Plan, PlanStatus
 from bot_runtime.planning.plans.loot_plan import LootPlan
@@ -28,6 +31,37 @@ class SearchBuildingPlan(Plan):
         self.target_room = None
         self.nav_target = None
         self.failed_targets = set() # (x,y) tuples that we failed to reach
+        self.failed_rooms = set() # RoomIndex ids of rooms we failed to reach
+        self.target_room_id = None
+        self.building = None # RoomIndex building id, once we stand in one of its rooms
+
+    def _nearest_reachable_room(self, state: BrainState, z: int):
+        """Unvisited room of this building with the shortest path to its anchor, if any is reachable."""
+        if state.reach is None or self.building is None:
+            return None
+        failed = {state.rooms.room(r).id for r in self.failed_rooms}
+        rooms = [r for r in state.rooms.rooms_in(self.building)
+                 if r.z == z and r.id not in failed and r.name not in state.memory.visited_rooms]
+        dists = state.reach.distances([state.rooms.anchor(r.id) for r in rooms])
+        best = min(range(len(rooms)), key=dists.__getitem__, default=None)
+        return rooms[best] if best is not None and dists[best] < math.inf else None
+
+    def _nearest_reachable_tile(self, state: BrainState, mask, z: int) -> int:
+        """Row of the masked vision tile with the shortest path, or -1 if none is reachable."""
+        if state.reach is None:
+            return -1
+        tiles = state.vision.tile_block
+        rows = np.flatnonzero(mask & (tiles.z == z))
+        dists = state.reach.distances(zip(tiles.x[rows].tolist(), tiles.y[rows].tolist()))
+        if not dists or min(dists) == math.inf:
+            return -1
+        return int(rows[int(np.argmin(dists))])
+
+    def _walled_off(self, state: BrainState, start, goal) -> bool:
+        """True once the known walls leave no path to `goal` (repaired incrementally every tick)."""
+        if state.routes is None:
+            return False
+        return state.routes.path(start, goal) is None
 
     def execute(self, state: BrainState) -> List[Action]:
         actions = []
@@ -35,18 +69,22 @@ class SearchBuildingPlan(Plan):
         # 1. Update Room Knowledge
         current_room_name = "Unknown"
         px, py = int(state.player.position.x), int(state.player.position.y)
-        
-        for t in state.vision.tiles:
-            if int(t.x) == px and int(t.y) == py:
-                if hasattr(t, 'room') and t.room:
-                    current_room_name = t.room
-                break
+        pz = int(state.player.position.z)
+        tiles = state.vision.tile_block
+
+        room = tiles.room_at(px, py, pz)
+        if room:
+            current_room_name = room
         
         if current_room_name != "Unknown":
             if current_room_name not in state.memory.visited_rooms:
                 logger.info(f"[SearchPlan] Discovered Room: {current_room_name}")
                 state.memory.visited_rooms.add(current_room_name)
             self.current_room = current_room_name
+
+        indexed = state.rooms.room_at(px, py, pz) if state.rooms else None
+        if indexed is not None and self.building is None:
+            self.building = indexed.building
             
         # 2. Check for Loot (Loot As You Go) - Placeholder
         pass
@@ -67,12 +105,20 @@ class SearchBuildingPlan(Plan):
                 self.last_dist = dist
                 
             is_stuck = self.stuck_ticks > 15 # ~7.5 seconds stuck (increased to avoid false positives)
+            # Newly seen walls cutting the target off are known now, not after the stuck timer
+            walled_off = dist >= 1.5 and not is_stuck and self._walled_off(state, (px, py, pz), (tx, ty, pz))
+            if walled_off:
+                logger.warning(f"[SearchPlan] No path left to {tx},{ty}. Blacklisting target.")
+                is_stuck = True
             
             # Arrival or Stuck
             if dist < 1.5 or is_stuck: 
                 if is_stuck:
-                    logger.warning(f"[SearchPlan] Stuck reaching {tx},{ty} (Dist: {dist:.1f}). Blacklisting target.")
+                    if not walled_off:
+                        logger.warning(f"[SearchPlan] Stuck reaching {tx},{ty} (Dist: {dist:.1f}). Blacklisting target.")
                     self.failed_targets.add((tx, ty))
+                    if self.target_room_id is not None:
+                        self.failed_rooms.add(self.target_room_id)
                 else:
                     logger.info(f"[SearchPlan] Arrived at target {tx},{ty}")
                 
@@ -86,22 +132,37 @@ class SearchBuildingPlan(Plan):
 
         # 4. Pick Next Target
         if not self.nav_target:
-            potential_targets = []
-            for t in state.vision.tiles:
-                # Filter invisible walls and failed targets
-                if hasattr(t, 'v') and not t.v: continue
-                if (t.x, t.y) in self.failed_targets: continue
-
-                if hasattr(t, 'room') and t.room and t.room not in state.memory.visited_rooms:
-                     potential_targets.append(t)
-            
-            if potential_targets:
-                # Pick closest
-                best = min(potential_targets, key=lambda t: math.dist((t.x, t.y), (px, py)))
-                self.nav_target = (best.x, best.y)
-                self.target_room = best.room
-                self.last_dist = math.dist((best.x, best.y), (px, py))
-                logger.info(f"[SearchPlan] Targeting new room: {best.room} at {best.x},{best.y}")
+            best = -1
+            room = None
+            self.target_room_id = None
+            if state.rooms:
+                # Nearest unvisited room of this building, from the room index
+                room = self._nearest_reachable_room(state, pz)
+                if room is None:
+                    room = state.rooms.nearest_room(px, py, pz, exclude_names=state.memory.visited_rooms,
+                                                    exclude=self.failed_rooms, building=self.building)
+            if room is None:
+                # Visible tiles in unvisited rooms, minus failed targets
+                candidates = tiles.visible & (tiles.room_id != NO_ID)
+                candidates &= ~tiles.in_rooms(state.memory.visited_rooms)
+                if self.failed_targets:
+                    candidates &= ~tiles.at(self.failed_targets)
+                best = self._nearest_reachable_tile(state, candidates, pz)
+                if best < 0:
+                    best = tiles.closest(candidates, px, py)
+
+            if room is not None:
+                self.nav_target = state.rooms.anchor(room.id)
+                self.target_room = room.name
+                self.target_room_id = room.id
+                self.last_dist = math.dist(self.nav_target, (px, py))
+                logger.info(f"[SearchPlan] Targeting new room: {room.name} at {self.nav_target[0]},{self.nav_target[1]}")
+            elif best >= 0:
+                bx, by = int(tiles.x[best]), int(tiles.y[best])
+                self.nav_target = (bx, by)
+                self.target_room = tiles.room(best)
+                self.last_dist = math.dist((bx, by), (px, py))
+                logger.info(f"[SearchPlan] Targeting new room: {self.target_room} at {bx},{by}")
             else:
                 # Check Stairs
                 stairs_target = None
@@ -1,6 +1,7 @@
 from bot_runtime.strategy.base import Strategy
 from bot_runtime.brain.state import BrainState, SituationMode
 from bot_runtime.control.action_queue import ActionQueue
+import math
 import logging
 from bot_runtime.planning.planner import ActionPlanner
 from bot_runtime.planning.plans.loot_plan import LootPlan
@@ -67,7 +68,7 @@ class LootStrategy(Strategy):
         best_score = 0.0
         
         all_items = []
-        if state.vision.world_items: all_items.extend(state.vision.world_items)
+        if state.vision.world_items: all_items.extend(i.dict() for i in state.vision.world_items)
         if state.vision and state.vision.nearby_containers:
             for c in state.vision.nearby_containers:
                 if c.items:
@@ -79,6 +80,7 @@ class LootStrategy(Strategy):
                         item_data['y'] = c.y
                         all_items.append(item_data)
                         
+        candidates = []
         for item in all_items:
             # Memory Filter
             if str(item.get('id')) in state.memory.failed_loot_items:
@@ -93,10 +95,17 @@ class LootStrategy(Strategy):
                 continue
 
             s = self.score_item(item, state)
-            if s > best_score:
-                best_score = s
-                best_item = item
-                
+            if s > 20.0:
+                candidates.append((s, item))
+
+        # Rank worthwhile items: reachable first, then score, then path distance (one Dijkstra for all)
+        dists = [0.0] * len(candidates)
+        if state.reach is not None:
+            dists = state.reach.distances([(i.get('x', 0), i.get('y', 0), i.get('z', 0)) for _, i in candidates])
+        if candidates:
+            k = max(range(len(candidates)), key=lambda k: (dists[k] < math.inf, candidates[k][0], -dists[k]))
+            best_score, best_item = candidates[k]
+
         if best_item and best_score > 20.0:
             logger.info(f"[LOOT_STRAT] Found High Value Item: {best_item.get('name')} (Score: {best_score})")
             target_id = best_item.get('id')
@@ -124,7 +133,7 @@ class LootStrategy(Strategy):
         # If Idle?
         if planner.is_idle():
              # If inside (heuristic: see walls/rooms)
-             if state.vision.tiles and any(t.room for t in state.vision.tiles):
+             if state.vision.tiles and state.vision.tile_block.has_rooms():
                  logger.info("[LOOT_STRAT] Inside building. Starting Search.")
                  px, py = int(state.player.position.x), int(state.player.position.y)
                  planner.set_goal(SearchBuildingPlan(px, py, mode="LOOT_AS_YOU_GO"))
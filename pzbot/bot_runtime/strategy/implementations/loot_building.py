@@ -1,9 +1,12 @@
+import numpy as np
+
 from bot_runtime.strategy.base import Strategy
 from bot_runtime.brain.state import BrainState, SituationMode
 from bot_runtime.control.action_queue import ActionQueue
 from bot_runtime.planning.planner import ActionPlanner
 from bot_runtime.planning.plans.search_building_plan import SearchBuildingPlan
 from bot_runtime.planning.base import PlanStatus
+from bot_runtime.ingest.tiles import NO_ID
 
 import logging
 logger = logging.getLogger(__name__)
@@ -75,14 +78,12 @@ class LootBuildingStrategy(Strategy):
 
 
         if state.vision and state.vision.tiles:
+            tiles = state.vision.tile_block
+            is_inside = tiles.room_at(px, py, int(state.player.position.z)) is not None
+
             # Debug: Scan 3x3 around player to see if ANY have room
-            found_rooms = []
-            for t in state.vision.tiles:
-                if abs(t.x - px) <= 1 and abs(t.y - py) <= 1:
-                     if hasattr(t, 'room') and t.room:
-                         found_rooms.append(f"{t.x},{t.y}:{t.room}")
-                         if t.x == px and t.y == py:
-                             is_inside = True
+            rows = np.flatnonzero(tiles.near(px, py, 1) & (tiles.room_id != NO_ID))
+            found_rooms = [f"{tiles.x[i]},{tiles.y[i]}:{tiles.room(i)}" for i in rows]
             
             if found_rooms:
                 logger.debug(f"[LootBuilding] Player at {px},{py}. Nearby Rooms: {found_rooms}")
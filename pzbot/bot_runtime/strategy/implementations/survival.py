@@ -1,6 +1,6 @@
 from bot_runtime.strategy.base import Strategy
 from bot_runtime.brain.state import BrainState, SituationMode
-from bot_runtime.control.action_queue import ActionQueue
+from bot_runtime.control.action_queue import ActionQueue, ActionType
 
 class SurvivalStrategy(Strategy):
     """
@@ -21,21 +21,23 @@ class SurvivalStrategy(Strategy):
         driver = state.situation.primary_driver
         
         if driver == "High Threat":
-            # NAIVE FLEE implementation
-            # Determine direction away from center of mass of threats?
-            # For now, just Run away from nearest threat vector.
-            # Ideally we use NavigationAnalyzer's 'nearest_exit' or calculated vector.
-            
-            # Placeholder: Just log intent for now
-            # queue.add("Say", text="I need to run!")
-            
-            # Simple Flee: If nearest threat is close, walk opposite?
-            # Since we don't have 'WalkTo' vector logic fully wired in ActionClient yet,
-            # we will just turn and wait to simulate panic for this step.
-            queue.add("Wait", duration=500)
+            # Flee: climb the distance-from-danger field a few tiles and walk there
+            target = self._flee_target(state)
+            if target is not None:
+                x, y, z = target
+                queue.add(ActionType.MOVE_TO.value, x=x, y=y, z=z)
+            else:
+                # Cornered (no tile gains distance) or no map yet: hold still
+                queue.add("Wait", duration=500)
             
         elif driver == "Critical Condition":
             # If bleeding, we should bandage.
             # We need an inventory system to check for bandages.
             # For now, just wait.
             queue.add("Wait", duration=1000)
+
+    def _flee_target(self, state: BrainState):
+        if state.flow is None or not state.player or not state.threat.vectors:
+            return None
+        pos = state.player.position
+        return state.flow.flee_target(pos.x, pos.y, int(pos.z), state.threat.vectors)
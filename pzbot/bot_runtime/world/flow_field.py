@@ -0,0 +1,182 @@
+"""
+Flee flow field over the grid window around the player.
+
+Every threat seeds a multi-source distance transform on the window: each tile gets the
+walking distance (8 directions, octile costs) to the nearest threat, spreading through
+walkable and unknown tiles, since zombies do not need us to have seen the ground. Threats
+outside the window seed the border tile nearest to them with their straight-line distance.
+The transform relaxes whole arrays with NumPy, so its cost does not depend on the number of
+threats. Each sweep carries distances one tile further, which settles open ground within a
+window's width of sweeps; winding indoor layouts (a corridor doubling back through the window)
+would need one per tile of the longest path. Past a window's width the relaxed distances seed
+a heap Dijkstra that finishes the job exactly, in time proportional to the tiles.
+
+Fleeing is climbing that field over known walkable tiles: `FleeField.route` steps to the
+neighbour farthest from danger until no neighbour is farther.
+"""
+import heapq
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from bot_runtime.config import settings
+from .hpa import MOVES, Tile
+from .processors.grid_system import GridSystem
+
+def distance_transform(seeds: np.ndarray, passable: np.ndarray,
+                       max_sweeps: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """
+    Multi-source geodesic distances: `seeds` holds each tile's starting distance (inf where
+    there is no source). Distances spread only through `passable` tiles; a blocked tile keeps
+    its seed. After `max_sweeps` relaxations (default: the window's width plus one) without
+    settling, `_finish` completes them. Returns (distances, sweeps).
+    """
+    h, w = seeds.shape
+    dist = seeds.astype(np.float64, copy=True)
+    padded = np.full((h + 2, w + 2), np.inf)
+    blocked = ~passable
+    fixed = dist[blocked]
+    limit = max(h, w) + 1 if max_sweeps is None else max_sweeps
+    sweeps = 0
+    while True:
+        if sweeps == limit:
+            return _finish(dist, passable), sweeps
+        sweeps += 1
+        padded[1:-1, 1:-1] = dist
+        best = dist.copy()
+        for dx, dy, cost in MOVES:
+            np.minimum(best, padded[1 + dy:h + 1 + dy, 1 + dx:w + 1 + dx] + cost, out=best)
+        best[blocked] = fixed
+        if np.array_equal(best, dist):
+            return dist, sweeps
+        dist = best
+
+def _finish(dist: np.ndarray, passable: np.ndarray) -> np.ndarray:
+    """Heap Dijkstra from every finite tile of `dist` (upper bounds, true at the sources)."""
+    h, w = dist.shape
+    stride = w + 2
+    # Padded with a blocked ring: no bounds checks
+    ok = np.zeros((h + 2, stride), dtype=bool)
+    ok[1:-1, 1:-1] = passable
+    d = np.full((h + 2, stride), np.inf)
+    d[1:-1, 1:-1] = dist
+    ok, d = ok.ravel().tolist(), d.ravel().tolist()
+    steps = [(dy * stride + dx, cost) for dx, dy, cost in MOVES]
+    heap = [(v, i) for i, v in enumerate(d) if v < math.inf]
+    heapq.heapify(heap)
+    while heap:
+        v, i = heapq.heappop(heap)
+        if v > d[i]:
+            continue
+        for off, cost in steps:
+            j = i + off
+            if ok[j] and v + cost < d[j]:
+                d[j] = v + cost
+                heapq.heappush(heap, (v + cost, j))
+    return np.array(d).reshape(h + 2, stride)[1:-1, 1:-1]
+
+class FleeField:
+    """Distance from danger on the window [x0, x0 + w) x [y0, y0 + h) of floor `z`."""
+    __slots__ = ('x0', 'y0', 'z', 'dist', 'walkable')
+
+    def __init__(self, x0: int, y0: int, z: int, dist: np.ndarray, walkable: np.ndarray):
+        self.x0 = x0
+        self.y0 = y0
+        self.z = z
+        self.dist = dist
+        self.walkable = walkable # Known and walkable: where we can flee to
+
+    def _inside(self, ix: int, iy: int) -> bool:
+        h, w = self.dist.shape
+        return 0 <= ix < w and 0 <= iy < h
+
+    def danger_distance(self, x: int, y: int) -> float:
+        """Walking distance from (x, y) to the nearest threat; inf when none can reach it."""
+        ix, iy = x - self.x0, y - self.y0
+        return float(self.dist[iy, ix]) if self._inside(ix, iy) else math.inf
+
+    def step(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """The walkable neighbour farthest from danger, if it is farther than (x, y)."""
+        ix, iy = x - self.x0, y - self.y0
+        if not self._inside(ix, iy):
+            return None
+        best, here = None, self.dist[iy, ix]
+        for dx, dy, _ in MOVES:
+            nx, ny = ix + dx, iy + dy
+            if not self._inside(nx, ny) or not self.walkable[ny, nx]:
+                continue
+            if dx and dy and not (self.walkable[iy, nx] and self.walkable[ny, ix]):
+                continue # No corner cutting
+            if self.dist[ny, nx] > here:
+                best, here = (nx, ny), self.dist[ny, nx]
+        return None if best is None else (best[0] + self.x0, best[1] + self.y0)
+
+    def route(self, x: int, y: int, steps: int) -> List[Tile]:
+        """Up to `steps` tiles climbing the field from (x, y), not including it."""
+        tiles = []
+        for _ in range(steps):
+            nxt = self.step(x, y)
+            if nxt is None:
+                break
+            x, y = nxt
+            tiles.append((x, y, self.z))
+        return tiles
+
+class FlowFieldService:
+    """
+    Builds `FleeField`s on a `2 * radius + 1` window centred on the player. The last field
+    is reused while the grid, the window and the threat tiles stay the same.
+    """
+    def __init__(self, grid: GridSystem, radius: Optional[int] = None):
+        self.grid = grid
+        self.radius = settings.FLEE_RADIUS if radius is None else radius
+        self._key = None
+        self._field: Optional[FleeField] = None
+
+        self.builds = 0
+        self.last_ms = 0.0
+        self.last_sweeps = 0
+
+    def flee_field(self, x: float, y: float, z: int, threats: Iterable[Any]) -> Optional[FleeField]:
+        """Field around (x, y, z) for threats with `x`/`y` (e.g. `ThreatVector`s); None without threats."""
+        px, py, z = int(math.floor(x)), int(math.floor(y)), int(z)
+        pos = np.array([(t.x, t.y) for t in threats], dtype=np.float64).reshape(-1, 2)
+        if not len(pos):
+            return None
+        r = self.radius
+        x0, y0 = px - r, py - r
+        key = (self.grid.version, x0, y0, z, np.floor(pos).astype(np.int64).tobytes())
+        if key == self._key:
+            return self._field
+
+        t0 = time.perf_counter()
+        win = self.grid.window(x0, y0, px + r, py + r, z)
+        h, w = win.shape
+        # Threats outside the window seed their nearest border tile, already that far away
+        ix = np.floor(pos[:, 0]).astype(np.int64) - x0
+        iy = np.floor(pos[:, 1]).astype(np.int64) - y0
+        cx, cy = np.clip(ix, 0, w - 1), np.clip(iy, 0, h - 1)
+        seeds = np.full((h, w), np.inf)
+        np.minimum.at(seeds, (cy, cx), np.hypot(ix - cx, iy - cy))
+        dist, sweeps = distance_transform(seeds, win.walkable | ~win.known)
+
+        self._field = FleeField(x0, y0, z, dist, win.known & win.walkable)
+        self._key = key
+        self.builds += 1
+        self.last_sweeps = sweeps
+        self.last_ms = (time.perf_counter() - t0) * 1000.0
+        return self._field
+
+    def flee_target(self, x: float, y: float, z: int, threats: Iterable[Any],
+                    steps: Optional[int] = None) -> Optional[Tile]:
+        """Where `steps` tiles of fleeing from (x, y, z) end; None if no step gains distance."""
+        field = self.flee_field(x, y, z, threats)
+        if field is None:
+            return None
+        route = field.route(int(math.floor(x)), int(math.floor(y)), settings.FLEE_STEPS if steps is None else steps)
+        return route[-1] if route else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"builds": self.builds, "last_ms": round(self.last_ms, 2), "last_sweeps": self.last_sweeps}
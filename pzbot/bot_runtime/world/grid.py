@@ -1,7 +1,7 @@
 import time
 import json
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 from dataclasses import dataclass, asdict
 from bot_runtime.ingest.state import Tile as StateTile
 
@@ -35,30 +35,32 @@ class SpatialGrid:
     def update(self, vision_tiles: List[StateTile]):
         """
         Merges new vision data into the persistent grid.
-        Assumes all tiles in 'vision_tiles' are walkable.
+        Tiles without a walkable flag (`w`) are taken as walkable.
         """
         now = time.time()
         new_tiles_count = 0
         
         for vt in vision_tiles:
             key = (vt.x, vt.y, vt.z)
+            walkable = getattr(vt, 'w', True)
+            room, layer = getattr(vt, 'room', None), getattr(vt, 'layer', None)
             if key in self._grid:
                 tile = self._grid[key]
                 tile.last_seen = now
-                tile.is_walkable = True
-                if vt.room:
-                    tile.room = vt.room
-                if vt.layer:
-                    tile.layer = vt.layer
+                tile.is_walkable = walkable
+                if room:
+                    tile.room = room
+                if layer:
+                    tile.layer = layer
             else:
                 self._grid[key] = GridTile(
                     x=vt.x,
                     y=vt.y,
                     z=vt.z,
-                    is_walkable=True,
+                    is_walkable=walkable,
                     last_seen=now,
-                    room=vt.room,
-                    layer=vt.layer
+                    room=room,
+                    layer=layer
                 )
                 self._update_bounds(vt.x, vt.y)
                 new_tiles_count += 1
@@ -0,0 +1,400 @@
+"""
+Hierarchical pathfinding (HPA*) over `GridSystem` chunks.
+
+The abstract graph has one node per entrance tile: wherever a run of walkable tiles
+crosses the border between two loaded chunks of a floor, a transition is placed in the
+middle of the run (and at both ends of long runs). Nodes of the same chunk are linked by
+their intra-chunk distance, nodes facing each other across a border by one step.
+
+Everything is derived lazily and cached per chunk against `GridSystem.chunk_version`:
+a chunk's walkability, its distance tables (one Dijkstra over the chunk's 100 tiles per
+source node) and the entrances on its borders are rebuilt only after its tiles changed.
+A search runs A* over the entrance nodes, then refines the abstract path into single
+steps for the first `refine` tiles only; the rest is returned as waypoints and refined
+by a later query as the player gets there. The heuristic is weighted by
+`NAV_HEURISTIC_WEIGHT`: a path a few percent longer for far fewer expansions.
+
+Moves are 8-connected (diagonal cost sqrt 2) without cutting corners. Only known walkable
+tiles of loaded chunks are passable, and paths stay on the start floor.
+"""
+import heapq
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from bot_runtime.config import settings
+from .processors.grid_chunk import CHUNK_SIZE
+from .processors.grid_system import GridSystem
+
+SQRT2 = math.sqrt(2)
+INF = float('inf')
+SPLIT_RUN = 6 # Entrance runs at least this long get a transition at each end too
+MAX_CHUNKS = 4096 # Chunks whose tables are kept (least recently searched dropped first)
+
+Tile = Tuple[int, int, int]
+ChunkKey = Tuple[int, int, int]
+Edge = Tuple[int, float, int, int] # (node id, cost, x, y)
+
+_OFFSET = 1 << 20 # Node ids pack (x, y) of one floor into an int: cheaper to hash than a tuple
+_STRIDE = 1 << 21
+
+def node_id(x: int, y: int) -> int:
+    return (x + _OFFSET) * _STRIDE + (y + _OFFSET)
+
+# (dx, dy, cost) of the 8 moves, shared by the grid searches (reach, replan, flow_field)
+MOVES = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+         (1, 1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2), (-1, -1, SQRT2))
+
+def octile(ax: int, ay: int, bx: int, by: int) -> float:
+    dx, dy = abs(ax - bx), abs(ay - by)
+    return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
+
+class NavPath(NamedTuple):
+    tiles: List[Tile] # Step by step from the start (the refined part)
+    waypoints: List[Tile] # Entrance nodes from the end of `tiles` on, ending at the goal
+    cost: float # Of the whole path
+    expanded: int # Abstract nodes expanded
+    nodes: Tuple[Tile, ...] = () # Abstract path: start, entrances, goal
+    costs: Tuple[float, ...] = () # Path cost from the start to each of `nodes`
+
+    @property
+    def complete(self) -> bool:
+        """True if `tiles` reaches the goal."""
+        return not self.waypoints
+
+class ChunkNav:
+    """Walkability of one chunk floor, its move graph and intra-chunk distance tables."""
+    __slots__ = ('key', 'version', 'open', 'neighbors', 'dist')
+
+    def __init__(self, key: ChunkKey, version: int, passable: np.ndarray):
+        self.key = key
+        self.version = version
+        self.open = passable # [ly, lx] bool
+        self.dist: Dict[int, List[float]] = {} # Source cell -> distance to every cell
+        flat = passable.ravel().tolist()
+        n = CHUNK_SIZE
+        neighbors: List[List[Tuple[int, float]]] = [[] for _ in range(n * n)]
+        for i, ok in enumerate(flat):
+            if not ok:
+                continue
+            ly, lx = divmod(i, n)
+            out = neighbors[i]
+            for dx, dy, cost in MOVES:
+                x, y = lx + dx, ly + dy
+                if not (0 <= x < n and 0 <= y < n) or not flat[y * n + x]:
+                    continue
+                if dx and dy and not (flat[ly * n + x] and flat[y * n + lx]):
+                    continue # No corner cutting
+                out.append((y * n + x, cost))
+        self.neighbors = neighbors
+
+    def passable(self, lx: int, ly: int) -> bool:
+        return bool(self.open[ly, lx])
+
+    def distances(self, cell: int) -> List[float]:
+        """Dijkstra from `cell` over this chunk only (cached until the chunk changes)."""
+        d = self.dist.get(cell)
+        if d is not None:
+            return d
+        d = [INF] * (CHUNK_SIZE * CHUNK_SIZE)
+        d[cell] = 0.0
+        heap = [(0.0, cell)]
+        neighbors = self.neighbors
+        while heap:
+            g, i = heapq.heappop(heap)
+            if g > d[i]:
+                continue
+            for j, cost in neighbors[i]:
+                ng = g + cost
+                if ng < d[j]:
+                    d[j] = ng
+                    heapq.heappush(heap, (ng, j))
+        self.dist[cell] = d
+        return d
+
+    def steps(self, src: int, dst: int) -> List[int]:
+        """Cells after `src` up to `dst`, walking back down `src`'s distance table."""
+        d = self.distances(src)
+        if d[dst] == INF:
+            return []
+        out = [dst]
+        j = dst
+        while j != src:
+            for i, cost in self.neighbors[j]:
+                if abs(d[i] + cost - d[j]) < 1e-9:
+                    j = i
+                    break
+            else:
+                return [] # Unreachable with a consistent table
+            out.append(j)
+        out.pop()
+        return out[::-1]
+
+class HierarchicalPathfinder:
+    """
+    HPA* over the loaded chunks of a `GridSystem`. `find_path` has the start/end signature
+    of the legacy `world.nav.Pathfinder`, but returns a `NavPath`.
+    """
+    def __init__(self, grid: GridSystem, max_nodes: Optional[int] = None, refine: Optional[int] = None,
+                 weight: Optional[float] = None):
+        self.grid = grid
+        self.max_nodes = settings.NAV_MAX_NODES if max_nodes is None else max_nodes
+        self.refine = settings.NAV_REFINE_TILES if refine is None else refine
+        self.weight = settings.NAV_HEURISTIC_WEIGHT if weight is None else weight
+        self._chunks: 'OrderedDict[ChunkKey, ChunkNav]' = OrderedDict()
+        self._borders: Dict[Tuple[ChunkKey, int], Tuple[Tuple[int, int], List[Tuple[Tile, Tile]]]] = {}
+        self._links: Dict[ChunkKey, Tuple[tuple, Dict[Tile, List[Tile]]]] = {}
+
+        self.queries = 0
+        self.found = 0
+        self.expanded = 0
+        self.chunk_builds = 0
+        self.last_ms = 0.0
+
+    # --- Per-chunk caches ---
+
+    def chunk(self, key: ChunkKey, memo: Optional[Dict[ChunkKey, Optional[ChunkNav]]] = None) -> Optional[ChunkNav]:
+        """The chunk's `ChunkNav`, rebuilt if its tiles changed; None if it is not loaded."""
+        if memo is not None and key in memo:
+            return memo[key]
+        version = self.grid.chunk_version(key)
+        nav = self._chunks.get(key)
+        if version is None:
+            if nav is not None:
+                self._drop(key)
+            nav = None
+        elif nav is None or nav.version != version:
+            bx, by = key[0] * CHUNK_SIZE, key[1] * CHUNK_SIZE
+            win = self.grid.window(bx, by, bx + CHUNK_SIZE - 1, by + CHUNK_SIZE - 1, key[2])
+            nav = self._chunks[key] = ChunkNav(key, version, win.known & win.walkable)
+            self._chunks.move_to_end(key)
+            self.chunk_builds += 1
+            while len(self._chunks) > MAX_CHUNKS:
+                self._drop(next(iter(self._chunks)))
+        else:
+            self._chunks.move_to_end(key)
+        if memo is not None:
+            memo[key] = nav
+        return nav
+
+    def _drop(self, key: ChunkKey):
+        self._chunks.pop(key, None)
+        self._links.pop(key, None)
+        self._borders.pop((key, 0), None)
+        self._borders.pop((key, 1), None)
+
+    def _border(self, a: ChunkKey, axis: int, memo) -> List[Tuple[Tile, Tile]]:
+        """
+        Transitions (tile in a, tile in its neighbor) across a's east (axis 0) or
+        south (axis 1) border.
+        """
+        b = (a[0] + 1, a[1], a[2]) if axis == 0 else (a[0], a[1] + 1, a[2])
+        ca, cb = self.chunk(a, memo), self.chunk(b, memo)
+        if ca is None or cb is None:
+            return []
+        sig = (ca.version, cb.version)
+        cached = self._borders.get((a, axis))
+        if cached is not None and cached[0] == sig:
+            return cached[1]
+
+        n, z = CHUNK_SIZE, a[2]
+        bx, by = a[0] * n, a[1] * n
+        if axis == 0:
+            both = ca.open[:, n - 1] & cb.open[:, 0]
+        else:
+            both = ca.open[n - 1, :] & cb.open[0, :]
+        pairs: List[Tuple[Tile, Tile]] = []
+        i = 0
+        flags = both.tolist()
+        while i < n:
+            if not flags[i]:
+                i += 1
+                continue
+            j = i
+            while j + 1 < n and flags[j + 1]:
+                j += 1
+            picks = (i, (i + j) // 2, j) if j - i + 1 >= SPLIT_RUN else ((i + j) // 2,)
+            for k in picks:
+                if axis == 0:
+                    pairs.append(((bx + n - 1, by + k, z), (bx + n, by + k, z)))
+                else:
+                    pairs.append(((bx + k, by + n - 1, z), (bx + k, by + n, z)))
+            i = j + 1
+        self._borders[(a, axis)] = (sig, pairs)
+        return pairs
+
+    def links(self, key: ChunkKey, memo=None) -> Dict[Tile, List[Tile]]:
+        """Entrance tiles of the chunk -> the tiles they step to in neighboring chunks."""
+        return self._entry(key, {} if memo is None else memo)[1]
+
+    def graph(self, key: ChunkKey, memo=None) -> Dict[int, List[Edge]]:
+        """
+        Entrance node ids of the chunk -> edges to the entrances reachable inside the chunk
+        and to the tiles one step across its borders.
+        """
+        return self._entry(key, {} if memo is None else memo)[2]
+
+    def _entry(self, key: ChunkKey, memo) -> tuple:
+        cx, cy, z = key
+        around = [key, (cx - 1, cy, z), (cx, cy - 1, z), (cx + 1, cy, z), (cx, cy + 1, z)]
+        navs = [self.chunk(k, memo) for k in around]
+        sig = tuple(None if c is None else c.version for c in navs)
+        cached = self._links.get(key)
+        if cached is not None and cached[0] == sig:
+            return cached
+        out: Dict[Tile, List[Tile]] = {}
+        for mine, theirs in self._border(key, 0, memo) + self._border(key, 1, memo):
+            out.setdefault(mine, []).append(theirs)
+        for theirs, mine in self._border(around[1], 0, memo) + self._border(around[2], 1, memo):
+            out.setdefault(mine, []).append(theirs)
+
+        c, n = navs[0], CHUNK_SIZE
+        cells = {t: (t[1] % n) * n + (t[0] % n) for t in out}
+        graph: Dict[int, List[Edge]] = {}
+        for node, across in out.items():
+            d = c.distances(cells[node])
+            edges = [(node_id(o[0], o[1]), d[i], o[0], o[1]) for o, i in cells.items() if o != node and d[i] != INF]
+            edges.extend((node_id(o[0], o[1]), 1.0, o[0], o[1]) for o in across)
+            graph[node_id(node[0], node[1])] = edges
+        entry = self._links[key] = (sig, out, graph)
+        return entry
+
+    # --- Search ---
+
+    def find_path(self, start: Tile, end: Tile, refine: Optional[int] = None) -> Optional[NavPath]:
+        """
+        Path from `start` to `end` (x, y, z), or None if there is none through loaded
+        chunks or the search bound was hit. The first `refine` tiles (default
+        `NAV_REFINE_TILES`, 0 = all) come step by step.
+        """
+        t0 = time.perf_counter()
+        self.queries += 1
+        path = self._search(tuple(int(v) for v in start), tuple(int(v) for v in end),
+                            self.refine if refine is None else refine)
+        self.last_ms = (time.perf_counter() - t0) * 1000.0
+        if path is not None:
+            self.found += 1
+        return path
+
+    def _search(self, start: Tile, end: Tile, refine: int) -> Optional[NavPath]:
+        if start[2] != end[2]:
+            return None
+        n = CHUNK_SIZE
+        memo: Dict[ChunkKey, Optional[ChunkNav]] = {}
+        sk = (start[0] // n, start[1] // n, start[2])
+        ek = (end[0] // n, end[1] // n, end[2])
+        sc, ec = self.chunk(sk, memo), self.chunk(ek, memo)
+        if sc is None or ec is None:
+            return None
+        if not sc.passable(start[0] - sk[0] * n, start[1] - sk[1] * n) or \
+           not ec.passable(end[0] - ek[0] * n, end[1] - ek[1] * n):
+            return None
+        if start == end:
+            return NavPath([start], [], 0.0, 0, (start,), (0.0,))
+
+        def cell(t: Tile) -> int:
+            return (t[1] % n) * n + (t[0] % n)
+
+        z = start[2]
+        end_cell = cell(end)
+        end_dist = ec.distances(end_cell) # Symmetric moves: node -> end within the end chunk
+        ex, ey = end[0], end[1]
+        start_id, end_id = node_id(start[0], start[1]), node_id(ex, ey)
+        g = {start_id: 0.0}
+        came: Dict[int, Tuple[int, int, int]] = {} # id -> (parent id, x, y)
+        w = self.weight
+        heap = [(octile(start[0], start[1], ex, ey) * w, -0.0, start_id, start[0], start[1])]
+        # Ties on f go to the deeper node (larger g): open ground is not explored breadth-first
+        graphs: Dict[Tuple[int, int], Dict[int, List[Edge]]] = {} # This query's view
+        expanded = 0
+        found = False
+        while heap:
+            _, g0, node, x, y = heapq.heappop(heap)
+            g0 = -g0
+            if g0 > g[node]:
+                continue
+            if node == end_id:
+                found = True
+                break
+            expanded += 1
+            if expanded > self.max_nodes:
+                break
+            ck = (x // n, y // n)
+            graph = graphs.get(ck)
+            if graph is None:
+                graph = graphs[ck] = self.graph(ck + (z,), memo)
+            edges = graph.get(node)
+            here = (y % n) * n + (x % n)
+            in_end = ck == ek[:2]
+            if edges is None: # The start tile, when it is not an entrance
+                d = sc.distances(here)
+                edges = [(o, d[(oy % n) * n + (ox % n)], ox, oy) for o, _, ox, oy in
+                         ((o, 0, o // _STRIDE - _OFFSET, o % _STRIDE - _OFFSET) for o in graph)
+                         if d[(oy % n) * n + (ox % n)] != INF]
+                if in_end and d[end_cell] != INF:
+                    edges.append((end_id, d[end_cell], ex, ey))
+            elif in_end and end_dist[here] != INF:
+                edges = edges + [(end_id, end_dist[here], ex, ey)]
+            for other, cost, ox, oy in edges:
+                ng = g0 + cost
+                if ng < g.get(other, INF):
+                    g[other] = ng
+                    came[other] = (node, x, y)
+                    dx, dy = abs(ox - ex), abs(oy - ey)
+                    h = dx + (SQRT2 - 1) * dy if dx > dy else dy + (SQRT2 - 1) * dx
+                    heapq.heappush(heap, (ng + h * w, -ng, other, ox, oy))
+        self.expanded += expanded
+        if not found:
+            return None
+
+        nodes, costs = [end], [g[end_id]]
+        at = end_id
+        while at in came:
+            at, px, py = came[at]
+            nodes.append((px, py, z))
+            costs.append(g[at])
+        nodes.reverse()
+        costs.reverse()
+        return self.refine_nodes(nodes, costs, refine, expanded, memo)
+
+    def refine_nodes(self, nodes: List[Tile], costs: List[float], refine: Optional[int] = None,
+                     expanded: int = 0, memo=None) -> Optional[NavPath]:
+        """
+        The `NavPath` of an abstract path (consecutive nodes in one chunk or one step apart
+        across a border), its first `refine` tiles refined to single steps; None if a chunk
+        it has to refine through is no longer loaded.
+        """
+        n = CHUNK_SIZE
+        refine = self.refine if refine is None else refine
+        memo = {} if memo is None else memo
+        tiles = [nodes[0]]
+        i = 0
+        while i + 1 < len(nodes) and (refine <= 0 or len(tiles) < refine):
+            a, b = nodes[i], nodes[i + 1]
+            ka, kb = (a[0] // n, a[1] // n, a[2]), (b[0] // n, b[1] // n, b[2])
+            if ka != kb:
+                tiles.append(b) # One step across the border
+            else:
+                c = self.chunk(ka, memo)
+                if c is None:
+                    return None
+                bx, by = ka[0] * n, ka[1] * n
+                src = (a[1] - by) * n + (a[0] - bx)
+                dst = (b[1] - by) * n + (b[0] - bx)
+                tiles.extend((bx + j % n, by + j // n, a[2]) for j in c.steps(src, dst))
+            i += 1
+        return NavPath(tiles, list(nodes[i + 1:]), costs[-1], expanded, tuple(nodes), tuple(costs))
+
+    def invalidate(self):
+        """Drops every cached chunk (they are rebuilt on demand)."""
+        self._chunks.clear()
+        self._borders.clear()
+        self._links.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        return {"queries": self.queries, "found": self.found, "expanded": self.expanded,
+                "chunks": len(self._chunks), "chunk_builds": self.chunk_builds,
+                "last_ms": round(self.last_ms, 3)}
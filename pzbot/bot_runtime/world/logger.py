@@ -55,5 +55,16 @@ class WorldLogger:
         if hasattr(self.world, 'grid'):
             stats = self.world.grid.get_stats()
             status += f" | Mapped: {stats['total_tiles']}"
+            cache = stats.get('cache')
+            if cache:
+                status += f" | Chunks: {cache['chunks']} ({cache['hit_rate']:.0%} hits, {cache['evictions']} evicted)"
+            prefetch = stats.get('prefetch')
+            if prefetch and (prefetch['hits'] or prefetch['misses']):
+                status += f" | Prefetch: {prefetch['hit_rate']:.0%} hits"
+
+        paths = getattr(self.world, 'paths', None)
+        if paths is not None and paths.lookups:
+            p = paths.get_stats()
+            status += f" | Paths: {p['hit_rate']:.0%} cached ({p['saved_ms']:.0f} ms saved)"
 
         logger.debug(status)
@@ -4,7 +4,13 @@ from typing import Optional
 from bot_runtime.ingest.state import GameState, Player, Vision
 from bot_runtime.world.processors.player_system import PlayerSystem
 from bot_runtime.world.processors.memory_system import MemorySystem
-from bot_runtime.world.processors.grid_system import GridSystem
+from bot_runtime.world.processors.grid_system import GridSystem, frame_block
+from bot_runtime.world.processors.room_index import RoomIndex
+from bot_runtime.world.hpa import HierarchicalPathfinder
+from bot_runtime.world.path_cache import PathCache
+from bot_runtime.world.flow_field import FlowFieldService
+from bot_runtime.world.reach import ReachService
+from bot_runtime.world.replan import ReplanService
 from bot_runtime.config import BASE_DIR
 from bot_runtime.world.view import WorldView, EntityType
 from .types import EntityData
@@ -25,6 +31,12 @@ class WorldModel(WorldView):
         self.player_system = PlayerSystem()
         self.memory = MemorySystem()
         self.grid = GridSystem(BASE_DIR)
+        self.rooms = RoomIndex()
+        self.nav = HierarchicalPathfinder(self.grid)
+        self.paths = PathCache(self.nav) # Use this one: repeated queries are served from the cache
+        self.flow = FlowFieldService(self.grid)
+        self.reach = ReachService(self.grid)
+        self.routes = ReplanService(self.grid, paths=self.paths)
 
     def update(self, new_state: GameState):
         """Updates the world model with a new game state."""
@@ -34,7 +46,7 @@ class WorldModel(WorldView):
         
         # 1. Update Player
         if new_state.player:
-            self.player_system.update(new_state.player)
+            self.player_system.update(new_state.player, new_state.timestamp)
 
             # 2. Update Memory & Grid from Vision
             if new_state.player.vision:
@@ -46,6 +58,13 @@ class WorldModel(WorldView):
                 # Update Grid (Chunks)
                 if vision.tiles:
                     self.grid.update(vision.tiles, new_state.timestamp)
+                    # Rooms & Buildings (only tiles not indexed before do any work)
+                    self.rooms.update(frame_block(vision.tiles))
+        
+            # Warm saved chunks ahead of the player, off the tick path
+            pos = new_state.player.position
+            vx, vy = self.player_system.get_velocity()
+            self.grid.prefetch(pos.x, pos.y, vx, vy, z=int(pos.z))
         
         # 3. Decay / Maintenance
         self.memory.decay()
@@ -1,24 +1,54 @@
 
 import heapq
 import math
-from typing import List, Tuple, Optional, Set
+from typing import Callable, List, Tuple, Optional, Set
 from .grid import SpatialGrid
 
+SQRT2 = math.sqrt(2)
+MODES = ("auto", "astar", "jps")
+
+# Directions to try from the start of a JPS search
+ALL_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+def _sign(v: int) -> int:
+    return (v > 0) - (v < 0)
+
 class Pathfinder:
     """
     Implements A* pathfinding on the SpatialGrid.
+
+    `mode` picks the search: "astar", "jps" (Jump Point Search) or "auto", which uses JPS
+    unless a `tile_cost` is given. JPS needs every step to cost its length, so it only runs
+    on unweighted grids; there it returns paths of the same length as A* while expanding
+    only jump points. `expanded` holds the node expansions of the last query.
     """
-    def __init__(self, grid: SpatialGrid):
+    def __init__(self, grid: SpatialGrid, mode: str = "auto",
+                 tile_cost: Optional[Callable[[int, int, int], float]] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown pathfinding mode {mode!r}, expected one of {MODES}")
+        if mode == "jps" and tile_cost is not None:
+            raise ValueError("Jump Point Search needs uniform costs: drop tile_cost or use mode='astar'")
         self.grid = grid
+        self.mode = mode
+        self.tile_cost = tile_cost # Step cost multiplier of entering (x, y, z)
+        self.expanded = 0
+
+    @property
+    def uses_jps(self) -> bool:
+        return self.mode == "jps" or (self.mode == "auto" and self.tile_cost is None)
 
     def find_path(self, start: Tuple[int, int, int], end: Tuple[int, int, int]) -> Optional[List[Tuple[int, int, int]]]:
         """
-        Calculates a path from start to end using A*.
+        Calculates a path from start to end using A* (or JPS, see `mode`).
         Returns a list of coordinates including start and end, or None if no path found.
         """
+        self.expanded = 0
         # Trivial case
         if start == end:
             return [start]
+
+        if self.uses_jps:
+            return self._find_path_jps(start, end)
             
         # If target isn't walkable, we can't search (basic check)
         # Note: In partial exploration, we might want to path to the 'nearest known' tile,
@@ -41,7 +71,10 @@ class Pathfinder:
             if current == end:
                 return self._reconstruct_path(came_from, current)
 
+            if current in visited:
+                continue # Stale entry, a shorter route was expanded already
             visited.add(current)
+            self.expanded += 1
 
             # Get neighbors via Grid
             neighbors = self.grid.get_neighbors(*current)
@@ -54,6 +87,8 @@ class Pathfinder:
                 # Calculate tentative G Score
                 # Verify diagonal vs cardinal cost
                 dist = math.sqrt((current[0]-neighbor.x)**2 + (current[1]-neighbor.y)**2)
+                if self.tile_cost is not None:
+                    dist *= self.tile_cost(*neighbor_pos)
                 tentative_g_score = g_score[current] + dist
 
                 if neighbor_pos not in g_score or tentative_g_score < g_score[neighbor_pos]:
@@ -75,3 +110,118 @@ class Pathfinder:
             current = came_from[current]
             total_path.append(current)
         return total_path[::-1]
+
+    def _find_path_jps(self, start: Tuple[int, int, int], end: Tuple[int, int, int]) -> Optional[List[Tuple[int, int, int]]]:
+        """
+        Jump Point Search (Harabor & Grastien, 2011) under the same moves as `get_neighbors`:
+        8 directions, a diagonal step needs only its target tile walkable. Straight and
+        diagonal runs are scanned without queueing the tiles along them; the search stops
+        only where a neighbour becomes reachable that a run cannot reach as cheaply (a
+        forced neighbour), so the heap holds few nodes and path lengths match A*.
+        """
+        if start[2] != end[2]:
+            return None # get_neighbors never changes floor
+        z = start[2]
+        goal = (end[0], end[1])
+        walkable = self.grid.is_walkable
+
+        origin = (start[0], start[1])
+        open_set = [(self._octile(origin, goal), 0.0, origin)]
+        came_from = {}
+        g_score = {origin: 0.0}
+        closed: Set[Tuple[int, int]] = set()
+
+        while open_set:
+            _, g, current = heapq.heappop(open_set)
+            if current == goal:
+                return self._expand_jumps(came_from, current, z)
+            if current in closed:
+                continue
+            closed.add(current)
+            self.expanded += 1
+
+            parent = came_from.get(current)
+            for dx, dy in self._directions(current, parent, z, walkable):
+                jump = self._jump(current[0], current[1], dx, dy, z, goal, walkable)
+                if jump is None or jump in closed:
+                    continue
+                ng = g + self._octile(current, jump)
+                if ng < g_score.get(jump, math.inf):
+                    g_score[jump] = ng
+                    came_from[jump] = current
+                    heapq.heappush(open_set, (ng + self._octile(jump, goal), ng, jump))
+        return None
+
+    def _directions(self, node: Tuple[int, int], parent: Optional[Tuple[int, int]], z: int, walkable) -> List[Tuple[int, int]]:
+        """Natural and forced directions out of `node` given the direction it was reached in."""
+        if parent is None:
+            return list(ALL_DIRECTIONS)
+        x, y = node
+        dx, dy = _sign(x - parent[0]), _sign(y - parent[1])
+        if dx and dy:
+            dirs = [(dx, dy), (dx, 0), (0, dy)]
+            if not walkable(x - dx, y, z):
+                dirs.append((-dx, dy))
+            if not walkable(x, y - dy, z):
+                dirs.append((dx, -dy))
+        elif dx:
+            dirs = [(dx, 0)]
+            if not walkable(x, y + 1, z):
+                dirs.append((dx, 1))
+            if not walkable(x, y - 1, z):
+                dirs.append((dx, -1))
+        else:
+            dirs = [(0, dy)]
+            if not walkable(x + 1, y, z):
+                dirs.append((1, dy))
+            if not walkable(x - 1, y, z):
+                dirs.append((-1, dy))
+        return dirs
+
+    def _jump(self, x: int, y: int, dx: int, dy: int, z: int, goal: Tuple[int, int], walkable) -> Optional[Tuple[int, int]]:
+        """Walks from (x, y) in (dx, dy) to the next jump point, or None at a dead end."""
+        while True:
+            x += dx
+            y += dy
+            if not walkable(x, y, z):
+                return None
+            if (x, y) == goal:
+                return (x, y)
+            if dx and dy:
+                if (not walkable(x - dx, y, z) and walkable(x - dx, y + dy, z)) or \
+                   (not walkable(x, y - dy, z) and walkable(x + dx, y - dy, z)):
+                    return (x, y)
+                # A diagonal tile is a jump point when a straight run from it finds one
+                if self._jump(x, y, dx, 0, z, goal, walkable) is not None or \
+                   self._jump(x, y, 0, dy, z, goal, walkable) is not None:
+                    return (x, y)
+            elif dx:
+                if (not walkable(x, y + 1, z) and walkable(x + dx, y + 1, z)) or \
+                   (not walkable(x, y - 1, z) and walkable(x + dx, y - 1, z)):
+                    return (x, y)
+            else:
+                if (not walkable(x + 1, y, z) and walkable(x + 1, y + dy, z)) or \
+                   (not walkable(x - 1, y, z) and walkable(x - 1, y + dy, z)):
+                    return (x, y)
+
+    def _expand_jumps(self, came_from: dict, current: Tuple[int, int], z: int) -> List[Tuple[int, int, int]]:
+        """Fills in the straight or diagonal runs between jump points, one tile per step."""
+        jumps = [current]
+        while current in came_from:
+            current = came_from[current]
+            jumps.append(current)
+        jumps.reverse()
+        path = [(jumps[0][0], jumps[0][1], z)]
+        for (ax, ay), (bx, by) in zip(jumps, jumps[1:]):
+            dx, dy = _sign(bx - ax), _sign(by - ay)
+            x, y = ax, ay
+            while (x, y) != (bx, by):
+                x += dx
+                y += dy
+                path.append((x, y, z))
+        return path
+
+    @staticmethod
+    def _octile(a: Tuple[int, int], b: Tuple[int, int]) -> float:
+        dx, dy = abs(a[0] - b[0]), abs(a[1] - b[1])
+        return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
@@ -0,0 +1,138 @@
+"""
+Path result cache in front of `HierarchicalPathfinder`.
+
+Plans ask for the same targets tick after tick while the player moves a few tiles. An
+entry is keyed by (start chunk, goal tile) and keeps the abstract path (start, entrances,
+goal) with its cumulative costs, so any start tile in the same chunk reuses it: the start
+is joined to the last node of the path still inside its chunk by that chunk's distance
+table, and the rest of the path is kept as is.
+
+Each entry records the chunks its path crosses. Before a lookup the cache reads the chunks
+whose walkability changed since the last lookup (`GridSystem.walkability_changes_since`)
+and drops only the entries crossing one of them. An entry crossing a chunk that has since
+been unloaded is dropped when it is next looked up. Failed searches are not cached.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from bot_runtime.config import settings
+from .hpa import HierarchicalPathfinder, NavPath, Tile, ChunkKey, INF
+from .processors.grid_chunk import CHUNK_SIZE
+
+CacheKey = Tuple[ChunkKey, Tile]
+
+def chunk_of(t: Tile) -> ChunkKey:
+    return (t[0] // CHUNK_SIZE, t[1] // CHUNK_SIZE, t[2])
+
+class _Entry:
+    __slots__ = ('nodes', 'costs', 'chunks', 'search_ms')
+
+    def __init__(self, nodes: Tuple[Tile, ...], costs: Tuple[float, ...], search_ms: float):
+        self.nodes = nodes
+        self.costs = costs
+        self.chunks = {chunk_of(t) for t in nodes} # Paths between nodes stay in their chunks
+        self.search_ms = search_ms
+
+class PathCache:
+    """
+    `find_path` answers like `HierarchicalPathfinder.find_path`, from the cache when it can.
+    At most `max_entries` paths are kept (least recently used dropped first).
+    """
+    def __init__(self, nav: HierarchicalPathfinder, max_entries: Optional[int] = None):
+        self.nav = nav
+        self.max_entries = settings.NAV_PATH_CACHE if max_entries is None else max_entries
+        self._entries: 'OrderedDict[CacheKey, _Entry]' = OrderedDict()
+        self._by_chunk: Dict[ChunkKey, Set[CacheKey]] = {}
+        self._version = nav.grid.version
+
+        self.lookups = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.saved_ms = 0.0 # Search time of the cached paths, minus the time hits took
+
+    def find_path(self, start: Tile, end: Tile, refine: Optional[int] = None) -> Optional[NavPath]:
+        t0 = time.perf_counter()
+        start, end = tuple(int(v) for v in start), tuple(int(v) for v in end)
+        self.lookups += 1
+        self._invalidate()
+        key = (chunk_of(start), end)
+        entry = self._entries.get(key)
+        if entry is not None:
+            path = self._reuse(entry, start, refine)
+            if path is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_ms += entry.search_ms - (time.perf_counter() - t0) * 1000.0
+                return path
+            self._drop(key)
+
+        self.misses += 1
+        path = self.nav.find_path(start, end, refine)
+        if path is not None and path.nodes:
+            self._put(key, _Entry(path.nodes, path.costs, (time.perf_counter() - t0) * 1000.0))
+        return path
+
+    def _reuse(self, entry: _Entry, start: Tile, refine: Optional[int]) -> Optional[NavPath]:
+        if any(self.nav.grid.chunk_version(ck) is None for ck in entry.chunks):
+            return None # Part of the path was unloaded (evicted): search again
+        nodes, costs = entry.nodes, entry.costs
+        if start == nodes[0]:
+            return self.nav.refine_nodes(list(nodes), list(costs), refine)
+        # Join the start to the last node of the leading run inside its chunk
+        home = chunk_of(start)
+        k = 0
+        while k + 1 < len(nodes) and chunk_of(nodes[k + 1]) == home:
+            k += 1
+        c = self.nav.chunk(home)
+        if c is None:
+            return None
+        n = CHUNK_SIZE
+        d = c.distances((start[1] % n) * n + (start[0] % n))
+        join = d[(nodes[k][1] % n) * n + (nodes[k][0] % n)]
+        if join == INF:
+            return None # Not connected inside the chunk: search again
+        if nodes[k] == start:
+            new_nodes, new_costs = list(nodes[k:]), [g - costs[k] for g in costs[k:]]
+        else:
+            new_nodes = [start] + list(nodes[k:])
+            new_costs = [0.0] + [join - costs[k] + g for g in costs[k:]]
+        return self.nav.refine_nodes(new_nodes, new_costs, refine)
+
+    def _put(self, key: CacheKey, entry: _Entry):
+        self._drop(key)
+        self._entries[key] = entry
+        for ck in entry.chunks:
+            self._by_chunk.setdefault(ck, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: CacheKey) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for ck in entry.chunks:
+            keys = self._by_chunk.get(ck)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_chunk[ck]
+        return True
+
+    def _invalidate(self):
+        """Drops the entries crossing chunks whose walkability changed since the last lookup."""
+        self._version, changed = self.nav.grid.walkability_changes_since(self._version)
+        for ck in changed:
+            for key in list(self._by_chunk.get(ck, ())):
+                if self._drop(key):
+                    self.invalidated += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._by_chunk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "lookups": self.lookups, "hits": self.hits,
+                "misses": self.misses, "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "invalidated": self.invalidated, "saved_ms": round(self.saved_ms, 2)}
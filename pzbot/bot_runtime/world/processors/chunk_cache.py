@@ -0,0 +1,138 @@
+"""
+LRU cache of loaded grid chunks.
+
+`ChunkCache` keeps chunks in an OrderedDict in least-recently-used order. A lookup (`get`)
+is a `move_to_end`, and eviction pops from the front, so both are O(1) and maintenance never
+walks the whole cache. The budget is a chunk count and/or a byte size (tile planes only).
+
+Keys are (cx, cy, z): each floor of a chunk column is cached, and evicted, on its own.
+A per-floor index (`floor(z)`) lets queries about one floor skip all the others.
+
+Evicted dirty chunks are written back by `ChunkWriter` (see `chunk_writer.py`).
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .memory_objects import GridChunkMemory
+
+logger = logging.getLogger(__name__)
+
+class ChunkCache:
+    """
+    Loaded chunks by key, least recently used first.
+    Not thread-safe: `GridSystem` holds its lock around every access.
+    """
+    def __init__(self, max_chunks: int = 0, max_bytes: int = 0, ttl_ms: int = 0):
+        self.max_chunks = max_chunks # 0 = unlimited
+        self.max_bytes = max_bytes # 0 = unlimited
+        self.ttl_ms = ttl_ms # 0 = no expiry
+        self._chunks: 'OrderedDict[Hashable, GridChunkMemory]' = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._floors: Dict[int, Dict[Tuple[int, int], None]] = {} # z -> (cx, cy) loaded on that floor
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    # Read-only mapping access (no touch, no counters)
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._chunks
+
+    def __getitem__(self, key: Hashable) -> GridChunkMemory:
+        return self._chunks[key]
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._chunks)
+
+    def keys(self):
+        return self._chunks.keys()
+
+    def values(self):
+        return self._chunks.values()
+
+    def items(self):
+        return self._chunks.items()
+
+    def floor(self, z: int) -> Dict[Tuple[int, int], None]:
+        """(cx, cy) of the chunks loaded on floor `z` (read-only)."""
+        return self._floors.get(z, {})
+
+    def floors(self) -> Dict[int, int]:
+        """Loaded chunk count per floor."""
+        return {z: len(keys) for z, keys in sorted(self._floors.items())}
+
+    def get(self, key: Hashable) -> Optional[GridChunkMemory]:
+        """Cache lookup: counts a hit or miss and marks the chunk most recently used."""
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._chunks.move_to_end(key)
+        return chunk
+
+    def put(self, key: Hashable, chunk: GridChunkMemory):
+        self._chunks[key] = chunk
+        self._chunks.move_to_end(key)
+        self._floors.setdefault(key[2], {})[key[:2]] = None
+        self.resize(key)
+
+    def resize(self, key: Hashable):
+        size = self._chunks[key].data.nbytes
+        self.bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def pop(self, key: Hashable) -> GridChunkMemory:
+        self.bytes -= self._sizes.pop(key, 0)
+        chunk = self._chunks.pop(key)
+        floor = self._floors.get(key[2])
+        if floor is not None:
+            floor.pop(key[:2], None)
+            if not floor:
+                del self._floors[key[2]]
+        return chunk
+
+    def over_budget(self) -> bool:
+        return ((self.max_chunks and len(self._chunks) > self.max_chunks) or
+                (self.max_bytes and self.bytes > self.max_bytes))
+
+    def evict(self, now_ms: int, keep: Tuple[Hashable, ...] = ()) -> List[Tuple[Hashable, GridChunkMemory]]:
+        """
+        Removes chunks from the LRU end while over budget or older than the TTL.
+        Stops at the first chunk that is neither, so the cost is O(evicted).
+        `keep` keys (e.g. the chunks just updated) are never evicted.
+        """
+        evicted = []
+        while self._chunks:
+            key, chunk = next(iter(self._chunks.items()))
+            if key in keep:
+                break
+            if self.over_budget():
+                self.evictions += 1
+            elif self.ttl_ms and now_ms - chunk.last_seen > self.ttl_ms:
+                self.expired += 1
+            else:
+                break
+            evicted.append((key, self.pop(key)))
+        return evicted
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "chunks": len(self._chunks),
+            "bytes": self.bytes,
+            "max_chunks": self.max_chunks,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "floors": self.floors(),
+        }
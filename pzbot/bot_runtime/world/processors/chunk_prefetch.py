@@ -0,0 +1,178 @@
+"""
+Heading-aware prefetch of persisted grid chunks.
+
+Without it, a chunk the player walks into is read from its region file inside
+`GridSystem.update`, on the tick path. `ChunkPrefetcher` reads them ahead of time on a
+background thread: each tick `GridSystem.prefetch` projects the player's velocity
+`GRID_PREFETCH_TILES` tiles ahead and requests the chunks within vision range of that
+path. Loaded chunks wait in `ready` until `update` needs them.
+
+A ready chunk must never be older than the data the grid has seen. `GridSystem` calls
+`discard(key)` whenever a chunk enters or leaves the cache, which drops a ready copy and
+cancels an in-flight read of it (its result is thrown away when it lands).
+"""
+import logging
+from collections import OrderedDict
+from threading import Thread, Condition
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from .grid_chunk import CHUNK_SIZE
+from .memory_objects import GridChunkMemory
+
+logger = logging.getLogger(__name__)
+
+MAX_ABSENT = 4096 # Remembered never-saved chunks
+
+def chunks_ahead(x: float, y: float, vx: float, vy: float, distance: int, radius: int, z: int = 0,
+                 step: int = CHUNK_SIZE // 2) -> List[Tuple[int, int, int]]:
+    """
+    Chunk keys on floor `z` within `radius` tiles of the path from (x, y) along (vx, vy) for
+    `distance` tiles, nearest first. The chunks around the player themselves are not included.
+    """
+    speed = (vx * vx + vy * vy) ** 0.5
+    if speed <= 0 or distance <= 0:
+        return []
+    dx, dy = vx / speed, vy / speed
+    here = set(_chunks_around(x, y, radius))
+    keys: Dict[Tuple[int, int, int], None] = {}
+    for d in range(step, distance + 1, step):
+        for key in _chunks_around(x + dx * d, y + dy * d, radius):
+            if key not in here:
+                keys[key + (z,)] = None
+    return list(keys)
+
+def _chunks_around(x: float, y: float, radius: int) -> Iterable[Tuple[int, int]]:
+    cx0, cx1 = int(x - radius) // CHUNK_SIZE, int(x + radius) // CHUNK_SIZE
+    cy0, cy1 = int(y - radius) // CHUNK_SIZE, int(y + radius) // CHUNK_SIZE
+    for cx in range(cx0, cx1 + 1):
+        for cy in range(cy0, cy1 + 1):
+            yield (cx, cy)
+
+class ChunkPrefetcher:
+    """
+    Background chunk reader. `load(key)` does the I/O on the prefetch thread and returns
+    a chunk, or None if the chunk was never saved. The thread starts on the first request.
+    """
+    def __init__(self, load: Callable[[Hashable], Optional[GridChunkMemory]], max_ready: int = 256,
+                 name: str = "grid-prefetch"):
+        self._load = load
+        self.max_ready = max_ready
+        self.name = name
+        self._cond = Condition()
+        self._queue: 'OrderedDict[Hashable, object]' = OrderedDict() # key -> request token
+        self._inflight: Dict[Hashable, object] = {}
+        self.ready: 'OrderedDict[Hashable, GridChunkMemory]' = OrderedDict()
+        self._absent: Set[Hashable] = set() # Not on disk: no need to ask again
+        self._thread: Optional[Thread] = None
+        self._closed = False
+
+        self.requested = 0
+        self.loaded = 0
+        self.absent = 0
+        self.hits = 0 # Chunk needed and already prefetched
+        self.misses = 0 # Chunk needed and read from disk on the tick path
+        self.wasted = 0 # Prefetched, dropped unused
+        self.errors = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._closed = False
+        self._thread = Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def request(self, keys: Iterable[Hashable]) -> int:
+        """Queues reads of `keys` not already ready, queued or known absent. Returns how many."""
+        if self._thread is None:
+            self.start()
+        queued = 0
+        with self._cond:
+            for key in keys:
+                if key in self.ready or key in self._inflight or key in self._absent:
+                    continue
+                token = object()
+                self._inflight[key] = token
+                self._queue[key] = token
+                queued += 1
+            if queued:
+                self.requested += queued
+                self._cond.notify_all()
+        return queued
+
+    def take(self, key: Hashable) -> Optional[GridChunkMemory]:
+        """The prefetched chunk for `key`, removed from `ready`; None if it is not there."""
+        with self._cond:
+            memory = self.ready.pop(key, None)
+            if memory is not None:
+                self.hits += 1
+            return memory
+
+    def miss(self):
+        """Counts a chunk read from disk on the tick path."""
+        self.misses += 1
+
+    def discard(self, key: Hashable):
+        """Forgets everything about `key`: the grid now holds (or just wrote) newer data."""
+        with self._cond:
+            self._inflight.pop(key, None)
+            self._queue.pop(key, None)
+            self._absent.discard(key)
+            if self.ready.pop(key, None) is not None:
+                self.wasted += 1
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                key, token = self._queue.popitem(last=False)
+            try:
+                memory = self._load(key)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Failed to prefetch chunk {key}: {e}")
+                memory = None
+            with self._cond:
+                if self._inflight.get(key) is not token:
+                    pass # Discarded while reading
+                elif memory is None:
+                    del self._inflight[key]
+                    if len(self._absent) >= MAX_ABSENT:
+                        self._absent.clear()
+                    self._absent.add(key)
+                    self.absent += 1
+                else:
+                    del self._inflight[key]
+                    self.ready[key] = memory
+                    self.loaded += 1
+                    while len(self.ready) > self.max_ready:
+                        self.ready.popitem(last=False)
+                        self.wasted += 1
+                self._cond.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every queued read finished. False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._inflight or self._thread is None, timeout)
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        with self._cond:
+            self._closed = True
+            self._queue.clear()
+            self._inflight.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            ready = len(self.ready)
+            queued = len(self._queue)
+        needed = self.hits + self.misses
+        return {"ready": ready, "queued": queued, "requested": self.requested, "loaded": self.loaded,
+                "absent": self.absent, "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / needed, 4) if needed else 0.0,
+                "wasted": self.wasted, "errors": self.errors}
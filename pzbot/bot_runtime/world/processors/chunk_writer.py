@@ -0,0 +1,144 @@
+"""
+Write-behind flusher for dirty grid chunks.
+
+The grid thread never does chunk file I/O. Under the grid lock it only serializes a dirty
+chunk (`GridChunk.to_bytes`, an in-memory copy) and submits the blob. The writer thread
+takes queued blobs in batches and hands each batch to the store in one call.
+
+The queue is keyed by chunk: a newer blob for a chunk that is still queued replaces the
+older one (coalescing), and its bound (`max_queue`) counts distinct chunks. When it is full,
+`submit(block=False)` refuses the blob and the caller keeps the chunk dirty for the next flush.
+`submit(block=True)` waits for room instead; evictions use it because the chunk is leaving memory.
+
+A submitted chunk stays in `pending` until its write landed, so a chunk evicted and revisited
+in between is taken from there instead of from stale disk data.
+"""
+import time
+import logging
+from collections import OrderedDict
+from threading import Thread, Condition
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .memory_objects import GridChunkMemory
+
+logger = logging.getLogger(__name__)
+
+# (key, chunk, blob)
+WriteItem = Tuple[Hashable, GridChunkMemory, bytes]
+
+class ChunkWriter:
+    """
+    Background writer. `write_batch(items)` does the I/O, on the writer thread,
+    which starts on the first submit.
+    """
+    def __init__(self, write_batch: Callable[[List[WriteItem]], None], max_queue: int = 1024,
+                 batch_size: int = 64, name: str = "grid-writer"):
+        self._write_batch = write_batch
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.name = name
+        self._cond = Condition()
+        self._queue: 'OrderedDict[Hashable, Tuple[GridChunkMemory, bytes]]' = OrderedDict()
+        self.pending: Dict[Hashable, GridChunkMemory] = {} # Queued or being written
+        self._thread: Optional[Thread] = None
+        self._closed = False
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0 # Queue full, caller keeps the chunk dirty
+        self.waits = 0 # Queue full, caller blocked
+        self.batches = 0
+        self.written = 0
+        self.errors = 0
+        self.max_depth = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._closed = False
+        self._thread = Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def submit(self, key: Hashable, chunk: GridChunkMemory, blob: bytes, block: bool = True) -> bool:
+        """Queues a chunk's blob. False if the queue is full and `block` is False."""
+        if self._thread is None:
+            self.start()
+        with self._cond:
+            if key in self._queue:
+                self.coalesced += 1
+            elif len(self._queue) >= self.max_queue:
+                if not block:
+                    self.rejected += 1
+                    return False
+                self.waits += 1
+                while len(self._queue) >= self.max_queue and self._thread.is_alive():
+                    self._cond.wait(0.1)
+            self._queue[key] = (chunk, blob)
+            self.pending[key] = chunk
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify_all()
+            return True
+
+    def pending_chunk(self, key: Hashable) -> Optional[GridChunkMemory]:
+        """The chunk for `key` if a write of it is still in flight (its data is current)."""
+        with self._cond:
+            return self.pending.get(key)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                batch = []
+                while self._queue and len(batch) < self.batch_size:
+                    key, (chunk, blob) = self._queue.popitem(last=False)
+                    batch.append((key, chunk, blob))
+                self._cond.notify_all() # Room in the queue
+            try:
+                self._write_batch(batch)
+                self.written += len(batch)
+                self.batches += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Failed to write {len(batch)} chunks: {e}")
+            with self._cond:
+                for key, chunk, _ in batch:
+                    if key not in self._queue and self.pending.get(key) is chunk:
+                        del self.pending[key]
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every queued write landed. False on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self.pending:
+                if self._thread is None or not self._thread.is_alive():
+                    break
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return not self.pending
+
+    def stop(self, timeout: Optional[float] = 30.0) -> bool:
+        """Writes what is queued, then stops the thread. False if writes were left behind."""
+        done = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if not done:
+            logger.error(f"Chunk writer stopped with {len(self.pending)} chunks not written")
+        return done
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            queued = len(self._queue)
+        return {"queued": queued, "max_depth": self.max_depth, "submitted": self.submitted,
+                "coalesced": self.coalesced, "rejected": self.rejected, "waits": self.waits,
+                "batches": self.batches, "written": self.written, "errors": self.errors}
@@ -0,0 +1,350 @@
+"""
+Array-backed grid chunks.
+
+A chunk covers CHUNK_SIZE x CHUNK_SIZE tiles. Each z-level it has seen is a `ChunkPlane`:
+fixed-size NumPy planes indexed [local_y, local_x]:
+
+    known               bool    tile was ever observed
+    walkable, explored  bool
+    last_seen           int64   ms (state timestamp)
+    room_id, layer_id   int32   interned via ROOMS / LAYERS (NO_ID = none)
+
+Per-tile `meta` is rare and lives in a sparse side table keyed by (x, y, z).
+`get()` returns a `TileView`, an immutable copy of one tile with the `TileData` attributes.
+About 20 bytes per tile, against ~1KB for a `TileData` model plus its "x_y_z" key.
+
+`GridSystem` keeps one chunk per (cx, cy, z), i.e. a single plane each, so every floor
+is loaded and evicted on its own; chunks saved before that hold a whole column (`floor()`
+splits them).
+
+On disk a chunk is a binary blob inside a region file (`to_bytes` / `from_bytes`, see
+`region_file.py`), or JSON (`to_dict` / `from_dict`). Room and layer ids are process-local,
+so both store names through a per-chunk table. Chunks saved as `GridChunkData`
+(the old `{"x_y_z": TileData}` format) still load.
+"""
+import json
+import zlib
+import struct
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from bot_runtime.ingest.tiles import ROOMS, LAYERS, NO_ID
+
+CHUNK_SIZE = 10
+
+PLANE_FIELDS = ('known', 'walkable', 'explored', 'last_seen', 'room_id', 'layer_id')
+
+# Binary blob (zlib-compressed): header, name/meta JSON, then per plane:
+# z i32 | packed known, walkable, explored bits | last_seen i64[] | room i16[] | layer i16[]
+BLOB_HEADER = struct.Struct("<iiqII") # chunk_x, chunk_y, last_visited, planes, json length
+_Z = struct.Struct("<i")
+_TILES = CHUNK_SIZE * CHUNK_SIZE
+_BITS = (_TILES + 7) // 8
+
+class TileView(NamedTuple):
+    """One tile read out of a chunk. Same attributes as `TileData`."""
+    x: int
+    y: int
+    z: int
+    is_walkable: bool
+    is_explored: bool
+    last_seen: int
+    layer: Optional[str]
+    room: Optional[str]
+    meta: Dict[str, Any]
+
+    def dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+    model_dump = dict
+
+class ChunkPlane:
+    """One z-level of a chunk."""
+    __slots__ = PLANE_FIELDS
+
+    def __init__(self):
+        shape = (CHUNK_SIZE, CHUNK_SIZE)
+        self.known = np.zeros(shape, dtype=bool)
+        self.walkable = np.ones(shape, dtype=bool)
+        self.explored = np.zeros(shape, dtype=bool)
+        self.last_seen = np.zeros(shape, dtype=np.int64)
+        self.room_id = np.full(shape, NO_ID, dtype=np.int32)
+        self.layer_id = np.full(shape, NO_ID, dtype=np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, f).nbytes for f in PLANE_FIELDS)
+
+class GridChunk:
+    """
+    A CHUNK_SIZE x CHUNK_SIZE column of tiles, one `ChunkPlane` per z-level.
+    Not thread-safe: `GridSystem` holds its lock around every access.
+    """
+    __slots__ = ('chunk_x', 'chunk_y', 'planes', 'meta', 'last_visited')
+
+    def __init__(self, chunk_x: int, chunk_y: int, last_visited: int = 0):
+        self.chunk_x = chunk_x
+        self.chunk_y = chunk_y
+        self.planes: Dict[int, ChunkPlane] = {}
+        self.meta: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+        self.last_visited = last_visited
+
+    def plane(self, z: int) -> ChunkPlane:
+        p = self.planes.get(z)
+        if p is None:
+            p = self.planes[z] = ChunkPlane()
+        return p
+
+    def floor(self, z: int) -> Optional['GridChunk']:
+        """A chunk with only level `z` of this one (planes are shared), or None if it has no such level."""
+        p = self.planes.get(z)
+        if p is None:
+            return None
+        chunk = GridChunk(self.chunk_x, self.chunk_y, self.last_visited)
+        chunk.planes[z] = p
+        chunk.meta = {k: m for k, m in self.meta.items() if k[2] == z}
+        return chunk
+
+    def _local(self, x: int, y: int) -> Tuple[int, int]:
+        return y - self.chunk_y * CHUNK_SIZE, x - self.chunk_x * CHUNK_SIZE
+
+    # --- Writes ---
+
+    def set_tile(self, x: int, y: int, z: int, walkable: bool = True, explored: bool = False, last_seen: int = 0,
+                 room: Optional[str] = None, layer: Optional[str] = None, meta: Optional[Dict[str, Any]] = None):
+        p = self.plane(z)
+        i = self._local(x, y)
+        p.known[i] = True
+        p.walkable[i] = walkable
+        p.explored[i] = explored
+        p.last_seen[i] = last_seen
+        p.room_id[i] = ROOMS.intern(room)
+        p.layer_id[i] = LAYERS.intern(layer)
+        if meta:
+            self.meta[(x, y, z)] = meta
+        else:
+            self.meta.pop((x, y, z), None)
+
+    def set_many(self, z: int, ly: np.ndarray, lx: np.ndarray, walkable: np.ndarray, explored: np.ndarray,
+                 last_seen: int, room_id: np.ndarray, layer_id: np.ndarray):
+        """Writes a batch of tiles on one z-level (local coordinates, interned ids)."""
+        p = self.plane(z)
+        i = (ly, lx)
+        p.known[i] = True
+        p.walkable[i] = walkable
+        p.explored[i] = explored
+        p.last_seen[i] = last_seen
+        p.room_id[i] = room_id
+        p.layer_id[i] = layer_id
+
+    def write_block(self, z: int, ly: np.ndarray, lx: np.ndarray, walkable: np.ndarray,
+                    room_id: np.ndarray, layer_id: np.ndarray, last_seen: int) -> Tuple[int, np.ndarray]:
+        """
+        Merges one z-level of a frame's tiles (local coordinates, interned ids).
+        Every tile gets `last_seen`; only tiles that are new or whose walkable/room/layer
+        changed are rewritten. Returns (rewritten count, mask of the rows that are new or
+        flipped walkable): the mask is what changes paths through the chunk.
+        """
+        p = self.plane(z)
+        i = (ly, lx)
+        passable = ~p.known[i] | (p.walkable[i] != walkable)
+        changed = passable | (p.room_id[i] != room_id) | (p.layer_id[i] != layer_id)
+        p.last_seen[i] = last_seen
+        n = int(np.count_nonzero(changed))
+        if n:
+            i = (ly[changed], lx[changed])
+            p.known[i] = True
+            p.walkable[i] = walkable[changed]
+            p.room_id[i] = room_id[changed]
+            p.layer_id[i] = layer_id[changed]
+        return n, passable
+
+    def write_tiles(self, tiles: List[Dict[str, Any]], last_seen: int):
+        """Writes raw tile dicts (as sent by Lua: x, y, z, w, room, layer) that fall in this chunk."""
+        # One pass into column lists per z-level: (ly, lx, walkable, explored, room_id, layer_id)
+        by_z: Dict[int, Tuple[list, list, list, list, list, list]] = {}
+        room, layer = ROOMS.intern, LAYERS.intern
+        bx, by = self.chunk_x * CHUNK_SIZE, self.chunk_y * CHUNK_SIZE
+        meta = self.meta
+        for t in tiles:
+            x, y, z = int(t['x']), int(t['y']), int(t.get('z', 0))
+            cols = by_z.get(z)
+            if cols is None:
+                cols = by_z[z] = ([], [], [], [], [], [])
+            cols[0].append(y - by)
+            cols[1].append(x - bx)
+            cols[2].append(t.get('w', True))
+            cols[3].append(t.get('is_explored', False))
+            cols[4].append(room(t.get('room')))
+            cols[5].append(layer(t.get('layer')))
+            if t.get('meta'):
+                meta[(x, y, z)] = t['meta']
+            elif meta:
+                meta.pop((x, y, z), None)
+
+        for z, (ly, lx, w, e, r, l) in by_z.items():
+            self.set_many(z, np.array(ly, dtype=np.intp), np.array(lx, dtype=np.intp),
+                          np.array(w, dtype=bool), np.array(e, dtype=bool), last_seen,
+                          np.array(r, dtype=np.int32), np.array(l, dtype=np.int32))
+
+    # --- Reads ---
+
+    def get(self, x: int, y: int, z: int) -> Optional[TileView]:
+        p = self.planes.get(z)
+        if p is None:
+            return None
+        i = self._local(x, y)
+        if not p.known[i]:
+            return None
+        return TileView(x, y, z, bool(p.walkable[i]), bool(p.explored[i]), int(p.last_seen[i]),
+                        LAYERS.name(int(p.layer_id[i])), ROOMS.name(int(p.room_id[i])),
+                        self.meta.get((x, y, z), {}))
+
+    def tile_count(self) -> int:
+        return sum(int(np.count_nonzero(p.known)) for p in self.planes.values())
+
+    def __len__(self):
+        return self.tile_count()
+
+    def tiles(self) -> Iterator[TileView]:
+        """Every known tile, plane by plane."""
+        bx, by = self.chunk_x * CHUNK_SIZE, self.chunk_y * CHUNK_SIZE
+        for z, p in self.planes.items():
+            ly, lx = np.nonzero(p.known)
+            rooms = [ROOMS.name(i) for i in p.room_id[ly, lx].tolist()]
+            layers = [LAYERS.name(i) for i in p.layer_id[ly, lx].tolist()]
+            for k, (y, x, w, e, t) in enumerate(zip((ly + by).tolist(), (lx + bx).tolist(), p.walkable[ly, lx].tolist(),
+                                                    p.explored[ly, lx].tolist(), p.last_seen[ly, lx].tolist())):
+                yield TileView(x, y, z, w, e, t, layers[k], rooms[k], self.meta.get((x, y, z), {}))
+
+    def bounds(self) -> Optional[Tuple[int, int, int, int]]:
+        """(min_x, max_x, min_y, max_y) of the known tiles, or None."""
+        known = None
+        for p in self.planes.values():
+            known = p.known if known is None else known | p.known
+        if known is None or not known.any():
+            return None
+        ly, lx = np.nonzero(known)
+        bx, by = self.chunk_x * CHUNK_SIZE, self.chunk_y * CHUNK_SIZE
+        return int(lx.min()) + bx, int(lx.max()) + bx, int(ly.min()) + by, int(ly.max()) + by
+
+    @property
+    def nbytes(self) -> int:
+        return sum(p.nbytes for p in self.planes.values())
+
+    # --- Persistence ---
+
+    def _local_tables(self) -> Tuple[Dict[int, int], Dict[int, int], Dict[int, Tuple[np.ndarray, np.ndarray]]]:
+        """Per-chunk room/layer tables: global id -> local index, and each plane's local ids (-1 = none)."""
+        rooms: Dict[int, int] = {}
+        layers: Dict[int, int] = {}
+
+        def local_ids(ids: np.ndarray, table: Dict[int, int]) -> np.ndarray:
+            uniq, inv = np.unique(ids, return_inverse=True)
+            local = np.array([-1 if i == NO_ID else table.setdefault(i, len(table)) for i in uniq.tolist()],
+                             dtype=np.int16)
+            return local[inv.ravel()]
+
+        ids = {z: (local_ids(p.room_id, rooms), local_ids(p.layer_id, layers)) for z, p in self.planes.items()}
+        return rooms, layers, ids
+
+    def to_dict(self) -> Dict[str, Any]:
+        rooms, layers, ids = self._local_tables()
+
+        planes = {}
+        for z, p in self.planes.items():
+            planes[str(z)] = {
+                "known": p.known.ravel().astype(np.uint8).tolist(),
+                "walkable": p.walkable.ravel().astype(np.uint8).tolist(),
+                "explored": p.explored.ravel().astype(np.uint8).tolist(),
+                "last_seen": p.last_seen.ravel().tolist(),
+                "room": ids[z][0].tolist(),
+                "layer": ids[z][1].tolist(),
+            }
+        return {
+            "chunk_x": self.chunk_x,
+            "chunk_y": self.chunk_y,
+            "last_visited": self.last_visited,
+            "size": CHUNK_SIZE,
+            "rooms": [ROOMS.name(i) for i in rooms],
+            "layers": [LAYERS.name(i) for i in layers],
+            "planes": planes,
+            "meta": [[x, y, z, m] for (x, y, z), m in self.meta.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'GridChunk':
+        chunk = cls(int(data["chunk_x"]), int(data["chunk_y"]), int(data.get("last_visited", 0)))
+        if "planes" not in data:
+            # Old GridChunkData file: {"x_y_z": TileData dict}
+            for t in (data.get("tiles") or {}).values():
+                chunk.set_tile(int(t["x"]), int(t["y"]), int(t.get("z", 0)),
+                               walkable=t.get("is_walkable", t.get("w", True)),
+                               explored=t.get("is_explored", False), last_seen=int(t.get("last_seen", 0)),
+                               room=t.get("room"), layer=t.get("layer"), meta=t.get("meta"))
+            return chunk
+
+        if data.get("size", CHUNK_SIZE) != CHUNK_SIZE:
+            raise ValueError(f"Chunk size {data.get('size')} != {CHUNK_SIZE}")
+        room_ids = np.array([ROOMS.intern(n) for n in data.get("rooms", [])] + [NO_ID], dtype=np.int32)
+        layer_ids = np.array([LAYERS.intern(n) for n in data.get("layers", [])] + [NO_ID], dtype=np.int32)
+        shape = (CHUNK_SIZE, CHUNK_SIZE)
+        for z, d in data["planes"].items():
+            p = chunk.plane(int(z))
+            p.known[:] = np.array(d["known"], dtype=bool).reshape(shape)
+            p.walkable[:] = np.array(d["walkable"], dtype=bool).reshape(shape)
+            p.explored[:] = np.array(d["explored"], dtype=bool).reshape(shape)
+            p.last_seen[:] = np.array(d["last_seen"], dtype=np.int64).reshape(shape)
+            # Local index -1 picks the trailing NO_ID
+            p.room_id[:] = room_ids[np.array(d["room"], dtype=np.int64)].reshape(shape)
+            p.layer_id[:] = layer_ids[np.array(d["layer"], dtype=np.int64)].reshape(shape)
+        for x, y, z, m in data.get("meta", []):
+            chunk.meta[(x, y, z)] = m
+        return chunk
+
+    def to_bytes(self) -> bytes:
+        rooms, layers, ids = self._local_tables()
+        names = json.dumps({
+            "rooms": [ROOMS.name(i) for i in rooms],
+            "layers": [LAYERS.name(i) for i in layers],
+            "meta": [[x, y, z, m] for (x, y, z), m in self.meta.items()],
+        }).encode()
+        parts = [BLOB_HEADER.pack(self.chunk_x, self.chunk_y, self.last_visited, len(self.planes), len(names)), names]
+        for z, p in self.planes.items():
+            parts.append(_Z.pack(z))
+            parts.append(np.packbits(np.stack([p.known, p.walkable, p.explored]).reshape(3, -1), axis=1).tobytes())
+            parts.append(p.last_seen.astype('<i8').tobytes())
+            parts.append(ids[z][0].astype('<i2').tobytes())
+            parts.append(ids[z][1].astype('<i2').tobytes())
+        return zlib.compress(b"".join(parts), 1)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> 'GridChunk':
+        buf = zlib.decompress(blob)
+        cx, cy, last_visited, n_planes, n_names = BLOB_HEADER.unpack_from(buf, 0)
+        off = BLOB_HEADER.size
+        names = json.loads(buf[off:off + n_names])
+        off += n_names
+
+        chunk = cls(cx, cy, last_visited)
+        room_ids = np.array([ROOMS.intern(n) for n in names["rooms"]] + [NO_ID], dtype=np.int32)
+        layer_ids = np.array([LAYERS.intern(n) for n in names["layers"]] + [NO_ID], dtype=np.int32)
+        shape = (CHUNK_SIZE, CHUNK_SIZE)
+        for _ in range(n_planes):
+            z = _Z.unpack_from(buf, off)[0]
+            off += _Z.size
+            bits = np.unpackbits(np.frombuffer(buf, dtype=np.uint8, count=3 * _BITS, offset=off).reshape(3, _BITS),
+                                 axis=1, count=_TILES).astype(bool)
+            off += 3 * _BITS
+            p = chunk.plane(z)
+            p.known[:], p.walkable[:], p.explored[:] = (b.reshape(shape) for b in bits)
+            p.last_seen[:] = np.frombuffer(buf, dtype='<i8', count=_TILES, offset=off).reshape(shape)
+            off += 8 * _TILES
+            p.room_id[:] = room_ids[np.frombuffer(buf, dtype='<i2', count=_TILES, offset=off)].reshape(shape)
+            off += 2 * _TILES
+            p.layer_id[:] = layer_ids[np.frombuffer(buf, dtype='<i2', count=_TILES, offset=off)].reshape(shape)
+            off += 2 * _TILES
+        for x, y, z, m in names["meta"]:
+            chunk.meta[(x, y, z)] = m
+        return chunk
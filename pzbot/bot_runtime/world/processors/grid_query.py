@@ -0,0 +1,156 @@
+"""
+Vectorized spatial queries over loaded grid chunks.
+
+`GridSystem.window` copies a box of one floor out of the chunk planes into dense arrays
+(`GridWindow`), under a single lock acquisition. The box/radius/ray/room queries work on
+those arrays and return `TileColumns`: one row per known tile, no per-tile objects.
+Tiles of chunks that are not loaded count as unknown.
+"""
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bot_runtime.ingest.tiles import ROOMS, LAYERS, NO_ID
+from .grid_chunk import GridChunk, CHUNK_SIZE
+
+class TileColumns:
+    """
+    Known tiles of one floor, as columns:
+        x, y                int32
+        walkable            bool
+        room_id, layer_id   int32, interned via ROOMS / LAYERS (NO_ID = none)
+        last_seen           int64
+    """
+    __slots__ = ('x', 'y', 'z', 'walkable', 'room_id', 'layer_id', 'last_seen')
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, z: int, walkable: np.ndarray, room_id: np.ndarray,
+                 layer_id: np.ndarray, last_seen: np.ndarray):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.walkable = walkable
+        self.room_id = room_id
+        self.layer_id = layer_id
+        self.last_seen = last_seen
+
+    @classmethod
+    def empty(cls, z: int) -> 'TileColumns':
+        i32 = np.zeros(0, dtype=np.int32)
+        return cls(i32, i32, z, np.zeros(0, dtype=bool), i32, i32, np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def concat(cls, parts: Sequence['TileColumns'], z: int) -> 'TileColumns':
+        if not parts:
+            return cls.empty(z)
+        if len(parts) == 1:
+            return parts[0]
+        return cls(*(np.concatenate([getattr(p, f) for p in parts]) if f != 'z' else z for f in cls.__slots__))
+
+    def __len__(self):
+        return len(self.x)
+
+    def select(self, mask: np.ndarray) -> 'TileColumns':
+        return TileColumns(self.x[mask], self.y[mask], self.z, self.walkable[mask], self.room_id[mask],
+                           self.layer_id[mask], self.last_seen[mask])
+
+    def room(self, row: int) -> Optional[str]:
+        return ROOMS.name(int(self.room_id[row]))
+
+    def layer(self, row: int) -> Optional[str]:
+        return LAYERS.name(int(self.layer_id[row]))
+
+    def room_counts(self) -> List[Tuple[str, int]]:
+        """(room, tiles) for the rooms in these tiles, most tiles first."""
+        ids = self.room_id[self.room_id != NO_ID]
+        if not len(ids):
+            return []
+        values, counts = np.unique(ids, return_counts=True)
+        order = np.argsort(-counts, kind='stable')
+        return [(ROOMS.name(int(values[i])), int(counts[i])) for i in order]
+
+class GridWindow:
+    """
+    Dense copy of the box [x0, x1] x [y0, y1] (inclusive) of floor `z`.
+    Arrays are indexed [y - y0, x - x0]; `known` is False outside loaded chunks.
+    """
+    __slots__ = ('x0', 'y0', 'z', 'known', 'walkable', 'room_id', 'layer_id', 'last_seen')
+
+    def __init__(self, x0: int, y0: int, x1: int, y1: int, z: int):
+        shape = (max(0, y1 - y0 + 1), max(0, x1 - x0 + 1))
+        self.x0 = x0
+        self.y0 = y0
+        self.z = z
+        self.known = np.zeros(shape, dtype=bool)
+        self.walkable = np.zeros(shape, dtype=bool)
+        self.room_id = np.full(shape, NO_ID, dtype=np.int32)
+        self.layer_id = np.full(shape, NO_ID, dtype=np.int32)
+        self.last_seen = np.zeros(shape, dtype=np.int64)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.known.shape
+
+    def fill(self, chunk: GridChunk):
+        """Copies the overlap of `chunk`'s plane for this floor into the window."""
+        p = chunk.planes.get(self.z)
+        if p is None:
+            return
+        h, w = self.shape
+        bx, by = chunk.chunk_x * CHUNK_SIZE, chunk.chunk_y * CHUNK_SIZE
+        # Overlap in world coordinates, then in both local frames
+        ax0, ax1 = max(self.x0, bx), min(self.x0 + w, bx + CHUNK_SIZE)
+        ay0, ay1 = max(self.y0, by), min(self.y0 + h, by + CHUNK_SIZE)
+        if ax0 >= ax1 or ay0 >= ay1:
+            return
+        dst = (slice(ay0 - self.y0, ay1 - self.y0), slice(ax0 - self.x0, ax1 - self.x0))
+        src = (slice(ay0 - by, ay1 - by), slice(ax0 - bx, ax1 - bx))
+        self.known[dst] = p.known[src]
+        self.walkable[dst] = p.walkable[src]
+        self.room_id[dst] = p.room_id[src]
+        self.layer_id[dst] = p.layer_id[src]
+        self.last_seen[dst] = p.last_seen[src]
+
+    def chunk_keys(self) -> Iterable[Tuple[int, int]]:
+        """(cx, cy) of every chunk overlapping the window."""
+        h, w = self.shape
+        if not h or not w:
+            return
+        for cx in range(self.x0 // CHUNK_SIZE, (self.x0 + w - 1) // CHUNK_SIZE + 1):
+            for cy in range(self.y0 // CHUNK_SIZE, (self.y0 + h - 1) // CHUNK_SIZE + 1):
+                yield (cx, cy)
+
+    def columns(self, mask: Optional[np.ndarray] = None) -> TileColumns:
+        """Known tiles of the window (and of `mask`, if given) as columns."""
+        sel = self.known if mask is None else self.known & mask
+        ly, lx = np.nonzero(sel)
+        return TileColumns((lx + self.x0).astype(np.int32), (ly + self.y0).astype(np.int32), self.z,
+                           self.walkable[sel], self.room_id[sel], self.layer_id[sel], self.last_seen[sel])
+
+    def disk(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Boolean mask of cells within `radius` (Euclidean) of (x, y)."""
+        h, w = self.shape
+        dy = (np.arange(h) + self.y0 - y)[:, None]
+        dx = (np.arange(w) + self.x0 - x)[None, :]
+        return dx * dx + dy * dy <= radius * radius
+
+    def ray_distances(self, x: int, y: int, directions: Sequence[Tuple[float, float]], max_dist: int,
+                      unknown_blocks: bool = False) -> np.ndarray:
+        """
+        For each direction, steps 1..max_dist from (x, y) and returns the first step that
+        hits a blocking tile (known and not walkable; unknown too if `unknown_blocks`),
+        or max_dist if none does. Cells outside the window count as unknown.
+        """
+        dirs = np.asarray(directions, dtype=float).reshape(-1, 2)
+        steps = np.arange(1, max_dist + 1, dtype=float)
+        px = np.floor(x + dirs[:, 0:1] * steps + 0.5).astype(np.int64) - self.x0
+        py = np.floor(y + dirs[:, 1:2] * steps + 0.5).astype(np.int64) - self.y0
+        h, w = self.shape
+        inside = (px >= 0) & (px < w) & (py >= 0) & (py < h)
+        pxc, pyc = np.clip(px, 0, max(w - 1, 0)), np.clip(py, 0, max(h - 1, 0))
+        known = inside & self.known[pyc, pxc] if h and w else np.zeros_like(inside)
+        walkable = self.walkable[pyc, pxc] if h and w else np.zeros_like(inside)
+        blocked = known & ~walkable
+        if unknown_blocks:
+            blocked |= ~known
+        first = np.argmax(blocked, axis=1)
+        return np.where(blocked.any(axis=1), first + 1, max_dist).astype(np.int32)
@@ -0,0 +1,222 @@
+"""
+Versioned grid snapshot stream.
+
+`GridSystem` stamps a chunk with the next version whenever its tiles are written. Each
+snapshot the runtime appends only the chunks changed since the previous one, as a single
+JSON line, to a stream file (`GridStreamWriter`). The first line of a stream file is a base
+holding every loaded chunk; once the file has grown to a few times the size of its base, the
+next publish starts a new file with a fresh base, so snapshot cost follows what changed and
+not how much of the map has been explored.
+
+The debug server tails the file (`GridStreamReader`), keeps the newest tiles per chunk and
+answers "what changed since version N", so the web UI only fetches changed chunks.
+
+Line format:
+    {"stream": id, "version": v, "base": bool, "timestamp": t,
+     "chunks": {"cx,cy,z": {"v": chunk version, "tiles": [tile dicts]}}}
+
+`stream` identifies the runtime session: versions only compare within one stream.
+"""
+import os
+import json
+import time
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (chunk key, chunk version, tile dicts)
+ChunkDelta = Tuple[Tuple[int, ...], int, List[Dict[str, Any]]]
+
+def chunk_id(key: Tuple[int, ...]) -> str:
+    return ",".join(str(k) for k in key)
+
+class GridStreamWriter:
+    """Runtime side: appends per-chunk deltas, starting a new file with a base when it got large."""
+    def __init__(self, path: Path, rebase_ratio: float = 4.0, min_rebase_bytes: int = 4 * 1024 * 1024):
+        self.path = Path(path)
+        self.stream = str(time.time_ns())
+        self.rebase_ratio = rebase_ratio
+        self.min_rebase_bytes = min_rebase_bytes
+        self.version = 0 # Newest version published
+        self.base_bytes = 0
+        self.file_bytes = 0
+        self.has_base = False
+
+        self.publishes = 0
+        self.bases = 0
+        self.chunks_sent = 0
+        self.last_bytes = 0
+
+    def needs_base(self) -> bool:
+        """True when the next publish should be a base with every loaded chunk."""
+        if not self.has_base:
+            return True
+        limit = max(self.min_rebase_bytes, self.base_bytes * self.rebase_ratio)
+        return self.file_bytes > limit
+
+    def line(self, version: int, chunks: List[ChunkDelta], base: bool) -> bytes:
+        record = {
+            "stream": self.stream,
+            "version": version,
+            "base": base,
+            "timestamp": time.time(),
+            "chunks": {chunk_id(key): {"v": v, "tiles": tiles} for key, v, tiles in chunks},
+        }
+        return (json.dumps(record) + "\n").encode('utf-8')
+
+    def publish(self, version: int, chunks: List[ChunkDelta], base: bool = False) -> bool:
+        """
+        Writes one stream line. A base replaces the file (temp file + os.replace), a delta is
+        appended. Nothing is written for an empty delta. False if the file could not be written.
+        """
+        if not base and not chunks:
+            self.version = max(self.version, version)
+            return True
+        data = self.line(version, chunks, base)
+
+        # Retry mechanism for file locking (WinError 32): the debug server reads the same file
+        for attempt in range(3):
+            try:
+                if base:
+                    temp_path = str(self.path) + ".tmp"
+                    with open(temp_path, 'wb') as f:
+                        f.write(data)
+                    os.replace(temp_path, self.path)
+                    self.file_bytes = self.base_bytes = len(data)
+                    self.has_base = True
+                    self.bases += 1
+                else:
+                    with open(self.path, 'ab') as f:
+                        f.write(data)
+                    self.file_bytes += len(data)
+                break
+            except OSError as e:
+                if attempt < 2:
+                    time.sleep(0.1)
+                    continue
+                logger.error(f"Failed to publish grid stream (OS Error): {e}")
+                return False
+
+        self.version = version
+        self.publishes += 1
+        self.chunks_sent += len(chunks)
+        self.last_bytes = len(data)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"version": self.version, "publishes": self.publishes, "bases": self.bases,
+                "chunks_sent": self.chunks_sent, "file_bytes": self.file_bytes, "last_bytes": self.last_bytes}
+
+class GridStreamReader:
+    """
+    Debug server side: tails a stream file and keeps the newest tiles of every chunk seen,
+    including chunks the runtime has since evicted.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.stream: Optional[str] = None
+        self.version = 0
+        self._bounds: Optional[List[int]] = None # [min_x, max_x, min_y, max_y]; tiles are never forgotten
+        self._offset = 0
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._partial = b""
+        # chunk id -> (version, tiles), oldest version first
+        self._chunks: 'OrderedDict[str, Tuple[int, List[Dict[str, Any]]]]' = OrderedDict()
+
+    def _reset(self):
+        self.stream = None
+        self.version = 0
+        self._bounds = None
+        self._chunks.clear()
+
+    def poll(self) -> int:
+        """Reads lines appended since the last poll. Returns how many were applied."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return 0
+        file_id = (st.st_dev, st.st_ino)
+        if file_id != self._file_id or st.st_size < self._offset:
+            # New file (rebased or a new runtime): read it from the start
+            self._file_id = file_id
+            self._offset = 0
+            self._partial = b""
+        if st.st_size == self._offset:
+            return 0
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return 0
+        self._offset += len(data)
+
+        data = self._partial + data
+        end = data.rfind(b"\n")
+        if end < 0:
+            self._partial = data
+            return 0
+        self._partial = data[end + 1:]
+        applied = 0
+        for raw in data[:end].split(b"\n"):
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                logger.warning("Skipping unreadable grid stream line")
+                continue
+            self.apply(record)
+            applied += 1
+        return applied
+
+    def apply(self, record: Dict[str, Any]):
+        if record.get("stream") != self.stream:
+            self._reset()
+            self.stream = record.get("stream")
+        # Base lines repeat chunks a reader may already have: only newer versions count
+        items = sorted(record.get("chunks", {}).items(), key=lambda kv: kv[1].get("v", 0))
+        for cid, chunk in items:
+            v = chunk.get("v", 0)
+            known = self._chunks.get(cid)
+            if known is not None and known[0] >= v:
+                continue
+            tiles = chunk.get("tiles", [])
+            self._chunks[cid] = (v, tiles)
+            self._chunks.move_to_end(cid)
+            self._grow_bounds(tiles)
+        self.version = max(self.version, record.get("version", 0))
+
+    def _grow_bounds(self, tiles: List[Dict[str, Any]]):
+        if not tiles:
+            return
+        xs = [t["x"] for t in tiles]
+        ys = [t["y"] for t in tiles]
+        if self._bounds is None:
+            self._bounds = [min(xs), max(xs), min(ys), max(ys)]
+            return
+        b = self._bounds
+        b[0], b[1] = min(b[0], min(xs)), max(b[1], max(xs))
+        b[2], b[3] = min(b[2], min(ys)), max(b[3], max(ys))
+
+    def bounds(self) -> Dict[str, int]:
+        b = self._bounds or [0, 0, 0, 0]
+        return {"min_x": b[0], "max_x": b[1], "min_y": b[2], "max_y": b[3]}
+
+    def since(self, version: int = 0, stream: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Chunks changed after `version`. A client on another stream, or one that has not
+        fetched anything yet (version 0), gets every chunk with `full` set.
+        """
+        full = stream != self.stream or version <= 0
+        chunks = {}
+        for cid in reversed(self._chunks):
+            v, tiles = self._chunks[cid]
+            if not full and v <= version:
+                break # Ordered by version: the rest is older
+            chunks[cid] = tiles
+        return {"stream": self.stream, "version": self.version, "full": full,
+                "bounds": self.bounds(), "chunks": chunks}
@@ -3,28 +3,80 @@ import json
 import time
 import logging
 import threading
-from typing import Dict, List, Any, Optional, Tuple
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from pathlib import Path
 from pydantic import BaseModel
+import numpy as np
 
-from ..types import TileData, GridChunkData
+from bot_runtime.ingest.lazy import LazyList
+from bot_runtime.ingest.tiles import TileBlock, tile_block, ROOMS, NO_ID
+
+from .grid_chunk import GridChunk, TileView, CHUNK_SIZE
+from .region_file import RegionStore
 from .memory_objects import GridChunkMemory
+from .chunk_cache import ChunkCache
+from .chunk_writer import ChunkWriter, WriteItem
+from .chunk_prefetch import ChunkPrefetcher, chunks_ahead
+from .grid_stream import GridStreamWriter, ChunkDelta
+from .grid_query import GridWindow, TileColumns
+from ...config import settings
 
 logger = logging.getLogger(__name__)
 
-CHUNK_SIZE = 10
+def chunk_name(key: Tuple[int, int, int]) -> str:
+    return f"chunk_{key[0]}_{key[1]}_{key[2]}"
+
+def frame_block(tiles: Sequence[Any]) -> TileBlock:
+    """The frame's `TileBlock`. Plain tile dicts may leave out z (0) and w (walkable)."""
+    if isinstance(tiles, LazyList):
+        return tile_block(tiles)
+    try:
+        return TileBlock.from_rows(tiles)
+    except KeyError:
+        return TileBlock.from_rows([{'z': 0, 'w': True, **t} for t in tiles])
 
 class GridSystem:
     """
-    Manages the spatial grid using 10x10 Chunks.
-    Handles persistence to disk to control memory usage.
+    Manages the spatial grid using 10x10 Chunks, one per floor: keys are (cx, cy, z).
+    Each chunk stores its tiles in a NumPy plane (see `grid_chunk.py`). Floors are
+    loaded, evicted and saved independently, so the upper floors of a tall building
+    page out while the player is downstairs.
+    Handles persistence to disk to control memory usage: loaded chunks live in an LRU
+    cache with a chunk/byte budget. Dirty chunks are written behind, by a background
+    `ChunkWriter`: the grid lock is never held during chunk file I/O. Chunks ahead of
+    the moving player are read in advance by a `ChunkPrefetcher`.
+    Snapshots publish only the chunks changed since the previous one (see `grid_stream.py`).
     """
-    def __init__(self, base_dir: Path):
+    def __init__(self, base_dir: Path, max_chunks: Optional[int] = None, max_bytes: Optional[int] = None,
+                 ttl_ms: Optional[int] = None, write_behind: Optional[bool] = None,
+                 prefetch_tiles: Optional[int] = None):
         self.data_dir = base_dir / "data" / "chunks"
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.store = RegionStore(self.data_dir)
         
-        self.chunks: Dict[Tuple[int, int], GridChunkMemory] = {}
+        self.chunks = ChunkCache(
+            max_chunks=settings.GRID_CACHE_MAX_CHUNKS if max_chunks is None else max_chunks,
+            max_bytes=settings.GRID_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes,
+            ttl_ms=settings.GRID_CACHE_TTL_MS if ttl_ms is None else ttl_ms,
+        )
+        self.writer = ChunkWriter(self._write_chunks, max_queue=settings.GRID_WRITE_QUEUE)
+        self.write_behind = settings.GRID_WRITE_BEHIND if write_behind is None else write_behind
+        self.prefetcher = ChunkPrefetcher(self._read_chunk)
+        self.prefetch_tiles = settings.GRID_PREFETCH_TILES if prefetch_tiles is None else prefetch_tiles
         self._lock = threading.RLock()
+        self._updated_keys: Tuple[Tuple[int, int, int], ...] = () # Chunks in the last update: never evicted
+        self._evicting: Dict[Tuple[int, int, int], GridChunkMemory] = {} # Evicted dirty, not handed to the writer yet
+
+        # Snapshot stream: a version per write, chunks ordered by the version they last changed at
+        self.version = 0
+        self._chunk_versions: 'OrderedDict[Tuple[int, int, int], int]' = OrderedDict()
+        self._stream: Optional[GridStreamWriter] = None
+        # Chunks ordered by the version their walkability (new tiles, walkable flips) last changed at
+        self._walk_versions: 'OrderedDict[Tuple[int, int, int], int]' = OrderedDict()
+        # Tiles whose walkability changed, per update: (version, [[x, y, z, walkable], ...])
+        self._tile_log: deque = deque(maxlen=settings.GRID_TILE_LOG)
+        self._tile_log_floor = 0 # Version of the newest entry dropped from the log
         
         # Bounds of currently loaded area
         self.min_x = 0
@@ -33,91 +85,247 @@ class GridSystem:
         self.max_y = 0
 
     def update(self, visible_tiles: List[Any], timestamp: int):
+        """
+        Merges a frame's vision tiles into the grid in one batch: the frame's `TileBlock`
+        is grouped by chunk and z-level with vectorized floor division, and bounds are
+        updated once. Tiles whose walkable/room/layer did not change only get a new
+        last_seen stamp, and a chunk without changes is neither dirtied nor re-published.
+        """
         if not visible_tiles: return
-        
-        chunk_updates: Dict[Tuple[int, int], List[Any]] = {}
-        
-        for t in visible_tiles:
-            if hasattr(t, 'dict'): t_data = t.dict()
-            else: t_data = t
-            x, y = t_data['x'], t_data['y']
-            
-            # Update bounds
-            self.min_x = min(self.min_x, x)
-            self.max_x = max(self.max_x, x)
-            self.min_y = min(self.min_y, y)
-            self.max_y = max(self.max_y, y)
-
-            cx = x // CHUNK_SIZE
-            cy = y // CHUNK_SIZE
-            key = (cx, cy)
-            
-            if key not in chunk_updates:
-                chunk_updates[key] = []
-            chunk_updates[key].append(t_data)
+        block = frame_block(visible_tiles)
+        n = len(block)
+        if not n: return
+
+        x, y, z = block.x, block.y, block.z
+        self.min_x = min(self.min_x, int(x.min()))
+        self.max_x = max(self.max_x, int(x.max()))
+        self.min_y = min(self.min_y, int(y.min()))
+        self.max_y = max(self.max_y, int(y.max()))
+
+        # Sort rows by (chunk, z) and cut the runs
+        cx, cy = x // CHUNK_SIZE, y // CHUNK_SIZE
+        order = np.lexsort((z, cy, cx))
+        cx, cy, z = cx[order], cy[order], z[order]
+        sx, sy = x[order], y[order]
+        lx = sx - cx * CHUNK_SIZE
+        ly = sy - cy * CHUNK_SIZE
+        walkable = block.walkable[order]
+        room_id = block.room_id[order]
+        layer_id = block.layer_id[order]
+        cuts = np.flatnonzero((cx[1:] != cx[:-1]) | (cy[1:] != cy[:-1]) | (z[1:] != z[:-1])) + 1
+        starts = [0] + cuts.tolist()
+        ends = cuts.tolist() + [n]
+        run_cx, run_cy, run_z = cx[starts].tolist(), cy[starts].tolist(), z[starts].tolist()
 
+        updated = {}
+        flipped = np.zeros(n, dtype=bool)
         with self._lock:
-            for key, tiles in chunk_updates.items():
-                chunk = self._get_or_load_chunk(key[0], key[1])
-                for t_data in tiles:
-                    tile_key = f"{t_data['x']}_{t_data['y']}_{t_data.get('z',0)}"
-                    chunk.data.tiles[tile_key] = TileData(**t_data)
+            for k, (a, b) in enumerate(zip(starts, ends)):
+                key = (run_cx[k], run_cy[k], run_z[k])
+                chunk = self._get_or_load_chunk(*key)
                 chunk.last_seen = timestamp
-                chunk.is_dirty = True
+                updated[key] = chunk
+                changed, passable = chunk.data.write_block(key[2], ly[a:b], lx[a:b], walkable[a:b],
+                                                           room_id[a:b], layer_id[a:b], timestamp)
+                if changed:
+                    chunk.is_dirty = True
+                    self.chunks.resize(key)
+                    self._mark_changed(key)
+                if changed and passable.any():
+                    flipped[a:b] = passable
+                    self._walk_versions[key] = self.version
+                    self._walk_versions.move_to_end(key)
+            self._updated_keys = tuple(updated)
+            if flipped.any():
+                if len(self._tile_log) == self._tile_log.maxlen:
+                    self._tile_log_floor = self._tile_log[0][0]
+                self._tile_log.append((self.version, np.stack(
+                    [sx[flipped], sy[flipped], z[flipped], walkable[flipped].astype(np.int64)], axis=1)))
 
-    def _get_or_load_chunk(self, cx: int, cy: int) -> GridChunkMemory:
+    def _get_or_load_chunk(self, cx: int, cy: int, z: int = 0) -> GridChunkMemory:
         # Assumes Lock is held by caller
-        key = (cx, cy)
-        if key in self.chunks:
-            return self.chunks[key]
-        
+        key = (cx, cy, z)
+        memory = self.chunks.get(key)
+        if memory is None:
+            memory = self._load_chunk(cx, cy, z)
+            self.chunks.put(key, memory)
+            self.prefetcher.discard(key)
+            self._mark_changed(key) # Newly visible to snapshot readers
+        return memory
+
+    def _read_chunk(self, key: Tuple[int, int, int]) -> Optional[GridChunkMemory]:
+        # Region file read: no grid lock needed (the store has its own)
+        chunk_data = self.store.load(*key)
+        if chunk_data is None:
+            return None
+        return GridChunkMemory(chunk_name(key), chunk_data)
+
+    def prefetch(self, x: float, y: float, vx: float, vy: float, z: int = 0, radius: Optional[int] = None) -> int:
+        """
+        Requests background reads of the chunks on floor `z` the player at (x, y), moving at
+        (vx, vy) tiles/s, will see within the next `prefetch_tiles` tiles. Returns how many were queued.
+        """
+        if self.prefetch_tiles <= 0:
+            return 0
+        radius = settings.VISION_RADIUS_GRID if radius is None else radius
+        keys = chunks_ahead(x, y, vx, vy, self.prefetch_tiles, radius, z=int(z))
+        if not keys:
+            return 0
+        with self._lock:
+            # Loaded or being written back: the grid's copy is newer than the disk
+            keys = [k for k in keys if k not in self.chunks and k not in self._evicting
+                    and self.writer.pending_chunk(k) is None]
+            return self.prefetcher.request(keys)
+
+    def _mark_changed(self, key: Tuple[int, int, int]):
+        # Assumes Lock is held by caller
+        self.version += 1
+        self._chunk_versions[key] = self.version
+        self._chunk_versions.move_to_end(key)
+
+    def chunk_version(self, key: Tuple[int, int, int]) -> Optional[int]:
+        """
+        Grid version at which the loaded chunk `key` last changed (-1 if not since it was
+        loaded); None if it is not loaded. Caches derived from a chunk compare this.
+        """
+        with self._lock:
+            if key not in self.chunks:
+                return None
+            return self._chunk_versions.get(key, -1)
+
+    def walkability_changes_since(self, version: int) -> Tuple[int, List[Tuple[int, int, int]]]:
+        """
+        (current version, keys of the chunks whose walkability changed after `version`),
+        newest first. O(changed), like `changes_since`; evicted chunks are included.
+        """
+        keys = []
+        with self._lock:
+            for key in reversed(self._walk_versions):
+                if self._walk_versions[key] <= version:
+                    break
+                keys.append(key)
+            return self.version, keys
+
+    def tile_changes_since(self, version: int) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        (current version, [[x, y, z, walkable], ...] of the tiles that became known or flipped
+        walkable after `version`, oldest first). The array is None when the log no longer
+        reaches back to `version` (GRID_TILE_LOG updates are kept): re-read the area instead.
+        """
+        with self._lock:
+            if version < self._tile_log_floor:
+                return self.version, None
+            parts = []
+            for v, tiles in reversed(self._tile_log):
+                if v <= version:
+                    break
+                parts.append(tiles)
+            if not parts:
+                return self.version, np.empty((0, 4), dtype=np.int64)
+            return self.version, np.concatenate(parts[::-1])
+
+    def changes_since(self, version: int) -> Tuple[int, List[ChunkDelta]]:
+        """
+        (current version, [(key, chunk version, tile dicts)]) for loaded chunks changed after
+        `version`, newest first. Walks back from the newest change, so the cost is O(changed).
+        """
+        changes = []
+        with self._lock:
+            for key in reversed(self._chunk_versions):
+                v = self._chunk_versions[key]
+                if v <= version:
+                    break
+                if key in self.chunks:
+                    changes.append((key, v, [t.dict() for t in self.chunks[key].data.tiles()]))
+            return self.version, changes
+
+    def _load_chunk(self, cx: int, cy: int, z: int) -> GridChunkMemory:
+        key = (cx, cy, z)
+        # Evicted but not written yet: the in-flight copy is the current one
+        memory = self._evicting.pop(key, None) or self.writer.pending_chunk(key)
+        if memory is not None:
+            return memory
+        memory = self.prefetcher.take(key)
+        if memory is not None:
+            return memory
+
+        try:
+            memory = self._read_chunk(key)
+            if memory is not None:
+                self.prefetcher.miss() # Disk read on the tick path
+                return memory
+        except Exception as e:
+            logger.error(f"Failed to load chunk {cx},{cy},{z} from region file: {e}")
+
+        # Saved as a whole column (before floors were split, or as JSON before region files):
+        # this floor is taken out and saved to its own region file
+        column = None
+        try:
+            column = self.store.load_column(cx, cy)
+        except Exception as e:
+            logger.error(f"Failed to load chunk column {cx},{cy} from region file: {e}")
         chunk_file = self.data_dir / f"chunk_{cx}_{cy}.json"
-        if chunk_file.exists():
+        if column is None and chunk_file.exists():
             try:
                 with open(chunk_file, 'r') as f:
                     data = json.load(f)
-                    chunk_data = GridChunkData(**data)
-                    memory = GridChunkMemory(f"chunk_{cx}_{cy}", chunk_data)
-                    self.chunks[key] = memory
-                    return memory
+                    column = GridChunk.from_dict(data)
             except Exception as e:
                 logger.error(f"Failed to load chunk {cx},{cy}: {e}")
+        chunk_data = column.floor(z) if column is not None else None
+        if chunk_data is not None:
+            memory = GridChunkMemory(chunk_name(key), chunk_data)
+            memory.is_dirty = True
+            return memory
         
-        new_data = GridChunkData(chunk_x=cx, chunk_y=cy)
-        memory = GridChunkMemory(f"chunk_{cx}_{cy}", new_data)
-        self.chunks[key] = memory
-        return memory
+        new_data = GridChunk(cx, cy, int(time.time() * 1000))
+        return GridChunkMemory(chunk_name(key), new_data)
 
-    def save_snapshot(self, path: str, additional_data: Dict[str, Any] = None):
+    def floors(self) -> Dict[int, int]:
+        """Loaded chunk count per floor."""
         with self._lock:
-            # 1. Update Dirty Chunks to Disk
-            for key, chunk in self.chunks.items():
-                if chunk.is_dirty:
-                    self._save_chunk_to_disk(chunk)
-
-            # 2. Generate flat snapshot
-            all_tiles = []
-            min_x, max_x, min_y, max_y = 999999, -999999, 999999, -999999
-            has_data = False
-
-            for chunk in self.chunks.values():
-                for t in chunk.data.tiles.values():
-                    all_tiles.append(t.dict())
-                    min_x = min(min_x, t.x)
-                    max_x = max(max_x, t.x)
-                    min_y = min(min_y, t.y)
-                    max_y = max(max_y, t.y)
-                    has_data = True
-            
+            return self.chunks.floors()
+
+    def mapped_ratio(self, x: int, y: int, z: int, chunk_radius: int = 2) -> float:
+        """
+        Share of the chunks within `chunk_radius` of (x, y) that are loaded with known
+        tiles on floor `z`. Only floor `z` is looked at.
+        """
+        cx0, cy0 = int(x) // CHUNK_SIZE, int(y) // CHUNK_SIZE
+        total = (2 * chunk_radius + 1) ** 2
+        known = 0
+        with self._lock:
+            floor = self.chunks.floor(int(z))
+            for cx in range(cx0 - chunk_radius, cx0 + chunk_radius + 1):
+                for cy in range(cy0 - chunk_radius, cy0 + chunk_radius + 1):
+                    if (cx, cy) in floor and self.chunks[(cx, cy, int(z))].data.tile_count():
+                        known += 1
+        return known / total
+
+    def save_snapshot(self, path: str, additional_data: Dict[str, Any] = None, stream_path: Optional[str] = None):
+        """
+        Publishes the grid to readers. Tiles go to the snapshot stream (`stream_path`, by default
+        `grid_stream.jsonl` next to `path`) as the chunks changed since the last snapshot; `path`
+        gets the small JSON document with the stream position and `additional_data`.
+        """
+        stream_path = Path(stream_path) if stream_path else Path(path).with_name("grid_stream.jsonl")
+        with self._lock:
+            # 1. Queue Dirty Chunks for the writer (a full queue leaves them dirty for next time)
+            self.flush_dirty()
+
+            # 2. Collect changed chunks (every loaded chunk for a base)
+            if self._stream is None or self._stream.path != stream_path:
+                self._stream = GridStreamWriter(stream_path)
+            stream = self._stream
+            base = stream.needs_base()
+            version, changes = self.changes_since(0 if base else stream.version)
+
+        stream.publish(version, changes, base=base)
+
         snapshot = {
             "timestamp": time.time(),
-            "tiles": all_tiles,
-            "bounds": {
-                "min_x": min_x if has_data else 0,
-                "max_x": max_x if has_data else 0,
-                "min_y": min_y if has_data else 0,
-                "max_y": max_y if has_data else 0
-            }
+            "stream": stream.stream,
+            "version": stream.version
         }
         
         if additional_data:
@@ -152,46 +360,142 @@ class GridSystem:
         if saved:
             ent_count = len(snapshot.get('entities', []))
             sig_count = len(snapshot.get('signals', []))
-            logger.info(f"Saved snapshot with {len(all_tiles)} tiles, {ent_count} entities, {sig_count} signals")
+            kind = "base" if base else "delta"
+            logger.info(f"Saved snapshot v{version} ({kind}: {len(changes)} chunks), {ent_count} entities, {sig_count} signals")
 
-    def _save_chunk_to_disk(self, chunk: GridChunkMemory):
-        path = self.data_dir / f"chunk_{chunk.data.chunk_x}_{chunk.data.chunk_y}.json"
-        try:
-            with open(path, 'w') as f:
-                f.write(chunk.data.model_dump_json())
-            chunk.is_dirty = False
-        except Exception as e:
-            logger.error(f"Failed to save chunk disk: {e}")
+    def _write_back(self, key: Tuple[int, int, int], chunk: GridChunkMemory, block: bool) -> bool:
+        """Serializes a dirty chunk (lock held) and queues it, or saves it right away without write-behind."""
+        blob = chunk.data.to_bytes()
+        if self.write_behind:
+            if not self.writer.submit(key, chunk, blob, block=block):
+                return False
+        else:
+            try:
+                self.store.save_blob(key[0], key[1], key[2], blob)
+            except Exception as e:
+                logger.error(f"Failed to save chunk disk: {e}")
+                return False
+        chunk.is_dirty = False
+        return True
+
+    def _write_chunks(self, batch: List[WriteItem]):
+        # Writer thread, grid lock not held
+        self.store.save_blobs((key[0], key[1], key[2], blob) for key, _, blob in batch)
+
+    def flush_dirty(self, block: bool = False) -> int:
+        """Hands every dirty chunk to the writer. Returns how many were queued."""
+        queued = 0
+        with self._lock:
+            for key, chunk in self.chunks.items():
+                if chunk.is_dirty and self._write_back(key, chunk, block):
+                    queued += 1
+        return queued
+
+    def close(self):
+        """Writes every dirty chunk, waits for the writer and closes the region files (fsynced)."""
+        self.prefetcher.stop()
+        self.flush_dirty(block=True)
+        self.writer.stop()
+        self.store.close()
 
     def maintenance(self):
+        """Evicts chunks over the cache budget or past the TTL, least recently used first."""
         now = int(time.time() * 1000)
-        keys_to_remove = []
-        
+        leaving = []
         with self._lock:
-            for key, chunk in self.chunks.items():
-                age = now - chunk.last_seen
-                if age > chunk.get_ttl():
-                    if chunk.is_dirty:
-                        self._save_chunk_to_disk(chunk)
-                    keys_to_remove.append(key)
-            
-            for k in keys_to_remove:
-                del self.chunks[k]
+            for key, chunk in self.chunks.evict(now, keep=self._updated_keys):
+                self._chunk_versions.pop(key, None) # Reloading re-publishes it
+                self.prefetcher.discard(key)
+                if chunk.is_dirty:
+                    if self.write_behind:
+                        # Loads find it here until the writer has it
+                        self._evicting[key] = chunk
+                        leaving.append((key, chunk, chunk.data.to_bytes()))
+                    else:
+                        self._write_back(key, chunk, block=True)
+        # Leaving memory: wait for room rather than drop it, without holding up readers
+        for key, chunk, blob in leaving:
+            self.writer.submit(key, chunk, blob, block=True)
+            with self._lock:
+                if self._evicting.pop(key, None) is chunk:
+                    chunk.is_dirty = False
+                # else: loaded back meanwhile, and maybe changed since the blob: stays dirty
 
-    def get_stats(self) -> Dict[str, int]:
-        total_tiles = sum(len(c.data.tiles) for c in self.chunks.values())
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total_tiles = sum(c.data.tile_count() for c in self.chunks.values())
+            cache = self.chunks.get_stats()
         return {
             "total_tiles": total_tiles,
-            "loaded_chunks": len(self.chunks)
+            "loaded_chunks": cache["chunks"],
+            "tile_bytes": cache["bytes"],
+            "cache": cache,
+            "writer": self.writer.get_stats(),
+            "prefetch": self.prefetcher.get_stats(),
+            "stream": self._stream.get_stats() if self._stream else None
         }
 
-    def get_tile(self, x: int, y: int, z: int) -> Optional[Any]:
+    def get_tile(self, x: int, y: int, z: int) -> Optional[TileView]:
         cx = int(x) // CHUNK_SIZE
         cy = int(y) // CHUNK_SIZE
-        key = (cx, cy)
+        key = (cx, cy, int(z))
         
         with self._lock:
             if key in self.chunks:
-                tile_key = f"{int(x)}_{int(y)}_{int(z)}"
-                return self.chunks[key].data.tiles.get(tile_key)
+                return self.chunks[key].data.get(int(x), int(y), int(z))
         return None
+
+    # --- Spatial queries: one lock acquisition each, arrays out (see grid_query) ---
+
+    def window(self, x0: int, y0: int, x1: int, y1: int, z: int) -> GridWindow:
+        """Dense copy of the box [x0, x1] x [y0, y1] (inclusive) of floor `z`."""
+        win = GridWindow(int(x0), int(y0), int(x1), int(y1), int(z))
+        with self._lock:
+            self._fill(win)
+        return win
+
+    def _fill(self, win: GridWindow):
+        floor = self.chunks.floor(win.z)
+        for cx, cy in win.chunk_keys():
+            if (cx, cy) in floor:
+                win.fill(self.chunks[(cx, cy, win.z)].data)
+
+    def query_box(self, x0: int, y0: int, x1: int, y1: int, z: int) -> TileColumns:
+        """Known tiles in the box [x0, x1] x [y0, y1] (inclusive) of floor `z`."""
+        return self.window(x0, y0, x1, y1, z).columns()
+
+    def query_radius(self, x: float, y: float, radius: float, z: int) -> TileColumns:
+        """Known tiles of floor `z` within `radius` tiles (Euclidean) of (x, y)."""
+        r = int(np.ceil(radius))
+        win = self.window(int(x) - r, int(y) - r, int(x) + r, int(y) + r, z)
+        return win.columns(win.disk(x, y, radius))
+
+    def raycast(self, x: int, y: int, z: int, directions: Sequence[Tuple[float, float]], max_dist: int,
+                unknown_blocks: bool = False) -> np.ndarray:
+        """
+        Distance along each of `directions` to the first blocking tile (known and not walkable;
+        unknown too if `unknown_blocks`), max_dist if the ray is clear. One int per direction.
+        """
+        x, y = int(x), int(y)
+        win = self.window(x - max_dist, y - max_dist, x + max_dist, y + max_dist, z)
+        return win.ray_distances(x, y, directions, max_dist, unknown_blocks)
+
+    def tiles_in_room(self, room: str, z: int) -> TileColumns:
+        """Known tiles of floor `z` in `room`, across the loaded chunks."""
+        rid = ROOMS.lookup(room)
+        if rid == NO_ID:
+            return TileColumns.empty(int(z))
+        z = int(z)
+        parts: List[TileColumns] = []
+        with self._lock:
+            for cx, cy in self.chunks.floor(z):
+                p = self.chunks[(cx, cy, z)].data.planes.get(z)
+                if p is None:
+                    continue
+                sel = p.known & (p.room_id == rid)
+                if not sel.any():
+                    continue
+                ly, lx = np.nonzero(sel)
+                parts.append(TileColumns((lx + cx * CHUNK_SIZE).astype(np.int32), (ly + cy * CHUNK_SIZE).astype(np.int32),
+                                         z, p.walkable[sel], p.room_id[sel], p.layer_id[sel], p.last_seen[sel]))
+        return TileColumns.concat(parts, z)
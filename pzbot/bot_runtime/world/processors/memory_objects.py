@@ -2,6 +2,7 @@ import time
 import logging
 from typing import Dict, Any, Optional
 from ..types import EntityData, TileData, GridChunkData
+from .grid_chunk import GridChunk
 from ...config import settings
 
 logger = logging.getLogger(__name__)
@@ -118,18 +119,18 @@ class GridChunkMemory(MemoryObject):
     Map Chunks (10x10 Tiles).
     Persisted to disk, managed by RAM cache.
     """
-    def __init__(self, chunk_id: str, data: GridChunkData):
+    def __init__(self, chunk_id: str, data: GridChunk):
         super().__init__(chunk_id, data)
         self.is_dirty = False # Needs save to disk
 
-    def update(self, data: GridChunkData):
+    def update(self, data: GridChunk):
         self.data = data
         self.last_seen = int(time.time() * 1000)
         self.is_dirty = True
 
     def get_ttl(self) -> int:
-        # RAM Cache TTL. If not visited for 5 minutes, unload (save if dirty).
-        return 300 * 1000
+        # RAM Cache TTL. If not visited for 5 minutes, unload (save if dirty). See ChunkCache.
+        return settings.GRID_CACHE_TTL_MS
 
 class GlobalFloorMemory(MemoryObject):
     """
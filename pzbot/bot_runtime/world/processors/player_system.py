@@ -1,5 +1,6 @@
+import time
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 from bot_runtime.ingest.state import Player
 
 logger = logging.getLogger(__name__)
@@ -7,18 +8,46 @@ logger = logging.getLogger(__name__)
 class PlayerSystem:
     """
     Manages the player's self-state (position, vitals, inventory).
+    Also estimates the player's velocity from successive positions.
     """
+    VELOCITY_SMOOTHING = 0.5 # Weight of the newest sample
+    MAX_SPEED = 20.0 # Tiles/s; faster means a teleport or a load, not movement
+
     def __init__(self):
         self.state: Optional[Player] = None
+        self.velocity: Tuple[float, float] = (0.0, 0.0) # Tiles per second
+        self._last_pos: Optional[Tuple[float, float, float]] = None
+        self._last_time: Optional[float] = None
 
-    def update(self, player_state: Player):
+    def update(self, player_state: Player, timestamp: Optional[float] = None):
+        """`timestamp` is the frame time in ms (defaults to now)."""
         self.state = player_state
+        now = timestamp if timestamp else time.time() * 1000.0
+        pos = player_state.position
+        current = (pos.x, pos.y, pos.z)
+
+        if self._last_pos is not None and self._last_time is not None and now > self._last_time:
+            dt = (now - self._last_time) / 1000.0
+            vx = (current[0] - self._last_pos[0]) / dt
+            vy = (current[1] - self._last_pos[1]) / dt
+            if current[2] != self._last_pos[2] or (vx * vx + vy * vy) > self.MAX_SPEED ** 2:
+                self.velocity = (0.0, 0.0)
+            else:
+                a = self.VELOCITY_SMOOTHING
+                self.velocity = (a * vx + (1 - a) * self.velocity[0], a * vy + (1 - a) * self.velocity[1])
+        if self._last_time is None or now > self._last_time:
+            self._last_pos = current
+            self._last_time = now
 
     def get_position(self):
         if self.state:
             return self.state.position
         return None
-        
+
+    def get_velocity(self) -> Tuple[float, float]:
+        """Smoothed (vx, vy) in tiles per second."""
+        return self.velocity
+
     @property
     def is_ready(self) -> bool:
         return self.state is not None
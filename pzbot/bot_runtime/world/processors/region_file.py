@@ -0,0 +1,258 @@
+"""
+Region files: REGION_SIZE x REGION_SIZE grid chunks packed into one binary file.
+
+Replaces one `chunk_{cx}_{cy}.json` per chunk, which left tens of thousands of tiny files
+after a long session. Layout (little endian):
+
+    header  "PZRF" | version u32 | region_size u32 | pad
+    table   REGION_SIZE^2 entries of offset u64 | length u32 | capacity u32  (0 = no chunk)
+    data    chunk blobs (`GridChunk.to_bytes`)
+
+A chunk blob is rewritten in place when it fits its slot's capacity and appended at the
+end of the file otherwise; the table entry is updated after the blob is written. Space
+left behind by moved blobs is reclaimed by `compact()` once it exceeds half the file.
+Reads go through a read-only mmap, so loading a chunk touches only its own pages.
+Writes are buffered until `flush()`; `flush(durable=True)` also fsyncs.
+"""
+import os
+import mmap
+import struct
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from .grid_chunk import GridChunk
+
+logger = logging.getLogger(__name__)
+
+REGION_SIZE = 32 # Chunks per side: 320x320 tiles per file
+
+MAGIC = b"PZRF"
+VERSION = 1
+HEADER = struct.Struct("<4sII4x")
+ENTRY = struct.Struct("<QII")
+TABLE_OFFSET = HEADER.size
+DATA_OFFSET = TABLE_OFFSET + REGION_SIZE * REGION_SIZE * ENTRY.size
+
+SLACK = 1.25 # Appended slots get room to grow
+
+def region_of(cx: int, cy: int) -> Tuple[int, int]:
+    return cx // REGION_SIZE, cy // REGION_SIZE
+
+class RegionFile:
+    """One region file. Not thread-safe: `RegionStore` serializes access."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        new = not self.path.exists()
+        self._f = open(self.path, 'w+b' if new else 'r+b')
+        if new:
+            self._f.write(HEADER.pack(MAGIC, VERSION, REGION_SIZE))
+            self._f.write(bytes(DATA_OFFSET - TABLE_OFFSET))
+            self._f.flush()
+        else:
+            magic, version, size = HEADER.unpack(self._f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or size != REGION_SIZE:
+                self._f.close()
+                raise ValueError(f"{self.path} is not a v{VERSION} region file of {REGION_SIZE} chunks")
+
+        self._f.seek(TABLE_OFFSET)
+        table = self._f.read(DATA_OFFSET - TABLE_OFFSET)
+        self._table = [ENTRY.unpack_from(table, i * ENTRY.size) for i in range(REGION_SIZE * REGION_SIZE)]
+        self._map: Optional[mmap.mmap] = None
+        self._end = self._f.seek(0, os.SEEK_END)
+        self._unflushed = False
+
+    @staticmethod
+    def _index(cx: int, cy: int) -> int:
+        return (cy % REGION_SIZE) * REGION_SIZE + (cx % REGION_SIZE)
+
+    def _mapped(self) -> mmap.mmap:
+        if self._unflushed:
+            self.flush()
+        if self._map is None:
+            self._map = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __contains__(self, chunk: Tuple[int, int]) -> bool:
+        return self._table[self._index(*chunk)][1] > 0
+
+    def chunks(self) -> Iterator[Tuple[int, int]]:
+        """Local (cx % REGION_SIZE, cy % REGION_SIZE) of every stored chunk."""
+        for i, (_, length, _) in enumerate(self._table):
+            if length:
+                yield i % REGION_SIZE, i // REGION_SIZE
+
+    def read(self, cx: int, cy: int) -> Optional[bytes]:
+        offset, length, _ = self._table[self._index(cx, cy)]
+        if not length:
+            return None
+        return self._mapped()[offset:offset + length]
+
+    def load(self, cx: int, cy: int) -> Optional[GridChunk]:
+        blob = self.read(cx, cy)
+        return GridChunk.from_bytes(blob) if blob is not None else None
+
+    def write(self, cx: int, cy: int, blob: bytes):
+        i = self._index(cx, cy)
+        offset, _, capacity = self._table[i]
+        n = len(blob)
+        if n > capacity:
+            # Does not fit: append, leaving the old slot as garbage
+            offset, capacity = self._end, int(n * SLACK)
+            self._end += capacity
+        self._unmap() # Windows cannot extend a file that is mapped
+        self._f.seek(offset)
+        self._f.write(blob)
+        if offset + capacity > self._f.tell():
+            self._f.write(bytes(offset + capacity - self._f.tell()))
+        self._set_entry(i, (offset, n, capacity))
+        self._unflushed = True
+
+    def _set_entry(self, i: int, entry: Tuple[int, int, int]):
+        self._table[i] = entry
+        self._f.seek(TABLE_OFFSET + i * ENTRY.size)
+        self._f.write(ENTRY.pack(*entry))
+
+    def flush(self, durable: bool = False):
+        self._f.flush()
+        if durable:
+            os.fsync(self._f.fileno())
+        self._unflushed = False
+
+    @property
+    def data_bytes(self) -> int:
+        return self._end - DATA_OFFSET
+
+    @property
+    def garbage(self) -> int:
+        """Bytes of data not owned by any slot."""
+        return self.data_bytes - sum(e[2] for e in self._table)
+
+    def compact(self):
+        """Rewrites the file with only the live blobs (durable, atomic replace)."""
+        blobs = {i: bytes(self._mapped()[o:o + n]) for i, (o, n, _) in enumerate(self._table) if n}
+        self._unmap()
+        self._f.close()
+
+        tmp = self.path.with_suffix(".tmp")
+        table = [(0, 0, 0)] * (REGION_SIZE * REGION_SIZE)
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, REGION_SIZE))
+            f.write(bytes(DATA_OFFSET - TABLE_OFFSET))
+            for i, blob in blobs.items():
+                table[i] = (f.tell(), len(blob), len(blob))
+                f.write(blob)
+            f.seek(TABLE_OFFSET)
+            f.write(b"".join(ENTRY.pack(*e) for e in table))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+        self._f = open(self.path, 'r+b')
+        self._table = table
+        self._end = self._f.seek(0, os.SEEK_END)
+
+    def close(self):
+        self._unmap()
+        self.flush(durable=True)
+        self._f.close()
+
+class RegionStore:
+    """
+    Chunk persistence for `GridSystem`: a directory of `r.{rx}.{ry}.{z}.pzr` region files,
+    one set per floor, so floors are read and written independently.
+    Files from before floors were split (`r.{rx}.{ry}.pzr`, whole columns) are still read
+    through `load_column`, never written.
+    Region files are opened on first use and kept open. Thread-safe: the grid thread
+    loads while the background writer saves.
+    """
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._regions: Dict[Tuple[int, ...], RegionFile] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.saves = 0
+        self.compactions = 0
+
+    def path(self, rx: int, ry: int, z: int = 0) -> Path:
+        return self.data_dir / f"r.{rx}.{ry}.{z}.pzr"
+
+    def column_path(self, rx: int, ry: int) -> Path:
+        """Region file of whole-column chunks, from before floors were split."""
+        return self.data_dir / f"r.{rx}.{ry}.pzr"
+
+    def _region(self, cx: int, cy: int, z: Optional[int], create: bool) -> Optional[RegionFile]:
+        # z None: the old column file
+        rx, ry = region_of(cx, cy)
+        key = (rx, ry) if z is None else (rx, ry, z)
+        region = self._regions.get(key)
+        if region is None:
+            path = self.column_path(rx, ry) if z is None else self.path(rx, ry, z)
+            if not create and not path.exists():
+                return None
+            region = self._regions[key] = RegionFile(path)
+        return region
+
+    def _read(self, cx: int, cy: int, z: Optional[int]) -> Optional[GridChunk]:
+        with self._lock:
+            region = self._region(cx, cy, z, create=False)
+            blob = region.read(cx, cy) if region is not None else None
+        if blob is None:
+            return None
+        self.loads += 1
+        return GridChunk.from_bytes(blob)
+
+    def load(self, cx: int, cy: int, z: int = 0) -> Optional[GridChunk]:
+        """The stored chunk of floor `z`, or None if it was never saved."""
+        return self._read(cx, cy, z)
+
+    def load_column(self, cx: int, cy: int) -> Optional[GridChunk]:
+        """The whole-column chunk saved before floors were split, or None."""
+        return self._read(cx, cy, None)
+
+    def save(self, chunk: GridChunk, z: int = 0):
+        self.save_blob(chunk.chunk_x, chunk.chunk_y, z, chunk.to_bytes())
+
+    def save_blob(self, cx: int, cy: int, z: int, blob: bytes):
+        """Saves a chunk already serialized with `GridChunk.to_bytes`."""
+        self.save_blobs([(cx, cy, z, blob)])
+
+    def save_blobs(self, blobs: Iterable[Tuple[int, int, int, bytes]], durable: bool = False):
+        """Saves a batch of serialized (cx, cy, z, blob) chunks, flushing each touched region once."""
+        with self._lock:
+            touched = {}
+            for cx, cy, z, blob in blobs:
+                region = self._region(cx, cy, z, create=True)
+                region.write(cx, cy, blob)
+                touched[id(region)] = region
+                self.saves += 1
+            for region in touched.values():
+                if region.garbage * 2 > region.data_bytes:
+                    region.compact()
+                    self.compactions += 1
+                else:
+                    region.flush(durable)
+
+    def sync(self):
+        """fsyncs every open region file."""
+        with self._lock:
+            for region in self._regions.values():
+                region.flush(durable=True)
+
+    def close(self):
+        """Closes every region file (durably)."""
+        with self._lock:
+            for region in self._regions.values():
+                region.close()
+            self._regions.clear()
+
+    def get_stats(self) -> dict:
+        return {"regions": len(self._regions), "loads": self.loads, "saves": self.saves,
+                "compactions": self.compactions}
@@ -0,0 +1,355 @@
+"""
+Incremental room and building index, built from the room labels of vision tiles.
+
+A room is a 4-connected set of tiles with the same room label on one floor: two
+kitchens in two houses are two rooms. A building is a set of rooms joined by
+union-find whenever labelled tiles of different rooms touch (side by side, or
+directly above each other on adjacent floors). Unlabelled tiles (outdoors, walls
+the sensor reports without a room) separate buildings.
+
+Only tiles that the index has not seen yet do any work: a frame's labelled tiles
+are packed into int64 keys and looked up in the sorted array of indexed keys with one
+vectorized binary search (`np.searchsorted`), so a frame costs O(frame * log(indexed)),
+and only the new keys are merged in. A tile keeps the room it was first indexed under.
+
+Room and building centroids live in a spatial hash of BUCKET-tile cells, so the
+nearest (unvisited) room and the nearest building are found by searching outward
+from the query point's cell instead of scanning every room.
+
+The index is transient: it is rebuilt from vision after a restart, like `MemoryState`.
+"""
+import logging
+from typing import Collection, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from bot_runtime.ingest.tiles import TileBlock, ROOMS, NO_ID
+
+logger = logging.getLogger(__name__)
+
+BUCKET = 16 # Spatial hash cell, in tiles
+
+_OFFSET = 1 << 20 # Tile x/y -> non-negative, 21 bits each
+_Z_OFFSET = 1 << 7 # z -> 8 bits
+
+def pack_keys(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """One int64 per tile coordinate."""
+    return (((x.astype(np.int64) + _OFFSET) << 29) | ((y.astype(np.int64) + _OFFSET) << 8)
+            | (z.astype(np.int64) + _Z_OFFSET))
+
+class Room(NamedTuple):
+    id: int
+    name: str
+    z: int
+    x: float # Centroid
+    y: float
+    size: int # Tiles
+    building: int
+
+class Building(NamedTuple):
+    id: int
+    x: float # Centroid over all floors
+    y: float
+    size: int # Tiles
+    rooms: int
+    floors: Tuple[int, ...]
+
+class _Hash:
+    """Spatial hash of points (centroids) that move as their rooms grow."""
+    def __init__(self):
+        self.cells: Dict[Tuple[int, int], Set[int]] = {}
+        self.where: Dict[int, Tuple[int, int]] = {}
+        # Cell bounds ever occupied: they only grow, so the rings may run a little past the last cells
+        self.bounds: Optional[List[int]] = None # [min cx, min cy, max cx, max cy]
+
+    def put(self, item: int, x: float, y: float):
+        cell = (int(x) // BUCKET, int(y) // BUCKET)
+        old = self.where.get(item)
+        if old == cell:
+            return
+        if old is not None:
+            self.remove(item)
+        self.cells.setdefault(cell, set()).add(item)
+        self.where[item] = cell
+        b = self.bounds
+        if b is None:
+            self.bounds = [cell[0], cell[1], cell[0], cell[1]]
+        else:
+            b[0], b[1] = min(b[0], cell[0]), min(b[1], cell[1])
+            b[2], b[3] = max(b[2], cell[0]), max(b[3], cell[1])
+
+    def remove(self, item: int):
+        cell = self.where.pop(item, None)
+        if cell is not None:
+            items = self.cells[cell]
+            items.discard(item)
+            if not items:
+                del self.cells[cell]
+
+    def rings(self, x: float, y: float) -> Iterable[Tuple[int, List[int]]]:
+        """(k, items) for the cells at Chebyshev distance k = 0, 1, ... from (x, y)'s cell."""
+        if not self.cells:
+            return
+        qx, qy = int(x) // BUCKET, int(y) // BUCKET
+        x0, y0, x1, y1 = self.bounds
+        max_k = max(abs(x0 - qx), abs(x1 - qx), abs(y0 - qy), abs(y1 - qy))
+        cells = self.cells
+        for k in range(max_k + 1):
+            if 8 * k >= len(cells):
+                # Fewer cells left than the ring has: take the rest at once rather than walk empty rings
+                yield max_k, [i for (cx, cy), items in cells.items()
+                              if max(abs(cx - qx), abs(cy - qy)) >= k for i in items]
+                return
+            found: List[int] = []
+            if k == 0:
+                found.extend(cells.get((qx, qy), ()))
+            else:
+                for dx in range(-k, k + 1):
+                    found.extend(cells.get((qx + dx, qy - k), ()))
+                    found.extend(cells.get((qx + dx, qy + k), ()))
+                for dy in range(-k + 1, k):
+                    found.extend(cells.get((qx - k, qy + dy), ()))
+                    found.extend(cells.get((qx + k, qy + dy), ()))
+            yield k, found
+
+class RoomIndex:
+    """
+    Room -> tiles and centroid, room -> building. Fed with each frame's `TileBlock`.
+    Room and building ids are union-find nodes: an id handed out earlier stays valid
+    after merges (it resolves to the merged room or building).
+    """
+    def __init__(self):
+        self._known = np.zeros(0, dtype=np.int64) # Sorted packed keys of indexed tiles
+        self._tiles: Dict[Tuple[int, int, int], int] = {} # Tile -> room node
+
+        # Rooms: union-find over nodes; aggregates are valid at roots
+        self._parent: List[int] = []
+        self._label: List[int] = []
+        self._z: List[int] = []
+        self._count: List[int] = []
+        self._sx: List[int] = []
+        self._sy: List[int] = []
+        self._members: Dict[int, List[Tuple[int, int]]] = {} # Root -> (x, y) tiles
+
+        # Buildings: a second union-find over the same room nodes
+        self._bparent: List[int] = []
+        self._bcount: List[int] = []
+        self._bsx: List[int] = []
+        self._bsy: List[int] = []
+        self._brooms: List[int] = []
+        self._bfloors: Dict[int, Set[int]] = {}
+
+        self._room_hash: Dict[int, _Hash] = {} # Per floor
+        self._building_hash = _Hash()
+        self.rooms = 0
+        self.buildings = 0
+
+    # --- Ingest ---
+
+    def update(self, block: TileBlock) -> int:
+        """Indexes the frame's room-labelled tiles not seen before. Returns how many."""
+        if not len(block):
+            return 0
+        labelled = block.room_id != NO_ID
+        if not labelled.any():
+            return 0
+        x, y, z, rid = block.x[labelled], block.y[labelled], block.z[labelled], block.room_id[labelled]
+        keys = pack_keys(x, y, z)
+        known = self._known
+        pos = np.searchsorted(known, keys)
+        new = pos == len(known)
+        new[~new] = known[pos[~new]] != keys[~new]
+        if not new.any():
+            return 0
+        keys, first = np.unique(keys[new], return_index=True)
+        self._known = np.insert(known, np.searchsorted(known, keys), keys)
+        idx = np.flatnonzero(new)[first]
+        for tx, ty, tz, r in zip(x[idx].tolist(), y[idx].tolist(), z[idx].tolist(), rid[idx].tolist()):
+            self._add_tile(tx, ty, tz, r)
+        return len(idx)
+
+    def _add_tile(self, x: int, y: int, z: int, label: int):
+        tiles = self._tiles
+        room = -1
+        touching: List[int] = []
+        for n in ((x + 1, y, z), (x - 1, y, z), (x, y + 1, z), (x, y - 1, z)):
+            other = tiles.get(n)
+            if other is None:
+                continue
+            other = self._find(other)
+            if self._label[other] == label:
+                room = other if room < 0 else self._union(room, other)
+            else:
+                touching.append(other)
+        for n in ((x, y, z + 1), (x, y, z - 1)):
+            other = tiles.get(n)
+            if other is not None:
+                touching.append(self._find(other))
+        if room < 0:
+            room = self._new_room(label, z)
+
+        tiles[(x, y, z)] = room
+        self._count[room] += 1
+        self._sx[room] += x
+        self._sy[room] += y
+        self._members[room].append((x, y))
+        b = self._bfind(room)
+        self._bcount[b] += 1
+        self._bsx[b] += x
+        self._bsy[b] += y
+
+        for other in touching:
+            self._bunion(room, other)
+        self._rehash(self._find(room))
+
+    def _new_room(self, label: int, z: int) -> int:
+        i = len(self._parent)
+        self._parent.append(i)
+        self._label.append(label)
+        self._z.append(z)
+        self._count.append(0)
+        self._sx.append(0)
+        self._sy.append(0)
+        self._members[i] = []
+        self._bparent.append(i)
+        self._bcount.append(0)
+        self._bsx.append(0)
+        self._bsy.append(0)
+        self._brooms.append(1)
+        self._bfloors[i] = {z}
+        self.rooms += 1
+        self.buildings += 1
+        return i
+
+    # --- Union-find ---
+
+    def _find(self, i: int) -> int:
+        parent = self._parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def _bfind(self, i: int) -> int:
+        parent = self._bparent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def _union(self, a: int, b: int) -> int:
+        """Merges two rooms (same label and floor). Returns the surviving root."""
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return a
+        if self._count[a] < self._count[b]:
+            a, b = b, a
+        self._bunion(a, b) # One room lies in one building
+        self._parent[b] = a
+        self._count[a] += self._count[b]
+        self._sx[a] += self._sx[b]
+        self._sy[a] += self._sy[b]
+        self._members[a].extend(self._members.pop(b))
+        self._room_hash[self._z[b]].remove(b)
+        self.rooms -= 1
+        return a
+
+    def _bunion(self, a: int, b: int):
+        a, b = self._bfind(a), self._bfind(b)
+        if a == b:
+            return
+        if self._bcount[a] < self._bcount[b]:
+            a, b = b, a
+        self._bparent[b] = a
+        self._bcount[a] += self._bcount[b]
+        self._bsx[a] += self._bsx[b]
+        self._bsy[a] += self._bsy[b]
+        self._brooms[a] += self._brooms[b]
+        self._bfloors[a] |= self._bfloors.pop(b)
+        self._building_hash.remove(b)
+        self.buildings -= 1
+        self._brehash(a)
+
+    def _rehash(self, room: int):
+        n = self._count[room]
+        self._room_hash.setdefault(self._z[room], _Hash()).put(room, self._sx[room] / n, self._sy[room] / n)
+        self._brehash(self._bfind(room))
+
+    def _brehash(self, b: int):
+        n = self._bcount[b]
+        if n:
+            self._building_hash.put(b, self._bsx[b] / n, self._bsy[b] / n)
+
+    # --- Queries ---
+
+    def room(self, room_id: int) -> Room:
+        r = self._find(room_id)
+        n = self._count[r]
+        return Room(r, ROOMS.name(self._label[r]), self._z[r], self._sx[r] / n, self._sy[r] / n, n, self._bfind(r))
+
+    def building(self, building_id: int) -> Building:
+        b = self._bfind(building_id)
+        n = self._bcount[b]
+        return Building(b, self._bsx[b] / n, self._bsy[b] / n, n, self._brooms[b], tuple(sorted(self._bfloors[b])))
+
+    def room_at(self, x: int, y: int, z: int) -> Optional[Room]:
+        node = self._tiles.get((int(x), int(y), int(z)))
+        return None if node is None else self.room(node)
+
+    def room_tiles(self, room_id: int) -> List[Tuple[int, int]]:
+        """(x, y) of the room's tiles (on its floor)."""
+        return list(self._members[self._find(room_id)])
+
+    def anchor(self, room_id: int) -> Tuple[int, int]:
+        """The room's tile nearest its centroid: a reachable stand-in for the room."""
+        r = self.room(room_id)
+        return min(self._members[r.id], key=lambda t: (t[0] - r.x) ** 2 + (t[1] - r.y) ** 2)
+
+    def rooms_in(self, building_id: int) -> List[Room]:
+        b = self._bfind(building_id)
+        return [self.room(r) for r in self._members if self._bfind(r) == b]
+
+    def nearest_room(self, x: float, y: float, z: int, exclude_names: Collection[str] = (),
+                     exclude: Collection[int] = (), building: Optional[int] = None) -> Optional[Room]:
+        """
+        The room on floor `z` whose centroid is nearest (x, y), skipping rooms named in
+        `exclude_names` (e.g. visited rooms), room ids in `exclude`, and rooms outside
+        `building` if given.
+        """
+        h = self._room_hash.get(int(z))
+        if h is None:
+            return None
+        skip_labels = {ROOMS.lookup(n) for n in exclude_names}
+        skip = {self._find(i) for i in exclude}
+        b = None if building is None else self._bfind(building)
+        def ok(r: int) -> bool:
+            return (self._label[r] not in skip_labels and r not in skip
+                    and (b is None or self._bfind(r) == b))
+        best = self._nearest(h, x, y, ok, self._count, self._sx, self._sy)
+        return None if best is None else self.room(best)
+
+    def nearest_building(self, x: float, y: float, exclude: Collection[int] = ()) -> Optional[Building]:
+        """The building whose centroid is nearest (x, y), skipping building ids in `exclude`."""
+        skip = {self._bfind(i) for i in exclude}
+        best = self._nearest(self._building_hash, x, y, lambda b: b not in skip, self._bcount, self._bsx, self._bsy)
+        return None if best is None else self.building(best)
+
+    def _nearest(self, h: _Hash, x: float, y: float, ok, count: List[int], sx: List[int], sy: List[int]) -> Optional[int]:
+        best, best_d2 = None, float('inf')
+        for k, items in h.rings(x, y):
+            for i in items:
+                n = count[i]
+                d2 = (sx[i] / n - x) ** 2 + (sy[i] / n - y) ** 2
+                if d2 < best_d2 and ok(i):
+                    best, best_d2 = i, d2
+            # Every item in a ring beyond k is at least k * BUCKET away
+            if best is not None and best_d2 <= (k * BUCKET) ** 2:
+                break
+        return best
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"tiles": len(self._tiles), "rooms": self.rooms, "buildings": self.buildings}
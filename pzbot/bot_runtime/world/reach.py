@@ -0,0 +1,125 @@
+"""
+Path distances from the player to many targets in one pass.
+
+Ranking loot and rooms by straight-line distance sends the bot toward things behind walls,
+and one A* per candidate is too slow. `ReachField` runs a single Dijkstra from the player
+tile over the grid window around it (known walkable tiles, 8 moves, no corner cutting) and
+answers the path distance of every target from that one expansion.
+
+The expansion is lazy and resumable: asking for a target expands only until its distance
+is final, so near targets are cheap and later, farther ones continue the same search.
+Targets that are not walkable themselves (a container on a counter) are reached from a
+neighbouring tile. Targets beyond `radius` tiles, on another floor or walled off from the
+known ground are `inf`.
+
+`ReachService` keeps one field per player tile and grid version, so every analyzer, strategy
+and plan of a tick shares it.
+"""
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bot_runtime.config import settings
+from .hpa import INF, MOVES, SQRT2
+from .processors.grid_system import GridSystem
+
+class ReachField:
+    """Resumable Dijkstra from (x, y, z) over the window within `radius` tiles of it."""
+    def __init__(self, grid: GridSystem, x: int, y: int, z: int, radius: int):
+        self.x, self.y, self.z = x, y, z
+        self.radius = radius
+        self.x0, self.y0 = x - radius, y - radius
+        win = grid.window(self.x0, self.y0, x + radius, y + radius, z)
+        self.h, self.w = win.shape
+        self._walk = (win.known & win.walkable).ravel().tolist()
+        self._dist = [INF] * (self.h * self.w)
+        self._closed = bytearray(self.h * self.w)
+        self._heap: List[Tuple[float, int]] = []
+        self.expanded = 0
+        start = self._index(x, y)
+        if start is not None and self._walk[start]:
+            self._dist[start] = 0.0
+            self._heap.append((0.0, start))
+
+    def _index(self, x: int, y: int) -> Optional[int]:
+        lx, ly = x - self.x0, y - self.y0
+        if 0 <= lx < self.w and 0 <= ly < self.h:
+            return ly * self.w + lx
+        return None
+
+    def _expand(self, bound: float):
+        """Settles tiles until the nearest unsettled one is at least `bound` away."""
+        heap, dist, closed, walk, w, h = self._heap, self._dist, self._closed, self._walk, self.w, self.h
+        while heap and heap[0][0] < bound:
+            d, i = heapq.heappop(heap)
+            if closed[i]:
+                continue
+            closed[i] = 1
+            self.expanded += 1
+            ly, lx = divmod(i, w)
+            for dx, dy, cost in MOVES:
+                nx, ny = lx + dx, ly + dy
+                if not (0 <= nx < w and 0 <= ny < h):
+                    continue
+                j = ny * w + nx
+                if closed[j] or not walk[j]:
+                    continue
+                if dx and dy and not (walk[ly * w + nx] and walk[ny * w + lx]):
+                    continue # No corner cutting
+                nd = d + cost
+                if nd < dist[j] and nd <= self.radius * SQRT2:
+                    dist[j] = nd
+                    heapq.heappush(heap, (nd, j))
+
+    def distance(self, x: float, y: float, z: Optional[int] = None) -> float:
+        """Path distance to the tile at (x, y), or to stand next to it when it is not walkable."""
+        x, y = int(math.floor(x)), int(math.floor(y))
+        if (z is not None and int(z) != self.z) or self._index(x, y) is None:
+            return INF
+        target = self._index(x, y)
+        own = bool(self._walk[target])
+        while True:
+            # Best distance through tiles settled so far
+            if own:
+                best = self._dist[target] if self._closed[target] else INF
+            else:
+                best = INF
+                for dx, dy, cost in MOVES:
+                    j = self._index(x + dx, y + dy)
+                    if j is not None and self._closed[j]:
+                        best = min(best, self._dist[j] + cost)
+            # Unsettled tiles are at least the heap top away (one more step if not the target)
+            floor = self._heap[0][0] + (0.0 if own else 1.0) if self._heap else INF
+            if best <= floor:
+                return best
+            self._expand(best - (0.0 if own else 1.0) if best < INF else floor + 1.0)
+
+    def distances(self, points: Iterable[Tuple[float, ...]]) -> List[float]:
+        """`distance` of each (x, y) or (x, y, z); nearer targets are resolved first."""
+        points = list(points)
+        order = sorted(range(len(points)), key=lambda k: (points[k][0] - self.x) ** 2 + (points[k][1] - self.y) ** 2)
+        out = [INF] * len(points)
+        for k in order:
+            out[k] = self.distance(*points[k][:3])
+        return out
+
+class ReachService:
+    """One `ReachField` per player tile and grid version (so, at most one per tick)."""
+    def __init__(self, grid: GridSystem, radius: Optional[int] = None):
+        self.grid = grid
+        self.radius = settings.REACH_RADIUS if radius is None else radius
+        self._key = None
+        self._field: Optional[ReachField] = None
+        self.builds = 0
+
+    def field(self, x: float, y: float, z: int) -> ReachField:
+        tile = (int(math.floor(x)), int(math.floor(y)), int(z))
+        key = (tile, self.grid.version)
+        if key != self._key:
+            self._field = ReachField(self.grid, *tile, self.radius)
+            self._key = key
+            self.builds += 1
+        return self._field
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"builds": self.builds, "expanded": self._field.expanded if self._field else 0}
@@ -0,0 +1,307 @@
+"""
+Incremental replanning with D* Lite (Koenig & Likhachev, 2002).
+
+A plan walking to a target keeps one `DStarLite` search between ticks. The search runs
+backwards from the goal, so the player moving only shifts the heuristic (`km`), and keeps
+its g/rhs values. Every tick it reads the tiles whose walkability changed since its last
+sync (`GridSystem.tile_changes_since`, the diff of `GridSystem.update`) and re-evaluates only
+the tiles around them: repairing the path costs what the change affects, not a new search.
+
+Unknown tiles count as free (the usual freespace assumption), so a route is planned through
+ground not seen yet and repaired when a wall shows up there. The search is kept to the box
+around start and goal grown by `NAV_REPLAN_MARGIN` tiles. Past the box is ground the search
+does not look at, so it is open too: one virtual node joins every free tile on the box edge,
+at a cost above any path inside the box. A route around a wall whose door lies outside the
+box goes through it, and a goal is only reported cut off when known walls enclose it (or the
+start) inside the box. Moves are the 8 directions without corner cutting, like
+`HierarchicalPathfinder`.
+"""
+import heapq
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bot_runtime.config import settings
+from .hpa import INF, MOVES, SQRT2, Tile, octile
+from .path_cache import PathCache
+from .processors.grid_system import GridSystem
+
+EPS = 1e-9 # Octile sums reach equal costs by different roundings
+
+class DStarLite:
+    """
+    Shortest path from a moving start to a fixed goal on floor `goal[2]`.
+    `path(start)` syncs tile changes, repairs the search and returns the tiles, or None
+    when known walls cut the goal off. A route that has to leave the box ends at the box
+    edge (`leaves_box`).
+    """
+    def __init__(self, grid: GridSystem, start: Tile, goal: Tile, margin: Optional[int] = None,
+                 extent: Sequence[Tile] = ()):
+        self.grid = grid
+        self.goal = tuple(int(v) for v in goal)
+        self.z = self.goal[2]
+        m = settings.NAV_REPLAN_MARGIN if margin is None else margin
+        # The box covers start, goal and `extent` (e.g. a known route between them), grown by the margin
+        xs = [start[0], goal[0]] + [int(t[0]) for t in extent]
+        ys = [start[1], goal[1]] + [int(t[1]) for t in extent]
+        self.x0, self.y0 = min(xs) - m, min(ys) - m
+        self.x1, self.y1 = max(xs) + m, max(ys) + m
+        self.w, self.h = self.x1 - self.x0 + 1, self.y1 - self.y0 + 1
+        # The outside of the box: one node next to every edge tile, reached only when nothing inside is
+        self._out = self.w * self.h
+        self._exit = self._out * SQRT2 # More than any path inside the box
+        self._edge = [i for i in range(self._out)
+                      if i % self.w in (0, self.w - 1) or i // self.w in (0, self.h - 1)]
+        self._on_edge = bytearray(self._out)
+        for i in self._edge:
+            self._on_edge[i] = 1
+
+        self.expanded = 0 # Node expansions of the last `path` call
+        self.total_expanded = 0
+        self.repaired_tiles = 0 # Tile changes applied since the search was built
+        self._load()
+        self._start = self._id(start[0], start[1])
+        self._reset()
+
+    def _id(self, x: int, y: int) -> int:
+        return (y - self.y0) * self.w + (x - self.x0)
+
+    def _xy(self, i: int) -> Tuple[int, int]:
+        ly, lx = divmod(i, self.w)
+        return lx + self.x0, ly + self.y0
+
+    def contains(self, tile: Tile) -> bool:
+        return int(tile[2]) == self.z and self.x0 <= tile[0] <= self.x1 and self.y0 <= tile[1] <= self.y1
+
+    def _load(self):
+        # Version first: a change racing the copy is replayed by the next sync
+        self.version = self.grid.version
+        win = self.grid.window(self.x0, self.y0, self.x1, self.y1, self.z)
+        self._blocked = bytearray((win.known & ~win.walkable).ravel().tobytes()) + b"\0" # Outside: free
+
+    def _reset(self):
+        self._g: Dict[int, float] = {}
+        self._rhs: Dict[int, float] = {}
+        self._open: Dict[int, Tuple[float, float]] = {} # Node -> key it is queued with
+        self._heap: List[Tuple[float, float, int]] = []
+        self._km = 0.0
+        self._last = self._start # Start when km was last brought up to date
+        goal = self._id(self.goal[0], self.goal[1])
+        self._goal = goal
+        self._rhs[goal] = 0.0
+        self._push(goal)
+
+    # --- D* Lite ---
+
+    def _h(self, a: int, b: int) -> float:
+        if b == self._out:
+            return 0.0
+        ay, ax = divmod(a, self.w)
+        by, bx = divmod(b, self.w)
+        return octile(ax, ay, bx, by)
+
+    def _key(self, i: int) -> Tuple[float, float]:
+        m = min(self._g.get(i, INF), self._rhs.get(i, INF))
+        return (m + self._h(self._start, i) + self._km, m)
+
+    def _push(self, i: int):
+        k = self._key(i)
+        self._open[i] = k
+        heapq.heappush(self._heap, (k[0], k[1], i))
+
+    def _top(self) -> Optional[Tuple[Tuple[float, float], int]]:
+        heap, open_ = self._heap, self._open
+        while heap:
+            k1, k2, i = heap[0]
+            if open_.get(i) == (k1, k2):
+                return (k1, k2), i
+            heapq.heappop(heap) # Stale: removed or queued again with another key
+        return None
+
+    def _free(self, i: int) -> bool:
+        return not self._blocked[i] or i == self._goal or i == self._start
+
+    def _neighbors(self, i: int):
+        """(neighbour, step cost) pairs; every edge is usable both ways."""
+        if not self._free(i):
+            return
+        if i == self._out:
+            for j in self._edge:
+                if self._free(j):
+                    yield j, self._exit
+            return
+        if self._on_edge[i]:
+            yield self._out, self._exit
+        w, h = self.w, self.h
+        ly, lx = divmod(i, w)
+        for dx, dy, cost in MOVES:
+            nx, ny = lx + dx, ly + dy
+            if not (0 <= nx < w and 0 <= ny < h):
+                continue
+            j = ny * w + nx
+            if not self._free(j):
+                continue
+            if dx and dy and not (self._free(ly * w + nx) and self._free(ny * w + lx)):
+                continue # No corner cutting
+            yield j, cost
+
+    def _update_vertex(self, i: int):
+        g, rhs = self._g, self._rhs
+        if i != self._goal:
+            rhs[i] = min((cost + g.get(j, INF) for j, cost in self._neighbors(i)), default=INF)
+        self._open.pop(i, None)
+        if g.get(i, INF) != rhs.get(i, INF):
+            self._push(i)
+
+    def _compute(self):
+        g, rhs, start = self._g, self._rhs, self._start
+        while True:
+            top = self._top()
+            if top is None:
+                return
+            k_old, u = top
+            k_start = self._key(start)
+            # Ties with the start's key are expanded too: its path may run through them
+            if k_old[0] > k_start[0] + EPS and rhs.get(start, INF) == g.get(start, INF):
+                return
+            self.expanded += 1
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u)
+            elif g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                del self._open[u]
+                for j, _ in self._neighbors(u):
+                    self._update_vertex(j)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for j, _ in self._neighbors(u):
+                    self._update_vertex(j)
+
+    # --- Grid changes ---
+
+    def _around(self, i: int) -> List[int]:
+        """i and its neighbours: edges into and out of i, and diagonals cornering on it, start there."""
+        ly, lx = divmod(i, self.w)
+        tiles = [ny * self.w + nx for ny in (ly - 1, ly, ly + 1) for nx in (lx - 1, lx, lx + 1)
+                 if 0 <= nx < self.w and 0 <= ny < self.h]
+        if self._on_edge[i]:
+            tiles.append(self._out)
+        return tiles
+
+    def sync(self) -> int:
+        """Applies the tile changes since the last sync. Returns how many tiles flipped."""
+        version, tiles = self.grid.tile_changes_since(self.version)
+        if tiles is None:
+            # The change log moved past us: start over from the current grid
+            self._load()
+            self._reset()
+            return -1
+        self.version = version
+        if not len(tiles):
+            return 0
+        inside = ((tiles[:, 2] == self.z) & (tiles[:, 0] >= self.x0) & (tiles[:, 0] <= self.x1)
+                  & (tiles[:, 1] >= self.y0) & (tiles[:, 1] <= self.y1))
+        touched = set()
+        flips = 0
+        for x, y, _, walkable in tiles[inside].tolist():
+            i = self._id(x, y)
+            blocked = 0 if walkable else 1
+            if self._blocked[i] == blocked:
+                continue
+            self._blocked[i] = blocked
+            flips += 1
+            touched.update(self._around(i))
+        if flips:
+            for i in touched:
+                self._update_vertex(i)
+            self.repaired_tiles += flips
+        return flips
+
+    # --- Queries ---
+
+    def path(self, start: Tile) -> Optional[List[Tile]]:
+        """Moves the start to `start` (inside the box), repairs the search and extracts the path."""
+        self.expanded = 0
+        old, new = self._start, self._id(int(start[0]), int(start[1]))
+        if old != new:
+            # Keys queued for the old start stay lower bounds once km grows by the move
+            self._start = new
+            self._km += self._h(self._last, new)
+            self._last = new
+            if self._blocked[old] or self._blocked[new]:
+                # The start counts as free wherever it stands: edges around both tiles changed
+                for i in {j for c in (old, new) for j in self._around(c)}:
+                    self._update_vertex(i)
+        self.sync()
+        self._compute()
+        self.total_expanded += self.expanded
+        if self._g.get(self._start, INF) == INF:
+            return None
+        tiles = [self._start]
+        seen = {self._start}
+        i = self._start
+        while i != self._goal:
+            # Greedy descent on g; the step cost breaks nothing since g is consistent
+            i = min(self._neighbors(i), key=lambda jc: jc[1] + self._g.get(jc[0], INF))[0]
+            if i == self._out:
+                break # The rest of the route is outside the box
+            if i in seen or self._g.get(i, INF) == INF:
+                return None
+            seen.add(i)
+            tiles.append(i)
+        return [self._xy(i) + (self.z,) for i in tiles]
+
+    def cost(self) -> float:
+        """Path cost from the current start (after `path`); past `leaves_box`, not a real length."""
+        return self._g.get(self._start, INF)
+
+    def leaves_box(self) -> bool:
+        """True if the last `path` found no route inside the box, only one around it."""
+        return self._exit <= self.cost() < INF
+
+class ReplanService:
+    """
+    Keeps the `DStarLite` search of the current navigation target. Asking for another goal,
+    or starting outside the search box, builds a new one.
+
+    When a new search finds its route only around the box, `paths` (the HPA* `PathCache`)
+    is asked once for a route over known ground; if there is one, the search is rebuilt over
+    a box that covers it, so the walls along the real route get repaired too.
+    """
+    def __init__(self, grid: GridSystem, margin: Optional[int] = None, paths: Optional[PathCache] = None):
+        self.grid = grid
+        self.margin = margin
+        self.paths = paths
+        self.search: Optional[DStarLite] = None
+        self.builds = 0
+        self.widened = 0 # Searches rebuilt over a known route
+        self._asked: Optional[DStarLite] = None # Search `paths` was last asked about
+
+    def path(self, start: Tile, goal: Tile) -> Optional[List[Tile]]:
+        start = tuple(int(v) for v in start)
+        goal = tuple(int(v) for v in goal)
+        s = self.search
+        if s is None or s.goal != goal or not s.contains(start):
+            s = self.search = DStarLite(self.grid, start, goal, self.margin)
+            self.builds += 1
+        tiles = s.path(start)
+        if tiles is not None and s.leaves_box() and self.paths is not None and self._asked is not s:
+            self._asked = s
+            known = self.paths.find_path(start, goal)
+            if known is not None:
+                s = self.search = self._asked = DStarLite(self.grid, start, goal, self.margin, extent=known.nodes)
+                self.builds += 1
+                self.widened += 1
+                tiles = s.path(start)
+        return tiles
+
+    def clear(self):
+        self.search = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        s = self.search
+        return {"builds": self.builds,
+                "widened": self.widened,
+                "expanded": s.expanded if s else 0,
+                "total_expanded": s.total_expanded if s else 0,
+                "repaired_tiles": s.repaired_tiles if s else 0}
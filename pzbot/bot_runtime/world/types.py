@@ -80,6 +80,7 @@ class VehicleData(EntityData):
 class GridChunkData(BaseModel):
     """
     Represents a 10x10 chunk of the world grid.
+    Old on-disk chunk format; `GridSystem` now keeps chunks as `GridChunk` arrays and still loads these files.
     """
     chunk_x: int
     chunk_y: int
@@ -3,6 +3,7 @@ import subprocess
 import sys
 import time
 import os
+import json
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
@@ -109,8 +110,17 @@ def run_game(mode="continue", ip=None):
             launch_mode = "join" # Not fully supported by Lua yet but consistent
             
         print(f"[Lifecycle] Writing launch config '{launch_mode}' to {config_path}")
+        # Preserve other keys (log_level, state_format)
+        launch_data = {}
+        if os.path.exists(config_path):
+            try:
+                with open(config_path, "r") as f:
+                    launch_data = json.load(f)
+            except Exception:
+                pass
+        launch_data["mode"] = launch_mode
         with open(config_path, "w") as f:
-            f.write(f'{{"mode": "{launch_mode}"}}')
+            json.dump(launch_data, f)
             
         # 2. Prepare Command
         # projectzomboid.sh usually sets up LD_LIBRARY_PATH and runs Java.
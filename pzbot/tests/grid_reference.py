@@ -0,0 +1,32 @@
+"""Reference shortest paths for the grid search tests: plain Dijkstra over (x, y) tiles."""
+import heapq
+import math
+
+def dijkstra(free, sources, goal=None, corner_cutting: bool = False):
+    """
+    Distances from the nearest of `sources` over the tiles where `free((x, y))`, 8 moves
+    (sqrt 2 diagonals), diagonals only between two free side tiles unless `corner_cutting`.
+    Sources spread even when not free themselves. Returns the distance to `goal` (inf if
+    unreachable) when given, else {tile: distance} of every tile reached.
+    """
+    dist = {s: 0.0 for s in sources}
+    heap = [(0.0, s) for s in dist]
+    heapq.heapify(heap)
+    while heap:
+        g, (x, y) = heapq.heappop(heap)
+        if (x, y) == goal:
+            return g
+        if g > dist[(x, y)]:
+            continue
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                n = (x + dx, y + dy)
+                if not (dx or dy) or not free(n):
+                    continue
+                if dx and dy and not corner_cutting and not (free((x + dx, y)) and free((x, y + dy))):
+                    continue
+                ng = g + (math.sqrt(2) if dx and dy else 1.0)
+                if ng < dist.get(n, math.inf):
+                    dist[n] = ng
+                    heapq.heappush(heap, (ng, n))
+    return dist if goal is None else math.inf
@@ -0,0 +1,67 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from bot_runtime.ingest import binary
+from bot_runtime.ingest.frame import TornReadError, split_frame, decode_body
+from bot_runtime.ingest.watcher import StateWatcher, BACKEND_POLL
+from tools.synthetic_state import make_frame
+
+class TestMsgpack(unittest.TestCase):
+    VALUES = {
+        "ints": [0, 1, 127, 128, 255, 256, 65535, 65536, 2**32 - 1, -1, -32, -33, -128, -129, -32768, -32769, -2**31],
+        "floats": [0.5, -10800.25, 1e-300, 3.0e300],
+        "str": ["", "a" * 31, "b" * 32, "c" * 300, "Zoë's Kitchen", "日本"],
+        "nested": {"empty_map": {}, "empty_list": [], "list": list(range(20)), "flags": [True, False, None]},
+    }
+
+    def test_pure_roundtrip(self):
+        parts = []
+        binary._encode(self.VALUES, parts.append)
+        body = b"".join(parts)
+        decoded, end = binary._decode(body, 0)
+        self.assertEqual(end, len(body))
+        self.assertEqual(decoded, self.VALUES)
+
+    def test_state_frame_matches_json(self):
+        data = make_frame(radius=3)
+        body, seq = split_frame(binary.encode_frame(data, 9))
+        self.assertEqual(seq, 9)
+        self.assertTrue(binary.is_msgpack_body(body))
+        self.assertEqual(decode_body(body), json.loads(json.dumps(data)))
+
+    def test_every_prefix_is_torn(self):
+        frame = binary.encode_frame({"timestamp": 1, "player": {"position": {"x": 1, "y": 2, "z": 0}}}, 1)
+        for cut in range(4, len(frame)):
+            with self.assertRaises(TornReadError, msg=f"cut at {cut}"):
+                split_frame(frame[:cut])
+
+class TestBinaryTransport(unittest.TestCase):
+    def test_watcher_reads_newest_transport(self):
+        received = []
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = Path(tmp) / "state.json"
+            bin_path = Path(tmp) / "state.bin"
+            watcher = StateWatcher(json_path, lambda s: received.append(s.player.position.x),
+                                   polling_interval=0.01, backend=BACKEND_POLL, binary_path=bin_path)
+            watcher.start()
+            try:
+                json_path.write_text(json.dumps({"player": {"position": {"x": 1, "y": 0, "z": 0}}}))
+                self.wait_for(received, 1)
+                time.sleep(0.02) # Newer mtime
+                bin_path.write_bytes(binary.encode_frame({"player": {"position": {"x": 2, "y": 0, "z": 0}}}, 1))
+                self.wait_for(received, 2)
+                self.assertEqual(watcher.get_stats()["transport"], "binary")
+            finally:
+                watcher.stop()
+        self.assertEqual(received[:2], [1, 2])
+
+    def wait_for(self, received, count, timeout=2.0):
+        deadline = time.time() + timeout
+        while len(received) < count and time.time() < deadline:
+            time.sleep(0.01)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from bot_runtime.brain.brain import Brain
+from bot_runtime.brain.state import BrainState
+from bot_runtime.ingest.parser import StateParser
+from bot_runtime.ingest.tiles import TileBlock
+from bot_runtime.world import model
+from bot_runtime.world.processors.grid_system import GridSystem
+from bot_runtime.world.processors.room_index import RoomIndex
+from bot_runtime.world.reach import ReachService
+from bot_runtime.world.replan import ReplanService
+
+class TestBrainSnapshot(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.grid = GridSystem(Path(self._tmp.name))
+
+    def tearDown(self):
+        self.grid.close()
+        self._tmp.cleanup()
+
+    def test_snapshot_is_plain_json(self):
+        tiles = [{"x": x, "y": y, "z": 0, "w": True, "room": "kitchen"} for x in range(5) for y in range(5)]
+        player = StateParser().parse_dict(
+            {"timestamp": 1, "player": {"position": {"x": 2, "y": 2, "z": 0}, "vision": {"tiles": tiles}}}).player
+        state = BrainState(player=player, vision=player.vision)
+        state.rooms = RoomIndex()
+        state.rooms.update(TileBlock.from_rows(tiles))
+        state.memory.visited_rooms.add("kitchen")
+        self.grid.update(tiles, 1)
+        state.reach = ReachService(self.grid).field(2, 2, 0)
+        state.routes = ReplanService(self.grid) # Holds the grid and its lock
+        state.routes.path((0, 0, 0), (4, 4, 0))
+        data = json.loads(json.dumps(state.snapshot()))
+        self.assertNotIn("vision", data)
+        self.assertNotIn("player", data)
+        self.assertNotIn("reach", data)
+        self.assertNotIn("routes", data)
+        self.assertEqual(data["rooms"], {"tiles": 25, "rooms": 1, "buildings": 1})
+        self.assertEqual(data["memory"]["visited_rooms"], ["kitchen"])
+        self.assertEqual(data["situation"]["current_mode"], "IDLE")
+        self.assertIsNotNone(state.reach) # The live state is left as it was
+
+    def test_ticked_state_is_saved_like_main_does(self):
+        with mock.patch.object(model, "BASE_DIR", Path(self._tmp.name) / "world"):
+            world = model.WorldModel()
+        try:
+            tiles = [{"x": x, "y": y, "z": 0, "w": True, "room": "kitchen"} for x in range(5) for y in range(5)]
+            world.update(StateParser().parse_dict(
+                {"timestamp": 1, "player": {"position": {"x": 2, "y": 2, "z": 0}, "vision": {"tiles": tiles}}}))
+            brain = Brain(world)
+            brain.update()
+            self.assertIs(brain.state.flow, world.flow)
+            path = Path(self._tmp.name) / "grid_snapshot.json"
+            world.grid.save_snapshot(str(path), {"brain": brain.state.snapshot()})
+            with open(path) as f:
+                self.assertEqual(json.load(f)["brain"]["rooms"]["tiles"], 25)
+        finally:
+            world.grid.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from bot_runtime.world.processors.chunk_cache import ChunkCache
+from bot_runtime.world.processors.grid_chunk import GridChunk
+from bot_runtime.world.processors.grid_system import GridSystem
+from bot_runtime.world.processors.memory_objects import GridChunkMemory
+
+def memory(cx: int, cy: int, last_seen: int = 0, planes: int = 1) -> GridChunkMemory:
+    chunk = GridChunk(cx, cy)
+    for z in range(planes):
+        chunk.plane(z)
+    m = GridChunkMemory(f"chunk_{cx}_{cy}_0", chunk)
+    m.last_seen = last_seen
+    return m
+
+class TestChunkCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = ChunkCache(max_chunks=3)
+        for i in range(4):
+            cache.put((i, 0, 0), memory(i, 0))
+        cache.get((0, 0, 0)) # (1, 0, 0) is now the oldest
+        evicted = cache.evict(now_ms=0)
+        self.assertEqual([k for k, _ in evicted], [(1, 0, 0)])
+        self.assertEqual(list(cache), [(2, 0, 0), (3, 0, 0), (0, 0, 0)])
+        self.assertIsNone(cache.get((9, 9, 0)))
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 1, 1))
+
+    def test_byte_budget_and_keep(self):
+        one = memory(0, 0).data.nbytes
+        cache = ChunkCache(max_bytes=3 * one)
+        for i in range(3):
+            cache.put((i, 0, 0), memory(i, 0))
+        cache.put((3, 0, 0), memory(3, 0, planes=2)) # Two z-levels: twice the size
+        self.assertEqual(cache.bytes, 5 * one)
+        evicted = cache.evict(now_ms=0, keep=((1, 0, 0),))
+        self.assertEqual([k for k, _ in evicted], [(0, 0, 0)]) # Stops at a kept chunk
+        evicted = cache.evict(now_ms=0)
+        self.assertEqual([k for k, _ in evicted], [(1, 0, 0)])
+        self.assertEqual(cache.bytes, 3 * one)
+
+    def test_ttl_expiry_stops_at_fresh_chunk(self):
+        cache = ChunkCache(ttl_ms=1000)
+        cache.put((0, 0, 0), memory(0, 0, last_seen=0))
+        cache.put((1, 0, 0), memory(1, 0, last_seen=5000))
+        cache.put((2, 0, 0), memory(2, 0, last_seen=0)) # Recently used, so not reached
+        self.assertEqual([k for k, _ in cache.evict(now_ms=5500)], [(0, 0, 0)])
+        self.assertEqual(cache.get_stats()["expired"], 1)
+
+    def test_floor_index(self):
+        cache = ChunkCache()
+        for z in (0, 1, 2):
+            cache.put((0, 0, z), memory(0, 0))
+        cache.put((1, 0, 0), memory(1, 0))
+        self.assertEqual(cache.floors(), {0: 2, 1: 1, 2: 1})
+        self.assertEqual(list(cache.floor(0)), [(0, 0), (1, 0)])
+        cache.pop((0, 0, 2))
+        self.assertEqual(cache.floors(), {0: 2, 1: 1})
+        self.assertEqual(list(cache.floor(2)), [])
+
+class TestGridSystemCache(unittest.TestCase):
+    def test_evicted_chunks_are_written_back_and_reloaded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp), max_chunks=4, max_bytes=0, ttl_ms=0)
+            # Walk east one chunk per frame
+            for step in range(10):
+                x = step * 10
+                grid.update([{"x": x + i, "y": 5, "z": 0, "w": i != 3, "room": f"r{step}"} for i in range(10)], step)
+                grid.maintenance()
+            self.assertEqual(len(grid.chunks), 4)
+            self.assertTrue(grid.writer.flush(5))
+            self.assertEqual(grid.get_stats()["cache"]["evictions"], 6)
+            self.assertIsNone(grid.get_tile(3, 5, 0)) # Not loaded
+
+            grid.update([{"x": 0, "y": 6, "z": 0}], 99) # Back to the first chunk
+            self.assertEqual(grid.get_tile(3, 5, 0).room, "r0")
+            self.assertFalse(grid.get_tile(3, 5, 0).is_walkable)
+            self.assertEqual(grid.store.get_stats()["loads"], 1)
+            grid.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from bot_runtime.ingest.state import Player, Position
+from bot_runtime.world.processors.chunk_prefetch import ChunkPrefetcher, chunks_ahead
+from bot_runtime.world.processors.grid_chunk import GridChunk
+from bot_runtime.world.processors.grid_system import GridSystem
+from bot_runtime.world.processors.memory_objects import GridChunkMemory
+from bot_runtime.world.processors.player_system import PlayerSystem
+
+def strip(x0: int, y: int, width: int) -> list:
+    return [{"x": x, "y": y + dy, "z": 0, "w": x % 7 != 0, "room": f"r{x // 10}"}
+            for x in range(x0, x0 + width) for dy in range(-2, 3)]
+
+class TestChunksAhead(unittest.TestCase):
+    def test_follows_heading(self):
+        keys = chunks_ahead(105, 104, 3.0, 0.0, distance=30, radius=4)
+        self.assertTrue(keys)
+        self.assertTrue(all(cx > 10 for cx, _, _ in keys)) # East of the player's chunk only
+        self.assertEqual({cy for _, cy, _ in keys}, {10})
+        self.assertEqual(keys[0], (11, 10, 0)) # Nearest first
+        self.assertEqual({z for _, _, z in chunks_ahead(105, 104, 3.0, 0.0, distance=30, radius=4, z=2)}, {2})
+        self.assertEqual(chunks_ahead(105, 104, 0.0, 0.0, distance=30, radius=4), [])
+
+class TestChunkPrefetcher(unittest.TestCase):
+    def test_discard_cancels_inflight_read(self):
+        started, release = threading.Event(), threading.Event()
+        def slow_load(key):
+            started.set()
+            release.wait(5)
+            return GridChunkMemory("chunk", GridChunk(key[0], key[1]))
+        prefetcher = ChunkPrefetcher(slow_load)
+        prefetcher.request([(1, 1, 0)])
+        self.assertTrue(started.wait(5))
+        prefetcher.discard((1, 1, 0)) # The grid now has newer data
+        release.set()
+        self.assertTrue(prefetcher.wait_idle(5))
+        self.assertIsNone(prefetcher.take((1, 1, 0)))
+        prefetcher.stop()
+
+class TestGridPrefetch(unittest.TestCase):
+    def test_walking_into_mapped_area_reads_no_chunks_on_tick(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp))
+            grid.update(strip(0, 5, 80), 1)
+            grid.close()
+
+            grid = GridSystem(Path(tmp), prefetch_tiles=40)
+            for step in range(8):
+                x = step * 10
+                self.assertTrue(grid.prefetcher.wait_idle(5))
+                grid.update(strip(x, 5, 10), 100 + step)
+                grid.prefetch(x + 5, 5, 4.0, 0.0, radius=2)
+
+            stats = grid.get_stats()["prefetch"]
+            self.assertEqual(stats["misses"], 1) # Only the chunk the player started in
+            self.assertEqual(stats["hits"], 7)
+            self.assertEqual(grid.get_tile(71, 5, 0).room, "r7")
+            grid.close()
+
+    def test_loaded_chunks_are_not_prefetched(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp))
+            grid.update(strip(0, 5, 60), 1)
+            self.assertEqual(grid.prefetch(5, 5, 4.0, 0.0, radius=2), 0)
+            grid.close()
+
+class TestPlayerVelocity(unittest.TestCase):
+    def player(self, x: float, y: float, z: float = 0) -> Player:
+        return Player(position=Position(x=x, y=y, z=z))
+
+    def test_velocity_from_positions(self):
+        system = PlayerSystem()
+        system.update(self.player(100, 100), 1000)
+        self.assertEqual(system.get_velocity(), (0.0, 0.0))
+        for i in range(1, 10):
+            system.update(self.player(100 + i * 0.5, 100), 1000 + i * 100) # 5 tiles/s east
+        vx, vy = system.get_velocity()
+        self.assertAlmostEqual(vx, 5.0, delta=0.1)
+        self.assertAlmostEqual(vy, 0.0)
+
+        system.update(self.player(900, 100), 2000) # Teleport
+        self.assertEqual(system.get_velocity(), (0.0, 0.0))
+
+if __name__ == '__main__':
+    unittest.main()
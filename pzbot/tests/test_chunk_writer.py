@@ -0,0 +1,127 @@
+import threading
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from bot_runtime.world.processors.chunk_writer import ChunkWriter
+from bot_runtime.world.processors.grid_chunk import GridChunk
+from bot_runtime.world.processors.grid_system import GridSystem
+from bot_runtime.world.processors.memory_objects import GridChunkMemory
+
+def memory(cx: int, cy: int) -> GridChunkMemory:
+    return GridChunkMemory(f"chunk_{cx}_{cy}", GridChunk(cx, cy))
+
+class TestChunkWriter(unittest.TestCase):
+    def setUp(self):
+        self.gate = threading.Event()
+        self.batches = []
+        def write_batch(items):
+            self.gate.wait(5)
+            self.batches.append([(key, blob) for key, _, blob in items])
+        self.writer = ChunkWriter(write_batch, max_queue=3, batch_size=2)
+
+    def tearDown(self):
+        self.gate.set()
+        self.writer.stop()
+
+    def wait_taken(self, timeout: float = 5.0):
+        """Waits until the writer thread took everything off the queue."""
+        deadline = time.time() + timeout
+        while self.writer.get_stats()["queued"]:
+            if time.time() > deadline:
+                self.fail("writer did not take the queued chunk")
+            time.sleep(0.001)
+
+    def test_coalesces_and_batches(self):
+        m = memory(0, 0)
+        self.writer.submit("busy", m, b"first") # Taken at once, blocks the writer
+        self.wait_taken()
+        self.writer.submit((0, 0), m, b"old")
+        self.writer.submit((0, 0), m, b"new")
+        self.writer.submit((1, 0), memory(1, 0), b"other")
+        self.assertIs(self.writer.pending_chunk((0, 0)), m)
+        self.gate.set()
+        self.assertTrue(self.writer.flush(5))
+        self.assertEqual(self.batches, [[("busy", b"first")], [((0, 0), b"new"), ((1, 0), b"other")]])
+        self.assertIsNone(self.writer.pending_chunk((0, 0)))
+        self.assertEqual(self.writer.get_stats()["coalesced"], 1)
+
+    def test_bounded_queue(self):
+        self.writer.submit("busy", memory(9, 9), b"")
+        self.wait_taken()
+        for i in range(3):
+            self.assertTrue(self.writer.submit(i, memory(i, 0), b"", block=False))
+        self.assertFalse(self.writer.submit(3, memory(3, 0), b"", block=False))
+        self.assertTrue(self.writer.submit(0, memory(0, 0), b"again", block=False)) # Coalesces: no new slot
+
+        threading.Timer(0.05, self.gate.set).start()
+        self.assertTrue(self.writer.submit(3, memory(3, 0), b"", block=True)) # Waits for room
+        stats = self.writer.get_stats()
+        self.assertEqual((stats["rejected"], stats["waits"]), (1, 1))
+
+class TestGridWriteBehind(unittest.TestCase):
+    def test_snapshot_does_not_wait_for_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp), max_chunks=0, ttl_ms=0)
+            disk = threading.Event()
+            save_blobs = grid.store.save_blobs
+            def slow_save(blobs, durable=False):
+                disk.wait(5) # A stuck disk
+                save_blobs(list(blobs), durable)
+            grid.store.save_blobs = slow_save
+
+            grid.update([{"x": i, "y": 0, "z": 0} for i in range(40)], 1)
+            grid.save_snapshot(str(Path(tmp) / "snapshot.json"))
+            # The tick path keeps going while the write is stuck
+            grid.update([{"x": 0, "y": 1, "z": 0}], 2)
+            self.assertEqual(grid.writer.get_stats()["written"], 0)
+            disk.set()
+            self.assertTrue(grid.writer.flush(5))
+            self.assertEqual(grid.writer.get_stats()["written"], 4)
+            self.assertEqual([k for k, c in grid.chunks.items() if c.is_dirty], [(0, 0, 0)])
+
+            grid.update([{"x": 0, "y": 0, "z": 1}], 3) # Another floor: a chunk of its own
+            grid.close() # Writes what is still dirty before returning
+            self.assertEqual(grid.store.get_stats()["saves"], 6)
+
+            reloaded = GridSystem(Path(tmp))
+            with reloaded._lock:
+                reloaded._get_or_load_chunk(0, 0, 0)
+                reloaded._get_or_load_chunk(0, 0, 1)
+            self.assertIsNotNone(reloaded.get_tile(0, 1, 0))
+            self.assertIsNotNone(reloaded.get_tile(0, 0, 1))
+
+    def test_eviction_waits_for_the_writer_outside_the_lock(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp), max_chunks=1, ttl_ms=0)
+            grid.writer.max_queue = 1
+            disk = threading.Event()
+            save_blobs = grid.store.save_blobs
+            def slow_save(blobs, durable=False):
+                disk.wait(5)
+                save_blobs(list(blobs), durable)
+            grid.store.save_blobs = slow_save
+
+            for cx in range(4):
+                grid.update([{"x": cx * 10 + 1, "y": 0, "z": 0, "room": f"r{cx}"}], cx + 1)
+            # Three dirty chunks leave: one being written, one queued, one waiting for room
+            evicting = threading.Thread(target=grid.maintenance)
+            evicting.start()
+            deadline = time.time() + 5
+            while not grid.writer.get_stats()["waits"]:
+                self.assertLess(time.time(), deadline)
+                time.sleep(0.001)
+            t = time.time()
+            self.assertTrue(grid.window(0, 0, 39, 0, 0).known[0, 31])
+            grid.update([{"x": 22, "y": 0, "z": 0}], 5) # Loads the chunk still waiting for the writer
+            self.assertLess(time.time() - t, 1.0)
+            self.assertEqual(grid.get_tile(21, 0, 0).room, "r2")
+            disk.set()
+            evicting.join(5)
+            self.assertFalse(evicting.is_alive())
+            self.assertTrue(grid.chunks[(2, 0, 0)].is_dirty) # Changed after its blob was taken
+            grid.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import copy
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from bot_runtime.ingest.delta import (DeltaAssembler, DeltaEncoder, MissingKeyframeError, KEYED_LISTS,
+                                      index_entries, keyframe_path, load_full_state)
+from bot_runtime.ingest.parser import StateParser, DECODER_FAST
+from bot_runtime.world.processors.grid_system import GridSystem
+from tools.synthetic_state import make_frame
+
+def wire(frame: dict) -> dict:
+    """What the reader decodes (a fresh copy, as from the file)."""
+    return json.loads(json.dumps(frame))
+
+def keyed(frame: dict) -> dict:
+    vision = frame["player"]["vision"]
+    return {name: index_entries(vision[name], fn) for name, fn in KEYED_LISTS.items()}
+
+def scene_changes(base: dict, step: int) -> dict:
+    frame = copy.deepcopy(base)
+    vision = frame["player"]["vision"]
+    vision["tiles"][step]["w"] = not vision["tiles"][step]["w"]
+    vision["tiles"].pop(10 + step)
+    vision["nearby_containers"][0]["items"].pop()
+    vision["world_items"].append({"id": f"new_{step}", "type": "Base.Nails", "name": "Nails", "category": "Item",
+                                  "x": 1, "y": 2, "z": 0})
+    vision["objects"] = vision["objects"][:step]
+    return frame
+
+class TestDeltaFrames(unittest.TestCase):
+    def setUp(self):
+        self.base = make_frame(radius=4, containers=3, world_items=5, objects=4)
+        # Containers without ids key by parent/type/position; two identical ones get '#2'
+        loot = {"type": "Container", "object_type": "Floor", "x": 1, "y": 1, "z": 0, "items": [],
+                "meta": {"parent_type": "World", "parent_id": "Floor"}}
+        self.base["player"]["vision"]["nearby_containers"] += [dict(loot), dict(loot)]
+
+    def test_rebuilds_every_frame(self):
+        encoder, assembler = DeltaEncoder(), DeltaAssembler()
+        for step in range(6):
+            original = scene_changes(self.base, step) if step else self.base
+            frame, kind = encoder.encode(original)
+            self.assertEqual(kind, "key" if step == 0 else "delta")
+            rebuilt = assembler.apply(wire(frame))
+            self.assertEqual(keyed(rebuilt), keyed(wire(original)))
+            self.assertEqual(rebuilt["player"]["vision"]["objects"], original["player"]["vision"]["objects"])
+            self.assertNotIn("delta", rebuilt["player"]["vision"])
+            self.assertNotIn("frame", rebuilt)
+
+    def test_latest_delta_is_enough(self):
+        encoder, assembler = DeltaEncoder(), DeltaAssembler()
+        assembler.apply(wire(encoder.encode(self.base)[0]))
+        frames = [encoder.encode(scene_changes(self.base, step))[0] for step in range(1, 5)]
+        rebuilt = assembler.apply(wire(frames[-1]))
+        self.assertEqual(keyed(rebuilt), keyed(wire(scene_changes(self.base, 4))))
+
+    def test_delta_is_small(self):
+        encoder = DeltaEncoder()
+        encoder.encode(self.base)
+        frame, kind = encoder.encode(scene_changes(self.base, 1))
+        self.assertEqual(kind, "delta")
+        self.assertNotIn("tiles", frame["player"]["vision"])
+        self.assertLess(len(json.dumps(frame)), len(json.dumps(self.base)) / 2)
+
+    def test_large_change_sends_keyframe(self):
+        encoder = DeltaEncoder(max_change_ratio=0.1)
+        encoder.encode(self.base)
+        moved = make_frame(radius=4, containers=3, world_items=5, objects=4, px=500, py=500)
+        self.assertEqual(encoder.encode(moved)[1], "key")
+
+    def test_unchanged_entries_keep_identity(self):
+        encoder, assembler = DeltaEncoder(keyframe_interval=2), DeltaAssembler()
+        first = assembler.apply(wire(encoder.encode(self.base)[0]))["player"]["vision"]["tiles"]
+        second = assembler.apply(wire(encoder.encode(scene_changes(self.base, 1))[0]))["player"]["vision"]["tiles"]
+        first_ids = {id(t) for t in first}
+        changed = [t for t in second if id(t) not in first_ids]
+        self.assertEqual(len(changed), 1) # The flipped tile
+
+        # A new keyframe with the same content still hands out the old objects
+        assembler.apply(wire(encoder.encode(scene_changes(self.base, 1))[0]))
+        frame, kind = encoder.encode(scene_changes(self.base, 1))
+        self.assertEqual(kind, "key")
+        third = assembler.apply(wire(frame))["player"]["vision"]["tiles"]
+        self.assertEqual({id(t) for t in third}, {id(t) for t in second})
+
+    def test_missed_keyframe_is_loaded_from_side_file(self):
+        encoder = DeltaEncoder()
+        key, _ = encoder.encode(self.base)
+        delta, _ = encoder.encode(scene_changes(self.base, 1))
+        with tempfile.TemporaryDirectory() as tmp:
+            state_path = Path(tmp) / "state.json"
+            state_path.write_text(json.dumps(delta))
+
+            assembler = DeltaAssembler([keyframe_path(state_path)])
+            with self.assertRaises(MissingKeyframeError):
+                assembler.apply(wire(delta))
+
+            keyframe_path(state_path).write_text(json.dumps(key))
+            rebuilt = assembler.apply(wire(delta))
+            self.assertEqual(keyed(rebuilt), keyed(wire(scene_changes(self.base, 1))))
+            self.assertEqual(assembler.get_stats()["keyframe_loads"], 1)
+
+            self.assertEqual(keyed(load_full_state(state_path)), keyed(rebuilt))
+
+    def test_full_frames_pass_through(self):
+        data = wire(self.base)
+        self.assertIs(DeltaAssembler().apply(data), data)
+        self.assertEqual(data, wire(self.base))
+
+    def test_parser_rebuilds_delta_frames(self):
+        encoder, parser = DeltaEncoder(), StateParser(decoder=DECODER_FAST)
+        parser.parse_bytes(json.dumps(encoder.encode(self.base)[0]).encode())
+        state = parser.parse_bytes(json.dumps(encoder.encode(scene_changes(self.base, 2))[0]).encode())
+        expected = scene_changes(self.base, 2)["player"]["vision"]
+        self.assertEqual(len(state.player.vision.tiles), len(expected["tiles"]))
+        self.assertEqual(len(state.player.vision.world_items), len(expected["world_items"]))
+        self.assertEqual(parser.deltas.get_stats()["deltas"], 1)
+
+class TestGridSkipsUnchangedTiles(unittest.TestCase):
+    def test_only_changed_tiles_are_rewritten(self):
+        encoder, assembler = DeltaEncoder(), DeltaAssembler()
+        base = make_frame(radius=4)
+        changed = copy.deepcopy(base)
+        tile = changed["player"]["vision"]["tiles"][0]
+        tile["w"] = not tile["w"]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp))
+            grid.update(assembler.apply(wire(encoder.encode(base)[0]))["player"]["vision"]["tiles"], 1)
+            grid.flush_dirty()
+            version = grid.version
+            grid.update(assembler.apply(wire(encoder.encode(changed)[0]))["player"]["vision"]["tiles"], 2)
+
+            key = (tile['x'], tile['y'], tile['z'])
+            self.assertEqual(grid.get_tile(*key).is_walkable, tile["w"])
+            # Only the changed tile's chunk is dirtied and re-published
+            chunk_key = (tile['x'] // 10, tile['y'] // 10, tile['z'])
+            self.assertEqual([k for k, c in grid.chunks.items() if c.is_dirty], [chunk_key])
+            self.assertEqual([k for k, _, _ in grid.changes_since(version)[1]], [chunk_key])
+            # Unchanged tiles still get the new last_seen stamp
+            self.assertTrue(all(t.last_seen == 2 for c in grid.chunks.values() for t in c.data.tiles()))
+            self.assertTrue(all(c.last_seen == 2 for c in grid.chunks.values()))
+            grid.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from pydantic import ValidationError
+
+from bot_runtime.ingest.parser import StateParser, DECODER_FAST, DECODER_VALIDATED
+from bot_runtime.ingest.state import GameState
+from tools.synthetic_state import make_frame
+
+class TestFastDecoder(unittest.TestCase):
+    def setUp(self):
+        self.fast = StateParser(decoder=DECODER_FAST)
+        self.validated = StateParser(decoder=DECODER_VALIDATED)
+
+    def test_matches_validated_dump(self):
+        frame = make_frame(radius=5)
+        fast_state = self.fast.parse_dict(frame)
+        ref_state = self.validated.parse_dict(frame)
+        self.assertEqual(fast_state.model_dump(), ref_state.model_dump())
+        self.assertEqual(self.fast.fast_fallbacks, 0)
+
+    def test_lua_empty_table_quirks(self):
+        # Lua serializes empty arrays as {}
+        frame = make_frame(radius=2)
+        frame["player"]["vision"]["objects"] = {}
+        frame["player"]["inventory"] = {}
+        state = self.fast.parse_dict(frame)
+        self.assertEqual(state.player.vision.objects, [])
+        self.assertEqual(state.player.inventory, [])
+
+    def test_missing_required_field_falls_back(self):
+        frame = make_frame(radius=2)
+        del frame["player"]["position"]["x"]
+        with self.assertRaises(ValidationError):
+            self.fast.parse_dict(frame)
+        self.assertEqual(self.fast.fast_fallbacks, 1)
+
+    def test_lazy_list_falls_back_on_read(self):
+        frame = make_frame(radius=2)
+        del frame["player"]["vision"]["tiles"][0]["x"]
+        state = self.fast.parse_dict(frame)
+        with self.assertRaises(ValidationError):
+            list(state.player.vision.tiles)
+
+    def test_minimal_frame(self):
+        state = self.fast.parse_dict({"timestamp": 1, "player": {"position": {"x": 3, "y": 4, "z": 0}}})
+        self.assertEqual(state.player.position.x, 3)
+        self.assertIsNone(state.player.vision)
+        self.assertEqual(state.model_dump(), self.validated.parse_dict({"timestamp": 1, "player": {"position": {"x": 3, "y": 4, "z": 0}}}).model_dump())
+
+if __name__ == '__main__':
+    unittest.main()
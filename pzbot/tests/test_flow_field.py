@@ -0,0 +1,135 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from bot_runtime.brain.state import BrainState, SituationMode, ThreatVector
+from bot_runtime.control.action_queue import ActionQueue
+from bot_runtime.ingest.state import Player, Position
+from bot_runtime.strategy.implementations.survival import SurvivalStrategy
+from bot_runtime.world.flow_field import FlowFieldService, distance_transform
+from bot_runtime.world.processors.grid_system import GridSystem
+from tests.grid_reference import dijkstra
+
+def threat(x: float, y: float) -> ThreatVector:
+    return ThreatVector(source_id=f"z{x},{y}", type="Zombie", x=x, y=y, score=10.0)
+
+def reference(passable: np.ndarray, sources: list) -> np.ndarray:
+    """Reference distances on the array, sources as (row, col); the transform cuts corners."""
+    h, w = passable.shape
+    dist = np.full((h, w), np.inf)
+    reached = dijkstra(lambda t: 0 <= t[0] < w and 0 <= t[1] < h and passable[t[1], t[0]],
+                       [(x, y) for y, x in sources], corner_cutting=True)
+    for (x, y), d in reached.items():
+        dist[y, x] = d
+    return dist
+
+class TestFlowField(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.grid = GridSystem(Path(self._tmp.name))
+        self.flow = FlowFieldService(self.grid, radius=15)
+
+    def tearDown(self):
+        self.grid.close()
+        self._tmp.cleanup()
+
+    def open_field(self, x0: int, y0: int, x1: int, y1: int, wall=lambda x, y: False):
+        self.grid.update([{"x": x, "y": y, "z": 0, "w": not wall(x, y)}
+                          for x in range(x0, x1) for y in range(y0, y1)], 1)
+
+    def test_distance_transform_matches_dijkstra(self):
+        rng = np.random.default_rng(4)
+        passable = rng.random((40, 50)) > 0.3
+        sources = [(int(y), int(x)) for y, x in zip(rng.integers(0, 40, 6), rng.integers(0, 50, 6))]
+        seeds = np.full(passable.shape, np.inf)
+        for y, x in sources:
+            seeds[y, x] = 0.0
+        dist, _ = distance_transform(seeds, passable)
+        np.testing.assert_allclose(dist, reference(passable, sources))
+
+    def test_winding_layouts_are_finished_by_dijkstra(self):
+        # Corridors doubling back across the whole window: a path ~30 times its width
+        passable = np.ones((61, 61), dtype=bool)
+        for x in range(1, 61, 2):
+            passable[:, x] = False
+            passable[0 if x % 4 == 1 else 60, x] = True
+        seeds = np.full(passable.shape, np.inf)
+        seeds[30, 0] = 0.0
+        dist, sweeps = distance_transform(seeds, passable)
+        self.assertEqual(sweeps, 62)
+        np.testing.assert_allclose(dist, reference(passable, [(30, 0)]))
+        self.assertGreater(dist[30, 60], 1500)
+        # Cut short anywhere, the result is still exact
+        passable = np.random.default_rng(7).random((30, 40)) > 0.3
+        seeds = np.full(passable.shape, np.inf)
+        seeds[5, 5] = seeds[20, 30] = 0.0
+        dist, sweeps = distance_transform(seeds, passable, max_sweeps=3)
+        self.assertEqual(sweeps, 3)
+        np.testing.assert_allclose(dist, reference(passable, [(5, 5), (20, 30)]))
+
+    def test_flee_climbs_away_from_threats(self):
+        self.open_field(0, 0, 40, 40)
+        start = (20, 20)
+        zombies = [threat(15.5, 20.5), threat(16.2, 22.8)]
+        target = self.flow.flee_target(*start, 0, zombies, steps=8)
+        self.assertGreater(target[0], start[0])
+        field = self.flow.flee_field(*start, 0, zombies)
+        self.assertGreater(field.danger_distance(*target[:2]), field.danger_distance(*start) + 7)
+
+    def test_walls_bend_the_field(self):
+        # Wall along x == 20 with a gap at y == 5: the zombie at (18, 20) must walk around it
+        self.open_field(0, 0, 40, 40, wall=lambda x, y: x == 20 and y != 5)
+        field = self.flow.flee_field(22, 20, 0, [threat(18, 20)])
+        self.assertAlmostEqual(field.danger_distance(18, 20), 0.0)
+        self.assertGreater(field.danger_distance(22, 20), 20) # Around via the gap, not 4 through the wall
+        self.assertLess(field.danger_distance(21, 6), 20)
+
+    def test_threats_outside_the_window_and_unknown_ground(self):
+        self.open_field(0, 0, 40, 40)
+        field = self.flow.flee_field(20, 20, 0, [threat(60, 20)]) # 25 tiles past the window edge (x = 35)
+        self.assertAlmostEqual(field.danger_distance(35, 20), 25.0)
+        self.assertAlmostEqual(field.danger_distance(30, 20), 30.0)
+        self.assertLess(self.flow.flee_target(20, 20, 0, [threat(60, 20)])[0], 20)
+        self.assertIsNone(self.flow.flee_field(20, 20, 0, []))
+
+    def test_field_is_reused_until_something_changes(self):
+        self.open_field(0, 0, 40, 40)
+        zombies = [threat(15, 20)]
+        self.flow.flee_field(20, 20, 0, zombies)
+        self.flow.flee_field(20.4, 20.6, 0, [threat(15.3, 20.1)])
+        self.assertEqual(self.flow.builds, 1)
+        self.grid.update([{"x": 30, "y": 30, "z": 0, "w": False}], 2)
+        self.flow.flee_field(20, 20, 0, zombies)
+        self.assertEqual(self.flow.builds, 2)
+
+    def test_hundreds_of_threats(self):
+        self.open_field(-20, -20, 80, 80, wall=lambda x, y: (x * 7 + y * 13) % 11 == 0)
+        flow = FlowFieldService(self.grid, radius=30)
+        rng = random.Random(2)
+        zombies = [threat(rng.uniform(-10, 70), rng.uniform(-10, 70)) for _ in range(400)]
+        flow.flee_field(30, 30, 0, zombies)
+        self.assertLess(flow.last_ms, 250) # A few ms in practice; loose for slow CI
+
+    def test_survival_strategy_flees(self):
+        self.open_field(0, 0, 40, 40)
+        state = BrainState()
+        state.situation.current_mode = SituationMode.SURVIVAL
+        state.situation.primary_driver = "High Threat"
+        state.player = Player(position=Position(x=20.5, y=20.5, z=0))
+        state.threat.vectors = [threat(17, 20)]
+        state.flow = self.flow
+        queue = ActionQueue()
+        SurvivalStrategy().execute(state, queue)
+        action = queue.pop_all()[0]
+        self.assertEqual(action["type"], "MoveTo")
+        self.assertGreater(action["params"]["x"], 20)
+
+        state.flow = None
+        SurvivalStrategy().execute(state, queue)
+        self.assertEqual(queue.pop_all()[0]["type"], "Wait")
+
+if __name__ == '__main__':
+    unittest.main()
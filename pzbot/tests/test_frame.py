@@ -0,0 +1,81 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from bot_runtime.ingest.frame import FrameReader, TornReadError, split_frame
+from bot_runtime.ingest.parser import StateParser
+
+def encode_frame(data: dict, seq: int) -> bytes:
+    body = json.dumps(data, ensure_ascii=False)
+    length = len(body.encode('utf-16-le')) // 2 # Java String.length(), like Kahlua's #
+    return (body + f"\n#PZB {seq} {length}\n").encode('utf-8')
+
+STATE = {"timestamp": 1, "player": {"position": {"x": 1, "y": 2, "z": 0}, "guid": "Zoë"}}
+
+class TestSplitFrame(unittest.TestCase):
+    def test_complete_frame(self):
+        raw = encode_frame(STATE, 7)
+        body, seq = split_frame(raw)
+        self.assertEqual(seq, 7)
+        self.assertEqual(json.loads(body), STATE)
+
+    def test_characters_outside_the_bmp(self):
+        state = {"timestamp": 1, "player": {"position": {"x": 1, "y": 2, "z": 0}, "guid": "Zoë \U0001F9DF"}}
+        body, seq = split_frame(encode_frame(state, 2), require_trailer=True)
+        self.assertEqual(json.loads(body), state)
+
+    def test_every_prefix_is_torn(self):
+        raw = encode_frame(STATE, 7)
+        for cut in range(len(raw)):
+            with self.assertRaises(TornReadError, msg=f"cut at {cut}"):
+                split_frame(raw[:cut], require_trailer=True)
+
+    def test_legacy_frame_without_trailer(self):
+        raw = json.dumps(STATE).encode()
+        self.assertEqual(split_frame(raw), (raw, None))
+        with self.assertRaises(TornReadError):
+            split_frame(raw[:-3])
+        with self.assertRaises(TornReadError):
+            split_frame(raw, require_trailer=True)
+
+    def test_parser_reads_trailer_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "state.json"
+            path.write_bytes(encode_frame(STATE, 1))
+            self.assertEqual(StateParser().parse_file(path).player.position.y, 2)
+
+class TestFrameReader(unittest.TestCase):
+    def test_retries_until_writer_finishes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "state.json"
+            raw = encode_frame(STATE, 3)
+            path.write_bytes(raw[:40]) # Writer is mid-write
+
+            def finish():
+                time.sleep(0.02)
+                path.write_bytes(raw)
+            t = threading.Thread(target=finish)
+            t.start()
+
+            reader = FrameReader(path, retries=50, retry_delay=0.002)
+            body, seq = reader.read()
+            t.join()
+            self.assertEqual(seq, 3)
+            self.assertGreater(reader.torn_reads, 0)
+            self.assertEqual(reader.failed_reads, 0)
+
+    def test_gives_up_and_counts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "state.json"
+            path.write_bytes(encode_frame(STATE, 1)[:-5])
+            reader = FrameReader(path, retries=2, retry_delay=0)
+            with self.assertRaises(TornReadError):
+                reader.read()
+            self.assertEqual(reader.torn_reads, 3)
+            self.assertEqual(reader.failed_reads, 1)
+
+if __name__ == '__main__':
+    unittest.main()
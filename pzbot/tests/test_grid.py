@@ -11,8 +11,8 @@ class TestSpatialGrid(unittest.TestCase):
         
         # New vision
         vision_tiles = [
-            StateTile(x=10, y=10, z=0),
-            StateTile(x=11, y=10, z=0)
+            StateTile(x=10, y=10, z=0, w=True),
+            StateTile(x=11, y=10, z=0, w=True)
         ]
         
         grid.update(vision_tiles)
@@ -25,7 +25,7 @@ class TestSpatialGrid(unittest.TestCase):
 
     def test_update_updates_timestamp(self):
         grid = SpatialGrid()
-        vision_tiles = [StateTile(x=10, y=10, z=0)]
+        vision_tiles = [StateTile(x=10, y=10, z=0, w=True)]
         grid.update(vision_tiles)
         
         t1 = grid.get_tile(10, 10, 0).last_seen
@@ -40,9 +40,9 @@ class TestSpatialGrid(unittest.TestCase):
 
     def test_update_merges_unique_tiles(self):
         grid = SpatialGrid()
-        grid.update([StateTile(x=10, y=10, z=0)])
-        grid.update([StateTile(x=11, y=10, z=0)]) # New tile
-        grid.update([StateTile(x=10, y=10, z=0)]) # Existing tile
+        grid.update([StateTile(x=10, y=10, z=0, w=True)])
+        grid.update([StateTile(x=11, y=10, z=0, w=True)]) # New tile
+        grid.update([StateTile(x=10, y=10, z=0, w=True)]) # Existing tile
         
         self.assertEqual(grid.get_stats()["total_tiles"], 2)
 
@@ -0,0 +1,120 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from bot_runtime.world.processors.grid_chunk import GridChunk, TileView, CHUNK_SIZE
+from bot_runtime.world.processors.grid_system import GridSystem
+from bot_runtime.world.processors.grid_stream import GridStreamReader
+from bot_runtime.analysis.navigation import NavigationAnalyzer
+from bot_runtime.brain.state import CharacterPersonality
+from tools.synthetic_state import make_frame
+
+def vision_tiles(**kw) -> list:
+    return make_frame(**kw)["player"]["vision"]["tiles"]
+
+class TestGridChunk(unittest.TestCase):
+    def test_write_and_read_tiles(self):
+        chunk = GridChunk(1, 2)
+        chunk.write_tiles([
+            {"x": 10, "y": 20, "z": 0, "w": True, "room": "kitchen", "layer": "Floor"},
+            {"x": 19, "y": 29, "z": 0, "w": False},
+            {"x": 15, "y": 25, "z": 1, "w": True, "meta": {"door": True}},
+        ], 500)
+
+        tile = chunk.get(10, 20, 0)
+        self.assertIsInstance(tile, TileView)
+        self.assertEqual((tile.room, tile.layer, tile.is_walkable, tile.last_seen), ("kitchen", "Floor", True, 500))
+        self.assertFalse(chunk.get(19, 29, 0).is_walkable)
+        self.assertIsNone(chunk.get(11, 20, 0)) # Never seen
+        self.assertIsNone(chunk.get(10, 20, 2)) # No such level
+        self.assertEqual(chunk.get(15, 25, 1).meta, {"door": True})
+        self.assertEqual(chunk.tile_count(), 3)
+        self.assertEqual(chunk.bounds(), (10, 19, 20, 29))
+
+        # Rewrite clears the old meta and room
+        chunk.write_tiles([{"x": 15, "y": 25, "z": 1, "w": False}], 600)
+        tile = chunk.get(15, 25, 1)
+        self.assertEqual((tile.meta, tile.room, tile.is_walkable), ({}, None, False))
+
+    def test_round_trip(self):
+        chunk = GridChunk(-1, 0)
+        chunk.write_tiles([{"x": -10, "y": 0, "z": 0, "w": False, "room": "bathroom"},
+                           {"x": -1, "y": 9, "z": 1, "layer": "Wall", "meta": {"n": 1}}], 7)
+        loaded = GridChunk.from_dict(json.loads(json.dumps(chunk.to_dict())))
+        self.assertEqual(sorted(loaded.tiles()), sorted(chunk.tiles()))
+        self.assertEqual(loaded.tile_count(), 2)
+
+    def test_loads_old_tile_dict_format(self):
+        old = {"chunk_x": 0, "chunk_y": 0, "last_visited": 1,
+               "tiles": {"3_4_0": {"x": 3, "y": 4, "z": 0, "is_walkable": False, "is_explored": True,
+                                   "last_seen": 99, "layer": None, "room": "garage", "meta": {}}}}
+        tile = GridChunk.from_dict(old).get(3, 4, 0)
+        self.assertEqual((tile.is_walkable, tile.is_explored, tile.last_seen, tile.room), (False, True, 99, "garage"))
+
+class TestGridSystemChunks(unittest.TestCase):
+    def test_batched_update_groups_by_chunk_and_level(self):
+        tiles = [{"x": x, "y": y, "z": z, "w": (x + y) % 3 > 0, "room": "hall" if x < 0 else None}
+                 for x in range(-12, 13) for y in (-1, 0, 9, 10) for z in (0, 1)]
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp))
+            grid.update(tiles, 5)
+            for t in tiles:
+                view = grid.get_tile(t["x"], t["y"], t["z"])
+                self.assertEqual((view.is_walkable, view.room, view.last_seen), (t["w"], t["room"], 5))
+            self.assertEqual(sorted(grid.chunks.keys()), [(cx, cy, z) for cx in (-2, -1, 0, 1) for cy in (-1, 0, 1) for z in (0, 1)])
+            self.assertEqual(grid.floors(), {0: 12, 1: 12})
+            self.assertEqual((grid.min_x, grid.max_x, grid.min_y, grid.max_y), (-12, 12, -1, 10))
+
+            # Same tiles again: stamped, nothing rewritten
+            grid.flush_dirty()
+            version = grid.version
+            grid.update(tiles, 6)
+            self.assertEqual(grid.version, version)
+            self.assertFalse(any(c.is_dirty for c in grid.chunks.values()))
+            self.assertEqual(grid.get_tile(-12, -1, 1).last_seen, 6)
+            grid.close()
+
+    def test_mapped_ratio_counts_own_floor_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp))
+            grid.update([{"x": x, "y": y, "z": 0, "w": True} for x in range(0, 50) for y in range(0, 50, 10)], 1)
+            grid.update([{"x": 5, "y": 5, "z": 2, "w": True}], 1) # One chunk upstairs
+            self.assertEqual(grid.mapped_ratio(25, 25, 0), 1.0)
+            self.assertEqual(grid.mapped_ratio(25, 25, 2), 1 / 25)
+            self.assertEqual(grid.mapped_ratio(25, 25, 1), 0.0)
+
+            player = SimpleNamespace(position=SimpleNamespace(x=25.5, y=25.5, z=2.0))
+            state = NavigationAnalyzer(CharacterPersonality()).analyze(SimpleNamespace(player=player, grid=grid))
+            self.assertEqual(state.mapped_ratio, 1 / 25)
+            grid.close()
+
+    def test_update_persist_and_reload(self):
+        tiles = vision_tiles(radius=6, px=100, py=100)
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp))
+            grid.update(tiles, 1000)
+            t = tiles[0]
+            self.assertEqual(grid.get_tile(t["x"], t["y"], t["z"]).is_walkable, t["w"])
+            self.assertEqual(grid.get_stats()["total_tiles"], len(tiles))
+
+            snapshot = Path(tmp) / "snapshot.json"
+            grid.save_snapshot(str(snapshot))
+            stream = GridStreamReader(Path(tmp) / "grid_stream.jsonl")
+            stream.poll()
+            saved = stream.since(0)
+            flat = [t for chunk in saved["chunks"].values() for t in chunk]
+            self.assertEqual(len(flat), len(tiles))
+            self.assertEqual(saved["bounds"]["min_x"], min(t["x"] for t in tiles))
+            self.assertIn("is_walkable", flat[0])
+
+            # A fresh grid loads the chunks back from disk
+            self.assertTrue(grid.writer.flush(5))
+            reloaded = GridSystem(Path(tmp))
+            with reloaded._lock:
+                reloaded._get_or_load_chunk(t["x"] // CHUNK_SIZE, t["y"] // CHUNK_SIZE)
+            self.assertEqual(reloaded.get_tile(t["x"], t["y"], t["z"]), grid.get_tile(t["x"], t["y"], t["z"]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from bot_runtime.ingest.state import Player, Position
+from bot_runtime.world.processors.grid_system import GridSystem
+from bot_runtime.analysis.zones import ZoneAnalyzer
+from bot_runtime.brain.state import CharacterPersonality
+
+def room_tiles() -> list:
+    # A 6x6 kitchen straddling four chunks (x, y in 7..12) walled on x == 13, then a hall
+    tiles = []
+    for x in range(5, 20):
+        for y in range(7, 13):
+            if x == 13:
+                tiles.append({"x": x, "y": y, "z": 0, "w": False})
+            elif x < 13:
+                tiles.append({"x": x, "y": y, "z": 0, "w": True, "room": "kitchen" if x >= 7 else None})
+            else:
+                tiles.append({"x": x, "y": y, "z": 0, "w": True, "room": "hall"})
+    tiles.append({"x": 9, "y": 9, "z": 1, "w": True, "room": "attic"})
+    return tiles
+
+class TestGridQuery(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.grid = GridSystem(Path(self._tmp.name))
+        self.grid.update(room_tiles(), 100)
+
+    def tearDown(self):
+        self.grid.close()
+        self._tmp.cleanup()
+
+    def test_box_matches_get_tile(self):
+        cols = self.grid.query_box(3, 5, 15, 14, 0)
+        expected = {(x, y) for x in range(3, 16) for y in range(5, 15) if self.grid.get_tile(x, y, 0)}
+        self.assertEqual(set(zip(cols.x.tolist(), cols.y.tolist())), expected)
+        for row in range(len(cols)):
+            tile = self.grid.get_tile(int(cols.x[row]), int(cols.y[row]), 0)
+            self.assertEqual((bool(cols.walkable[row]), cols.room(row), int(cols.last_seen[row])),
+                             (tile.is_walkable, tile.room, tile.last_seen))
+        self.assertEqual(len(self.grid.query_box(100, 100, 110, 110, 0)), 0) # Nothing loaded
+        self.assertEqual(self.grid.query_box(9, 9, 9, 9, 1).room(0), "attic")
+
+    def test_radius(self):
+        cols = self.grid.query_radius(10, 10, 2, 0)
+        self.assertEqual(len(cols), 13) # Lattice points of a radius-2 disk, all known
+        self.assertTrue(all((x - 10) ** 2 + (y - 10) ** 2 <= 4 for x, y in zip(cols.x, cols.y)))
+
+    def test_raycast(self):
+        dist = self.grid.raycast(10, 10, 0, [(1, 0), (-1, 0), (0, 1), (1, -1)], 10)
+        self.assertEqual(dist.tolist(), [3, 10, 10, 3]) # Wall at x == 13; unknown counts as open
+        self.assertEqual(self.grid.raycast(10, 10, 0, [(0, 1)], 10, unknown_blocks=True).tolist(), [3])
+
+    def test_tiles_in_room(self):
+        kitchen = self.grid.tiles_in_room("kitchen", 0)
+        self.assertEqual(len(kitchen), 36)
+        self.assertEqual((kitchen.x.min(), kitchen.x.max(), kitchen.y.min(), kitchen.y.max()), (7, 12, 7, 12))
+        self.assertEqual(len(self.grid.tiles_in_room("kitchen", 1)), 0)
+        self.assertEqual(len(self.grid.tiles_in_room("nowhere", 0)), 0)
+
+    def test_zone_analyzer_uses_player_floor(self):
+        analyzer = ZoneAnalyzer(CharacterPersonality())
+        def zone(x, y, z):
+            player = Player(position=Position(x=x, y=y, z=z))
+            return analyzer.analyze(SimpleNamespace(player=player, grid=self.grid)).current_zone
+        self.assertEqual(zone(8, 10, 0), "kitchen")
+        self.assertEqual(zone(14, 10, 0), "hall") # Wall column has no room
+        self.assertEqual(zone(9, 9, 1), "attic")
+        self.assertEqual(zone(50, 50, 0), "Outdoors")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from bot_runtime.world.processors.grid_stream import GridStreamWriter, GridStreamReader
+from bot_runtime.world.processors.grid_system import GridSystem
+
+def row(cx: int, step: int) -> list:
+    return [{"x": cx * 10 + i, "y": 5, "z": 0, "w": i != step % 10} for i in range(10)]
+
+class TestGridStream(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.grid = GridSystem(self.dir, max_chunks=0, ttl_ms=0)
+        self.snapshot = str(self.dir / "grid_snapshot.json")
+        self.stream = self.dir / "grid_stream.jsonl"
+
+    def tearDown(self):
+        self.grid.close()
+        self._tmp.cleanup()
+
+    def test_snapshots_publish_only_changed_chunks(self):
+        for cx in range(5):
+            self.grid.update(row(cx, 0), 1)
+        self.grid.save_snapshot(self.snapshot, {"entities": []})
+        self.grid.update(row(2, 1), 2)
+        self.grid.save_snapshot(self.snapshot)
+        self.grid.save_snapshot(self.snapshot) # Nothing changed: nothing appended
+
+        lines = [json.loads(l) for l in self.stream.read_text().splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0]["base"])
+        self.assertEqual(len(lines[0]["chunks"]), 5)
+        self.assertFalse(lines[1]["base"])
+        self.assertEqual(list(lines[1]["chunks"]), ["2,0,0"])
+
+        with open(self.snapshot) as f:
+            doc = json.load(f)
+        self.assertNotIn("tiles", doc)
+        self.assertEqual(doc["version"], lines[1]["version"])
+
+    def test_reader_answers_since_version(self):
+        reader = GridStreamReader(self.stream)
+        for cx in range(3):
+            self.grid.update(row(cx, 0), 1)
+        self.grid.save_snapshot(self.snapshot)
+        reader.poll()
+        first = reader.since(0)
+        self.assertTrue(first["full"])
+        self.assertEqual(sorted(first["chunks"]), ["0,0,0", "1,0,0", "2,0,0"])
+        self.assertEqual(first["bounds"], {"min_x": 0, "max_x": 29, "min_y": 5, "max_y": 5})
+
+        self.grid.update(row(1, 4), 2)
+        self.grid.save_snapshot(self.snapshot)
+        reader.poll()
+        delta = reader.since(first["version"], first["stream"])
+        self.assertFalse(delta["full"])
+        self.assertEqual(list(delta["chunks"]), ["1,0,0"])
+        walkable = {t["x"]: t["is_walkable"] for t in delta["chunks"]["1,0,0"]}
+        self.assertFalse(walkable[14])
+        self.assertEqual(reader.since(delta["version"], delta["stream"])["chunks"], {})
+        self.assertTrue(reader.since(delta["version"], "another-run")["full"])
+
+    def test_rebase_keeps_reader_position(self):
+        self.grid._stream = GridStreamWriter(self.stream, rebase_ratio=1.5, min_rebase_bytes=0)
+        reader = GridStreamReader(self.stream)
+        for cx in range(4):
+            self.grid.update(row(cx, 0), 1)
+        self.grid.save_snapshot(self.snapshot)
+        reader.poll()
+        version = reader.version
+        for step in range(1, 6):
+            self.grid.update(row(step % 4, step), step + 1)
+            self.grid.save_snapshot(self.snapshot)
+            reader.poll()
+        self.assertGreater(self.grid._stream.bases, 1)
+        # The new base is a new file: the reader follows it and still serves deltas
+        delta = reader.since(version, reader.stream)
+        self.assertFalse(delta["full"])
+        self.assertEqual(sorted(delta["chunks"]), ["0,0,0", "1,0,0", "2,0,0", "3,0,0"])
+        self.assertEqual(len(reader.since(0)["chunks"]), 4)
+
+    def test_reader_waits_for_complete_lines(self):
+        writer = GridStreamWriter(self.stream)
+        line = writer.line(3, [((0, 0), 3, [{"x": 1, "y": 2}])], base=True)
+        self.stream.write_bytes(line[:10])
+        reader = GridStreamReader(self.stream)
+        self.assertEqual(reader.poll(), 0)
+        with open(self.stream, 'ab') as f:
+            f.write(line[10:])
+        self.assertEqual(reader.poll(), 1)
+        self.assertEqual(reader.since(0)["chunks"], {"0,0": [{"x": 1, "y": 2}]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import math
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from bot_runtime.world.hpa import HierarchicalPathfinder
+from bot_runtime.world.processors.grid_system import GridSystem
+from tests.grid_reference import dijkstra
+
+def maze(width: int, height: int, seed: int, density: float = 0.25) -> list:
+    """Random walls, plus an open corridor along y == 0 and x == 0 so most tiles connect."""
+    rng = random.Random(seed)
+    return [{"x": x, "y": y, "z": 0, "w": x == 0 or y == 0 or rng.random() > density}
+            for x in range(width) for y in range(height)]
+
+class TestHierarchicalPathfinder(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.grid = GridSystem(Path(self._tmp.name))
+        self.nav = HierarchicalPathfinder(self.grid, refine=0)
+
+    def tearDown(self):
+        self.grid.close()
+        self._tmp.cleanup()
+
+    def assert_valid(self, tiles: list, open_: set):
+        for (ax, ay, _), (bx, by, _) in zip(tiles, tiles[1:]):
+            dx, dy = bx - ax, by - ay
+            self.assertTrue(max(abs(dx), abs(dy)) == 1, f"{(ax, ay)} -> {(bx, by)}")
+            self.assertIn((bx, by), open_)
+            if dx and dy:
+                self.assertIn((ax + dx, ay), open_) # No corner cutting
+                self.assertIn((ax, ay + dy), open_)
+
+    def test_paths_are_valid_and_near_optimal(self):
+        tiles = maze(60, 60, seed=3)
+        self.grid.update(tiles, 1)
+        open_ = {(t["x"], t["y"]) for t in tiles if t["w"]}
+        rng = random.Random(7)
+        cells = sorted(open_)
+        checked = 0
+        for _ in range(30):
+            (sx, sy), (ex, ey) = rng.choice(cells), rng.choice(cells)
+            best = dijkstra(open_.__contains__, [(sx, sy)], (ex, ey))
+            path = self.nav.find_path((sx, sy, 0), (ex, ey, 0))
+            if best == math.inf:
+                self.assertIsNone(path)
+                continue
+            checked += 1
+            self.assertIsNotNone(path)
+            self.assertTrue(path.complete)
+            self.assertEqual((path.tiles[0], path.tiles[-1]), ((sx, sy, 0), (ex, ey, 0)))
+            self.assert_valid(path.tiles, open_)
+            steps = sum(math.dist(a[:2], b[:2]) for a, b in zip(path.tiles, path.tiles[1:]))
+            self.assertAlmostEqual(steps, path.cost, places=6)
+            self.assertLessEqual(path.cost, best * 1.25 + 2) # Entrances cost a little optimality
+        self.assertGreater(checked, 20)
+
+    def test_refines_only_near_the_start(self):
+        self.grid.update([{"x": x, "y": y, "z": 0, "w": True} for x in range(200) for y in range(5)], 1)
+        path = self.nav.find_path((0, 2, 0), (199, 2, 0), refine=12)
+        self.assertFalse(path.complete)
+        self.assertGreaterEqual(len(path.tiles), 12)
+        self.assertLess(len(path.tiles), 30)
+        self.assertEqual(path.waypoints[-1], (199, 2, 0))
+        self.assertAlmostEqual(path.cost, 199.0)
+        # Walking on re-queries from the last refined tile
+        rest = self.nav.find_path(path.tiles[-1], (199, 2, 0))
+        self.assertAlmostEqual(path.cost, rest.cost + sum(
+            math.dist(a[:2], b[:2]) for a, b in zip(path.tiles, path.tiles[1:])))
+
+    def test_tile_changes_invalidate_only_their_chunk(self):
+        self.grid.update([{"x": x, "y": y, "z": 0, "w": True} for x in range(50) for y in range(10)], 1)
+        self.assertAlmostEqual(self.nav.find_path((0, 4, 0), (49, 4, 0)).cost, 49.0)
+        builds = self.nav.chunk_builds
+        self.assertAlmostEqual(self.nav.find_path((0, 4, 0), (49, 4, 0)).cost, 49.0)
+        self.assertEqual(self.nav.chunk_builds, builds) # Fully cached
+
+        # A wall across x == 25 with one gap at y == 0
+        self.grid.update([{"x": 25, "y": y, "z": 0, "w": y == 0} for y in range(10)], 2)
+        path = self.nav.find_path((0, 4, 0), (49, 4, 0))
+        self.assertIn((25, 0, 0), path.tiles)
+        self.assertEqual(self.nav.chunk_builds, builds + 1)
+
+        self.grid.update([{"x": 25, "y": 0, "z": 0, "w": False}], 3)
+        self.assertIsNone(self.nav.find_path((0, 4, 0), (49, 4, 0)))
+
+    def test_unknown_tiles_and_other_floors_block(self):
+        self.grid.update([{"x": x, "y": 0, "z": 0, "w": True} for x in range(10)]
+                         + [{"x": x, "y": 0, "z": 0, "w": True} for x in range(15, 25)], 1)
+        self.assertIsNone(self.nav.find_path((0, 0, 0), (20, 0, 0))) # Gap never seen
+        self.assertIsNone(self.nav.find_path((0, 0, 0), (5, 0, 1)))
+        self.assertIsNone(self.nav.find_path((0, 0, 0), (0, 1, 0))) # Goal unknown
+        self.assertEqual(self.nav.find_path((3, 0, 0), (3, 0, 0)).tiles, [(3, 0, 0)])
+
+    def test_search_bound(self):
+        self.grid.update(maze(80, 80, seed=5, density=0.0), 1)
+        self.assertIsNone(HierarchicalPathfinder(self.grid, max_nodes=3).find_path((0, 0, 0), (79, 79, 0)))
+        self.assertIsNotNone(self.nav.find_path((0, 0, 0), (79, 79, 0)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from bot_runtime.ingest.lazy import LazyList
+from bot_runtime.ingest.parser import StateParser, DECODER_FAST, DECODER_VALIDATED
+from tools.synthetic_state import make_frame
+
+class TestLazyVision(unittest.TestCase):
+    def check_lazy(self, decoder):
+        state = StateParser(decoder=decoder).parse_dict(make_frame(radius=3))
+        vision = state.player.vision
+        tiles = vision.tiles
+
+        self.assertIsInstance(tiles, LazyList)
+        self.assertFalse(tiles.is_materialized)
+        self.assertEqual(len(tiles), 49) # len() does not decode
+        self.assertFalse(tiles.is_materialized)
+
+        first = tiles[0]
+        self.assertTrue(tiles.is_materialized)
+        self.assertIs(vision.tiles[0], first) # Cached for the rest of the frame
+        self.assertIsInstance(first.x, int)
+        self.assertIsInstance(tiles.raw[0], dict)
+
+        container = vision.nearby_containers[0]
+        self.assertFalse(container.items.is_materialized)
+        self.assertTrue(all(i.name for i in container.items))
+        self.assertFalse(vision.world_items.is_materialized)
+
+    def test_validated_decoder(self):
+        self.check_lazy(DECODER_VALIDATED)
+
+    def test_fast_decoder(self):
+        self.check_lazy(DECODER_FAST)
+
+    def test_lua_empty_table(self):
+        frame = make_frame(radius=1)
+        frame["player"]["vision"]["tiles"] = {}
+        state = StateParser().parse_dict(frame)
+        self.assertEqual(state.player.vision.tiles, [])
+        self.assertEqual(len(state.model_dump()["player"]["vision"]["tiles"]), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
 
+import math
+import random
 import unittest
 from typing import List
 from bot_runtime.world.grid import SpatialGrid, GridTile
@@ -11,6 +13,14 @@ class MockTile:
         self.y = y
         self.z = z
 
+class MapTile(MockTile):
+    def __init__(self, x, y, z, w):
+        super().__init__(x, y, z)
+        self.w = w
+
+def path_length(path) -> float:
+    return sum(math.dist(a[:2], b[:2]) for a, b in zip(path, path[1:]))
+
 class TestNavigation(unittest.TestCase):
     def setUp(self):
         self.grid = SpatialGrid()
@@ -65,5 +75,47 @@ class TestNavigation(unittest.TestCase):
         path = self.nav.find_path((0, 0, 0), (10, 10, 0))
         self.assertIsNone(path)
 
+    def test_jps_matches_astar_lengths(self):
+        rng = random.Random(11)
+        tiles = [MapTile(x, y, 0, rng.random() > 0.3) for x in range(40) for y in range(40)]
+        self.grid.update(tiles)
+        cells = [(t.x, t.y, 0) for t in tiles if t.w]
+        astar = Pathfinder(self.grid, mode="astar")
+        jps = Pathfinder(self.grid, mode="jps")
+        found = 0
+        for _ in range(60):
+            start, end = rng.choice(cells), rng.choice(cells)
+            expected = astar.find_path(start, end)
+            path = jps.find_path(start, end)
+            if expected is None:
+                self.assertIsNone(path)
+                continue
+            found += 1
+            self.assertEqual((path[0], path[-1]), (start, end))
+            for a, b in zip(path, path[1:]):
+                self.assertEqual(max(abs(a[0] - b[0]), abs(a[1] - b[1])), 1)
+                self.assertTrue(self.grid.is_walkable(*b))
+            self.assertAlmostEqual(path_length(path), path_length(expected), places=6)
+        self.assertGreater(found, 20)
+
+    def test_jps_expands_fewer_nodes_in_the_open(self):
+        self.grid.update([MapTile(x, y, 0, not (x == 20 and 5 <= y < 35)) for x in range(40) for y in range(40)])
+        astar = Pathfinder(self.grid, mode="astar")
+        jps = Pathfinder(self.grid)
+        self.assertTrue(jps.uses_jps)
+        expected = astar.find_path((2, 20, 0), (38, 20, 0))
+        path = jps.find_path((2, 20, 0), (38, 20, 0))
+        self.assertAlmostEqual(path_length(path), path_length(expected), places=6)
+        self.assertLess(jps.expanded * 10, astar.expanded)
+
+    def test_tile_costs_use_astar(self):
+        self.grid.update([MapTile(x, y, 0, True) for x in range(5) for y in range(3)])
+        # Row y == 1 is mud: the cheap route keeps to the edges
+        nav = Pathfinder(self.grid, tile_cost=lambda x, y, z: 5.0 if y == 1 and 0 < x < 4 else 1.0)
+        self.assertFalse(nav.uses_jps)
+        self.assertNotIn((2, 1, 0), nav.find_path((0, 1, 0), (4, 1, 0)))
+        with self.assertRaises(ValueError):
+            Pathfinder(self.grid, mode="jps", tile_cost=lambda x, y, z: 1.0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,87 @@
+import math
+import tempfile
+import unittest
+from pathlib import Path
+
+from bot_runtime.world.hpa import HierarchicalPathfinder
+from bot_runtime.world.path_cache import PathCache
+from bot_runtime.world.processors.grid_system import GridSystem
+
+def field(width: int, height: int, room=None) -> list:
+    return [{"x": x, "y": y, "z": 0, "w": True, "room": room} for x in range(width) for y in range(height)]
+
+class TestPathCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.grid = GridSystem(Path(self._tmp.name))
+        self.nav = HierarchicalPathfinder(self.grid, refine=0)
+        self.cache = PathCache(self.nav, max_entries=8)
+        self.grid.update(field(60, 30), 1)
+
+    def tearDown(self):
+        self.grid.close()
+        self._tmp.cleanup()
+
+    def test_start_tiles_in_one_chunk_share_an_entry(self):
+        first = self.cache.find_path((2, 12, 0), (55, 12, 0))
+        self.assertAlmostEqual(first.cost, self.nav.find_path((2, 12, 0), (55, 12, 0)).cost)
+        path = self.cache.find_path((4, 13, 0), (55, 12, 0))
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+        self.assertTrue(path.complete)
+        self.assertEqual((path.tiles[0], path.tiles[-1]), ((4, 13, 0), (55, 12, 0)))
+        for a, b in zip(path.tiles, path.tiles[1:]):
+            self.assertEqual(max(abs(a[0] - b[0]), abs(a[1] - b[1])), 1)
+        steps = sum(math.dist(a[:2], b[:2]) for a, b in zip(path.tiles, path.tiles[1:]))
+        self.assertAlmostEqual(steps, path.cost, places=6)
+        fresh = self.nav.find_path((4, 13, 0), (55, 12, 0))
+        self.assertLessEqual(path.cost, fresh.cost + 2) # Joined within the start chunk only
+
+        self.assertEqual(self.cache.find_path((2, 12, 0), (55, 12, 0)).cost, first.cost)
+        self.cache.find_path((25, 12, 0), (55, 12, 0)) # Other chunk: a new search
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (2, 2, 2))
+        self.assertAlmostEqual(stats["hit_rate"], 0.5)
+
+    def test_walkability_changes_drop_only_crossing_entries(self):
+        self.cache.find_path((2, 2, 0), (55, 2, 0)) # Crosses every chunk along y < 10
+        self.cache.find_path((2, 25, 0), (8, 25, 0)) # Stays in chunk (0, 2)
+        self.grid.update([{"x": 30, "y": y, "z": 0, "w": y == 20} for y in range(10)], 2)
+        self.cache.find_path((2, 25, 0), (8, 25, 0))
+        self.assertEqual(self.cache.get_stats()["invalidated"], 1)
+        self.assertEqual(self.cache.hits, 1)
+        detour = self.cache.find_path((2, 2, 0), (55, 2, 0))
+        self.assertEqual(self.cache.misses, 3)
+        self.assertNotIn((30, 2, 0), detour.tiles)
+
+    def test_room_changes_keep_entries(self):
+        self.cache.find_path((2, 2, 0), (55, 2, 0))
+        self.grid.update(field(60, 10, room="kitchen"), 2)
+        self.cache.find_path((2, 2, 0), (55, 2, 0))
+        self.assertEqual((self.cache.hits, self.cache.invalidated), (1, 0))
+
+    def test_failed_searches_are_not_cached(self):
+        self.assertIsNone(self.cache.find_path((2, 2, 0), (80, 2, 0)))
+        self.grid.update([{"x": x, "y": 2, "z": 0, "w": True} for x in range(60, 81)], 2)
+        self.assertIsNotNone(self.cache.find_path((2, 2, 0), (80, 2, 0)))
+        self.assertEqual(self.cache.get_stats()["entries"], 1)
+
+    def test_evicted_chunks_drop_entries(self):
+        grid = GridSystem(Path(self._tmp.name) / "small", max_chunks=2, ttl_ms=0)
+        try:
+            nav = HierarchicalPathfinder(grid, refine=0)
+            cache = PathCache(nav)
+            grid.update(field(60, 10), 1)
+            self.assertIsNotNone(cache.find_path((2, 2, 0), (55, 2, 0)))
+            # Only the end chunks stay loaded; the path's middle is evicted (to disk)
+            grid.update([{"x": 2, "y": 2, "z": 0, "w": True}, {"x": 55, "y": 2, "z": 0, "w": True}], 2)
+            grid.maintenance()
+            self.assertIsNone(nav.find_path((2, 2, 0), (55, 2, 0)))
+            self.assertIsNone(cache.find_path((3, 2, 0), (55, 2, 0)))
+            self.assertIsNone(cache.find_path((2, 2, 0), (55, 2, 0)))
+            self.assertEqual((cache.hits, cache.get_stats()["entries"]), (0, 0))
+            self.assertIsNone(nav.refine_nodes([(2, 2, 0), (9, 2, 0), (10, 2, 0), (15, 2, 0)], [0.0, 7.0, 8.0, 13.0]))
+        finally:
+            grid.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import time
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from bot_runtime.ingest.pipeline import IngestPipeline, LatestFrameMailbox
+from bot_runtime.ingest.watcher import BACKEND_POLL
+
+class TestLatestFrameMailbox(unittest.TestCase):
+    def test_latest_wins_and_counts_drops(self):
+        box = LatestFrameMailbox()
+        for i in range(5):
+            box.put(i)
+        self.assertEqual(box.take(timeout=0), 4)
+        self.assertIsNone(box.take(timeout=0))
+        self.assertEqual(box.dropped, 4)
+        self.assertEqual(box.taken, 1)
+
+    def test_close_wakes_taker(self):
+        box = LatestFrameMailbox()
+        result = []
+        t = threading.Thread(target=lambda: result.append(box.take(timeout=5.0)))
+        t.start()
+        box.close()
+        t.join(timeout=1.0)
+        self.assertFalse(t.is_alive())
+        self.assertEqual(result, [None])
+
+class TestIngestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "state.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_state(self, ts):
+        with open(self.path, 'w') as f:
+            json.dump({"timestamp": ts, "player": {"position": {"x": 0, "y": 0, "z": 0}}}, f)
+
+    def test_slow_tick_acts_on_freshest_frame(self):
+        ticks = []
+        first_tick = threading.Event()
+
+        def on_frame(state):
+            ticks.append(state.timestamp)
+            first_tick.set()
+            time.sleep(0.3) # Long brain tick
+
+        pipeline = IngestPipeline(self.path, on_frame, polling_interval=0.01, backend=BACKEND_POLL)
+        pipeline.start()
+        try:
+            self.write_state(1)
+            self.assertTrue(first_tick.wait(2.0))
+            # Several frames land while the first tick is still running
+            for ts in range(2, 7):
+                time.sleep(0.04)
+                self.write_state(ts)
+
+            deadline = time.time() + 2.0
+            while (not ticks or ticks[-1] != 6) and time.time() < deadline:
+                time.sleep(0.02)
+        finally:
+            pipeline.stop()
+
+        self.assertEqual(ticks[0], 1)
+        self.assertEqual(ticks[-1], 6)
+        self.assertLess(len(ticks), 6)
+        self.assertGreater(pipeline.get_stats()["dropped"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import math
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from bot_runtime.brain.state import BrainState
+from bot_runtime.control.action_queue import ActionQueue
+from bot_runtime.ingest.parser import StateParser
+from bot_runtime.ingest.tiles import TileBlock
+from bot_runtime.planning.planner import ActionPlanner
+from bot_runtime.planning.plans.search_building_plan import SearchBuildingPlan
+from bot_runtime.strategy.implementations.loot import LootStrategy
+from bot_runtime.world.processors.grid_system import GridSystem
+from bot_runtime.world.processors.room_index import RoomIndex
+from bot_runtime.world.reach import ReachService
+from tests.grid_reference import dijkstra
+
+# A 20x12 house split by a wall along x == 10; the only door is at (10, 11).
+# West: kitchen with a pantry in its corner (x < 4, y >= 6). East: bedroom.
+def house(x: int, y: int) -> bool:
+    return not (x == 10 and y != 11)
+
+def rooms(x: int, y: int):
+    if x > 10:
+        return "bedroom"
+    if x < 4 and y >= 6:
+        return "pantry"
+    return "kitchen" if x < 10 or y == 11 else None
+
+class TestReach(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.grid = GridSystem(Path(self._tmp.name))
+        self.reach = ReachService(self.grid, radius=30)
+
+    def tearDown(self):
+        self.grid.close()
+        self._tmp.cleanup()
+
+    def build_house(self) -> list:
+        tiles = [{"x": x, "y": y, "z": 0, "w": house(x, y), "v": True, "room": rooms(x, y)}
+                 for x in range(20) for y in range(12)]
+        self.grid.update(tiles, 1)
+        return tiles
+
+    def test_distances_match_dijkstra(self):
+        rng = random.Random(5)
+        tiles = [{"x": x, "y": y, "z": 0, "w": rng.random() > 0.3} for x in range(30) for y in range(30)]
+        tiles[15 * 30 + 15]["w"] = True
+        self.grid.update(tiles, 1)
+        open_ = {(t["x"], t["y"]) for t in tiles if t["w"]}
+        reference = dijkstra(open_.__contains__, [(15, 15)])
+        field = self.reach.field(15.4, 15.8, 0)
+        targets = [(t["x"], t["y"]) for t in rng.sample(tiles, 80)]
+        for (x, y), d in zip(targets, field.distances(targets)):
+            if (x, y) in open_:
+                self.assertAlmostEqual(d, reference.get((x, y), math.inf), msg=str((x, y)))
+            else:
+                # Blocked tiles are reached from a neighbour
+                best = min((reference.get((x + dx, y + dy), math.inf) + math.hypot(dx, dy)
+                            for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx or dy) and (x + dx, y + dy) in open_),
+                           default=math.inf)
+                self.assertAlmostEqual(d, best, msg=str((x, y)))
+        self.assertEqual(field.distance(15, 15, z=1), math.inf)
+        self.assertEqual(field.distance(200, 15), math.inf) # Outside the radius
+
+    def test_one_field_per_tile_and_version(self):
+        tiles = self.build_house()
+        open_ = {(t["x"], t["y"]) for t in tiles if t["w"]}
+        field = self.reach.field(2.1, 2.9, 0)
+        self.assertIs(self.reach.field(2.7, 2.2, 0), field)
+        near = field.distance(3, 3)
+        expanded = field.expanded
+        self.assertLess(expanded, 20) # Stops once the near target is final
+        self.assertAlmostEqual(field.distance(15, 2), dijkstra(open_.__contains__, [(2, 2)], (15, 2))) # Through the door
+        self.assertGreater(field.distance(15, 2), 20)
+        self.assertGreater(field.expanded, expanded)
+        self.assertEqual(near, math.sqrt(2))
+        self.grid.update([{"x": 0, "y": 0, "z": 0, "w": False}], 2)
+        self.assertIsNot(self.reach.field(2, 2, 0), field)
+        self.assertEqual(self.reach.builds, 2)
+
+    def test_search_plan_prefers_the_reachable_room(self):
+        tiles = self.build_house()
+        index = RoomIndex()
+        index.update(TileBlock.from_rows(tiles))
+        state = BrainState(player=StateParser().parse_dict(
+            {"timestamp": 1, "player": {"position": {"x": 9, "y": 2, "z": 0}, "vision": {"tiles": tiles}}}).player)
+        state.vision = state.player.vision
+        state.rooms = index
+        state.memory.visited_rooms.add("kitchen")
+        home = index.room_at(9, 2, 0).building
+        # The bedroom's centre is nearer in a straight line, the pantry by walking
+        self.assertEqual(index.nearest_room(9, 2, 0, exclude_names={"kitchen"}, building=home).name, "bedroom")
+        state.reach = self.reach.field(9, 2, 0)
+        plan = SearchBuildingPlan(9, 2)
+        plan.execute(state)
+        self.assertEqual(plan.target_room, "pantry")
+        # Visible tiles without the room index: (11, 2) is right behind the wall
+        state.rooms = None
+        plan = SearchBuildingPlan(9, 2)
+        plan.execute(state)
+        self.assertEqual((plan.target_room, plan.nav_target), ("pantry", (3, 6)))
+        state.reach = None
+        plan = SearchBuildingPlan(9, 2)
+        plan.execute(state)
+        self.assertEqual((plan.target_room, plan.nav_target), ("bedroom", (11, 2)))
+
+    def test_loot_strategy_prefers_items_it_can_walk_to(self):
+        self.build_house()
+        frame = {"timestamp": 1, "player": {"position": {"x": 8, "y": 2, "z": 0}, "vision": {"tiles": [],
+                 "world_items": [{"id": "near", "name": "Shoes", "type": "Clothing", "category": "Clothing", "x": 11, "y": 2, "z": 0},
+                                 {"id": "far", "name": "Shirt", "type": "Clothing", "category": "Clothing", "x": 2, "y": 9, "z": 0}]}}}
+        player = StateParser().parse_dict(frame).player
+        state = BrainState(player=player, vision=player.vision)
+        state.reach = self.reach.field(8, 2, 0)
+        planner = ActionPlanner()
+        LootStrategy().execute(state, ActionQueue(), planner)
+        self.assertEqual(planner.active_plan.target_id, "far") # "near" is behind the wall
+
+if __name__ == '__main__':
+    unittest.main()
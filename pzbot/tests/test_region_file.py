@@ -0,0 +1,111 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from bot_runtime.world.processors.grid_chunk import GridChunk
+from bot_runtime.world.processors.region_file import RegionFile, RegionStore, DATA_OFFSET
+from bot_runtime.world.processors.grid_system import GridSystem
+
+def chunk_with(cx: int, cy: int, n: int) -> GridChunk:
+    chunk = GridChunk(cx, cy, 5)
+    chunk.write_tiles([{"x": cx * 10 + i % 10, "y": cy * 10 + i // 10, "z": i % 2, "w": i % 3 > 0,
+                        "room": "kitchen" if i % 4 else None, "meta": {"i": i} if i == 7 else None}
+                       for i in range(n)], 1000 + n)
+    return chunk
+
+class TestRegionFile(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_and_reopen(self):
+        store = RegionStore(self.dir)
+        chunks = [chunk_with(0, 0, 40), chunk_with(31, 31, 100), chunk_with(-1, 5, 3), chunk_with(32, 0, 10)]
+        for c in chunks:
+            store.save(c)
+        store.close()
+        # (0,0), (31,31) share a region; (-1,5) and (32,0) get their own
+        self.assertEqual(len(list(self.dir.glob("*.pzr"))), 3)
+
+        store = RegionStore(self.dir)
+        for c in chunks:
+            loaded = store.load(c.chunk_x, c.chunk_y)
+            self.assertEqual(sorted(loaded.tiles()), sorted(c.tiles()))
+            self.assertEqual(loaded.last_visited, 5)
+        self.assertIsNone(store.load(1, 0))
+        self.assertIsNone(store.load(500, 500))
+        store.close()
+
+    def test_rewrite_in_place_or_append(self):
+        region = RegionFile(self.dir / "r.0.0.pzr")
+        region.write(3, 4, chunk_with(3, 4, 100).to_bytes())
+        size = region.data_bytes
+        region.write(3, 4, chunk_with(3, 4, 90).to_bytes()) # Fits: same slot
+        self.assertEqual(region.data_bytes, size)
+        self.assertEqual(region.load(3, 4).tile_count(), 90)
+
+        big = chunk_with(3, 4, 100)
+        for i, t in enumerate(big.tiles()):
+            big.meta[(t.x, t.y, t.z)] = {"note": f"{i * 7919:x}" * 8}
+        region.write(3, 4, big.to_bytes()) # Does not fit: appended
+        self.assertGreater(region.data_bytes, size)
+        self.assertGreater(region.garbage, 0)
+
+        region.compact()
+        self.assertEqual(region.garbage, 0)
+        self.assertEqual(sorted(region.load(3, 4).tiles()), sorted(big.tiles()))
+        self.assertEqual(list(region.chunks()), [(3, 4)])
+        region.close()
+        self.assertEqual((self.dir / "r.0.0.pzr").stat().st_size, DATA_OFFSET + len(big.to_bytes()))
+
+    def test_rejects_other_files(self):
+        path = self.dir / "r.0.0.pzr"
+        path.write_bytes(b"not a region" * 100)
+        with self.assertRaises(ValueError):
+            RegionFile(path)
+
+class TestGridSystemRegions(unittest.TestCase):
+    def test_old_json_chunks_migrate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp))
+            old = {"chunk_x": 2, "chunk_y": 3, "last_visited": 1,
+                   "tiles": {"25_36_0": {"x": 25, "y": 36, "z": 0, "is_walkable": False, "room": "shed"}}}
+            (grid.data_dir / "chunk_2_3.json").write_text(json.dumps(old))
+
+            self.assertEqual(grid.get_tile(25, 36, 0), None) # Not loaded yet
+            with grid._lock:
+                grid._get_or_load_chunk(2, 3)
+            self.assertEqual(grid.get_tile(25, 36, 0).room, "shed")
+            grid.close()
+
+            self.assertTrue(grid.store.path(0, 0).exists())
+            (grid.data_dir / "chunk_2_3.json").unlink()
+            reloaded = GridSystem(Path(tmp))
+            with reloaded._lock:
+                reloaded._get_or_load_chunk(2, 3)
+            self.assertFalse(reloaded.get_tile(25, 36, 0).is_walkable)
+            reloaded.close()
+
+    def test_column_chunks_split_into_floors(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp))
+            # Region file from before floors were split: both levels in one blob
+            column = RegionFile(grid.store.column_path(0, 0))
+            column.write(0, 0, chunk_with(0, 0, 40).to_bytes())
+            column.close()
+
+            with grid._lock:
+                grid._get_or_load_chunk(0, 0, 1)
+            self.assertEqual(list(grid.chunks.keys()), [(0, 0, 1)]) # Floor 0 stays on disk
+            self.assertEqual(grid.get_tile(1, 0, 1).room, "kitchen")
+            self.assertIsNone(grid.get_tile(0, 0, 0))
+            grid.close()
+            self.assertEqual(grid.store.load(0, 0, 1).planes.keys(), {1})
+            self.assertIsNone(grid.store.load(0, 0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import math
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from bot_runtime.brain.state import BrainState
+from bot_runtime.config import settings
+from bot_runtime.ingest.parser import StateParser
+from bot_runtime.planning.plans.search_building_plan import SearchBuildingPlan
+from bot_runtime.world.hpa import HierarchicalPathfinder
+from bot_runtime.world.path_cache import PathCache
+from bot_runtime.world.processors.grid_system import GridSystem
+from bot_runtime.world.replan import DStarLite, ReplanService
+from tests.grid_reference import dijkstra
+
+def reference(blocked: set, box, start, goal) -> float:
+    """Shortest cost inside `box` around `blocked`; start and goal count as free."""
+    x0, y0, x1, y1 = box
+    return dijkstra(lambda p: x0 <= p[0] <= x1 and y0 <= p[1] <= y1 and (p not in blocked or p in (start, goal)),
+                    [start], goal)
+
+class TestReplan(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.grid = GridSystem(Path(self._tmp.name))
+
+    def tearDown(self):
+        self.grid.close()
+        self._tmp.cleanup()
+
+    def test_tile_changes_since(self):
+        version, tiles = self.grid.tile_changes_since(0)
+        self.assertEqual(tiles.shape, (0, 4))
+        self.grid.update([{"x": 1, "y": 2, "z": 0, "w": True}, {"x": 3, "y": 4, "z": 0, "w": False}], 1)
+        version, tiles = self.grid.tile_changes_since(version)
+        self.assertEqual(sorted(map(tuple, tiles.tolist())), [(1, 2, 0, 1), (3, 4, 0, 0)])
+        # Seen again unchanged, or only the room changed: nothing for paths
+        self.grid.update([{"x": 1, "y": 2, "z": 0, "w": True, "room": "kitchen"}], 2)
+        self.assertEqual(len(self.grid.tile_changes_since(version)[1]), 0)
+        self.grid.update([{"x": 1, "y": 2, "z": 0, "w": False}], 3)
+        self.assertEqual(self.grid.tile_changes_since(version)[1].tolist(), [[1, 2, 0, 0]])
+
+    def test_overflowed_log_asks_for_a_reload(self):
+        with mock.patch.object(settings, "GRID_TILE_LOG", 2):
+            grid = GridSystem(Path(self._tmp.name) / "small")
+        try:
+            version = grid.version
+            for t in range(3):
+                grid.update([{"x": t, "y": 0, "z": 0, "w": True}], t + 1)
+            self.assertIsNone(grid.tile_changes_since(version)[1])
+            self.assertEqual(len(grid.tile_changes_since(grid.version)[1]), 0)
+        finally:
+            grid.close()
+
+    def test_repairs_match_a_fresh_search_while_walking(self):
+        for seed in range(8):
+            rng = random.Random(seed)
+            world = {(x, y): rng.random() > 0.3 for x in range(40) for y in range(40)}
+            seen = set()
+            goal = (35, 33, 0)
+            pos = (2, 2, 0)
+            search = DStarLite(self.grid, pos, goal, margin=3)
+            box = (search.x0, search.y0, search.x1, search.y1)
+            for step in range(30):
+                # The player sees 4 tiles around itself; unknown ground is assumed walkable
+                tiles = [{"x": x, "y": y, "z": 0, "w": world.get((x, y), True)}
+                         for x in range(pos[0] - 4, pos[0] + 5) for y in range(pos[1] - 4, pos[1] + 5)
+                         if (x, y) not in seen]
+                seen.update((t["x"], t["y"]) for t in tiles)
+                self.grid.update(tiles, seed * 100 + step + 1)
+                path = search.path(pos)
+                blocked = {p for p in seen if not world.get(p, True)}
+                expected = reference(blocked, box, pos[:2], goal[:2])
+                got = search.cost() if path and not search.leaves_box() else math.inf
+                self.assertAlmostEqual(got, expected, msg=f"seed {seed} step {step}")
+                if not path or len(path) < 2:
+                    break
+                self.assertEqual(path[0], pos)
+                pos = path[1]
+            self.grid.close()
+            self.grid = GridSystem(Path(self._tmp.name) / str(seed))
+
+    def test_repair_costs_less_than_a_new_search(self):
+        rng = random.Random(1)
+        self.grid.update([{"x": x, "y": y, "z": 0, "w": rng.random() > 0.2 or (x, y) in ((5, 5), (90, 90))}
+                          for x in range(100) for y in range(100)], 1)
+        routes = ReplanService(self.grid)
+        path = routes.path((5, 5, 0), (90, 90, 0))
+        for t in range(5):
+            block = path[len(path) // 2]
+            self.grid.update([{"x": block[0], "y": block[1], "z": 0, "w": False}], t + 2)
+            path = routes.path(path[1], (90, 90, 0))
+            self.assertNotIn(block, path)
+            fresh = DStarLite(self.grid, path[0], (90, 90, 0))
+            fresh.path(path[0])
+            self.assertAlmostEqual(routes.search.cost(), fresh.cost())
+            self.assertLess(routes.search.expanded, fresh.expanded)
+        self.assertEqual(routes.builds, 1)
+        self.assertEqual(routes.search.repaired_tiles, 5)
+
+    def test_walled_off_goal(self):
+        # A 7x7 room (walls on x in {12, 18}, y in {2, 8}) with its door at (12, 5)
+        def walkable(x, y):
+            return not ((x in (12, 18) and 2 <= y <= 8) or (y in (2, 8) and 12 <= x <= 18)) or (x, y) == (12, 5)
+        self.grid.update([{"x": x, "y": y, "z": 0, "w": walkable(x, y)} for x in range(30) for y in range(12)], 1)
+        routes = ReplanService(self.grid, margin=4) # The whole room is inside the box
+        path = routes.path((3, 3, 0), (15, 5, 0))
+        self.assertIn((12, 5, 0), path)
+        self.assertFalse(routes.search.leaves_box())
+        self.grid.update([{"x": 12, "y": 5, "z": 0, "w": False}], 2)
+        self.assertIsNone(routes.path((4, 3, 0), (15, 5, 0)))
+        self.assertIsNotNone(routes.path((4, 3, 0), (8, 8, 0))) # Another goal: new search
+        self.assertEqual(routes.builds, 2)
+
+    def test_door_outside_the_box_is_not_a_wall(self):
+        # Wall along x == 50, its only door 30 tiles off the straight line
+        self.grid.update([{"x": x, "y": y, "z": 0, "w": x != 50 or y == 80} for x in range(100) for y in range(100)], 1)
+        routes = ReplanService(self.grid, margin=10)
+        path = routes.path((45, 50, 0), (55, 50, 0))
+        self.assertIsNotNone(path)
+        self.assertTrue(routes.search.leaves_box())
+        s = routes.search
+        self.assertTrue(path[-1][0] in (s.x0, s.x1) or path[-1][1] in (s.y0, s.y1)) # Heads for the box edge
+        self.assertLessEqual(len(path), 11)
+        player = StateParser().parse_dict(
+            {"timestamp": 1, "player": {"position": {"x": 45, "y": 50, "z": 0}, "vision": {"tiles": []}}}).player
+        state = BrainState(player=player, vision=player.vision)
+        state.routes = routes
+        plan = SearchBuildingPlan(45, 50)
+        plan.nav_target = (55, 50)
+        plan.last_dist = 10.0
+        plan.execute(state)
+        self.assertEqual((plan.nav_target, plan.failed_targets), ((55, 50), set())) # Still on its way
+        # Walls all along the box edge on the west side cut it off for real
+        self.grid.update([{"x": x, "y": y, "z": 0, "w": False} for x in range(35, 50) for y in (40, 60)]
+                         + [{"x": 35, "y": y, "z": 0, "w": False} for y in range(40, 61)], 2)
+        self.assertIsNone(routes.path((45, 50, 0), (55, 50, 0)))
+
+    def test_known_route_around_the_box_widens_the_search(self):
+        self.grid.update([{"x": x, "y": y, "z": 0, "w": x != 50 or y == 80} for x in range(100) for y in range(100)], 1)
+        paths = PathCache(HierarchicalPathfinder(self.grid))
+        routes = ReplanService(self.grid, margin=10, paths=paths)
+        path = routes.path((45, 50, 0), (55, 50, 0))
+        self.assertEqual((routes.builds, routes.widened, paths.lookups), (2, 1, 1))
+        self.assertFalse(routes.search.leaves_box())
+        self.assertIn((50, 80, 0), path) # Through the door, repaired like any other route
+        self.assertEqual(path[-1], (55, 50, 0))
+        self.grid.update([{"x": 49, "y": 79, "z": 0, "w": False}], 2)
+        self.assertIn((50, 80, 0), routes.path(path[1], (55, 50, 0)))
+        self.assertEqual((routes.builds, paths.lookups), (2, 1))
+
+    def test_search_plan_drops_a_target_once_walled_off(self):
+        # Walled 20x12 house: kitchen west of a wall along x == 10, bedroom east of it, door at (10, 11)
+        def walkable(x, y):
+            return 0 <= x < 20 and 0 <= y < 12 and (x != 10 or y == 11)
+        tiles = [{"x": x, "y": y, "z": 0, "w": walkable(x, y), "v": True,
+                  "room": "bedroom" if x > 10 else "kitchen"} for x in range(-1, 21) for y in range(-1, 13)]
+        self.grid.update(tiles, 1)
+        player = StateParser().parse_dict(
+            {"timestamp": 1, "player": {"position": {"x": 9, "y": 2, "z": 0}, "vision": {"tiles": tiles}}}).player
+        state = BrainState(player=player, vision=player.vision)
+        state.routes = ReplanService(self.grid)
+        plan = SearchBuildingPlan(9, 2)
+        plan.nav_target = (15, 2)
+        plan.last_dist = math.dist((9, 2), (15, 2))
+        self.assertEqual(plan.execute(state)[0].type, "MoveTo")
+        self.assertEqual(plan.failed_targets, set())
+        self.grid.update([{"x": 10, "y": 11, "z": 0, "w": False}], 2) # The door turns out shut
+        plan.execute(state)
+        self.assertIn((15, 2), plan.failed_targets)
+        self.assertNotEqual(plan.nav_target, (15, 2))
+
+if __name__ == '__main__':
+    unittest.main()
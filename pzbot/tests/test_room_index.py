@@ -0,0 +1,99 @@
+import unittest
+from types import SimpleNamespace
+
+from bot_runtime.ingest.state import Player, Position
+from bot_runtime.ingest.tiles import TileBlock
+from bot_runtime.world.processors.room_index import RoomIndex
+from bot_runtime.analysis.geo_analyzer import GeoAnalyzer
+
+def rect(x0: int, y0: int, w: int, h: int, room, z: int = 0) -> list:
+    return [{"x": x, "y": y, "z": z, "w": True, "room": room} for x in range(x0, x0 + w) for y in range(y0, y0 + h)]
+
+def block(tiles: list) -> TileBlock:
+    return TileBlock.from_rows(tiles)
+
+class TestRoomIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = RoomIndex()
+        # House A: kitchen and hall side by side, bedroom upstairs. House B: a kitchen 40 tiles east.
+        self.index.update(block(rect(0, 0, 4, 4, "kitchen") + rect(4, 0, 3, 4, "hall")
+                                + rect(0, 0, 3, 3, "bedroom", z=1) + rect(8, 0, 2, 4, None)))
+        self.index.update(block(rect(40, 0, 4, 4, "kitchen")))
+
+    def test_rooms_and_buildings(self):
+        kitchen = self.index.room_at(1, 1, 0)
+        self.assertEqual((kitchen.name, kitchen.size, kitchen.x, kitchen.y), ("kitchen", 16, 1.5, 1.5))
+        hall = self.index.room_at(5, 2, 0)
+        bedroom = self.index.room_at(1, 1, 1)
+        other = self.index.room_at(41, 1, 0)
+        self.assertEqual(hall.building, kitchen.building)
+        self.assertEqual(bedroom.building, kitchen.building) # Joined across floors
+        self.assertNotEqual(other.id, kitchen.id) # Same label, different room
+        self.assertNotEqual(other.building, kitchen.building)
+        self.assertIsNone(self.index.room_at(8, 1, 0)) # Unlabelled
+        house = self.index.building(kitchen.building)
+        self.assertEqual((house.rooms, house.floors, house.size), (3, (0, 1), 16 + 12 + 9))
+        self.assertEqual(self.index.get_stats(), {"tiles": 16 + 12 + 9 + 16, "rooms": 4, "buildings": 2})
+
+    def test_only_new_tiles_are_indexed(self):
+        self.assertEqual(self.index.update(block(rect(0, 0, 7, 4, "kitchen"))), 0)
+        self.assertEqual(self.index.update(block(rect(0, 4, 4, 1, "kitchen"))), 4)
+        self.assertEqual(self.index.room_at(0, 4, 0).size, 20)
+        # Known and new tiles mixed, new ones on both sides of the known key range
+        self.assertEqual(self.index.update(block(rect(-1, -1, 9, 7, "kitchen"))), 9 * 7 - 28 - 4)
+        self.assertEqual(self.index.update(block(rect(-1, -1, 9, 7, "kitchen") + rect(50, 0, 1, 1, "hall"))), 1)
+        self.assertEqual(self.index.get_stats()["tiles"], 16 + 12 + 9 + 16 + 4 + 31 + 1)
+
+    def test_rooms_merge_when_tiles_connect_them(self):
+        index = RoomIndex()
+        index.update(block(rect(0, 0, 2, 2, "hall") + rect(5, 0, 2, 2, "hall")))
+        first = index.room_at(0, 0, 0).id
+        self.assertEqual(index.get_stats()["rooms"], 2)
+        index.update(block(rect(2, 0, 3, 1, "hall")))
+        self.assertEqual(index.get_stats(), {"tiles": 11, "rooms": 1, "buildings": 1})
+        self.assertEqual(index.room(first).size, 11) # Old ids resolve to the merged room
+        self.assertEqual(sorted(index.room_tiles(first))[:2], [(0, 0), (0, 1)])
+
+    def test_nearest_queries(self):
+        rooms = self.index
+        self.assertEqual(rooms.nearest_room(6, 1, 0).name, "hall")
+        self.assertEqual(rooms.nearest_room(6, 1, 0, exclude_names={"hall"}).name, "kitchen")
+        near = rooms.nearest_room(30, 1, 0, exclude_names={"hall"})
+        self.assertEqual(near.x, 41.5)
+        home = rooms.room_at(1, 1, 0).building
+        self.assertEqual(rooms.nearest_room(30, 1, 0, building=home, exclude_names={"hall"}).x, 1.5)
+        self.assertIsNone(rooms.nearest_room(6, 1, 0, exclude_names={"hall", "kitchen"}, building=home))
+        self.assertEqual(rooms.nearest_room(6, 1, 1).name, "bedroom")
+        self.assertIsNone(rooms.nearest_room(6, 1, 2))
+        self.assertEqual(rooms.anchor(near.id), (41, 1))
+        self.assertEqual(rooms.nearest_building(30, 0).id, near.building)
+        self.assertEqual(rooms.nearest_building(30, 0, exclude={near.building}).id, home)
+        # Merging empties cells at the edge: the stale bounds only widen the search
+        self.index.update(block(rect(7, 0, 33, 1, "kitchen"))) # Joins both houses
+        self.assertEqual(rooms.nearest_building(30, 0).size, 16 + 12 + 9 + 16 + 33)
+        self.assertEqual(rooms.nearest_room(-100, 1, 0).name, "kitchen")
+
+    def test_nearest_searches_outward_over_many_buildings(self):
+        index = RoomIndex()
+        tiles = []
+        for i in range(20):
+            for j in range(20):
+                tiles += rect(i * 30, j * 30, 3, 3, f"room{(i + j) % 3}")
+        index.update(block(tiles))
+        self.assertEqual(index.get_stats()["buildings"], 400)
+        b = index.nearest_building(305, 452)
+        self.assertEqual((b.x, b.y), (301.0, 451.0))
+        room = index.nearest_room(305, 452, 0, exclude_names={"room1"})
+        expected = min(((i * 30 + 1, j * 30 + 1) for i in range(20) for j in range(20) if (i + j) % 3 != 1),
+                       key=lambda c: (c[0] - 305) ** 2 + (c[1] - 452) ** 2)
+        self.assertEqual((room.x, room.y), expected)
+
+    def test_geo_analyzer_nearest_building(self):
+        state = SimpleNamespace(rooms=self.index, player=Player(position=Position(x=30, y=2, z=0)))
+        target = GeoAnalyzer.get_nearest_building(state)
+        self.assertEqual((target["x"], target["y"]), (42, 2))
+        self.assertEqual(GeoAnalyzer.get_nearest_building(state, {target["id"]})["x"], 3) # House A: (93 / 37, 51 / 37)
+        self.assertIsNone(GeoAnalyzer.get_nearest_building(SimpleNamespace(rooms=None, player=state.player)))
+
+if __name__ == '__main__':
+    unittest.main()
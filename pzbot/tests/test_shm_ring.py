@@ -0,0 +1,128 @@
+import json
+import time
+import uuid
+import tempfile
+import unittest
+import subprocess
+import sys
+from pathlib import Path
+
+from bot_runtime.ingest.shm_ring import StateRing, StateRingReader, RingFeed, SLOT_HEADER, HEADER_BYTES, _U64
+from bot_runtime.ingest.pipeline import IngestPipeline
+from bot_runtime.ingest.watcher import BACKEND_POLL
+from bot_runtime.ingest.delta import DeltaEncoder
+from tools.synthetic_state import make_frame
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def ring_name() -> str:
+    return f"pzbot_test_{uuid.uuid4().hex[:10]}"
+
+class TestStateRing(unittest.TestCase):
+    def setUp(self):
+        self.ring = StateRing.create(ring_name(), slots=4, slot_bytes=256)
+        self.reader = StateRingReader(self.ring.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.ring.close()
+
+    def test_latest_skips_to_newest(self):
+        self.assertIsNone(self.reader.latest())
+        for i in range(1, 4):
+            self.ring.publish(f"frame {i}".encode(), 100.0 + i)
+        frame = self.reader.latest()
+        self.assertEqual((frame.seq, frame.written_at, frame.body), (3, 103.0, b"frame 3"))
+        self.assertIsNone(self.reader.latest()) # Nothing new
+        self.ring.publish(b"frame 4", 104.0)
+        self.ring.publish(b"frame 5", 105.0)
+        self.assertEqual(self.reader.latest().body, b"frame 5")
+        self.assertEqual(self.reader.get_stats()["skipped"], 1)
+
+    def test_read_since_returns_what_is_left(self):
+        for i in range(1, 3):
+            self.ring.publish(f"frame {i}".encode(), 0.0)
+        self.assertEqual([f.seq for f in self.reader.read_since()], [1, 2])
+        # A slow reader: 6 more frames into 4 slots, the oldest two are gone
+        for i in range(3, 9):
+            self.ring.publish(f"frame {i}".encode(), 0.0)
+        self.assertEqual([f.body for f in self.reader.read_since()], [b"frame 5", b"frame 6", b"frame 7", b"frame 8"])
+        self.assertEqual(self.reader.skipped, 2)
+
+    def test_slot_being_written_is_not_read(self):
+        self.ring.publish(b"frame 1", 0.0)
+        off = HEADER_BYTES + (1 % self.ring.slots) * (SLOT_HEADER.size + self.ring.slot_bytes)
+        _U64.pack_into(self.ring._buf, off, 2 * 1 - 1) # Writer mid-copy
+        self.assertIsNone(self.reader.latest())
+        _U64.pack_into(self.ring._buf, off, 2 * 1)
+        self.assertEqual(self.reader.latest().body, b"frame 1")
+
+    def test_oversized_frame_is_dropped(self):
+        self.assertEqual(self.ring.publish(b"x" * 300, 0.0), 0)
+        self.assertEqual(self.ring.get_stats()["oversized"], 1)
+        self.assertIsNone(self.reader.latest())
+
+    def test_reader_in_other_process(self):
+        self.ring.publish(b'{"hello": 1}', 0.0)
+        code = ("import sys; sys.path.insert(0, sys.argv[2]);"
+                "from bot_runtime.ingest.shm_ring import StateRingReader;"
+                "r = StateRingReader(sys.argv[1]); print(r.latest().body.decode()); r.close()")
+        out = subprocess.run([sys.executable, "-c", code, self.ring.name, str(ROOT)],
+                             capture_output=True, text=True, timeout=30)
+        self.assertEqual(out.stdout.strip(), '{"hello": 1}', out.stderr)
+        # The reader exiting must not take the ring with it
+        self.ring.publish(b"after", 0.0)
+        self.assertEqual(self.reader.latest().body, b"after")
+
+class TestRingFeed(unittest.TestCase):
+    def test_rebuilds_deltas_and_follows_restart(self):
+        name = ring_name()
+        feed = RingFeed(name)
+        self.assertFalse(feed.connect())
+
+        encoder = DeltaEncoder()
+        base = make_frame(radius=2)
+        ring = StateRing.create(name, slots=4, slot_bytes=1 << 16)
+        try:
+            ring.publish(json.dumps(encoder.encode(base)[0]).encode(), 0.0)
+            base["player"]["vision"]["tiles"].pop()
+            ring.publish(json.dumps(encoder.encode(base)[0]).encode(), 0.0)
+            frames = feed.read_all()
+            self.assertEqual(len(frames), 2)
+            self.assertEqual(len(frames[-1][1]["player"]["vision"]["tiles"]), len(base["player"]["vision"]["tiles"]))
+        finally:
+            ring.close()
+
+        self.assertFalse(feed.connect()) # Writer closed the ring
+        ring = StateRing.create(name, slots=4, slot_bytes=1 << 16)
+        try:
+            ring.publish(json.dumps({"player": {"position": {"x": 7}}}).encode(), 0.0)
+            self.assertEqual(feed.latest()["player"]["position"]["x"], 7)
+        finally:
+            feed.close()
+            ring.close()
+
+class TestPipelinePublishes(unittest.TestCase):
+    def test_frames_read_are_published(self):
+        received = []
+        ring = StateRing.create(ring_name(), slots=4, slot_bytes=1 << 16)
+        reader = StateRingReader(ring.name)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "state.json"
+            pipeline = IngestPipeline(path, received.append, polling_interval=0.01, backend=BACKEND_POLL, ring=ring)
+            pipeline.start()
+            try:
+                path.write_text(json.dumps({"player": {"position": {"x": 1, "y": 2, "z": 0}}}))
+                deadline = time.time() + 2.0
+                while not received and time.time() < deadline:
+                    time.sleep(0.01)
+            finally:
+                pipeline.stop()
+                frame = reader.latest()
+                reader.close()
+                ring.close()
+        self.assertEqual(len(received), 1)
+        self.assertEqual(json.loads(frame.body)["player"]["position"]["x"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
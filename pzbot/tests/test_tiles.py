@@ -0,0 +1,73 @@
+import unittest
+
+from bot_runtime.brain.state import BrainState
+from bot_runtime.ingest.parser import StateParser, DECODER_FAST, DECODER_VALIDATED
+from bot_runtime.ingest.tiles import NO_ID, TileBlock
+from bot_runtime.planning.plans.search_building_plan import SearchBuildingPlan
+
+def tile(x, y, w=True, v=True, room=None, layer=None):
+    t = {"x": x, "y": y, "z": 0, "w": w, "v": v}
+    if room: t["room"] = room
+    if layer: t["layer"] = layer
+    return t
+
+def frame(tiles, px=0, py=0):
+    return {"timestamp": 1, "player": {"position": {"x": px, "y": py, "z": 0}, "vision": {"tiles": tiles}}}
+
+class TestTileBlock(unittest.TestCase):
+    TILES = [
+        tile(0, 0, room="hall"),
+        tile(1, 0, w=False, layer="Wall"),
+        tile(5, 5, room="kitchen"),
+        tile(2, 2, v=False, room="bedroom"),
+        tile(9, 9),
+    ]
+
+    def test_lookups(self):
+        for decoder in (DECODER_VALIDATED, DECODER_FAST):
+            vision = StateParser(decoder=decoder).parse_dict(frame(self.TILES)).player.vision
+            block = vision.tile_block
+            self.assertIs(vision.tile_block, block) # Built once per frame
+            self.assertEqual(len(block), 5)
+            self.assertEqual(block.room_at(0, 0, 0), "hall")
+            self.assertIsNone(block.room_at(9, 9, 0))
+            self.assertIsNone(block.room_at(42, 42, 0))
+            self.assertTrue(block.is_walkable(0, 0, 0))
+            self.assertFalse(block.is_walkable(1, 0, 0))
+            self.assertFalse(block.is_walkable(42, 42, 0))
+            self.assertEqual(block.layer(block.row(1, 0, 0)), "Wall")
+            self.assertTrue(block.has_rooms())
+
+    def test_same_block_from_decoded_tiles(self):
+        vision = StateParser().parse_dict(frame(self.TILES)).player.vision
+        a = vision.tile_block
+        b = TileBlock.from_rows(list(vision.tiles))
+        for col in TileBlock.__slots__[:-1]:
+            self.assertEqual(getattr(a, col).tolist(), getattr(b, col).tolist(), col)
+
+    def test_vectorized_filters(self):
+        block = StateParser().parse_dict(frame(self.TILES)).player.vision.tile_block
+        self.assertEqual(int(block.near(0, 0, 1).sum()), 2)
+        mask = block.visible & (block.room_id != NO_ID) & ~block.in_rooms({"hall"})
+        self.assertEqual(block.room(block.closest(mask, 0, 0)), "kitchen")
+        self.assertEqual(block.closest(mask & ~block.at([(5, 5)]), 0, 0), -1)
+
+class TestSearchBuildingPlan(unittest.TestCase):
+    def test_targets_closest_visible_unvisited_room(self):
+        tiles = [
+            tile(0, 0, room="hall"),
+            tile(2, 2, v=False, room="bedroom"), # Not visible
+            tile(3, 3, room="kitchen"),
+            tile(8, 8, room="bathroom"),
+        ]
+        state = StateParser().parse_dict(frame(tiles))
+        brain = BrainState(vision=state.player.vision, player=state.player)
+
+        plan = SearchBuildingPlan(0, 0)
+        plan.execute(brain)
+        self.assertIn("hall", brain.memory.visited_rooms)
+        self.assertEqual(plan.nav_target, (3, 3))
+        self.assertEqual(plan.target_room, "kitchen")
+
+if __name__ == '__main__':
+    unittest.main()
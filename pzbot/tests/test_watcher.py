@@ -0,0 +1,68 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from bot_runtime.ingest.watcher import StateWatcher, BACKEND_POLL, BACKEND_EVENTS
+
+def write_state(path: Path, x: float, mtime_ns: int = None):
+    with open(path, 'w') as f:
+        json.dump({"timestamp": 1, "player": {"position": {"x": x, "y": 0, "z": 0}}}, f)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+class TestStateWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "state.json"
+        self.received = []
+        self.got_frame = threading.Event()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def on_update(self, state):
+        self.received.append(state.player.position.x)
+        self.got_frame.set()
+
+    def wait_for(self, count, timeout=2.0):
+        deadline = time.time() + timeout
+        while len(self.received) < count and time.time() < deadline:
+            time.sleep(0.01)
+        return len(self.received) >= count
+
+    def test_poll_backend_reads_new_frames(self):
+        watcher = StateWatcher(self.path, self.on_update, polling_interval=0.01, backend=BACKEND_POLL)
+        watcher.start()
+        try:
+            write_state(self.path, 1.0)
+            self.assertTrue(self.wait_for(1))
+            self.assertEqual(watcher.get_stats()["backend"], BACKEND_POLL)
+            self.assertEqual(watcher.latency.frames, 1)
+        finally:
+            watcher.stop()
+
+    def test_event_backend_sees_writes_in_same_mtime_granule(self):
+        # Large interval: a frame can only arrive promptly via the close-write event
+        watcher = StateWatcher(self.path, self.on_update, polling_interval=5.0, backend=BACKEND_EVENTS)
+        watcher.start()
+        try:
+            if watcher.active_backend != BACKEND_EVENTS:
+                self.skipTest("No event backend available on this platform")
+
+            fixed_mtime = time.time_ns()
+            write_state(self.path, 1.0, mtime_ns=fixed_mtime)
+            self.assertTrue(self.wait_for(1))
+
+            # Same size, same mtime: invisible to the poller
+            write_state(self.path, 2.0, mtime_ns=fixed_mtime)
+            self.assertTrue(self.wait_for(2))
+            self.assertEqual(self.received[-1], 2.0)
+        finally:
+            watcher.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+"""
+Benchmarks grid memory and per-frame update time.
+
+Compares the array-backed chunks (`GridChunk`) with the previous storage, one
+`TileData` model per tile in a "x_y_z"-keyed dict, and region files with one JSON
+file per chunk for persistence.
+
+The stall test runs `update` on a tick thread while the main thread saves snapshots,
+with and without the write-behind flusher, and reports how long ticks were blocked.
+
+The snapshot test times one snapshot after a frame of changes as the explored map grows:
+a full dump of every tile vs the snapshot stream (changed chunks only).
+
+Usage:
+    python tools/bench_grid.py                  # 100k tiles, scan radius 15
+    python tools/bench_grid.py --tiles 250000 --radius 25
+    python tools/bench_grid.py --write-delay-ms 5   # Slower disk for the stall test
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from bot_runtime.world.types import TileData
+from bot_runtime.world.processors.grid_chunk import GridChunk, CHUNK_SIZE
+from bot_runtime.world.processors.grid_system import GridSystem
+from bot_runtime.world.processors.region_file import RegionStore
+from tools.synthetic_state import make_frame
+
+def frames_covering(n_tiles: int, radius: int) -> list:
+    """Tile lists of adjacent scans until about `n_tiles` distinct tiles are covered."""
+    side = 2 * radius + 1
+    per_row = max(1, int((n_tiles / side ** 2) ** 0.5))
+    frames = []
+    for i in range(per_row):
+        for j in range(per_row):
+            frames.append(make_frame(radius=radius, px=10000 + i * side, py=9000 + j * side, seed=i * per_row + j,
+                                     containers=0, world_items=0, objects=0)["player"]["vision"]["tiles"])
+    return frames
+
+def measure(build) -> tuple:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, after - before
+
+def build_tiledata(frames: list) -> dict:
+    chunks = {}
+    for tiles in frames:
+        for t in tiles:
+            chunk = chunks.setdefault((t['x'] // CHUNK_SIZE, t['y'] // CHUNK_SIZE), {})
+            chunk[f"{t['x']}_{t['y']}_{t['z']}"] = TileData(**t)
+    return chunks
+
+def build_arrays(frames: list) -> dict:
+    chunks = {}
+    for tiles in frames:
+        by_chunk = {}
+        for t in tiles:
+            by_chunk.setdefault((t['x'] // CHUNK_SIZE, t['y'] // CHUNK_SIZE), []).append(t)
+        for (cx, cy), rows in by_chunk.items():
+            chunks.setdefault((cx, cy), GridChunk(cx, cy)).write_tiles(rows, 1000)
+    return chunks
+
+def time_updates(frames: list, rounds: int) -> tuple:
+    """ms per frame: (first visit, revisits of unchanged tiles)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        grid = GridSystem(Path(tmp), prefetch_tiles=0)
+        start = time.perf_counter()
+        for tiles in frames:
+            grid.update(tiles, 0)
+        first = (time.perf_counter() - start) / len(frames) * 1000.0
+        start = time.perf_counter()
+        for r in range(1, rounds + 1):
+            for tiles in frames:
+                grid.update(tiles, r)
+        again = (time.perf_counter() - start) / (rounds * len(frames)) * 1000.0
+        grid.close()
+        return first, again
+
+def time_updates_tiledata(frames: list, rounds: int) -> float:
+    chunks: dict = {}
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for tiles in frames:
+            for t in tiles:
+                chunk = chunks.setdefault((t['x'] // CHUNK_SIZE, t['y'] // CHUNK_SIZE), {})
+                chunk[f"{t['x']}_{t['y']}_{t.get('z', 0)}"] = TileData(**t)
+    return (time.perf_counter() - start) / (rounds * len(frames)) * 1000.0
+
+def dir_size(path: Path) -> tuple:
+    files = [f for f in path.iterdir() if f.is_file()]
+    return len(files), sum(f.stat().st_size for f in files)
+
+def bench_persistence(chunks: dict) -> list:
+    """Saves and loads every chunk: JSON files vs region files. Rows of (name, save s, load s, files, bytes)."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        json_dir = Path(tmp) / "json"
+        json_dir.mkdir()
+        start = time.perf_counter()
+        for (cx, cy), c in chunks.items():
+            with open(json_dir / f"chunk_{cx}_{cy}.json", 'w') as f:
+                json.dump(c.to_dict(), f)
+        save = time.perf_counter() - start
+        start = time.perf_counter()
+        for cx, cy in chunks:
+            with open(json_dir / f"chunk_{cx}_{cy}.json", 'r') as f:
+                GridChunk.from_dict(json.load(f))
+        load = time.perf_counter() - start
+        results.append(("JSON files", save, load) + dir_size(json_dir))
+
+        region_dir = Path(tmp) / "regions"
+        store = RegionStore(region_dir)
+        start = time.perf_counter()
+        for c in chunks.values():
+            store.save(c)
+        save = time.perf_counter() - start
+        store.close()
+        store = RegionStore(region_dir)
+        start = time.perf_counter()
+        for cx, cy in chunks:
+            store.load(cx, cy)
+        load = time.perf_counter() - start
+        store.close()
+        results.append(("Region files", save, load) + dir_size(region_dir))
+    return results
+
+def bench_stall(frames: list, write_delay_ms: float, seconds: float) -> list:
+    """Tick latency while snapshots save dirty chunks. Rows of (mode, p50 ms, p99 ms, max ms, ticks)."""
+    results = []
+    for write_behind in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = GridSystem(Path(tmp), max_chunks=0, ttl_ms=0, write_behind=write_behind)
+            save_blobs = grid.store.save_blobs
+            def slow_save(blobs, durable=False):
+                blobs = list(blobs)
+                time.sleep(write_delay_ms / 1000.0 * len(blobs))
+                save_blobs(blobs, durable)
+            grid.store.save_blobs = slow_save
+
+            latencies = []
+            stop = threading.Event()
+            def ticks():
+                i = 0
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    grid.update(frames[i % len(frames)], i)
+                    latencies.append(time.perf_counter() - start)
+                    i += 1
+                    time.sleep(0.01)
+            tick_thread = threading.Thread(target=ticks)
+            tick_thread.start()
+            snapshot = Path(tmp) / "grid_snapshot.json"
+            end = time.time() + seconds
+            while time.time() < end:
+                time.sleep(0.1)
+                grid.save_snapshot(str(snapshot))
+            stop.set()
+            tick_thread.join()
+            grid.close()
+
+        lat = sorted(latencies)
+        ms = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1000.0
+        results.append(("write-behind" if write_behind else "synchronous", ms(0.5), ms(0.99), lat[-1] * 1000.0, len(lat)))
+    return results
+
+def bench_snapshot(frames: list, steps: int = 4) -> list:
+    """Snapshot time as the map grows, one frame changed. Rows of (tiles, full ms, stream ms, stream bytes, base)."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        grid = GridSystem(Path(tmp), max_chunks=0, ttl_ms=0)
+        snapshot = str(Path(tmp) / "grid_snapshot.json")
+        per_step = max(1, len(frames) // steps)
+        for step in range(1, steps + 1):
+            for tiles in frames[(step - 1) * per_step:step * per_step]:
+                grid.update(tiles, step)
+            grid.save_snapshot(snapshot)
+            # The frame that changed since the last snapshot
+            grid.update([dict(t, w=(t['w'] != bool(step % 2))) for t in frames[0]], step)
+
+            start = time.perf_counter()
+            with grid._lock:
+                all_tiles = [t.dict() for c in grid.chunks.values() for t in c.data.tiles()]
+            with open(snapshot + ".full", 'w') as f:
+                json.dump({"tiles": all_tiles}, f)
+            full = time.perf_counter() - start
+
+            bases = grid._stream.bases
+            start = time.perf_counter()
+            grid.save_snapshot(snapshot)
+            streamed = time.perf_counter() - start
+            results.append((len(all_tiles), full * 1000.0, streamed * 1000.0, grid._stream.last_bytes,
+                            grid._stream.bases > bases))
+        grid.close()
+    return results
+
+def main():
+    ap = argparse.ArgumentParser(description="Grid storage benchmark")
+    ap.add_argument("--tiles", type=int, default=100_000, help="Tiles to store for the memory test")
+    ap.add_argument("--radius", type=int, default=15, help="Synthetic scan radius")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--write-delay-ms", type=float, default=2.0, help="Simulated disk time per chunk write (stall test)")
+    ap.add_argument("--stall-seconds", type=float, default=3.0)
+    args = ap.parse_args()
+
+    frames = frames_covering(args.tiles, args.radius)
+    n = sum(len(f) for f in frames)
+    print(f"{n} tiles in {len(frames)} frames of {len(frames[0])} tiles")
+
+    _, old_bytes = measure(lambda: build_tiledata(frames))
+    chunks, new_bytes = measure(lambda: build_arrays(frames))
+    per_100k = 100_000 / n / (1024 * 1024)
+    print(f"Memory per 100k tiles:  TileData dicts {old_bytes * per_100k:8.1f} MB | "
+          f"arrays {new_bytes * per_100k:8.1f} MB ({old_bytes / max(new_bytes, 1):.0f}x)")
+
+    old_ms = time_updates_tiledata(frames, args.rounds)
+    new_ms, again_ms = time_updates(frames, args.rounds)
+    print(f"Update per frame:       TileData dicts {old_ms:8.2f} ms | arrays {new_ms:8.2f} ms ({old_ms / new_ms:.1f}x), "
+          f"unchanged revisit {again_ms:.2f} ms")
+
+    print(f"Persistence of {len(chunks)} chunks:")
+    for name, save, load, files, size in bench_persistence(chunks):
+        n = len(chunks)
+        print(f"  {name:<13} save {save / n * 1e6:7.1f} us/chunk | load {load / n * 1e6:7.1f} us/chunk | "
+              f"{files:6d} files {size / 1024:9.1f} KB")
+
+    print("Snapshot after one changed frame, as the map grows:")
+    for tiles, full, streamed, size, base in bench_snapshot(frames):
+        kind = "base, file rewritten" if base else "delta"
+        print(f"  {tiles:7d} tiles  full dump {full:8.2f} ms | stream {streamed:7.2f} ms ({size / 1024:.1f} KB {kind})")
+
+    stall_frames = frames[:16]
+    print(f"Tick stall while saving snapshots ({sum(len(f) for f in stall_frames)} tiles, "
+          f"{args.write_delay_ms:g} ms per chunk write):")
+    for mode, p50, p99, worst, ticks in bench_stall(stall_frames, args.write_delay_ms, args.stall_seconds):
+        print(f"  {mode:<13} update p50 {p50:7.2f} ms | p99 {p99:7.2f} ms | max {worst:7.2f} ms ({ticks} ticks)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmarks path queries on a synthetic town or a recorded map.
+
+The town is open ground with scattered obstacles and walled buildings with one door
+each. `--map` loads a recorded grid stream instead (`tools/grid_stream.jsonl`, written
+next to the grid snapshot by the runtime) and uses its most explored floor. Queries
+connect random walkable tiles `--min-dist` to `--max-dist` tiles apart and are answered by:
+    flat A*   tile-level A* over the whole window (the previous approach, no bound)
+    HPA* cold first query of each pair: chunk tables are built as the search meets them
+    HPA* warm the same queries again, every chunk table cached
+Both HPA* columns refine the full path (refine=0), so they compare with flat A*.
+
+The second table runs `world.nav.Pathfinder` on a `SpatialGrid` of the same tiles in its
+two uniform-cost modes, A* and Jump Point Search, and checks their path lengths match.
+
+Usage:
+    python tools/bench_nav.py                   # 400x400 town, 50 queries
+    python tools/bench_nav.py --size 800 --queries 100 --max-dist 600
+    python tools/bench_nav.py --map tools/grid_stream.jsonl --min-dist 30 --max-dist 150
+"""
+import sys
+import math
+import heapq
+import random
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from bot_runtime.world.grid import SpatialGrid
+from bot_runtime.world.hpa import HierarchicalPathfinder, octile, SQRT2
+from bot_runtime.world.nav import Pathfinder
+from bot_runtime.world.processors.grid_stream import GridStreamReader
+from bot_runtime.world.processors.grid_system import GridSystem
+
+def town(size: int, seed: int) -> np.ndarray:
+    """[y, x] walkable map: obstacles plus walled buildings with a door."""
+    rng = np.random.default_rng(seed)
+    walk = rng.random((size, size)) > 0.05
+    r = random.Random(seed)
+    for _ in range(size * size // 900):
+        w, h = r.randint(6, 18), r.randint(6, 18)
+        x0, y0 = r.randint(0, size - w - 1), r.randint(0, size - h - 1)
+        walk[y0:y0 + h, x0:x0 + w] = True
+        walk[y0, x0:x0 + w] = walk[y0 + h - 1, x0:x0 + w] = False
+        walk[y0:y0 + h, x0] = walk[y0:y0 + h, x0 + w - 1] = False
+        walk[y0 + h - 1, x0 + w // 2] = True # Door
+    return walk
+
+def recorded(path: Path) -> tuple:
+    """([y, x] walkable, [y, x] known) of the most explored floor in a grid stream, origin at its corner."""
+    reader = GridStreamReader(path)
+    reader.poll()
+    tiles = [t for _, chunk in reader.since()["chunks"].items() for t in chunk]
+    if not tiles:
+        raise SystemExit(f"No tiles in {path}")
+    floors = {}
+    for t in tiles:
+        floors.setdefault(t.get("z", 0), []).append(t)
+    tiles = max(floors.values(), key=len)
+    x0, y0 = min(t["x"] for t in tiles), min(t["y"] for t in tiles)
+    shape = (max(t["y"] for t in tiles) - y0 + 1, max(t["x"] for t in tiles) - x0 + 1)
+    walk, known = np.zeros(shape, dtype=bool), np.zeros(shape, dtype=bool)
+    for t in tiles:
+        known[t["y"] - y0, t["x"] - x0] = True
+        walk[t["y"] - y0, t["x"] - x0] = t.get("is_walkable", t.get("w", True))
+    return walk, known
+
+def flat_astar(walk: np.ndarray, start: tuple, end: tuple) -> tuple:
+    """(cost, expanded) of plain A* on the tile grid, same moves as HPA*."""
+    h, w = walk.shape
+    g = {start: 0.0}
+    heap = [(octile(*start, *end), 0.0, start)]
+    expanded = 0
+    while heap:
+        _, g0, (x, y) = heapq.heappop(heap)
+        if (x, y) == end:
+            return g0, expanded
+        if g0 > g[(x, y)]:
+            continue
+        expanded += 1
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nx, ny = x + dx, y + dy
+                if not (dx or dy) or not (0 <= nx < w and 0 <= ny < h) or not walk[ny, nx]:
+                    continue
+                if dx and dy and not (walk[y, nx] and walk[ny, x]):
+                    continue
+                ng = g0 + (SQRT2 if dx and dy else 1.0)
+                if ng < g.get((nx, ny), math.inf):
+                    g[(nx, ny)] = ng
+                    heapq.heappush(heap, (ng + octile(nx, ny, *end), ng, (nx, ny)))
+    return math.inf, expanded
+
+def pct(values: list, q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+def main():
+    ap = argparse.ArgumentParser(description="Path query benchmark")
+    ap.add_argument("--size", type=int, default=400, help="Town side in tiles")
+    ap.add_argument("--queries", type=int, default=50)
+    ap.add_argument("--min-dist", type=int, default=100)
+    ap.add_argument("--max-dist", type=int, default=400)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--map", type=Path, default=None, help="Recorded grid stream (.jsonl) instead of the town")
+    args = ap.parse_args()
+
+    if args.map:
+        walk, known = recorded(args.map)
+        name = f"{args.map.name} ({walk.shape[1]}x{walk.shape[0]})"
+    else:
+        walk = town(args.size, args.seed)
+        known = np.ones_like(walk)
+        name = f"{args.size}x{args.size} town"
+    ys, xs = np.nonzero(walk)
+    tiles = [{"x": int(x), "y": int(y), "z": 0, "w": bool(walk[y, x])} for y, x in zip(*np.nonzero(known))]
+    rng = random.Random(args.seed)
+    pairs = []
+    while len(pairs) < args.queries:
+        a, b = rng.randrange(len(xs)), rng.randrange(len(xs))
+        s, e = (int(xs[a]), int(ys[a])), (int(xs[b]), int(ys[b]))
+        if args.min_dist <= math.dist(s, e) <= args.max_dist:
+            pairs.append((s, e))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        grid = GridSystem(Path(tmp), max_chunks=0, max_bytes=0, ttl_ms=0)
+        grid.update(tiles, 1)
+        nav = HierarchicalPathfinder(grid, refine=0)
+        print(f"{name}, {int(walk.sum())} walkable tiles, {args.queries} queries "
+              f"{args.min_dist}-{args.max_dist} tiles apart")
+
+        flat_ms, flat_exp, cold_ms, warm_ms, hpa_exp, ratio = [], [], [], [], [], []
+        for s, e in pairs:
+            t0 = time.perf_counter()
+            cost, expanded = flat_astar(walk, s, e)
+            flat_ms.append((time.perf_counter() - t0) * 1000)
+            flat_exp.append(expanded)
+            t0 = time.perf_counter()
+            path = nav.find_path(s + (0,), e + (0,))
+            cold_ms.append((time.perf_counter() - t0) * 1000)
+            if path is not None and cost < math.inf:
+                ratio.append(path.cost / max(cost, 1e-9))
+                hpa_exp.append(path.expanded)
+        for s, e in pairs:
+            t0 = time.perf_counter()
+            nav.find_path(s + (0,), e + (0,))
+            warm_ms.append((time.perf_counter() - t0) * 1000)
+
+        for name, ms in (("flat A*", flat_ms), ("HPA* cold", cold_ms), ("HPA* warm", warm_ms)):
+            print(f"  {name:<10} p50 {pct(ms, 50):8.2f} ms | p99 {pct(ms, 99):8.2f} ms")
+        print(f"  Expanded nodes: flat A* {np.mean(flat_exp):.0f} tiles | HPA* {np.mean(hpa_exp):.0f} entrances")
+        print(f"  HPA* path cost vs optimal: mean {np.mean(ratio):.3f}x, max {np.max(ratio):.3f}x")
+
+        # One changed tile re-derives one chunk's tables
+        x, y = pairs[0][0]
+        grid.update([{"x": x + 1, "y": y, "z": 0, "w": not walk[y, x + 1]}], 2)
+        builds = nav.chunk_builds
+        t0 = time.perf_counter()
+        nav.find_path(pairs[0][0] + (0,), pairs[0][1] + (0,))
+        print(f"  After a tile change: {(time.perf_counter() - t0) * 1000:.2f} ms, "
+              f"{nav.chunk_builds - builds} chunk(s) rebuilt")
+        grid.close()
+
+    bench_jps(tiles, pairs)
+
+def bench_jps(tiles: list, pairs: list):
+    """Uniform-cost A* vs Jump Point Search through the `Pathfinder` API."""
+    grid = SpatialGrid()
+    grid.update([SimpleNamespace(**t) for t in tiles])
+    modes = {"A*": Pathfinder(grid, mode="astar"), "JPS": Pathfinder(grid, mode="jps")}
+    ms = {m: [] for m in modes}
+    expanded = {m: [] for m in modes}
+    worst = 0.0
+    for s, e in pairs:
+        lengths = []
+        for m, nav in modes.items():
+            t0 = time.perf_counter()
+            path = nav.find_path(s + (0,), e + (0,))
+            ms[m].append((time.perf_counter() - t0) * 1000)
+            expanded[m].append(nav.expanded)
+            lengths.append(sum(math.dist(a[:2], b[:2]) for a, b in zip(path, path[1:])) if path else math.inf)
+        if lengths[0] < math.inf:
+            worst = max(worst, abs(lengths[0] - lengths[1]))
+    print("Pathfinder (SpatialGrid, uniform costs)")
+    for m in modes:
+        print(f"  {m:<10} p50 {pct(ms[m], 50):8.2f} ms | p99 {pct(ms[m], 99):8.2f} ms | "
+              f"expanded mean {np.mean(expanded[m]):8.0f} nodes")
+    print(f"  Path length difference JPS vs A*: max {worst:.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmarks per-frame parse time of the state decoders.
+
+Usage:
+    python tools/bench_parse.py                      # synthetic frame (scan radius 15)
+    python tools/bench_parse.py --radius 25
+    python tools/bench_parse.py --state path/to/state.json
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from bot_runtime.ingest.delta import load_full_state
+from bot_runtime.ingest.parser import StateParser, DECODER_VALIDATED, DECODER_FAST
+from tools.synthetic_state import make_frame
+
+def time_per_frame(fn, frames: int) -> float:
+    fn() # warmup
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) / frames * 1000.0
+
+def touch_vision(state):
+    """Reads every lazy list, i.e. the worst case where all consumers run this tick."""
+    vision = state.player.vision
+    if not vision:
+        return
+    for _ in vision.tiles: pass
+    for _ in vision.world_items: pass
+    for c in vision.nearby_containers:
+        for _ in c.items: pass
+
+def main():
+    ap = argparse.ArgumentParser(description="State decoder benchmark")
+    ap.add_argument("--state", type=Path, help="Recorded state.json to benchmark, keyframe or delta (default: synthetic frame)")
+    ap.add_argument("--radius", type=int, default=15, help="Synthetic scan radius")
+    ap.add_argument("--frames", type=int, default=200)
+    args = ap.parse_args()
+
+    if args.state:
+        # Framed like the bot reads it (trailer, msgpack); delta frames rebuilt from the keyframe file
+        data = load_full_state(args.state)
+        source = str(args.state)
+    else:
+        data = make_frame(radius=args.radius)
+        source = f"synthetic r={args.radius}"
+
+    raw = json.dumps(data)
+    vision = data.get("player", {}).get("vision") or {}
+    print(f"Frame: {source} | {len(raw)/1024:.1f} KB | tiles={len(vision.get('tiles') or [])} "
+          f"containers={len(vision.get('nearby_containers') or [])} world_items={len(vision.get('world_items') or [])}")
+
+    json_ms = time_per_frame(lambda: json.loads(raw), args.frames)
+    print(f"{'json.loads':<22} {json_ms:8.3f} ms/frame")
+
+    baseline = None
+    for name in (DECODER_VALIDATED, DECODER_FAST):
+        parser = StateParser(decoder=name)
+        ms = time_per_frame(lambda: parser.parse_dict(data), args.frames)
+        baseline = baseline or ms
+        print(f"{'parse_dict[' + name + ']':<22} {ms:8.3f} ms/frame  ({baseline / ms:4.1f}x)")
+        full_ms = time_per_frame(lambda: touch_vision(parser.parse_dict(data)), args.frames)
+        print(f"{'  + read all lists':<22} {full_ms:8.3f} ms/frame")
+        if parser.fast_fallbacks:
+            print(f"  WARNING: {parser.fast_fallbacks} frames fell back to validation")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Compares the JSON and binary (msgpack) state transports.
+
+Usage:
+    python tools/bench_transport.py                        # bytes + encode/decode per frame
+    python tools/bench_transport.py --radius 25
+    python tools/bench_transport.py --write /tmp/bridge    # stand-in writer: state.bin at 5 Hz
+    python tools/bench_transport.py --write /tmp/bridge --format json
+    python tools/bench_transport.py --write /tmp/bridge --delta   # keyframes + delta frames
+
+The stand-in writer mimics ObservationClient.lua (same framing as util.writeState /
+util.writeStateBinary, same delta frames as StateDelta.lua), so the bot can be pointed at it
+with PZBOT_STATE_FILE_PATH.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from bot_runtime.ingest import binary
+from bot_runtime.ingest.frame import split_frame, decode_body
+from bot_runtime.ingest.delta import DeltaAssembler, DeltaEncoder, keyframe_path
+from tools.synthetic_state import make_frame
+
+def time_per_frame(fn, frames: int) -> float:
+    fn() # warmup
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) / frames * 1000.0
+
+def encode_json_frame(data: dict, seq: int) -> bytes:
+    body = json.dumps(data, separators=(',', ':'))
+    return (body + f"\n#PZB {seq} {len(body)}\n").encode('utf-8')
+
+def bench(args):
+    data = make_frame(radius=args.radius)
+    json_frame = encode_json_frame(data, 1)
+    bin_frame = binary.encode_frame(data, 1)
+
+    decoder = "native msgpack" if binary.has_native_decoder() else "pure-Python fallback (pip install msgpack)"
+    print(f"Frame: synthetic r={args.radius} | msgpack decoder: {decoder}")
+    print(f"{'':<10} {'bytes':>10} {'encode ms':>10} {'decode ms':>10}")
+
+    rows = [
+        ("json", json_frame, lambda: encode_json_frame(data, 1)),
+        ("msgpack", bin_frame, lambda: binary.encode_frame(data, 1)),
+    ]
+    for name, frame, encode in rows:
+        enc_ms = time_per_frame(encode, args.frames)
+        dec_ms = time_per_frame(lambda: decode_body(split_frame(frame)[0]), args.frames)
+        print(f"{name:<10} {len(frame):>10} {enc_ms:>10.3f} {dec_ms:>10.3f}")
+
+    assert decode_body(split_frame(bin_frame)[0]) == decode_body(split_frame(json_frame)[0])
+
+    # Delta frames: the next frame after a keyframe, with `churn` of the scene changed
+    encoder = DeltaEncoder()
+    key_frame, _ = encoder.encode(data)
+    delta, kind = encoder.encode(churn(data, args.churn))
+    assert kind == "delta"
+
+    print(f"\nDelta frames (churn {args.churn:.0%}), decode includes rebuilding the full frame:")
+    for name, encode in (("json", encode_json_frame), ("msgpack", binary.encode_frame)):
+        frame = encode(delta, 2)
+        key_body = split_frame(encode(key_frame, 1))[0]
+
+        assembler = DeltaAssembler()
+        assembler.apply(decode_body(key_body))
+        dec_ms = time_per_frame(lambda: assembler.apply(decode_body(split_frame(frame)[0])), args.frames)
+        print(f"{name + '+delta':<14} {len(frame):>10} {'':>10} {dec_ms:>10.3f}")
+
+def churn(data: dict, fraction: float, seed: int = 1) -> dict:
+    """Copy of `data` with `fraction` of the tiles and containers changed."""
+    rnd = random.Random(seed)
+    frame = json.loads(json.dumps(data))
+    vision = frame["player"]["vision"]
+    for t in vision["tiles"]:
+        if rnd.random() < fraction:
+            t["w"] = not t["w"]
+    for c in vision["nearby_containers"]:
+        if rnd.random() < fraction and c["items"]:
+            c["items"].pop()
+    return frame
+
+def write_loop(args):
+    out_dir = args.write
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / ("state.bin" if args.format == "msgpack" else "state.json")
+    print(f"Writing {args.format} frames to {path} every {args.interval * 1000:.0f}ms (Ctrl+C to stop)")
+    encode = binary.encode_frame if args.format == "msgpack" else encode_json_frame
+    encoder = DeltaEncoder(session=int(time.time())) if args.delta else None
+    scene = make_frame(radius=args.radius)
+
+    seq = 0
+    try:
+        while True:
+            seq += 1
+            data = churn(scene, args.churn, seed=seq) if encoder else make_frame(radius=args.radius, seed=seq)
+            data["timestamp"] = int(time.time() * 1000)
+            start = time.perf_counter()
+            kind = None
+            if encoder:
+                data, kind = encoder.encode(data)
+            frame = encode(data, seq)
+            # Plain truncate + write, like getFileWriter / getFileOutput (not atomic)
+            with open(path, 'wb') as f:
+                f.write(frame)
+            if kind == "key":
+                with open(keyframe_path(path), 'wb') as f:
+                    f.write(frame)
+            if seq % 25 == 0:
+                print(f"seq={seq} bytes={len(frame)} encode+write={(time.perf_counter() - start) * 1000:.2f}ms")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+def main():
+    ap = argparse.ArgumentParser(description="State transport benchmark / stand-in writer")
+    ap.add_argument("--radius", type=int, default=15, help="Synthetic scan radius")
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--write", type=Path, help="Run as stand-in writer into this directory")
+    ap.add_argument("--format", choices=("json", "msgpack"), default="msgpack")
+    ap.add_argument("--interval", type=float, default=0.2)
+    ap.add_argument("--delta", action="store_true", help="Stand-in writer sends keyframes + delta frames")
+    ap.add_argument("--churn", type=float, default=0.02, help="Fraction of tiles/containers changed per frame (delta frames)")
+    args = ap.parse_args()
+
+    if args.write:
+        write_loop(args)
+    else:
+        bench(args)
+
+if __name__ == "__main__":
+    main()
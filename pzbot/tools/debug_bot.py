@@ -3,12 +3,26 @@ import socketserver
 import webbrowser
 import json
 import os
+import sys
 import time
+from urllib.parse import urlparse, parse_qs
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from bot_runtime.ingest.delta import load_full_state
+from bot_runtime import config
+from bot_runtime.ingest.shm_ring import RingFeed
+from bot_runtime.world.processors.grid_stream import GridStreamReader
 
 PORT = 8000
 # The directory containing the static files
 WEB_DIR = os.path.join(os.path.dirname(__file__), 'web')
 
+# Frames published by the running bot (see shm_ring.py). Without a bot, the state file is read directly.
+STATE_FEED = RingFeed(config.STATE_RING_NAME)
+
+# Tiles published by the running bot, chunk by chunk (see grid_stream.py)
+GRID_STREAM = GridStreamReader(os.path.join(os.path.dirname(__file__), 'grid_stream.jsonl'))
+
 class RequestHandler(http.server.SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=WEB_DIR, **kwargs)
@@ -40,14 +54,16 @@ class RequestHandler(http.server.SimpleHTTPRequestHandler):
                 if not os.path.exists(state_path):
                      state_path = os.path.join(zomboid_root, 'mods/AISurvivorBridge/common/state.json')
                      
-                if os.path.exists(state_path):
-                    for _ in range(5): # Retry loop for file contention
-                        try:
-                            with open(state_path, 'r') as f:
-                                response_data["state_data"] = json.load(f)
-                            break
-                        except:
-                            time.sleep(0.05)
+                if STATE_FEED.connect():
+                    # Bot is running: take its newest frame from shared memory
+                    STATE_FEED.latest()
+                    response_data["state_data"] = STATE_FEED.last or {}
+                elif os.path.exists(state_path):
+                    try:
+                        # Retries while Lua is still writing the file; delta frames are rebuilt from the keyframe file
+                        response_data["state_data"] = load_full_state(state_path, retries=5, retry_delay=0.05)
+                    except Exception:
+                        pass
                 
                 # 2. Read Grid Memory (Python Bot Output)
                 grid_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'grid_snapshot.json'))
@@ -73,6 +89,25 @@ class RequestHandler(http.server.SimpleHTTPRequestHandler):
 
             self.wfile.write(json.dumps(response_data).encode('utf-8'))
             return
+
+        # Grid tiles: chunks changed since the client's version (?since=N&stream=S)
+        url = urlparse(self.path)
+        if url.path == '/grid':
+            query = parse_qs(url.query)
+            try:
+                since = int(query.get('since', ['0'])[0])
+            except ValueError:
+                since = 0
+            stream = query.get('stream', [None])[0]
+
+            GRID_STREAM.poll()
+            response_data = GRID_STREAM.since(since, stream)
+
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.end_headers()
+            self.wfile.write(json.dumps(response_data).encode('utf-8'))
+            return
             
         # Serve Static Files (CSS, JS, HTML) via parent class
         return super().do_GET()
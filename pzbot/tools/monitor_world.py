@@ -10,6 +10,8 @@ sys.path.append(str(project_root))
 
 from bot_runtime import config
 from bot_runtime.ingest.watcher import StateWatcher
+from bot_runtime.ingest.parser import StateParser
+from bot_runtime.ingest.shm_ring import RingFeed
 from bot_runtime.world.model import WorldModel
 from bot_runtime.ingest.state import GameState
 
@@ -76,6 +78,11 @@ class WorldMonitor:
 
     def run(self):
         print("Initializing Monitor...")
+        feed = RingFeed(config.STATE_RING_NAME)
+        if feed.connect():
+            self.run_from_ring(feed)
+            return
+
         watcher = StateWatcher(
             state_file_path=config.STATE_FILE_PATH,
             on_update=self.on_tick,
@@ -93,6 +100,21 @@ class WorldMonitor:
             print(f"Error: {e}")
             watcher.stop()
 
+    def run_from_ring(self, feed: RingFeed):
+        """Follows the frames published by the running bot instead of reading the state file."""
+        print(f"Reading frames from the bot's state ring '{feed.name}'")
+        parser = StateParser()
+        try:
+            while True:
+                data = feed.latest()
+                if data is not None:
+                    self.on_tick(parser.parse_dict(data))
+                time.sleep(0.05)
+        except KeyboardInterrupt:
+            print("\nMonitor stopped.")
+        finally:
+            feed.close()
+
 if __name__ == "__main__":
     monitor = WorldMonitor()
     monitor.run()
@@ -6,6 +6,7 @@ import shutil
 import threading
 import logging
 from pathlib import Path
+from typing import Optional
 from datetime import datetime
 
 # Setup paths - Assume we are in tools/recorder.py or similar
@@ -37,12 +38,18 @@ except ImportError:
 # In `main.py` it uses `config.STATE_FILE_PATH`.
 # Let's try to import config.
 sys.path.append(str(ROOT_DIR))
+from bot_runtime.ingest.frame import FrameReader, TornReadError
+from bot_runtime.ingest.delta import DeltaAssembler, MissingKeyframeError, keyframe_path
+from bot_runtime.ingest.shm_ring import RingFeed, DEFAULT_NAME
+
 try:
     from bot_runtime import config
     STATE_FILE_PATH = config.STATE_FILE_PATH
+    RING_NAME = config.STATE_RING_NAME # The ring main.py publishes to
 except ImportError:
     print("Could not import bot_runtime.config. Using default path.")
     STATE_FILE_PATH = Path(r"C:\Users\lucas\Zomboid\Lua\AISurvivorBridge\state.json")
+    RING_NAME = DEFAULT_NAME
 
 # Logging setup
 logging.basicConfig(
@@ -56,7 +63,7 @@ logging.basicConfig(
 logger = logging.getLogger("Recorder")
 
 class Recorder:
-    def __init__(self, state_path: Path, output_dir: Path, lite_mode: bool = False):
+    def __init__(self, state_path: Path, output_dir: Path, lite_mode: bool = False, ring_name: Optional[str] = RING_NAME):
         self.state_path = state_path
         self.output_dir = output_dir
         self.lite_mode = lite_mode
@@ -69,6 +76,12 @@ class Recorder:
         
         self.start_time = 0
         self._last_mtime = 0
+        self._reader = FrameReader(state_path, retries=5, retry_delay=0.01)
+        # Delta frames from the mod are recorded as full frames
+        keyframe_paths = [keyframe_path(state_path), keyframe_path(state_path.with_suffix(".bin"))]
+        self._deltas = DeltaAssembler(keyframe_paths)
+        # While the bot runs, record from its frame ring instead of reading the file a second time
+        self._feed = RingFeed(ring_name, keyframe_paths) if ring_name else None
         
         # Output handles
         self.out_file = None
@@ -195,7 +208,11 @@ class Recorder:
         
         while self.running:
             try:
-                if self.state_path.exists():
+                if self._feed and self._feed.connect():
+                    for _, data in self._feed.read_all():
+                        self._write_frame(data)
+                        self._last_mtime = time.time()
+                elif self.state_path.exists():
                     stat = self.state_path.stat()
                     mtime = stat.st_mtime
                     
@@ -203,27 +220,20 @@ class Recorder:
                         self._last_mtime = mtime
                         
                         # Read Code
-                        # We use a retry loop because file might be locked by Lua writing
-                        for _ in range(3):
-                            try:
-                                with open(self.state_path, "r", encoding='utf-8') as f:
-                                    content = f.read()
-                                    if not content: continue
-                                    
-                                    data = json.loads(content)
-                                    self._write_frame(data)
-                                    
-                                    # Optional: print status inline every 100 frames
-                                    if self.frame_count % 50 == 0:
-                                        sys.stdout.write(f"\rFrames: {self.frame_count} | Bookmarks: {self.bookmarks}")
-                                        sys.stdout.flush()
-                                    break
-                            except json.JSONDecodeError:
-                                # Partial write, skip
-                                time.sleep(0.01)
-                            except Exception as e:
-                                logger.warning(f"Read error: {e}")
-                                time.sleep(0.01)
+                        # FrameReader retries while Lua is still writing the file
+                        try:
+                            data = self._deltas.apply(self._reader.load())
+                            self._write_frame(data)
+
+                            # Optional: print status inline every 100 frames
+                            if self.frame_count % 50 == 0:
+                                sys.stdout.write(f"\rFrames: {self.frame_count} | Bookmarks: {self.bookmarks}")
+                                sys.stdout.flush()
+                        except (TornReadError, MissingKeyframeError, json.JSONDecodeError):
+                            # Still partial after retries, skip
+                            pass
+                        except Exception as e:
+                            logger.warning(f"Read error: {e}")
                                 
                 else:
                     # Waiting for file or Game Paused
@@ -268,11 +278,12 @@ if __name__ == "__main__":
     parser.add_argument("--state", type=Path, default=STATE_FILE_PATH, help="Path to state.json to watch")
     parser.add_argument("--output", type=Path, default=RECORDINGS_DIR, help="Directory to save recordings")
     parser.add_argument("--lite", action="store_true", help="Strip static tile data to save space (Recommended)")
+    parser.add_argument("--file-only", action="store_true", help="Always read the state file, even while the bot publishes frames")
     
     args = parser.parse_args()
     
     if not args.state.exists():
         logger.warning(f"State file not found at {args.state}. Ensure the game is running or will start soon.")
     
-    rec = Recorder(args.state, args.output, lite_mode=args.lite)
+    rec = Recorder(args.state, args.output, lite_mode=args.lite, ring_name=None if args.file_only else RING_NAME)
     rec.start()
@@ -0,0 +1,66 @@
+"""
+Synthetic state frames shaped like `Sensor.scan` output.
+Used by the benchmark tools when no recorded `state.json` is available.
+"""
+import random
+
+ROOMS = ["kitchen", "bedroom", "bathroom", "livingroom", "hall"]
+LAYERS = ["Wall", "Floor", "Tree", "FenceHigh"]
+
+def make_frame(radius: int = 15, containers: int = 20, items_per_container: int = 10,
+               world_items: int = 40, objects: int = 30, px: int = 10800, py: int = 9400,
+               seed: int = 0) -> dict:
+    """Builds one full state frame (as decoded from JSON) around (px, py)."""
+    rnd = random.Random(seed)
+
+    tiles = []
+    for x in range(px - radius, px + radius + 1):
+        for y in range(py - radius, py + radius + 1):
+            t = {"x": x, "y": y, "z": 0, "w": rnd.random() > 0.2, "v": rnd.random() > 0.3}
+            if rnd.random() < 0.4:
+                t["room"] = rnd.choice(ROOMS)
+            if rnd.random() < 0.2:
+                t["layer"] = rnd.choice(LAYERS)
+            tiles.append(t)
+
+    nearby_containers = []
+    for i in range(containers):
+        items = [{"id": f"item_{i}_{j}", "type": "Base.TinnedBeans", "name": "Beans", "count": 1,
+                  "category": "Food", "weight": 0.5} for j in range(items_per_container)]
+        nearby_containers.append({"id": f"container_{i}", "type": "Container", "object_type": "Fridge",
+                                  "x": px + rnd.randint(-radius, radius), "y": py + rnd.randint(-radius, radius), "z": 0,
+                                  "items": items, "meta": {}})
+
+    floor_items = [{"id": f"floor_{i}", "type": "Base.Axe", "name": "Axe", "category": "Weapon",
+                    "x": px + rnd.randint(-radius, radius), "y": py + rnd.randint(-radius, radius), "z": 0}
+                   for i in range(world_items)]
+
+    objs = [{"id": f"zombie_{i}", "type": "Zombie", "x": px + rnd.randint(-radius, radius),
+             "y": py + rnd.randint(-radius, radius), "z": 0, "meta": {"state": "idle"}}
+            for i in range(objects)]
+
+    return {
+        "timestamp": 1000,
+        "tick": 1.0,
+        "player": {
+            "position": {"x": px + 0.5, "y": py + 0.5, "z": 0},
+            "body": {"health": 100, "parts": {}},
+            "action_state": {"status": "idle"},
+            "moodles": [],
+            "inventory": [],
+            "worn_items": [],
+            "vision": {
+                "scan_radius": radius,
+                "timestamp": 1000,
+                "tiles": tiles,
+                "objects": objs,
+                "world_items": floor_items,
+                "nearby_containers": nearby_containers,
+                "vehicles": [],
+                "signals": [],
+                "sounds": [],
+                "neighbors": {}
+            }
+        },
+        "environment": {"time_of_day": 12.0}
+    }
@@ -942,6 +942,30 @@ function renderMap(grid, state) {
 let lastState = null;
 let lastGrid = null;
 
+// Grid tiles by chunk, merged from /grid deltas (only chunks changed since gridVersion are fetched)
+const gridChunks = new Map();
+let gridStream = null;
+let gridVersion = 0;
+let gridTiles = [];
+let gridBounds = null;
+
+async function pollGrid() {
+    const res = await fetch(`/grid?since=${gridVersion}&stream=${encodeURIComponent(gridStream || '')}`);
+    const delta = await res.json();
+    if (!delta.stream) return false;
+    if (delta.full) gridChunks.clear();
+    const changed = Object.keys(delta.chunks || {});
+    changed.forEach(id => gridChunks.set(id, delta.chunks[id]));
+    gridStream = delta.stream;
+    gridVersion = delta.version;
+    gridBounds = delta.bounds;
+    if (changed.length > 0 || delta.full) {
+        gridTiles = [];
+        gridChunks.forEach(tiles => { for (const t of tiles) gridTiles.push(t); });
+    }
+    return true;
+}
+
 async function poll() {
     try {
         const res = await fetch('/data');
@@ -963,8 +987,12 @@ async function poll() {
 
         if (data.grid_data) {
             if (data.grid_data.tiles && data.grid_data.tiles.length > 0) {
+                // Older runtime: full tile list in the snapshot
                 lastGrid = data.grid_data;
                 updateMemory(lastGrid);
+            } else if (data.grid_data.stream && await pollGrid() && gridTiles.length > 0) {
+                lastGrid = Object.assign({}, data.grid_data, { tiles: gridTiles, bounds: gridBounds });
+                updateMemory(lastGrid);
             }
             if (data.grid_data.brain) {
                 updateBrainState(data.grid_data.brain);